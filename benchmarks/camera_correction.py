@@ -0,0 +1,120 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark the real-time camera correction.
+
+Corrects random uint16 frames in place with each correction alone and with all of
+them, and reports frames/s and MB/s. The correction runs on the data thread, so
+compare the rates with the frame rate of the camera:
+
+    python benchmarks/camera_correction.py --size 2048 --frames 16
+"""
+
+# Standard Library Imports
+import argparse
+import time
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+from navigate.model.analysis.camera import CameraCorrection, find_hot_pixels
+
+
+def camera_maps(shape, hot_pixels=500):
+    """Random offset, flatfield and hot-pixel maps.
+
+    Parameters
+    ----------
+    shape : tuple
+        (height, width) of the frames.
+    hot_pixels : int
+        Number of hot pixels.
+
+    Returns
+    -------
+    dict
+        CameraCorrection keyword arguments of each correction and of all of them.
+    """
+    variance = np.random.gamma(2, 2, shape)
+    variance.flat[np.random.choice(variance.size, hot_pixels, replace=False)] = 1e4
+    maps = {
+        "offset": {"offset_map": np.random.normal(100, 2, shape)},
+        "flatfield": {"flatfield_map": np.random.uniform(0.8, 1.2, shape)},
+        "hot pixel": {"hot_pixel_mask": find_hot_pixels(variance)},
+    }
+    maps["all"] = {k: v for m in maps.values() for k, v in m.items()}
+    return maps
+
+
+def benchmark(correction, frames, repeats=3):
+    """Correct the frames repeatedly.
+
+    Parameters
+    ----------
+    correction : CameraCorrection
+        The correction.
+    frames : np.ndarray
+        ZYX uint16 frames, corrected in place.
+    repeats : int
+        Number of passes over the frames.
+
+    Returns
+    -------
+    float
+        Corrected frames per second.
+    """
+    # the first pass warms up the caches
+    correction.correct(frames)
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        correction.correct(frames)
+    return repeats * len(frames) / (time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Camera correction benchmark")
+    parser.add_argument("--size", type=int, default=2048, help="frame edge, pixels")
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    shape = (args.size, args.size)
+    frames = np.random.randint(90, 2000, (args.frames,) + shape).astype(np.uint16)
+    for name, kwargs in camera_maps(shape).items():
+        frames_per_second = benchmark(
+            CameraCorrection(shape, **kwargs), frames, args.repeats
+        )
+        print(
+            f"{name}: {frames_per_second:.1f} frames/s, "
+            f"{frames_per_second * frames[0].nbytes / 1e6:.1f} MB/s"
+        )
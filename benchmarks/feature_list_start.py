@@ -0,0 +1,102 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark the acquisition start latency of large customized feature lists.
+
+Times turning the string of a customized feature list with many loops into a
+feature list with exec, with the first and with cached compilations, and loading
+it into the feature containers of a model on synthetic hardware, as an
+acquisition does when it starts:
+
+    python benchmarks/feature_list_start.py --loops 200
+"""
+
+# Standard Library Imports
+import argparse
+import time
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.features import feature_related_functions
+from navigate.model.features.feature_container import load_features
+from navigate.model.features.feature_list_compiler import compile_feature_list
+from navigate.model.features.feature_related_functions import (
+    convert_str_to_feature_list,
+)
+from synthetic_model import synthetic_model
+
+
+def large_feature_list_str(n):
+    """Return the string of a customized feature list with n loops."""
+    loop = (
+        "({'name': PrepareNextChannel}, {'name': Snap}, "
+        "{'name': WaitToContinue, 'node': {'device_related': True}}, "
+        "{'name': LoopByCount, 'args': "
+        "('experiment.MicroscopeState.selected_channels',), 'true': 'break'})"
+    )
+    return "[" + ", ".join([loop] * n) + "]"
+
+
+def mean_time(func, repeats):
+    """Return the mean duration of func in seconds."""
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start_time) / repeats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature list start benchmark")
+    parser.add_argument("--loops", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    content = large_feature_list_str(args.loops)
+    namespace = vars(feature_related_functions)
+    exec_time = mean_time(lambda: exec(f"result={content}", namespace, {}), 1)
+
+    compile_feature_list.cache_clear()
+    first_time = mean_time(lambda: convert_str_to_feature_list(content), 1)
+    cached_time = mean_time(lambda: convert_str_to_feature_list(content), args.repeats)
+
+    with synthetic_model() as model:
+        start_latency = mean_time(
+            lambda: load_features(model, convert_str_to_feature_list(content)),
+            args.repeats,
+        )
+
+    print(f"{args.loops} loops, {len(content)} characters")
+    print(f"exec: {exec_time * 1000:.2f} ms")
+    print(f"first compile: {first_time * 1000:.2f} ms")
+    print(f"cached compile: {cached_time * 1000:.2f} ms")
+    print(f"acquisition start: {start_latency * 1000:.2f} ms")
@@ -0,0 +1,108 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark the sequenced z-stack against the per-frame z-stack.
+
+Acquires z-stacks with the per-frame ZStackAcquisition, which moves the stage and
+starts the DAQ for every plane, and with the hardware-timed
+SequencedZStackAcquisition on the synthetic DAQ and stage, and reports frames/s
+of both:
+
+    python benchmarks/sequenced_z_stack.py --z-steps 50
+"""
+
+# Standard Library Imports
+import argparse
+import time
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.features.common_features import (
+    SequencedZStackAcquisition,
+    ZStackAcquisition,
+)
+from synthetic_model import synthetic_model
+
+
+def acquire_z_stack(model, feature):
+    """Acquire a z-stack with a customized feature list.
+
+    Parameters
+    ----------
+    model : Model
+        Model with synthetic hardware.
+    feature : class
+        ZStackAcquisition or SequencedZStackAcquisition.
+
+    Returns
+    -------
+    float
+        Acquired frames per second.
+    """
+    state = model.configuration["experiment"]["MicroscopeState"]
+    n_frames = int(state["number_z_steps"]) * int(state["selected_channels"])
+    model.addon_feature = [{"name": feature}]
+    show_img_pipe = model.create_pipe("show_img_pipe")
+
+    start_time = time.perf_counter()
+    model.run_command("acquire")
+    while show_img_pipe.recv() != "stop":
+        pass
+    model.data_thread.join()
+    duration = time.perf_counter() - start_time
+
+    model.release_pipe("show_img_pipe")
+    model.addon_feature = None
+    return n_frames / duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequenced z-stack benchmark")
+    parser.add_argument("--z-steps", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with synthetic_model() as model:
+        state = model.configuration["experiment"]["MicroscopeState"]
+        state["image_mode"] = "customized"
+        state["is_save"] = False
+        state["is_multiposition"] = False
+        state["stack_cycling_mode"] = "per_stack"
+        state["number_z_steps"] = args.z_steps
+
+        for feature in [ZStackAcquisition, SequencedZStackAcquisition]:
+            frame_rates = [acquire_z_stack(model, feature) for _ in range(args.repeats)]
+            print(
+                f"{feature.__name__}: {max(frame_rates):.1f} frames/s "
+                f"(best of {args.repeats}, {args.z_steps} planes per channel)"
+            )
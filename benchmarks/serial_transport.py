@@ -0,0 +1,141 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark pipelined serial commands without hardware.
+
+Sends commands through a SerialTransport connected to a LoopbackSerial stand-in
+with a link latency and a processing time per command. The commands are sent one
+at a time with query, pipelined with query_many, and queued from several threads
+with submit. Reports commands/s and round trips of each:
+
+    python benchmarks/serial_transport.py --latency 0.004 --process-time 0.0002
+"""
+
+# Standard Library Imports
+import argparse
+import threading
+import time
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.devices.APIs.serial_transport import SerialTransport
+from navigate.tools.serial_stand_in import LoopbackSerial
+
+
+def echo(command):
+    """Answer a command with itself."""
+    return command.strip() + b"\r\n"
+
+
+def send_sequential(transport, commands):
+    """Send each command and wait for its response."""
+    return [transport.query(command) for command in commands]
+
+
+def send_pipelined(transport, commands):
+    """Send the commands back to back, then read the responses."""
+    return transport.query_many(commands)
+
+
+def send_submitted(transport, commands, n_threads=4):
+    """Queue the commands from several threads."""
+    futures = [None] * len(commands)
+
+    def submit(indices):
+        for i in indices:
+            futures[i] = transport.submit(commands[i])
+
+    threads = [
+        threading.Thread(target=submit, args=(range(k, len(commands), n_threads),))
+        for k in range(n_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [future.result() for future in futures]
+
+
+def benchmark(send, commands, latency, process_time):
+    """Send the commands through a new transport.
+
+    Parameters
+    ----------
+    send : callable
+        Sends the commands through the transport and returns the responses.
+    commands : list[bytes]
+        Commands.
+    latency : float
+        Round trip time of the link in seconds.
+    process_time : float
+        Time in seconds the device needs to process a command.
+
+    Returns
+    -------
+    commands_per_second : float
+        Commands per second.
+    round_trips : int
+        Number of times the transport waited for responses.
+    """
+    transport = SerialTransport(
+        LoopbackSerial(echo, latency=latency, process_time=process_time)
+    )
+    start_time = time.perf_counter()
+    responses = send(transport, commands)
+    duration = time.perf_counter() - start_time
+    transport.close()
+    assert responses == [echo(command) for command in commands]
+    return len(commands) / duration, transport.round_trips
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial transport benchmark")
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.004, help="link round trip, seconds"
+    )
+    parser.add_argument(
+        "--process-time", type=float, default=0.0002, help="per command, seconds"
+    )
+    args = parser.parse_args()
+
+    commands = [bytes(f"{i}\r", encoding="ascii") for i in range(args.commands)]
+    for name, send in [
+        ("sequential", send_sequential),
+        ("pipelined", send_pipelined),
+        ("submitted", send_submitted),
+    ]:
+        commands_per_second, round_trips = benchmark(
+            send, commands, args.latency, args.process_time
+        )
+        print(f"{name}: {commands_per_second:.0f} cmd/s, {round_trips} round trips")
@@ -0,0 +1,125 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Profile the startup imports with python -X importtime.
+
+Imports the entry point, the controller and the model in fresh interpreters,
+reports the best cumulative import time of each against its target and lists the
+slowest modules they import directly:
+
+    python benchmarks/startup_imports.py --repeats 5
+
+main() shows the splash screen after importing navigate.main and imports the
+controller afterwards, so navigate.main sets the time to the splash screen. The
+controller logs "Startup - Splash screen dismissed ...s after the controller
+started" when the main window is shown, the target of that time is
+SPLASH_DISMISSED_TARGET with synthetic hardware.
+
+The display notebook of the main window imports matplotlib, which is most of the
+import time of the controller. pandas and pandastable are imported when the
+multiposition tab is built.
+"""
+
+# Standard Library Imports
+import argparse
+import subprocess
+import sys
+
+# Third Party Imports
+
+# Local Imports
+
+#: dict: Target cumulative import time of each module, in seconds.
+IMPORT_TARGETS = {
+    "navigate.main": 0.3,
+    "navigate.model.model": 0.5,
+    "navigate.controller.controller": 1.5,
+}
+
+#: float: Target time from the controller start to the dismissed splash screen.
+SPLASH_DISMISSED_TARGET = 3.0
+
+
+def import_profile(module):
+    """Import a module in a new interpreter with -X importtime.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module.
+
+    Returns
+    -------
+    list[tuple]
+        (depth, name, self time, cumulative time) of each imported module, times
+        in seconds, in the order of the profile.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        profile.append(
+            (depth, name.strip(), int(self_time) / 1e6, int(cumulative) / 1e6)
+        )
+    return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup import benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--slowest", type=int, default=5)
+    args = parser.parse_args()
+
+    over_target = False
+    for module, target in IMPORT_TARGETS.items():
+        profiles = [import_profile(module) for _ in range(args.repeats)]
+        # the module is the last, outermost import of its profile
+        best = min(profiles, key=lambda profile: profile[-1][3])
+        import_time = best[-1][3]
+        over_target |= import_time > target
+        print(f"{module}: {import_time:.3f} s (target {target:.1f} s)")
+
+        depth = best[-1][0]
+        children = [entry for entry in best if entry[0] == depth + 1]
+        children.sort(key=lambda entry: entry[3], reverse=True)
+        for _, name, _, cumulative in children[: args.slowest]:
+            print(f"    {name}: {cumulative:.3f} s")
+    print(f"splash screen dismissed: target {SPLASH_DISMISSED_TARGET:.1f} s")
+    sys.exit(1 if over_target else 0)
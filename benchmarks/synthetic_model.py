@@ -0,0 +1,89 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Model on synthetic hardware, for the benchmarks."""
+
+# Standard Library Imports
+import contextlib
+from multiprocessing import Manager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Third Party Imports
+
+# Local Imports
+from navigate.config.config import (
+    load_configs,
+    verify_configuration,
+    verify_experiment_config,
+    verify_waveform_constants,
+)
+from navigate.model.model import Model
+
+#: Path: Configuration files that ship with the code base.
+CONFIGURATION_DIRECTORY = (
+    Path(__file__).resolve().parent.parent.joinpath("src", "navigate", "config")
+)
+
+
+@contextlib.contextmanager
+def synthetic_model():
+    """Create a Model with synthetic hardware and the shipped configuration.
+
+    Yields
+    ------
+    model : Model
+        The model. Its events are sent to a MagicMock.
+    """
+    with Manager() as manager:
+        configuration = load_configs(
+            manager,
+            configuration=CONFIGURATION_DIRECTORY / "configuration.yaml",
+            experiment=CONFIGURATION_DIRECTORY / "experiment.yml",
+            waveform_constants=CONFIGURATION_DIRECTORY / "waveform_constants.yml",
+            rest_api_config=CONFIGURATION_DIRECTORY / "rest_api_config.yml",
+            waveform_templates=CONFIGURATION_DIRECTORY / "waveform_templates.yml",
+        )
+        verify_configuration(manager, configuration)
+        verify_experiment_config(manager, configuration)
+        verify_waveform_constants(manager, configuration)
+
+        model = Model(
+            args=SimpleNamespace(synthetic_hardware=True),
+            configuration=configuration,
+            event_queue=MagicMock(),
+        )
+        try:
+            yield model
+        finally:
+            model.terminate()
@@ -152,12 +152,17 @@ def get_configuration_paths():
 def load_configs(manager, **kwargs):
     """Load configuration files.
 
+    All the files are parsed before the shared dictionary is built, and the shared
+    dictionary is built in bulk, see build_nested_dict.
+
     Parameters
     ----------
-    manager : multiprocessing.Manager
-        Shares objects (e.g., dict) between processes
+    manager : multiprocessing.Manager or None
+        Shares objects (e.g., dict) between processes. If None, plain dictionaries
+        are returned, e.g. to verify the configurations before sharing them.
     **kwargs
-        List of configuration file paths
+        List of configuration file paths or already loaded configuration
+        dictionaries
 
     Returns
     -------
@@ -168,18 +173,24 @@ def load_configs(manager, **kwargs):
         print("No files provided to load_yaml_config()")
         sys.exit(1)
 
-    config_dict = manager.dict()
+    configs = {}
     for config_name, file_path in kwargs.items():
+        if isinstance(file_path, dict):
+            configs[config_name] = file_path
+            continue
         file_path = Path(file_path)
         assert file_path.exists(), "Configuration File not found: {}".format(file_path)
         with open(file_path) as f:
             try:
-                config_data = yaml.load(f, Loader=yaml.FullLoader)
-                build_nested_dict(manager, config_dict, config_name, config_data)
+                configs[config_name] = yaml.load(f, Loader=yaml.FullLoader)
             except yaml.YAMLError as yaml_error:
                 print(f"Configuration - Yaml Error: {yaml_error}")
                 sys.exit(1)
 
+    config_dict = {} if manager is None else manager.dict()
+    for config_name, config_data in configs.items():
+        build_nested_dict(manager, config_dict, config_name, config_data)
+
     # return combined dictionary
     return config_dict
 
@@ -187,10 +198,15 @@ def load_configs(manager, **kwargs):
 def build_nested_dict(manager, parent_dict, key_name, dict_data):
     """Nest dictionaries recursively.
 
+    The tree is built from the leaves up and every shared dictionary or list is
+    created with its content in one call to the manager, instead of one call per
+    key or list item.
+
     Parameters
     ----------
-    manager : multiprocessing.Manager
-        Shares objects (e.g., dict) between processes
+    manager : multiprocessing.Manager or None
+        Shares objects (e.g., dict) between processes. If None, the data is copied
+        into plain dictionaries and lists.
     parent_dict : dict
         Dictionary we are adding to
     key_name : str
@@ -206,19 +222,17 @@ def build_nested_dict(manager, parent_dict, key_name, dict_data):
     --------
     >>> build_nested_dict(manager, parent_dict, key_name, dict_data)
     """
-    if type(dict_data) != dict and type(dict_data) != list:
-        parent_dict[key_name] = dict_data
-        return
-    if type(dict_data) == dict:
-        d = manager.dict()
-        for k in dict_data:
-            build_nested_dict(manager, d, k, dict_data[k])
-    else:
-        d = manager.list()
-        for i, v in enumerate(dict_data):
-            d.append(None)
-            build_nested_dict(manager, d, i, v)
-    parent_dict[key_name] = d
+
+    def build(data):
+        if type(data) == dict:
+            d = {k: build(v) for k, v in data.items()}
+            return d if manager is None else manager.dict(d)
+        elif type(data) == list:
+            d = [build(v) for v in data]
+            return d if manager is None else manager.list(d)
+        return data
+
+    parent_dict[key_name] = build(dict_data)
 
 
 def update_config_dict(manager, parent_dict, config_name, new_config) -> bool:
@@ -269,7 +283,11 @@ def verify_experiment_config(manager, configuration):
     configuration: configuration object
         contains all the yaml files
     """
-    if type(configuration["experiment"]) is not DictProxy:
+    # without a manager, the configuration is verified as plain dictionaries
+    dict_type = dict if manager is None else DictProxy
+    list_type = list if manager is None else ListProxy
+
+    if type(configuration["experiment"]) is not dict_type:
         update_config_dict(manager, configuration, "experiment", {})
 
     # verify/build autofocus parameter setting
@@ -290,7 +308,7 @@ def verify_experiment_config(manager, configuration):
         if "stage" in microscope_config.keys():
             stages = microscope_config["stage"]["hardware"]
             device_dict[microscope_name]["stage"] = {}
-            if type(stages) != ListProxy:
+            if not isinstance(stages, (list, ListProxy)):
                 stages = [stages]
             for stage in stages:
                 if not stage["type"].lower().startswith("synthetic"):
@@ -308,7 +326,7 @@ def verify_experiment_config(manager, configuration):
     }
     if (
         "AutoFocusParameters" not in configuration["experiment"]
-        or type(configuration["experiment"]["AutoFocusParameters"]) is not DictProxy
+        or type(configuration["experiment"]["AutoFocusParameters"]) is not dict_type
     ):
         update_config_dict(
             manager, configuration["experiment"], "AutoFocusParameters", {}
@@ -339,17 +357,17 @@ def verify_experiment_config(manager, configuration):
                     )
 
     # remove non-consistent autofocus parameter
-    for microscope_name in autofocus_setting_dict.keys():
+    for microscope_name in list(autofocus_setting_dict.keys()):
         if microscope_name not in device_dict:
             autofocus_setting_dict.pop(microscope_name)
         else:
-            for device in autofocus_setting_dict[microscope_name].keys():
+            for device in list(autofocus_setting_dict[microscope_name].keys()):
                 if device not in device_dict[microscope_name]:
                     autofocus_setting_dict[microscope_name].pop(device)
                 else:
-                    for device_ref in autofocus_setting_dict[microscope_name][
-                        device
-                    ].keys():
+                    for device_ref in list(
+                        autofocus_setting_dict[microscope_name][device].keys()
+                    ):
                         if (
                             device_ref
                             not in autofocus_setting_dict[microscope_name][device]
@@ -372,7 +390,7 @@ def verify_experiment_config(manager, configuration):
     }
     if (
         "Saving" not in configuration["experiment"]
-        or type(configuration["experiment"]["Saving"]) is not DictProxy
+        or type(configuration["experiment"]["Saving"]) is not dict_type
     ):
         update_config_dict(
             manager, configuration["experiment"], "Saving", saving_dict_sample
@@ -400,10 +418,13 @@ def verify_experiment_config(manager, configuration):
         "binning": "1x1",
         "frames_to_average": 1,
         "databuffer_size": 100,
+        "offset_correction": False,
+        "flatfield_correction": False,
+        "hot_pixel_correction": False,
     }
     if (
         "CameraParameters" not in configuration["experiment"]
-        or type(configuration["experiment"]["CameraParameters"]) is not DictProxy
+        or type(configuration["experiment"]["CameraParameters"]) is not dict_type
     ):
         update_config_dict(
             manager,
@@ -461,6 +482,11 @@ def verify_experiment_config(manager, configuration):
         if camera_setting_dict[k] < 1:
             camera_setting_dict[k] = camera_parameters_dict_sample[k]
 
+    # real-time camera corrections
+    for k in ["offset_correction", "flatfield_correction", "hot_pixel_correction"]:
+        if type(camera_setting_dict[k]) is not bool:
+            camera_setting_dict[k] = False
+
     # stage parameters
     stage_dict_sample = {}
     device_config = configuration["configuration"]["microscopes"]
@@ -477,7 +503,7 @@ def verify_experiment_config(manager, configuration):
 
     if (
         "StageParameters" not in configuration["experiment"]
-        or type(configuration["experiment"]["StageParameters"]) is not DictProxy
+        or type(configuration["experiment"]["StageParameters"]) is not dict_type
     ):
         update_config_dict(
             manager, configuration["experiment"], "StageParameters", stage_dict_sample
@@ -491,7 +517,7 @@ def verify_experiment_config(manager, configuration):
     for microscope_name in stage_dict_sample:
         if (
             microscope_name not in stage_setting_dict.keys()
-            or type(stage_setting_dict[microscope_name]) is not DictProxy
+            or type(stage_setting_dict[microscope_name]) is not dict_type
         ):
             update_config_dict(
                 manager,
@@ -516,10 +542,12 @@ def verify_experiment_config(manager, configuration):
                         ][k]
 
     # microscope state parameters
-    microscope_name = configuration["configuration"]["microscopes"].keys()[0]
-    zoom = configuration["configuration"]["microscopes"][microscope_name]["zoom"][
-        "position"
-    ].keys()[0]
+    microscope_name = list(configuration["configuration"]["microscopes"].keys())[0]
+    zoom = list(
+        configuration["configuration"]["microscopes"][microscope_name]["zoom"][
+            "position"
+        ].keys()
+    )[0]
     microscope_state_dict_sample = {
         "microscope_name": microscope_name,
         "image_mode": "live",
@@ -553,7 +581,7 @@ def verify_experiment_config(manager, configuration):
     }
     if (
         "MicroscopeState" not in configuration["experiment"]
-        or type(configuration["experiment"]["MicroscopeState"]) is not DictProxy
+        or type(configuration["experiment"]["MicroscopeState"]) is not dict_type
     ):
         update_config_dict(
             manager,
@@ -595,13 +623,15 @@ def verify_experiment_config(manager, configuration):
             "position"
         ].keys()
     ):
-        microscope_setting_dict["zoom"] = configuration["configuration"]["microscopes"][
-            microscope_name
-        ]["zoom"]["position"].keys()[0]
+        microscope_setting_dict["zoom"] = list(
+            configuration["configuration"]["microscopes"][microscope_name]["zoom"][
+                "position"
+            ].keys()
+        )[0]
     # channels
     if (
         "channels" not in microscope_setting_dict
-        or type(microscope_setting_dict["channels"]) is not DictProxy
+        or type(microscope_setting_dict["channels"]) is not dict_type
     ):
         update_config_dict(manager, microscope_setting_dict, "channels", {})
     laser_list = [
@@ -619,7 +649,7 @@ def verify_experiment_config(manager, configuration):
     channel_nums = configuration["configuration"]["gui"]["channels"]["count"]
     channel_setting_dict = microscope_setting_dict["channels"]
     selected_channel_num = 0
-    for channel in channel_setting_dict.keys():
+    for channel in list(channel_setting_dict.keys()):
         if not channel.startswith(prefix):
             del channel_setting_dict[channel]
             continue
@@ -667,28 +697,27 @@ def verify_experiment_config(manager, configuration):
     # MultiPositions
     if (
         "MultiPositions" not in configuration["experiment"]
-        or type(configuration["experiment"]["MultiPositions"]) is not ListProxy
+        or type(configuration["experiment"]["MultiPositions"]) is not list_type
     ):
         update_config_dict(manager, configuration["experiment"], "MultiPositions", [])
-    position_ids = []
-    multipositions = configuration["experiment"]["MultiPositions"]
-    for i, position in enumerate(multipositions):
-        for axis in ["x", "y", "z", "theta", "f"]:
-            try:
-                position[axis] = float(position[axis])
-            except ValueError:
-                position_ids.append(i)
-                break
-    for idx in position_ids[::-1]:
-        del multipositions[idx]
+    # imported here, navigate.main imports this module before numpy is needed
+    from navigate.tools.position_table import PositionTable
+
+    multipositions = PositionTable()
+    for position in configuration["experiment"]["MultiPositions"][:]:
+        try:
+            multipositions.append(position)
+        except ValueError:
+            continue
     if len(multipositions) < 1:
-        multipositions.append(None)
-        update_config_dict(
-            manager,
-            multipositions,
-            0,
-            {"x": 10.0, "y": 10.0, "z": 10.0, "f": 10.0, "theta": 10.0},
+        multipositions.append(
+            {"x": 10.0, "y": 10.0, "z": 10.0, "f": 10.0, "theta": 10.0}
         )
+    configuration["experiment"]["MultiPositions"] = (
+        multipositions.to_list()
+        if manager is None
+        else multipositions.to_list_proxy(manager)
+    )
     microscope_setting_dict["multiposition_count"] = len(multipositions)
 
 
@@ -720,14 +749,16 @@ def verify_waveform_constants(manager, configuration):
         from the configuration.
 
     """
-    if type(configuration["waveform_constants"]) is not DictProxy:
+    dict_type = dict if manager is None else DictProxy
+
+    if type(configuration["waveform_constants"]) is not dict_type:
         update_config_dict(manager, configuration, "waveform_constants", {})
     waveform_dict = configuration["waveform_constants"]
 
     # remote_focus_constants
     if (
         "remote_focus_constants" not in waveform_dict.keys()
-        or type(waveform_dict["remote_focus_constants"]) is not DictProxy
+        or type(waveform_dict["remote_focus_constants"]) is not dict_type
     ):
         update_config_dict(manager, waveform_dict, "remote_focus_constants", {})
 
@@ -736,7 +767,7 @@ def verify_waveform_constants(manager, configuration):
         config_dict = configuration["configuration"]["microscopes"][microscope_name]
         if (
             microscope_name not in waveform_dict.keys()
-            or type(waveform_dict[microscope_name]) is not DictProxy
+            or type(waveform_dict[microscope_name]) is not dict_type
         ):
             update_config_dict(manager, waveform_dict, microscope_name, {})
 
@@ -749,15 +780,14 @@ def verify_waveform_constants(manager, configuration):
         for zoom in config_dict["zoom"]["position"].keys():
             if (
                 zoom not in waveform_dict[microscope_name].keys()
-                or type(waveform_dict[microscope_name][zoom]) is not DictProxy
+                or type(waveform_dict[microscope_name][zoom]) is not dict_type
             ):
                 update_config_dict(manager, waveform_dict[microscope_name], zoom, {})
 
             for laser in lasers:
                 if (
                     laser not in waveform_dict[microscope_name][zoom].keys()
-                    or type(waveform_dict[microscope_name][zoom][laser])
-                    is not DictProxy
+                    or type(waveform_dict[microscope_name][zoom][laser]) is not dict_type
                 ):
                     update_config_dict(
                         manager,
@@ -794,17 +824,17 @@ def verify_waveform_constants(manager, configuration):
                                 ] = config_dict["remote_focus_device"].get(k, "0")
 
             # delete non-exist lasers
-            for k in waveform_dict[microscope_name][zoom].keys():
+            for k in list(waveform_dict[microscope_name][zoom].keys()):
                 if k not in lasers:
                     waveform_dict[microscope_name][zoom].pop(k)
 
         # delete non-exist zoom
-        for k in waveform_dict[microscope_name].keys():
+        for k in list(waveform_dict[microscope_name].keys()):
             if k not in config_dict["zoom"]["position"].keys():
                 waveform_dict[microscope_name].pop(k)
 
     # delete non-exist microscope
-    for k in waveform_dict.keys():
+    for k in list(waveform_dict.keys()):
         if k not in configuration["configuration"]["microscopes"].keys():
             waveform_dict.pop(k)
 
@@ -812,7 +842,7 @@ def verify_waveform_constants(manager, configuration):
     waveform_dict = configuration["waveform_constants"]
     if (
         "galvo_constants" not in waveform_dict.keys()
-        or type(waveform_dict["galvo_constants"]) is not DictProxy
+        or type(waveform_dict["galvo_constants"]) is not dict_type
     ):
         update_config_dict(manager, waveform_dict, "galvo_constants", {})
 
@@ -833,7 +863,7 @@ def verify_waveform_constants(manager, configuration):
         galvo_ref = f"Galvo {i}"
         if (
             galvo_ref not in waveform_dict.keys()
-            or type(waveform_dict[galvo_ref]) is not DictProxy
+            or type(waveform_dict[galvo_ref]) is not dict_type
         ):
             update_config_dict(manager, waveform_dict, galvo_ref, {})
         waveform_dict = waveform_dict[galvo_ref]
@@ -850,14 +880,14 @@ def verify_waveform_constants(manager, configuration):
             config_dict = configuration["configuration"]["microscopes"][microscope_name]
             if (
                 microscope_name not in waveform_dict.keys()
-                or type(waveform_dict[microscope_name]) is not DictProxy
+                or type(waveform_dict[microscope_name]) is not dict_type
             ):
                 update_config_dict(manager, waveform_dict, microscope_name, {})
 
             for zoom in config_dict["zoom"]["position"].keys():
                 if (
                     zoom not in waveform_dict[microscope_name].keys()
-                    or type(waveform_dict[microscope_name][zoom]) is not DictProxy
+                    or type(waveform_dict[microscope_name][zoom]) is not dict_type
                 ):
                     update_config_dict(
                         manager,
@@ -883,11 +913,11 @@ def verify_waveform_constants(manager, configuration):
                                     "galvo"
                                 ][i].get(k, "0")
             # delete non-exist zoom
-            for k in waveform_dict[microscope_name].keys():
+            for k in list(waveform_dict[microscope_name].keys()):
                 if k not in config_dict["zoom"]["position"].keys():
                     waveform_dict[microscope_name].pop(k)
         # delete non-exist microscope
-        for k in waveform_dict.keys():
+        for k in list(waveform_dict.keys()):
             if k not in configuration["configuration"]["microscopes"].keys():
                 waveform_dict.pop(k)
 
@@ -905,7 +935,7 @@ def verify_waveform_constants(manager, configuration):
     }
     if (
         "other_constants" not in waveform_dict.keys()
-        or type(waveform_dict["other_constants"]) is not DictProxy
+        or type(waveform_dict["other_constants"]) is not dict_type
     ):
         update_config_dict(
             manager,
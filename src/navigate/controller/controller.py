@@ -34,7 +34,6 @@
 from multiprocessing import Manager
 import tkinter
 from tkinter import messagebox
-import multiprocessing as mp
 import threading
 import sys
 import os
@@ -47,6 +46,7 @@ import platform
 from navigate.view.main_application_window import MainApp as view
 from navigate.view.popups.camera_view_popup_window import CameraViewPopupWindow
 from navigate.view.popups.feature_list_popup import FeatureListPopup
+from navigate.view.popups.image_preview_popup import ImagePreviewPopup
 
 # Local Sub-Controller Imports
 from navigate.controller.configuration_controller import ConfigurationController
@@ -60,6 +60,7 @@ from navigate.controller.sub_controllers import (
     ChannelsTabController,
     AcquireBarController,
     FeaturePopupController,
+    ImagePreviewPopupController,
     MenuController,
     PluginsController,
     # MicroscopePopupController,
@@ -67,10 +68,12 @@ from navigate.controller.sub_controllers import (
 )
 
 from navigate.controller.thread_pool import SynchronizedThreadPool
+from navigate.controller.update_scheduler import UpdateScheduler
 
 # Local Model Imports
 from navigate.model.model import Model
 from navigate.model.concurrency.concurrency_tools import ObjectInSubprocess
+from navigate.model.concurrency.event_queue import EventQueue
 
 # Misc. Local Imports
 from navigate.config.config import (
@@ -83,7 +86,6 @@ from navigate.config.config import (
 )
 from navigate.tools.file_functions import create_save_path, save_yaml_file
 from navigate.tools.common_dict_tools import update_stage_dict
-from navigate.tools.multipos_table_tools import update_table
 from navigate.tools.common_functions import combine_funcs
 
 # Logger Setup
@@ -138,15 +140,17 @@ class Controller:
         #: Object: Thread pool for the controller.
         self.threads_pool = SynchronizedThreadPool()
 
-        #: mp.Queue: Queue for retrieving events ('event_name', value) from model
-        self.event_queue = mp.Queue(100)
+        startup_time = time.perf_counter()
+
+        #: EventQueue: Queue for retrieving events ('event_name', value) from model
+        self.event_queue = EventQueue(100)
 
         #: Manager: A shared memory manager
         self.manager = Manager()
 
-        #: dict: Configuration dictionary
-        self.configuration = load_configs(
-            self.manager,
+        # parse and verify the configurations locally, then share them in bulk
+        configuration = load_configs(
+            None,
             configuration=configuration_path,
             experiment=experiment_path,
             waveform_constants=waveform_constants_path,
@@ -154,15 +158,27 @@ class Controller:
             waveform_templates=waveform_templates_path,
         )
 
-        verify_configuration(self.manager, self.configuration)
-        verify_experiment_config(self.manager, self.configuration)
-        verify_waveform_constants(self.manager, self.configuration)
+        verify_configuration(None, configuration)
+        verify_experiment_config(None, configuration)
+        verify_waveform_constants(None, configuration)
+        config_time = time.perf_counter()
+
+        #: dict: Configuration dictionary
+        self.configuration = load_configs(self.manager, **configuration)
+        share_time = time.perf_counter()
 
         # Initialize the Model
         #: ObjectInSubprocess: Model object in MVC architecture.
         self.model = ObjectInSubprocess(
             Model, args, self.configuration, event_queue=self.event_queue
         )
+        model_time = time.perf_counter()
+        logger.info(
+            f"Startup - Configuration loaded in {config_time - startup_time:.3f}s, "
+            f"shared in {share_time - config_time:.3f}s, "
+            f"model ready in {model_time - share_time:.3f}s "
+            f"({model_time - startup_time:.3f}s in total)"
+        )
 
         logger.info(f"Spec - Configuration Path: {configuration_path}")
         logger.info(f"Spec - Experiment Path: {experiment_path}")
@@ -230,6 +246,16 @@ class Controller:
         # Bonus config
         self.update_acquire_control()
 
+        #: UpdateScheduler: Applies coalesced GUI updates from worker threads.
+        self.update_scheduler = UpdateScheduler(
+            self.view.root,
+            self.configuration_controller.gui_setting.get("refresh_rate", 20),
+        )
+        self.update_scheduler.start()
+
+        #: dict: ImagePreviewPopupController of each open preview.
+        self.preview_popup_controllers = {}
+
         t = threading.Thread(target=self.update_event)
         t.start()
 
@@ -279,6 +305,10 @@ class Controller:
         # destroy splash screen and show main screen
         splash_screen.destroy()
         root.deiconify()
+        logger.info(
+            f"Startup - Splash screen dismissed "
+            f"{time.perf_counter() - startup_time:.3f}s after the controller started"
+        )
 
         #: int: ID for the resize event.Only works on Windows OS.
         self.resize_event_id = None
@@ -442,11 +472,8 @@ class Controller:
         self.camera_setting_controller.update_experiment_values()
         # update multi-positions
         positions = self.multiposition_tab_controller.get_positions()
-        update_config_dict(
-            self.manager,
-            self.configuration["experiment"],
-            "MultiPositions",
-            positions,
+        self.configuration["experiment"]["MultiPositions"] = positions.to_list_proxy(
+            self.manager
         )
         self.configuration["experiment"]["MicroscopeState"][
             "multiposition_count"
@@ -716,6 +743,21 @@ class Controller:
                 return
             self.execute("acquire")
 
+        elif command == "estimate_acquisition":
+            """Estimate the duration and data volume of the acquisition."""
+            if self.acquire_bar_controller.is_acquiring:
+                return
+            warning_info = self.update_experiment_setting()
+            if warning_info:
+                messagebox.showerror(
+                    title="Warning",
+                    message=f"Cannot estimate the acquisition!\n{warning_info}",
+                )
+                return
+            self.threads_pool.createThread(
+                "model", lambda: self.model.run_command("estimate_acquisition", *args)
+            )
+
         elif command == "load_feature":
             """Tell model to load/unload features."""
 
@@ -847,6 +889,8 @@ class Controller:
 
         elif command == "exit":
             """Exit the program."""
+            # Stop the scheduled GUI updates before the Tk root goes away.
+            self.update_scheduler.stop()
             # Save current GUI settings to .navigate/config/experiment.yml file.
             self.sloppy_stop()
             # self.menu_controller.feature_id_val.set(0)
@@ -991,7 +1035,9 @@ class Controller:
             images_received += 1
 
             # Update progress bar.
-            self.acquire_bar_controller.progress_bar(
+            self.update_scheduler.schedule(
+                "progress_bar",
+                self.acquire_bar_controller.progress_bar,
                 images_received=images_received,
                 microscope_state=self.configuration["experiment"]["MicroscopeState"],
                 mode=mode,
@@ -1001,8 +1047,10 @@ class Controller:
             stop_time = time.time()
             frames_per_second = images_received / (stop_time - start_time)
             # Update the Framerate in the Camera Settings Tab
-            self.camera_setting_controller.framerate_widgets["max_framerate"].set(
-                frames_per_second
+            self.update_scheduler.schedule(
+                "framerate",
+                self.camera_setting_controller.framerate_widgets["max_framerate"].set,
+                frames_per_second,
             )
 
             # Update the Framerate in the Acquire Bar to provide an estimate of
@@ -1019,12 +1067,17 @@ class Controller:
             getattr(plugin_obj, "end_acquisition_controller")(self)
 
         # Stop Progress Bars
-        self.acquire_bar_controller.progress_bar(
+        self.update_scheduler.schedule(
+            "progress_bar",
+            self.acquire_bar_controller.progress_bar,
             images_received=images_received,
             microscope_state=self.configuration["experiment"]["MicroscopeState"],
             mode=mode,
             stop=True,
         )
+        logger.info(
+            f"Navigate Controller - GUI updates: {self.update_scheduler.stats()}"
+        )
         self.set_mode_of_sub("stop")
 
     def launch_additional_microscopes(self):
@@ -1201,11 +1254,8 @@ class Controller:
                     sample_rate=self.configuration_controller.daq_sample_rate,
                 )
             elif event == "multiposition":
-                # Update the multi-position tab without appending to the list
-                update_table(
-                    table=self.view.settings.multiposition_tab.multipoint_list.get_table(),
-                    pos=value,
-                )
+                # Replace the positions, the table is updated by their change event
+                self.multiposition_tab_controller.set_positions(value)
                 self.channels_tab_controller.is_multiposition_val.set(True)
                 self.channels_tab_controller.toggle_multiposition()
 
@@ -1242,21 +1292,77 @@ class Controller:
 
             elif event == "stop":
                 # Stop the software
+                logger.info(f"Event queue - {self.event_queue.stats()}")
                 break
 
             elif event == "update_stage":
-                # ZM: I am so sorry for this.
-                for _ in range(10):
-                    try:
-                        self.update_stage_controller_silent(value)
-                        break
-                    except RuntimeError:
-                        time.sleep(0.001)
-                        pass
+                # applied from the Tk main loop, only the latest position is shown
+                self.update_scheduler.schedule(
+                    "update_stage", self.update_stage_controller_silent, value
+                )
             elif event == "remove_positions":
                 self.multiposition_tab_controller.remove_positions(value)
+            elif event == "update_z_range":
+                # the z-stack range was adapted to the tissue
+                self.channels_tab_controller.set_info(
+                    self.channels_tab_controller.stack_acq_vals, value
+                )
             elif event == "exposure_time":
                 self.channels_tab_controller.set_exposure_time(value[0], value[1])
+            elif event == "acquisition_estimate":
+                logger.info(f"Acquisition estimate: {value}")
+                self.show_acquisition_estimate(value)
+            elif event == "deskew_preview":
+                # only the latest projections are shown
+                self.update_scheduler.schedule(
+                    "deskew_preview", self.display_preview, "Deskew Preview", value
+                )
+            elif event == "mosaic_overview":
+                self.update_scheduler.schedule(
+                    "mosaic_overview", self.display_preview, "Mosaic Overview", value
+                )
+
+    def show_acquisition_estimate(self, estimate):
+        """Show the estimated duration and data volume of the acquisition.
+
+        Parameters
+        ----------
+        estimate : dict
+            Report of AcquisitionPlanner.
+        """
+        minutes, seconds = divmod(int(round(estimate["duration"])), 60)
+        hours, minutes = divmod(minutes, 60)
+        lines = [
+            f"Duration: {hours}h {minutes:02d}m {seconds:02d}s",
+            f"Frames: {estimate['frames']}",
+            f"Data: {estimate['bytes'] / 1024**3:.2f} GB",
+            f"Stage moves: {estimate['stage_moves']}",
+            f"Channel switches: {estimate['channel_switches']}",
+            "Time per phase:",
+        ]
+        lines += [
+            f"  {phase}: {duration:.1f} s"
+            for phase, duration in estimate["phases"].items()
+        ]
+        if estimate["unknown_features"]:
+            lines.append("Not estimated: " + ", ".join(estimate["unknown_features"]))
+        messagebox.showinfo(title="Acquisition Estimate", message="\n".join(lines))
+
+    def display_preview(self, name, images):
+        """Display preview images in their popup, which is opened if needed.
+
+        Parameters
+        ----------
+        name : str
+            Name of the preview, also the title of the popup.
+        images : dict
+            Images keyed by their title.
+        """
+        if name not in self.preview_popup_controllers:
+            self.preview_popup_controllers[name] = ImagePreviewPopupController(
+                ImagePreviewPopup(self.view, name), self, name
+            )
+        self.preview_popup_controllers[name].display_images(images)
 
     # def exit_program(self):
     #     """Exit the program.
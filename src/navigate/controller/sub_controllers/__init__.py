@@ -17,6 +17,7 @@ from .feature_advanced_setting_controller import (
 from .keystroke_controller import KeystrokeController  # noqa
 from .multi_position_controller import MultiPositionController  # noqa
 from .ilastik_popup_controller import IlastikPopupController  # noqa
+from .image_preview_popup_controller import ImagePreviewPopupController  # noqa
 from .camera_map_setting_popup_controller import CameraMapSettingPopupController  # noqa
 from .microscope_popup_controller import MicroscopePopupController  # noqa
 from .adaptiveoptics_popup_controller import AdaptiveOpticsPopupController  # noqa
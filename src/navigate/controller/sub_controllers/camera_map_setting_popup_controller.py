@@ -32,7 +32,6 @@
 
 # Standard library imports
 import os
-from pathlib import Path
 from tkinter import filedialog
 
 # Third party imports
@@ -41,7 +40,10 @@ import tifffile
 # Local application imports
 from navigate.controller.sub_controllers.gui_controller import GUIController
 from navigate.config import get_navigate_path
-from navigate.model.analysis.camera import compute_scmos_offset_and_variance_map
+from navigate.model.analysis.camera import (
+    compute_scmos_offset_and_variance_map,
+    save_camera_maps,
+)
 
 
 class CameraMapSettingPopupController(GUIController):
@@ -114,22 +116,17 @@ class CameraMapSettingPopupController(GUIController):
         """Create offset and variance maps from a series of dark frames."""
         # TODO: This should not be in the controller logic.
         image_name = self.view.file_name.get()
-        im = tifffile.imread(image_name)
-        self.off, self.var = compute_scmos_offset_and_variance_map(im)
+        # stream the frames page by page instead of loading the whole stack
+        with tifffile.TiffFile(image_name) as tif:
+            self.off, self.var = compute_scmos_offset_and_variance_map(
+                (page.asarray() for page in tif.pages), dtype="float32"
+            )
 
         self.display_plot()
 
-        save_dir = self.map_path
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-        camera_name = self.view.camera.get()
-        save_name_offset = f"{camera_name}_off.tiff"
-        save_name_variance = f"{camera_name}_var.tiff"
-        save_path_offset = Path(save_dir).joinpath(save_name_offset)
-        save_path_variance = Path(save_dir).joinpath(save_name_variance)
-
-        tifffile.imsave(save_path_offset, self.off)
-        tifffile.imsave(save_path_variance, self.var)
+        save_camera_maps(
+            self.map_path, self.view.camera.get(), off=self.off, var=self.var
+        )
 
     def display_plot(self):
         """Display the offset and variance maps."""
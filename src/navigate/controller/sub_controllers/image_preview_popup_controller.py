@@ -0,0 +1,102 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+
+# Third Party Imports
+
+# Local Imports
+from navigate.controller.sub_controllers.gui_controller import GUIController
+from navigate.tools.common_functions import combine_funcs
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class ImagePreviewPopupController(GUIController):
+    """Controller of a popup showing preview images sent by the model."""
+
+    def __init__(self, view, parent_controller, name):
+        """Initialize the ImagePreviewPopupController.
+
+        Parameters
+        ----------
+        view : navigate.view.popups.image_preview_popup.ImagePreviewPopup
+            The view of the preview popup.
+        parent_controller : navigate.controller.controller.Controller
+            The parent controller.
+        name : str
+            Name of the preview, the key of the controller in the parent controller's
+            preview_popup_controllers.
+        """
+        super().__init__(view, parent_controller)
+        #: str: Name of the preview.
+        self.name = name
+        #: dict: Image plot of each image name.
+        self.images = {}
+
+        self.view.popup.protocol(
+            "WM_DELETE_WINDOW",
+            combine_funcs(
+                self.view.popup.dismiss,
+                lambda: self.parent_controller.preview_popup_controllers.pop(
+                    self.name, None
+                ),
+            ),
+        )
+
+    def display_images(self, images):
+        """Display the preview images side by side.
+
+        The axes are only recreated if the image names or shapes change, otherwise
+        the image data is updated in place.
+
+        Parameters
+        ----------
+        images : dict
+            Images keyed by their title.
+        """
+        layout = [(k, v.shape) for k, v in images.items()]
+        if layout != [(k, v.get_array().shape) for k, v in self.images.items()]:
+            self.view.fig.clear()
+            self.images = {}
+            for i, (title, image) in enumerate(images.items()):
+                axes = self.view.fig.add_subplot(1, len(images), i + 1)
+                axes.set_title(title)
+                axes.set_axis_off()
+                self.images[title] = axes.imshow(image, cmap="gray", aspect="auto")
+        for title, image in images.items():
+            self.images[title].set_data(image)
+            self.images[title].set_clim(image.min(), max(image.max(), image.min() + 1))
+        self.view.canvas.draw_idle()
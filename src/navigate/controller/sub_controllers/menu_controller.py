@@ -43,9 +43,6 @@ import webbrowser
 
 # Local Imports
 from navigate.view.popups.ilastik_setting_popup import ilastik_setting_popup
-from navigate.view.popups.autofocus_setting_popup import AutofocusPopup
-from navigate.view.popups.adaptiveoptics_popup import AdaptiveOpticsPopup
-from navigate.view.popups.camera_map_setting_popup import CameraMapSettingPopup
 from navigate.view.popups.waveform_parameter_popup_window import (
     WaveformParameterPopupWindow,
 )
@@ -233,6 +230,13 @@ class MenuController(GUIController):
                     "<Control-Return>",
                     "<Control_L-Return>",
                 ],
+                "Estimate Acquisition": [
+                    "standard",
+                    self.estimate_acquisition,
+                    None,
+                    None,
+                    None,
+                ],
                 "Load Images": ["standard", self.load_images, None, None, None],
                 "Unload Images": [
                     "standard",
@@ -489,6 +493,9 @@ class MenuController(GUIController):
             "Time Series",
             "Decoupled Focus Stage Multiposition",
             "Remove Empty Tiles",
+            "Focus Map Multiposition",
+            "Adaptive Z Range",
+            "Hardware-Timed Z Stack",
         ]
         self.feature_list_count = len(self.feature_list_names)
         self.system_feature_list_count = self.feature_list_count
@@ -775,6 +782,10 @@ class MenuController(GUIController):
         if hasattr(self.parent_controller, "camera_map_popup_controller"):
             self.parent_controller.camera_map_popup_controller.showup()
             return
+        from navigate.view.popups.camera_map_setting_popup import (
+            CameraMapSettingPopup,
+        )
+
         map_popup = CameraMapSettingPopup(self.view)
         self.parent_controller.camera_map_popup_controller = (
             CameraMapSettingPopupController(map_popup, self.parent_controller)
@@ -785,6 +796,8 @@ class MenuController(GUIController):
         if hasattr(self.parent_controller, "adaptiveoptics_popup_controller"):
             self.parent_controller.ao_popup_controller.showup()
             return
+        from navigate.view.popups.adaptiveoptics_popup import AdaptiveOpticsPopup
+
         ao_popup = AdaptiveOpticsPopup(self.view)
         self.parent_controller.ao_popup_controller = AdaptiveOpticsPopupController(
             ao_popup, self.parent_controller
@@ -827,6 +840,8 @@ class MenuController(GUIController):
         if hasattr(self.parent_controller, "af_popup_controller"):
             self.parent_controller.af_popup_controller.showup()
             return
+        from navigate.view.popups.autofocus_setting_popup import AutofocusPopup
+
         af_popup = AutofocusPopup(self.view)
         self.parent_controller.af_popup_controller = AutofocusPopupController(
             af_popup, self.parent_controller
@@ -865,6 +880,10 @@ class MenuController(GUIController):
         """Acquire data/Stop acquiring data."""
         self.parent_controller.acquire_bar_controller.launch_popup_window()
 
+    def estimate_acquisition(self, *args):
+        """Estimate the duration and data volume of the acquisition."""
+        self.parent_controller.execute("estimate_acquisition")
+
     def not_implemented(self, *args):
         """Not implemented."""
         print("Not implemented")
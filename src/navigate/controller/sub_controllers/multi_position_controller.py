@@ -32,15 +32,15 @@
 
 # Standard Library Imports
 from tkinter import filedialog, messagebox
-import math
 import logging
 
 # Third Party Imports
-import pandas as pd
-from pandastable import TableModel
+import numpy as np
 
 # Local Imports
 from navigate.controller.sub_controllers.gui_controller import GUIController
+from navigate.tools.multipos_table_tools import optimize_tile_order
+from navigate.tools.position_table import TABLE_AXES, PositionTable
 
 
 # Logger Setup
@@ -70,6 +70,10 @@ class MultiPositionController(GUIController):
         self.table.insertRow = self.insert_row_func
         self.table.addStagePosition = self.add_stage_position
 
+        #: PositionTable: Positions shown in the Multi-Position Acquisition Interface.
+        self.positions = PositionTable()
+        self.positions.subscribe(self.update_table_view)
+
         self.view.master.tiling_buttons.buttons["tiling"].config(
             command=self.parent_controller.channels_tab_controller.launch_tiling_wizard
         )
@@ -86,11 +90,42 @@ class MultiPositionController(GUIController):
             command=self.eliminate_tiles
         )
 
+        self.view.master.tiling_buttons.buttons["optimize_path"].config(
+            command=self.optimize_path
+        )
+
     def eliminate_tiles(self):
         """Eliminate tiles that do not contain tissue."""
 
         self.parent_controller.execute("eliminate_tiles")
 
+    def optimize_path(self):
+        """Reorder the positions to reduce the stage travel time.
+
+        The travel time between two positions is limited by the slowest stage axis,
+        using the velocities of the active microscope's stage.
+        """
+        self.sync_positions()
+        if len(self.positions) < 3:
+            return
+        configuration = self.parent_controller.configuration
+        microscope_name = configuration["experiment"]["MicroscopeState"][
+            "microscope_name"
+        ]
+        stage_config = configuration["configuration"]["microscopes"][microscope_name][
+            "stage"
+        ]
+        velocity = stage_config.get("velocity", 1000)
+        velocities = {
+            axis: stage_config.get(f"{axis}_velocity", velocity) for axis in TABLE_AXES
+        }
+        order, report = optimize_tile_order(self.positions.array, velocities)
+        self.positions.reorder(order)
+        self.show_verbose_info(
+            f"reordered positions ({report['method']}), estimated stage travel time "
+            f"saved: {report['time_saved']:.1f} s"
+        )
+
     def set_positions(self, positions):
         """Set positions to multi-position's table
 
@@ -107,43 +142,79 @@ class MultiPositionController(GUIController):
         >>>    2: {'x': 2, 'y': 2, 'z': 2, 'theta': 2, 'f': 2}}
         >>>    set_positions(positions)
         """
-        axis_dict = {"x": "X", "y": "Y", "z": "Z", "theta": "R", "f": "F"}
-        data = {}
+        self.positions.set(positions)
+        self.show_verbose_info("loaded new positions")
+
+    def update_table_view(self, event, data):
+        """Update the table after the positions change.
+
+        Appended, removed and reordered positions change the rows of the table in
+        place. A reset, or a table whose rows don't match the positions, replaces
+        the table content.
+
+        Parameters
+        ----------
+        event : str
+            Name of the change, "reset", "append", "remove" or "reorder".
+        data : object
+            Data of the change.
+        """
+        import pandas as pd
 
-        for name in axis_dict:
-            data[axis_dict[name]] = list(pos[name] for pos in positions)
-        self.table.model.df = pd.DataFrame(data)
+        df = self.table.model.df
+        if event == "append":
+            self.table.model.df = pd.concat(
+                [df, pd.DataFrame(data, columns=list("XYZRF"))],
+                ignore_index=True,
+            )
+            self.table.currentrow = self.table.model.df.shape[0] - 1
+        elif event == "remove" and df.shape[0] == len(data):
+            self.table.model.df = df[data].reset_index(drop=True)
+        elif event == "reorder" and df.shape[0] == len(data):
+            self.table.model.df = df.iloc[data].reset_index(drop=True)
+        else:
+            self.table.model.df = pd.DataFrame(
+                self.positions.array, columns=list("XYZRF")
+            )
+        self.table.update_rowcolors()
         self.table.redraw()
-        self.show_verbose_info("loaded new positions")
+        self.table.tableChanged()
+
+    def read_table(self):
+        """Read the positions of the Multi-Position Acquisition Interface.
+
+        Rows with a missing or non-numeric value are skipped.
+
+        Returns
+        -------
+        np.ndarray
+            (n_positions x 5) positions in the order of TABLE_AXES.
+        """
+        import pandas as pd
+
+        df = self.table.model.df.reindex(columns=list("XYZRF"))
+        values = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        return values[~np.isnan(values).any(axis=1)]
+
+    def sync_positions(self):
+        """Update the position table with the edits made in the interface."""
+        self.positions.set(self.read_table(), notify=False)
 
     def get_positions(self):
         """Return all positions from the Multi-Position Acquisition Interface.
 
+        Rows with a missing or non-numeric value are skipped.
+
         Returns
         -------
-        dict
-            positions in the format of {index: {axis: value}}
+        PositionTable
+            positions, indexing it returns positions in the format of {axis: value}
 
         Example
         -------
         >>> get_positions()
         """
-        axis_dict = {"X": "x", "Y": "y", "Z": "z", "R": "theta", "F": "f"}
-        positions = []
-        rows = self.table.model.df.shape[0]
-        for i in range(rows):
-            temp = list(self.table.model.df.iloc[i])
-            if (
-                len(
-                    list(filter(lambda v: type(v) == float and not math.isnan(v), temp))
-                )
-                == 5
-            ):
-                temp = dict(self.table.model.df.iloc[i])
-                positions.append({})
-                for k in axis_dict:
-                    positions[i][axis_dict[k]] = temp[k]
-        return positions
+        return PositionTable(self.read_table())
 
     def handle_double_click(self, event):
         """Move to a position within the Multi-Position Acquisition Interface.
@@ -204,6 +275,9 @@ class MultiPositionController(GUIController):
         )
         if not filename:
             return
+        import pandas as pd
+        from pandastable import TableModel
+
         df = pd.read_csv(filename[0])
         # validate the csv file
         df.columns = map(lambda v: v.upper(), df.columns)
@@ -292,14 +366,8 @@ class MultiPositionController(GUIController):
         -------
         >>> append_position(position)
         """
-        temp = list(map(lambda k: position[k], position))
-        self.table.model.df = self.table.model.df.append(
-            pd.DataFrame([temp], columns=list("XYZRF")), ignore_index=True
-        )
-        self.table.currentrow = self.table.model.df.shape[0] - 1
-        self.table.update_rowcolors()
-        self.table.redraw()
-        self.table.tableChanged()
+        self.sync_positions()
+        self.positions.append(position)
         self.show_verbose_info("add current stage position to position list")
 
     def remove_positions(self, position_flag_list):
@@ -311,9 +379,5 @@ class MultiPositionController(GUIController):
             False: the position should be removed
             True: the position should be kept
         """
-        positions = self.get_positions()
-        l = len(position_flag_list)  # noqa
-        new_positions = [
-            p for i, p in enumerate(positions) if (i >= l or position_flag_list[i])
-        ]
-        self.set_positions(new_positions)
+        self.sync_positions()
+        self.positions.remove(position_flag_list)
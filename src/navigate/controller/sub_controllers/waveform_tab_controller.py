@@ -39,7 +39,11 @@ from tkinter import NSEW
 
 # Local Imports
 from navigate.controller.sub_controllers.gui_controller import GUIController
-from navigate.tools.waveform_template_funcs import get_waveform_template_parameters
+from navigate.tools.waveform_template_funcs import (
+    get_waveform_template_parameters,
+    decimate_waveform_dict,
+    repeat_decimated_waveform,
+)
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -64,6 +68,14 @@ class WaveformTabController(GUIController):
         self.remote_focus_waveform = 0
         #: dict: Dictionary of laser waveforms
         self.laser_ao_waveforms = 0
+        #: dict: Dictionary of decimated waveforms
+        self.waveform_dict = None
+        #: dict: Plotted lines, keyed by (plot, channel, waveform)
+        self.plot_lines = {}
+        #: tuple: Waveform hash, repeats and sample rate of the plotted waveforms
+        self.plotted_key = None
+        #: int: Maximum number of points plotted per waveform
+        self.max_plot_points = 2000
 
         self.initialize_plots()
 
@@ -138,7 +150,7 @@ class WaveformTabController(GUIController):
         Parameters
         ----------
         waveform_dict : dict
-            Dictionary of waveforms
+            Dictionary of waveforms, decimated by decimate_waveform_dict
         sample_rate : int
             Sample rate of the waveforms
 
@@ -146,7 +158,9 @@ class WaveformTabController(GUIController):
         --------
         >>> self.update_waveforms(waveform_dict, sample_rate)
         """
-        #: dict: Dictionary of waveforms
+        if "hash" not in waveform_dict:
+            # waveforms not decimated by the model
+            waveform_dict = decimate_waveform_dict(waveform_dict, self.max_plot_points)
         self.waveform_dict = waveform_dict
         self.sample_rate = sample_rate
 
@@ -190,8 +204,8 @@ class WaveformTabController(GUIController):
             and parent_notebook.tab(current_tab, "text") != "Waveform Settings"
         ):
             return
-        self.view.plot_etl.clear()
-        self.view.plot_galvo.clear()
+        if self.waveform_dict is None:
+            return
 
         waveform_template_name = self.parent_controller.configuration["experiment"][
             "MicroscopeState"
@@ -201,117 +215,124 @@ class WaveformTabController(GUIController):
             self.parent_controller.configuration["waveform_templates"],
             self.parent_controller.configuration["experiment"]["MicroscopeState"],
         )
+        waveform_repeat_total_num = repeat_num * expand_num
 
-        last_etl = 0
-        last_galvo = 0
-        last_camera = 0
+        # skip redrawing unchanged waveforms
+        plot_key = (
+            self.waveform_dict["hash"],
+            waveform_repeat_total_num,
+            self.sample_rate,
+        )
+        if plot_key == self.plotted_key:
+            return
+
+        camera_waveforms = self.waveform_dict["camera_waveform"]
+        remote_focus_waveforms = self.waveform_dict["remote_focus_waveform"]
+        galvo_waveforms = self.waveform_dict["galvo_waveform"]
+        channel_keys = [
+            k
+            for k in sorted(camera_waveforms.keys())
+            if remote_focus_waveforms.get(k) is not None
+        ]
+
+        # two pass, the envelopes keep the minimum and maximum of each waveform
         max_galvo_waveform = 0
         min_galvo_waveform = 1000000
         max_camera_waveform = 0
         min_camera_waveform = 1000000
         max_remote_focus_waveform = 0
         min_remote_focus_waveform = 1000000
-        # two pass
-        for k in self.waveform_dict["camera_waveform"].keys():
-            remote_focus_waveform = self.waveform_dict["remote_focus_waveform"][k]
-            if remote_focus_waveform is None:
-                continue
-            max_remote_focus_waveform = np.maximum(max_remote_focus_waveform, np.max(remote_focus_waveform))
-            min_remote_focus_waveform = np.minimum(min_remote_focus_waveform, np.min(remote_focus_waveform))
-            camera_waveform = self.waveform_dict["camera_waveform"][k]
-            max_camera_waveform = np.maximum(max_camera_waveform, np.max(camera_waveform))
-            min_camera_waveform = np.minimum(min_camera_waveform, np.min(camera_waveform))
-            for galvo_waveform in self.waveform_dict["galvo_waveform"]:
-                max_galvo_waveform = np.maximum(max_galvo_waveform, np.max(galvo_waveform[k]))
-                min_galvo_waveform = np.minimum(min_galvo_waveform, np.min(galvo_waveform[k]))
-
-        true_max = np.maximum(max_remote_focus_waveform, max_galvo_waveform)
-        true_min = np.minimum(min_remote_focus_waveform, min_galvo_waveform)
-        if true_max == true_min:
+        for k in channel_keys:
+            values = remote_focus_waveforms[k][1]
+            max_remote_focus_waveform = max(max_remote_focus_waveform, np.max(values))
+            min_remote_focus_waveform = min(min_remote_focus_waveform, np.min(values))
+            values = camera_waveforms[k][1]
+            max_camera_waveform = max(max_camera_waveform, np.max(values))
+            min_camera_waveform = min(min_camera_waveform, np.min(values))
+            for galvo_waveform in galvo_waveforms:
+                if galvo_waveform.get(k) is None:
+                    continue
+                values = galvo_waveform[k][1]
+                max_galvo_waveform = max(max_galvo_waveform, np.max(values))
+                min_galvo_waveform = min(min_galvo_waveform, np.min(values))
+
+        true_max = max(max_remote_focus_waveform, max_galvo_waveform)
+        true_min = min(min_remote_focus_waveform, min_galvo_waveform)
+        if true_max == true_min or max_camera_waveform == min_camera_waveform:
             scale = 1
             true_min = 0
         else:
-            scale = (true_max - true_min)/(max_camera_waveform - min_camera_waveform)
-
-        for k in sorted(self.waveform_dict["camera_waveform"].keys()):
-            if self.waveform_dict["remote_focus_waveform"][k] is None:
-                continue
-            remote_focus_waveform = self.waveform_dict["remote_focus_waveform"][k]
+            scale = (true_max - true_min) / (max_camera_waveform - min_camera_waveform)
+
+        def duration(waveform):
+            return waveform[2] * waveform_repeat_total_num / self.sample_rate
+
+        def repeat(waveform, offset):
+            positions, values, n_samples = waveform
+            positions, values = repeat_decimated_waveform(
+                positions,
+                values,
+                n_samples,
+                waveform_repeat_total_num,
+                self.max_plot_points,
+            )
+            return positions / self.sample_rate + offset, values
 
-            galvo_waveform_list = []
-            for galvo_waveform in self.waveform_dict["galvo_waveform"]:
-                if galvo_waveform[k] is None:
+        # (plot, channel, waveform): (x, y, line style)
+        lines = {}
+        last_etl = 0
+        last_galvo = 0
+        last_camera = 0
+        for k in channel_keys:
+            label = "CH" + k[-1]
+            x, y = repeat(remote_focus_waveforms[k], last_etl)
+            lines[("etl", k, "remote_focus")] = (x, y, {"label": label})
+            last_etl += duration(remote_focus_waveforms[k])
+            galvo_duration = 0
+            for i, galvo_waveform in enumerate(galvo_waveforms):
+                if galvo_waveform.get(k) is None:
                     continue
-                max_galvo_waveform = np.maximum(max_galvo_waveform, np.max(galvo_waveform[k]))
-                min_galvo_waveform = np.minimum(min_galvo_waveform, np.min(galvo_waveform[k]))
-                galvo_waveform_list += [galvo_waveform[k]]
-
-            camera_waveform = scale*self.waveform_dict["camera_waveform"][k] + true_min
-
-            waveform_repeat_total_num = repeat_num * expand_num
-
-            channel_index = k[-1]
-            label = "CH" + channel_index
-
-            self.view.plot_etl.plot(
-                np.arange(len(remote_focus_waveform) * waveform_repeat_total_num)
-                / self.sample_rate
-                + last_etl,
-                np.hstack([remote_focus_waveform] * waveform_repeat_total_num),
-                label=label,
-            )
-            # ax = self.view.plot_galvo.axis
-            for i, galvo_waveform in enumerate(galvo_waveform_list):
-                label = label + " G" + str(i)
-                self.view.plot_galvo.plot(
-                    np.arange(len(galvo_waveform) * waveform_repeat_total_num)
-                    / self.sample_rate
-                    + last_galvo,
-                    np.hstack([galvo_waveform] * waveform_repeat_total_num),
-                    label=label,
-                )
-            self.view.plot_etl.plot(
-                np.arange(len(camera_waveform) * waveform_repeat_total_num)
-                / self.sample_rate
-                + last_camera,
-                np.hstack([camera_waveform] * waveform_repeat_total_num),
-                c="k",
-                linestyle="--",
-            )
-            self.view.plot_galvo.plot(
-                np.arange(len(camera_waveform) * waveform_repeat_total_num)
-                / self.sample_rate
-                + last_camera,
-                np.hstack([camera_waveform] * waveform_repeat_total_num),
-                c="k",
-                linestyle="--",
-            )
-            last_etl += (
-                len(remote_focus_waveform)
-                * waveform_repeat_total_num
-                / self.sample_rate
-            )
-            last_galvo += (
-                len(galvo_waveform) * waveform_repeat_total_num / self.sample_rate
-            )
-            last_camera += (
-                len(camera_waveform) * waveform_repeat_total_num / self.sample_rate
-            )
+                x, y = repeat(galvo_waveform[k], last_galvo)
+                lines[("galvo", k, i)] = (x, y, {"label": f"{label} G{i}"})
+                galvo_duration = duration(galvo_waveform[k])
+            last_galvo += galvo_duration
+            x, y = repeat(camera_waveforms[k], last_camera)
+            y = scale * y + true_min
+            for plot in ["etl", "galvo"]:
+                lines[(plot, k, "camera")] = (x, y, {"c": "k", "linestyle": "--"})
+            last_camera += duration(camera_waveforms[k])
+
+        axes = {"etl": self.view.plot_etl, "galvo": self.view.plot_galvo}
+        if lines.keys() == self.plot_lines.keys():
+            # same lines, only update their data
+            for key, (x, y, _) in lines.items():
+                self.plot_lines[key].set_data(x, y)
+            for ax in axes.values():
+                ax.relim()
+                ax.autoscale_view()
+        else:
+            self.view.plot_etl.clear()
+            self.view.plot_galvo.clear()
+            self.plot_lines = {}
+            for key, (x, y, kwargs) in lines.items():
+                (self.plot_lines[key],) = axes[key[0]].plot(x, y, **kwargs)
 
-        self.view.plot_etl.set_title("Remote Focus Waveform")
-        self.view.plot_galvo.set_title("Galvo Waveform")
+            self.view.plot_etl.set_title("Remote Focus Waveform")
+            self.view.plot_galvo.set_title("Galvo Waveform")
 
-        self.view.plot_etl.set_xlabel("Duration (s)")
-        self.view.plot_galvo.set_xlabel("Duration (s)")
+            self.view.plot_etl.set_xlabel("Duration (s)")
+            self.view.plot_galvo.set_xlabel("Duration (s)")
 
-        self.view.plot_etl.set_ylabel("Amplitude")
-        self.view.plot_galvo.set_ylabel("Amplitude")
+            self.view.plot_etl.set_ylabel("Amplitude")
+            self.view.plot_galvo.set_ylabel("Amplitude")
 
-        self.view.plot_etl.legend()
-        self.view.plot_galvo.legend()
+            if channel_keys:
+                self.view.plot_etl.legend()
+                self.view.plot_galvo.legend()
 
-        self.view.fig.tight_layout()
+            self.view.fig.tight_layout()
 
+        self.plotted_key = plot_key
         self.view.canvas.draw_idle()
 
     def set_mode(self, mode):
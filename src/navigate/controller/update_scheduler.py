@@ -0,0 +1,152 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+import threading
+
+# Third Party Imports
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class UpdateScheduler:
+    """Coalesces GUI updates and applies them on the Tk main loop.
+
+    Worker threads submit updates with schedule. Only the most recent update of
+    each key is kept, and the pending updates are applied from the Tk main loop at
+    most refresh_rate times per second, so a fast acquisition cannot flood Tk.
+    """
+
+    def __init__(self, root, refresh_rate=20):
+        """Initialize the UpdateScheduler.
+
+        Parameters
+        ----------
+        root : tkinter.Tk
+            Tk root window whose main loop applies the updates.
+        refresh_rate : float
+            Maximum number of times per second the updates are applied.
+        """
+        #: tkinter.Tk: Tk root window.
+        self.root = root
+
+        #: int: Time between two refreshes in milliseconds.
+        self.interval = max(int(1000 / refresh_rate), 1)
+
+        #: dict: Most recent pending update (func, args, kwargs) of each key.
+        self.updates = {}
+
+        #: threading.Lock: Lock for the pending updates and counters.
+        self.lock = threading.Lock()
+
+        #: str: Identifier of the scheduled refresh, None if not running.
+        self.after_id = None
+
+        #: dict: Number of updates submitted for each key.
+        self.submitted = {}
+
+        #: dict: Number of updates replaced by a more recent one for each key.
+        self.coalesced = {}
+
+    def schedule(self, key, func, *args, **kwargs):
+        """Submit an update, replacing the pending update of the same key.
+
+        Safe to call from any thread.
+
+        Parameters
+        ----------
+        key : str
+            Name of the update, e.g. "progress_bar".
+        func : callable
+            Function applying the update, called as func(*args, **kwargs) from the
+            Tk main loop.
+        """
+        with self.lock:
+            if key in self.updates:
+                self.coalesced[key] = self.coalesced.get(key, 0) + 1
+            self.submitted[key] = self.submitted.get(key, 0) + 1
+            self.updates[key] = (func, args, kwargs)
+
+    def start(self):
+        """Start applying the updates. Must be called from the Tk main loop."""
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval, self.refresh)
+
+    def stop(self):
+        """Stop applying the updates. Must be called from the Tk main loop."""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def refresh(self):
+        """Apply the pending updates and schedule the next refresh."""
+        self.flush()
+        self.after_id = self.root.after(self.interval, self.refresh)
+
+    def flush(self):
+        """Apply the pending updates in the order their keys were first submitted.
+
+        Must be called from the Tk main loop.
+        """
+        with self.lock:
+            updates, self.updates = self.updates, {}
+        for key, (func, args, kwargs) in updates.items():
+            try:
+                func(*args, **kwargs)
+            except RuntimeError as e:
+                # Tk raises it while a widget is being changed, the next update of
+                # the key brings the GUI up to date
+                logger.debug(f"GUI update {key} failed: {e}")
+            except Exception:
+                logger.exception(f"GUI update {key} failed")
+
+    def stats(self):
+        """Return the number of submitted and coalesced updates for each key.
+
+        Returns
+        -------
+        stats : dict
+            {key: {"submitted": int, "coalesced": int}}
+        """
+        with self.lock:
+            return {
+                key: {
+                    "submitted": submitted,
+                    "coalesced": self.coalesced.get(key, 0),
+                }
+                for key, submitted in self.submitted.items()
+            }
@@ -39,7 +39,6 @@ import warnings
 # Third Party Imports
 
 # Local Imports
-from navigate.controller.controller import Controller
 from navigate.log_files.log_functions import log_setup
 from navigate.view.splash_screen import SplashScreen
 from navigate.tools.main_functions import (
@@ -110,6 +109,10 @@ def main():
 
     log_setup("logging.yml", logging_path)
 
+    # import the controller after the splash screen is shown, it takes most of the
+    # startup time
+    from navigate.controller.controller import Controller
+
     Controller(
         root,
         splash_screen,
@@ -0,0 +1,703 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.analysis.focus_surface import select_focus_samples
+from navigate.tools.position_table import PositionTable
+
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: list: Stage axes considered when estimating stage travel.
+STAGE_AXES = ["x", "y", "z", "theta", "f"]
+
+#: list: Phases reported in the acquisition estimate.
+PHASES = [
+    "exposure",
+    "stage",
+    "channel_switch",
+    "autofocus",
+    "resolution_switch",
+    "pause",
+]
+
+
+def get_config_value(configuration, reference, default=None):
+    """Resolve a dotted configuration reference.
+
+    Parameters
+    ----------
+    configuration : dict
+        Configuration dictionary.
+    reference : str
+        Dotted reference, e.g. "experiment.MicroscopeState.timepoints".
+    default : any
+        Value returned if the reference can not be resolved.
+
+    Returns
+    -------
+    value : any
+        The referenced value.
+    """
+    value = configuration
+    try:
+        for key in reference.split("."):
+            value = value[key]
+    except (KeyError, TypeError):
+        return default
+    return value
+
+
+class AcquisitionPlanner:
+    """Dry-run planner for feature lists.
+
+    Walks a feature list (as returned by `convert_str_to_feature_list` or used by
+    `load_features`) against the current configuration without touching any
+    hardware, and predicts the acquisition duration, number of frames, number of
+    bytes and a per-phase breakdown of the time.
+
+    Exposure and sweep times come from `Microscope.calculate_exposure_sweep_times`.
+    Stage velocities and channel-switch costs come from the configuration, and can
+    be overridden by measured telemetry, a dictionary with any of the keys:
+
+    - "stage_velocity": dict of axis -> velocity (um/s or deg/s)
+    - "stage_settle": settle time after each stage move (s)
+    - "channel_switch": time to switch channels (s)
+    - "resolution_switch": time to switch microscopes/zoom (s)
+    - "frame_overhead": additional time per frame (s)
+
+    Timings measured by the model can be added with `add_measured_telemetry`.
+    """
+
+    def __init__(self, model, telemetry=None):
+        """Initialize the AcquisitionPlanner.
+
+        Parameters
+        ----------
+        model : navigate.model.model.Model
+            Navigate model.
+        telemetry : dict, optional
+            Measured timings, used in preference to configuration values.
+        """
+        #: navigate.model.model.Model: Navigate model.
+        self.model = model
+        #: dict: Configuration dictionary.
+        self.configuration = model.configuration
+        #: dict: Measured timings.
+        self.telemetry = dict(telemetry or {})
+
+        #: dict: Estimate functions for each feature, keyed by feature name.
+        self.estimate_funcs = {
+            "Snap": self.estimate_snap,
+            "PrepareNextChannel": self.estimate_prepare_next_channel,
+            "MoveToNextPositionInMultiPositionTable": self.estimate_move_position,
+            "ZStackAcquisition": self.estimate_z_stack,
+            "SequencedZStackAcquisition": self.estimate_z_stack,
+            "Autofocus": self.estimate_autofocus,
+            "FocusMap": self.estimate_focus_map,
+            "ChangeResolution": self.estimate_change_resolution,
+            "StackPause": self.estimate_stack_pause,
+            "ConstantVelocityAcquisition": self.estimate_constant_velocity,
+            "DetectTissueInStack": self.estimate_detect_tissue,
+            "DetectTissueInStackAndReturn": self.estimate_detect_tissue,
+            "DetectTissueInStackAndRecord": self.estimate_detect_tissue,
+            "DetectTissueRangeInStackAndRecord": self.estimate_detect_tissue,
+            "LoopByCount": None,
+            "WaitToContinue": None,
+            "RemoveEmptyPositions": None,
+            "AdaptZRange": None,
+            "ImageWriter": None,
+        }
+        self.reset()
+
+    def reset(self):
+        """Reset the estimate."""
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        #: str: Name of the microscope in use.
+        self.microscope_name = microscope_state["microscope_name"]
+        #: list: Selected channel keys.
+        self.channels = [
+            k for k, v in microscope_state["channels"].items() if v["is_selected"]
+        ]
+        #: str: Current channel key.
+        self.current_channel = None
+        #: dict: Current stage position.
+        self.position = self.get_initial_position()
+        #: PositionTable: Multi-position table.
+        self.positions = PositionTable(
+            self.configuration["experiment"].get("MultiPositions", [])
+        )
+        #: dict: Per-feature state, keyed by the id of the feature dictionary.
+        self.feature_states = {}
+        #: dict: Time spent in each phase (s).
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        #: int: Number of frames.
+        self.frames = 0
+        #: int: Number of frames that produce data, e.g. not autofocus frames.
+        self.saved_frames = 0
+        #: int: Number of stage moves.
+        self.stage_moves = 0
+        #: int: Number of channel switches.
+        self.channel_switches = 0
+        #: set: Features that have no estimate function.
+        self.unknown_features = set()
+        self.update_exposure_sweep_times()
+
+    def get_initial_position(self):
+        """Get the stage position an acquisition starts from.
+
+        Returns
+        -------
+        position : dict
+            Stage position.
+        """
+        stage_parameters = self.configuration["experiment"]["StageParameters"]
+        return {axis: float(stage_parameters.get(axis, 0)) for axis in STAGE_AXES}
+
+    def get_microscope(self):
+        """Get the microscope the estimate is running against.
+
+        Returns
+        -------
+        microscope : navigate.model.microscope.Microscope
+            Microscope object.
+        """
+        microscopes = getattr(self.model, "microscopes", {})
+        if self.microscope_name in microscopes:
+            return microscopes[self.microscope_name]
+        return self.model.active_microscope
+
+    def update_exposure_sweep_times(self):
+        """Update exposure and sweep times from the microscope."""
+        exposure_times, sweep_times = (
+            self.get_microscope().calculate_exposure_sweep_times()
+        )
+        #: dict: Exposure time of each channel (s).
+        self.exposure_times = exposure_times
+        #: dict: Sweep time of each channel (s).
+        self.sweep_times = sweep_times
+
+    @property
+    def stage_config(self):
+        """dict: Stage configuration of the microscope in use."""
+        return self.configuration["configuration"]["microscopes"][
+            self.microscope_name
+        ]["stage"]
+
+    def get_stage_velocity(self, axis):
+        """Get the velocity of a stage axis.
+
+        Parameters
+        ----------
+        axis : str
+            Stage axis.
+
+        Returns
+        -------
+        velocity : float
+            Velocity of the axis (um/s or deg/s).
+        """
+        measured = self.telemetry.get("stage_velocity", {})
+        if axis in measured:
+            return float(measured[axis])
+        velocity = self.stage_config.get(
+            f"{axis}_velocity", self.stage_config.get("velocity", 1000)
+        )
+        try:
+            velocity = float(velocity)
+        except (TypeError, ValueError):
+            velocity = 1000.0
+        return velocity if velocity > 0 else 1000.0
+
+    def add_measured_telemetry(
+        self, trace_summary=None, stage_moves=(), waveform_stats=None
+    ):
+        """Add the timings measured in previous acquisitions to the telemetry.
+
+        Timings the planner was initialized with are kept.
+
+        Parameters
+        ----------
+        trace_summary : dict, optional
+            Spans of a traced acquisition, see ExecutionTracer.summary.
+        stage_moves : list, optional
+            Stage moves that were waited for, see PositionTracker.get_moves.
+        waveform_stats : dict, optional
+            Waveform cache counters, see WaveformCache.stats.
+        """
+        measured = {}
+        trace_summary = trace_summary or {}
+        for key, span_name in [
+            ("channel_switch", "PrepareNextChannel.main"),
+            ("resolution_switch", "ChangeResolution.main"),
+        ]:
+            span = trace_summary.get(span_name)
+            if span and span["count"] > 0:
+                measured[key] = span["total"] / span["count"]
+
+        # switching resolution calculates the waveforms of the new microscope
+        if (
+            "resolution_switch" not in measured
+            and waveform_stats
+            and waveform_stats["misses"] > 0
+        ):
+            measured["resolution_switch"] = (
+                waveform_stats["compute_time"] / waveform_stats["misses"]
+            )
+
+        # the settle time is the part of a move that is not spent travelling
+        settle_times = sorted(
+            duration
+            - max(
+                distance / self.get_stage_velocity(axis)
+                for axis, distance in distances.items()
+            )
+            for distances, duration in stage_moves
+        )
+        if settle_times:
+            measured["stage_settle"] = max(settle_times[len(settle_times) // 2], 0.0)
+
+        for key, value in measured.items():
+            self.telemetry.setdefault(key, value)
+
+    def get_channel_switch_time(self):
+        """Get the time it takes to switch channels.
+
+        Returns
+        -------
+        switch_time : float
+            Channel switch time (s).
+        """
+        if "channel_switch" in self.telemetry:
+            return float(self.telemetry["channel_switch"])
+        filter_wheel = self.configuration["configuration"]["microscopes"][
+            self.microscope_name
+        ].get("filter_wheel", {})
+        try:
+            return float(filter_wheel.get("filter_wheel_delay", 0))
+        except (AttributeError, TypeError, ValueError):
+            return 0.0
+
+    def estimate(self, feature_list):
+        """Estimate a feature list.
+
+        Parameters
+        ----------
+        feature_list : list
+            A feature list.
+
+        Returns
+        -------
+        report : dict
+            The acquisition estimate.
+        """
+        self.reset()
+        self.walk(feature_list)
+        if self.frames == 0:
+            self.snap()
+        return self.report()
+
+    def walk(self, feature_list):
+        """Walk a feature list.
+
+        Lists run sequentially. Tuples are loops and run as many times as the
+        first LoopByCount inside them allows. An iteration without any
+        acquisition feature acquires one frame, as the model snaps an image each
+        time the signal container returns.
+
+        Parameters
+        ----------
+        feature_list : list or tuple
+            A feature list.
+        """
+        for item in feature_list:
+            if type(item) is dict:
+                self.visit(item)
+            elif type(item) is tuple:
+                for _ in range(self.get_loop_count(item)):
+                    frames = self.frames
+                    self.walk(item)
+                    if self.frames == frames:
+                        self.snap()
+            elif type(item) is list:
+                self.walk(item)
+
+    def visit(self, feature_dict):
+        """Estimate one feature.
+
+        Parameters
+        ----------
+        feature_dict : dict
+            Feature dictionary with 'name' and optionally 'args'.
+        """
+        feature_name = getattr(feature_dict["name"], "__name__", "")
+        args = feature_dict.get("args", ())
+        if feature_name not in self.estimate_funcs:
+            self.unknown_features.add(feature_name)
+            result = True
+        elif self.estimate_funcs[feature_name] is None:
+            result = True
+        else:
+            result = self.estimate_funcs[feature_name](feature_dict, *args)
+        branch = feature_dict.get("true" if result is not False else "false", None)
+        if type(branch) is list:
+            self.walk(branch)
+
+    def get_loop_count(self, loop):
+        """Get the number of iterations of a loop.
+
+        Parameters
+        ----------
+        loop : tuple
+            A loop in a feature list.
+
+        Returns
+        -------
+        count : int
+            Number of iterations.
+        """
+        for item in loop:
+            if (
+                type(item) is dict
+                and getattr(item["name"], "__name__", "") == "LoopByCount"
+            ):
+                steps = item.get("args", (1,))[0]
+                if type(steps) is str:
+                    steps = get_config_value(self.configuration, steps, 1)
+                try:
+                    return max(int(steps), 1)
+                except (TypeError, ValueError):
+                    return 1
+        return 1
+
+    def get_feature_state(self, feature_dict, **kwargs):
+        """Get the state of a feature instance.
+
+        Each feature dictionary is instantiated once by `load_features`, so state
+        such as the current multi-position index persists across loop iterations.
+
+        Parameters
+        ----------
+        feature_dict : dict
+            Feature dictionary.
+        **kwargs : dict
+            Initial state.
+
+        Returns
+        -------
+        state : dict
+            Feature state.
+        """
+        return self.feature_states.setdefault(id(feature_dict), kwargs)
+
+    def snap(self, count=1, phase="exposure"):
+        """Acquire frames with the current channel.
+
+        Parameters
+        ----------
+        count : int
+            Number of frames.
+        phase : str
+            Phase the exposure time is accounted to.
+        """
+        if self.current_channel is None:
+            self.switch_channel()
+        frame_time = self.sweep_times.get(self.current_channel, 0) + float(
+            self.telemetry.get("frame_overhead", 0)
+        )
+        self.phases[phase] += count * frame_time
+        self.frames += count
+        if phase == "exposure":
+            self.saved_frames += count
+
+    def move_stage(self, position, phase="stage"):
+        """Move the stage.
+
+        All axes are assumed to move simultaneously, the slowest axis limits the
+        move.
+
+        Parameters
+        ----------
+        position : dict
+            Target position, keyed by axis.
+        phase : str
+            Phase the stage time is accounted to.
+        """
+        move_time = 0
+        for axis in STAGE_AXES:
+            if axis not in position:
+                continue
+            distance = abs(float(position[axis]) - self.position[axis])
+            self.position[axis] = float(position[axis])
+            move_time = max(move_time, distance / self.get_stage_velocity(axis))
+        if move_time > 0:
+            move_time += float(self.telemetry.get("stage_settle", 0))
+            self.stage_moves += 1
+        self.phases[phase] += move_time
+
+    def switch_channel(self, channel_idx=None):
+        """Switch to a channel.
+
+        Parameters
+        ----------
+        channel_idx : int, optional
+            Index in the selected channels. Switches to the next channel if None.
+        """
+        if not self.channels:
+            return
+        if channel_idx is None:
+            if self.current_channel in self.channels:
+                channel_idx = (self.channels.index(self.current_channel) + 1) % len(
+                    self.channels
+                )
+            else:
+                channel_idx = 0
+        channel = self.channels[channel_idx]
+        if channel != self.current_channel:
+            self.current_channel = channel
+            self.channel_switches += 1
+            self.phases["channel_switch"] += self.get_channel_switch_time()
+
+    def estimate_snap(self, feature_dict, *args):
+        """Estimate Snap."""
+        self.snap()
+
+    def estimate_prepare_next_channel(self, feature_dict, *args):
+        """Estimate PrepareNextChannel."""
+        self.switch_channel()
+
+    def estimate_move_position(self, feature_dict, *args):
+        """Estimate MoveToNextPositionInMultiPositionTable.
+
+        Returns
+        -------
+        result : bool
+            False if the table is exhausted.
+        """
+        state = self.get_feature_state(feature_dict, idx=0)
+        positions = self.positions
+        position_count = int(
+            self.configuration["experiment"]["MicroscopeState"]["multiposition_count"]
+        )
+        if state["idx"] >= min(position_count, len(positions)):
+            return False
+        self.move_stage(positions[state["idx"]])
+        state["idx"] += 1
+        return True
+
+    def estimate_z_stack(self, feature_dict, *args):
+        """Estimate ZStackAcquisition."""
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        number_z_steps = int(float(microscope_state["number_z_steps"]))
+        start_z = float(microscope_state["start_position"])
+        z_step = float(microscope_state["step_size"])
+        start_f = float(microscope_state["start_focus"])
+        f_step = (float(microscope_state["end_focus"]) - start_f) / max(
+            number_z_steps, 1
+        )
+        per_stack = microscope_state["stack_cycling_mode"] == "per_stack"
+        restore = {"z": self.position["z"], "f": self.position["f"]}
+
+        if bool(microscope_state["is_multiposition"]):
+            positions = self.positions
+        else:
+            positions = [
+                {
+                    "x": self.position["x"],
+                    "y": self.position["y"],
+                    "z": float(
+                        microscope_state.get("stack_z_origin", self.position["z"])
+                    ),
+                    "theta": self.position["theta"],
+                    "f": float(
+                        microscope_state.get("stack_focus_origin", self.position["f"])
+                    ),
+                }
+            ]
+
+        for position in positions:
+            self.move_stage({k: position[k] for k in ["x", "y", "theta"]})
+            if per_stack:
+                for channel_idx in range(len(self.channels)):
+                    self.switch_channel(channel_idx)
+                    self.scan_z(position, start_z, z_step, start_f, f_step, 1)
+            else:
+                self.scan_z(
+                    position, start_z, z_step, start_f, f_step, len(self.channels)
+                )
+        self.move_stage(restore)
+
+    def scan_z(self, position, start_z, z_step, start_f, f_step, channels):
+        """Acquire one z-stack at a position.
+
+        Parameters
+        ----------
+        position : dict
+            Position of the stack.
+        start_z : float
+            Start of the stack relative to the position.
+        z_step : float
+            Z step size.
+        start_f : float
+            Start focus relative to the position.
+        f_step : float
+            Focus step size.
+        channels : int
+            Number of channels acquired at each plane.
+        """
+        number_z_steps = int(
+            float(
+                self.configuration["experiment"]["MicroscopeState"]["number_z_steps"]
+            )
+        )
+        for i in range(number_z_steps):
+            self.move_stage(
+                {
+                    "z": position["z"] + start_z + i * z_step,
+                    "f": position["f"] + start_f + i * f_step,
+                }
+            )
+            if channels == 1:
+                self.snap()
+                continue
+            for channel_idx in range(channels):
+                self.switch_channel(channel_idx)
+                self.snap()
+
+    def estimate_autofocus(self, feature_dict, device="stage", device_ref="f", *args):
+        """Estimate Autofocus."""
+        settings = self.configuration["experiment"]["AutoFocusParameters"][
+            self.microscope_name
+        ][device][device_ref]
+        frames, travel = 0, 0
+        for stage in ["coarse", "fine"]:
+            if not settings[f"{stage}_selected"]:
+                continue
+            scan_range = float(settings[f"{stage}_range"])
+            frames += int(scan_range // float(settings[f"{stage}_step_size"])) + 1
+            # sweep through the range, then return to the best focus
+            travel += 2 * scan_range
+        self.phases["autofocus"] += travel / self.get_stage_velocity(device_ref)
+        self.snap(frames, phase="autofocus")
+
+    def estimate_focus_map(
+        self, feature_dict, n_samples=9, method="thin_plate", drift_samples=3, *args
+    ):
+        """Estimate FocusMap."""
+        state = self.get_feature_state(feature_dict, runs=0)
+        n_samples = int(n_samples) if state["runs"] == 0 else int(drift_samples)
+        state["runs"] += 1
+        sample_ids = select_focus_samples(self.positions.array[:, :3], n_samples)
+        for idx in sample_ids:
+            self.move_stage(self.positions[idx])
+            self.estimate_autofocus(feature_dict)
+
+    def estimate_change_resolution(
+        self, feature_dict, resolution_mode="high", zoom_value="N/A", *args
+    ):
+        """Estimate ChangeResolution."""
+        if resolution_mode in self.configuration["configuration"]["microscopes"]:
+            self.microscope_name = resolution_mode
+            self.update_exposure_sweep_times()
+        self.phases["resolution_switch"] += float(
+            self.telemetry.get("resolution_switch", 0)
+        )
+
+    def estimate_stack_pause(
+        self, feature_dict, pause_num="experiment.MicroscopeState.timepoints", *args
+    ):
+        """Estimate StackPause."""
+        if type(pause_num) is str:
+            pause_num = get_config_value(self.configuration, pause_num, 1)
+        state = self.get_feature_state(feature_dict, pause_num=int(pause_num))
+        state["pause_num"] -= 1
+        if state["pause_num"] <= 0:
+            return
+        pause_time = float(
+            self.configuration["experiment"]["MicroscopeState"]["stack_pause"]
+        )
+        self.phases["pause"] += max(pause_time, 0)
+
+    def estimate_constant_velocity(self, feature_dict, *args):
+        """Estimate ConstantVelocityAcquisition."""
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        number_z_steps = int(float(microscope_state["number_z_steps"]))
+        for channel_idx in range(len(self.channels)):
+            self.switch_channel(channel_idx)
+            self.snap(number_z_steps)
+
+    def estimate_detect_tissue(self, feature_dict, planes=1, *args):
+        """Estimate DetectTissueInStack and its subclasses."""
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        planes = int(planes)
+        z_range = float(microscope_state["end_position"]) - float(
+            microscope_state["start_position"]
+        )
+        z, f = self.position["z"], self.position["f"]
+        for i in range(planes):
+            offset = z_range / 2 if planes == 1 else i * z_range / (planes - 1)
+            self.move_stage({"z": z + offset})
+            self.snap()
+        self.position["z"], self.position["f"] = z, f
+
+    def report(self):
+        """Summarize the estimate.
+
+        Returns
+        -------
+        report : dict
+            Predicted duration (s), number of frames, number of bytes of image
+            data (excluding autofocus frames), time spent
+            in each phase (s), number of stage moves and channel switches, and the
+            features that could not be estimated.
+        """
+        # saved frames are binned
+        camera_parameters = self.configuration["experiment"]["CameraParameters"]
+        frame_bytes = (
+            int(camera_parameters["img_x_pixels"])
+            * int(camera_parameters["img_y_pixels"])
+            * 2
+        )
+        return {
+            "duration": sum(self.phases.values()),
+            "frames": self.frames,
+            "bytes": self.saved_frames * frame_bytes,
+            "phases": dict(self.phases),
+            "stage_moves": self.stage_moves,
+            "channel_switches": self.channel_switches,
+            "unknown_features": sorted(self.unknown_features),
+        }
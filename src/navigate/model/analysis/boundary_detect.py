@@ -34,8 +34,6 @@ import math
 from typing import Optional
 
 # Third party imports
-from skimage import filters
-from skimage.transform import downscale_local_mean
 import numpy as np
 import numpy.typing as npt
 
@@ -112,6 +110,8 @@ def find_tissue_boundary_2d(
     boundary : list
         List of boundaries of tissue by row of downsampled image.
     """
+    from skimage import filters
+    from skimage.transform import downscale_local_mean
 
     # Threshold
     thresh_img = image_data > filters.threshold_otsu(image_data)
@@ -31,10 +31,12 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 # Standard library imports
+import os
 
 # Third-party imports
 import numpy as np
 import numpy.typing as npt
+import tifffile
 
 # Local application imports
 
@@ -44,37 +46,154 @@ import numpy.typing as npt
 # Optics Express. 2017;25(10):11701–11701.
 
 
+class WelfordAccumulator:
+    """Per-pixel running mean and variance of a stream of frames.
+
+    Frames are accumulated one at a time with Welford's online algorithm, so the
+    memory used does not depend on the number of frames and no frame is copied.
+    All the temporary arrays are preallocated.
+    """
+
+    def __init__(self, shape=None, dtype=np.float64):
+        """Initialize the WelfordAccumulator.
+
+        Parameters
+        ----------
+        shape : tuple, optional
+            Shape of a frame. If None, the shape of the first frame is used.
+        dtype : np.dtype
+            Precision of the accumulators, e.g. np.float32 to halve the memory.
+        """
+        #: np.dtype: Precision of the accumulators.
+        self.dtype = np.dtype(dtype)
+
+        #: int: Number of accumulated frames.
+        self.count = 0
+
+        #: np.ndarray: Running mean.
+        self._mean = None
+
+        #: np.ndarray: Running sum of squared differences from the mean.
+        self._m2 = None
+
+        #: list: Preallocated temporary arrays.
+        self._buffers = None
+
+        if shape is not None:
+            self._allocate(shape)
+
+    def _allocate(self, shape):
+        """Allocate the accumulators.
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of a frame.
+        """
+        self._mean = np.zeros(shape, dtype=self.dtype)
+        self._m2 = np.zeros(shape, dtype=self.dtype)
+        self._buffers = [np.empty(shape, dtype=self.dtype) for _ in range(2)]
+
+    @property
+    def shape(self):
+        """tuple: Shape of a frame, None before the first frame."""
+        return None if self._mean is None else self._mean.shape
+
+    @property
+    def mean(self):
+        """np.ndarray: Per-pixel mean of the accumulated frames."""
+        return None if self._mean is None else self._mean.copy()
+
+    @property
+    def variance(self):
+        """np.ndarray: Per-pixel (population) variance of the accumulated frames."""
+        if self._m2 is None:
+            return None
+        return self._m2 / max(self.count, 1)
+
+    def update(self, frames):
+        """Accumulate a frame or a stack of frames.
+
+        Parameters
+        ----------
+        frames : npt.ArrayLike
+            YX frame, ZYX stack or an iterable of YX frames.
+
+        Raises
+        ------
+        ValueError
+            If the frame shape does not match the accumulated frames.
+        """
+        if isinstance(frames, np.ndarray) and frames.ndim == 2:
+            frames = (frames,)
+        for frame in frames:
+            if self._mean is None:
+                self._allocate(frame.shape)
+            elif frame.shape != self._mean.shape:
+                raise ValueError(
+                    f"Frame shape {frame.shape} doesn't match {self._mean.shape}"
+                )
+            self.count += 1
+            delta, delta2 = self._buffers
+            np.subtract(frame, self._mean, out=delta, casting="unsafe")
+            np.multiply(delta, 1.0 / self.count, out=delta2, casting="unsafe")
+            self._mean += delta2
+            np.subtract(frame, self._mean, out=delta2, casting="unsafe")
+            delta *= delta2
+            self._m2 += delta
+
+
 def compute_scmos_offset_and_variance_map(
     image: npt.ArrayLike,
+    dtype: npt.DTypeLike = None,
 ) -> tuple[npt.ArrayLike, npt.ArrayLike]:
     """Compute the offset and variance map of an sCMOS camera.
 
+    The frames are streamed through a WelfordAccumulator, so a memory-mapped stack
+    or a generator of frames is never loaded into memory at once.
+
     Parameters
     ----------
     image : npt.ArrayLike
-        ZYX image of multiple dark camera frames, taken sequentially.
+        ZYX image of multiple dark camera frames, taken sequentially, or an
+        iterable of YX frames.
+    dtype : npt.DTypeLike
+        Data type of the maps. Default is the data type of the frames.
 
     Returns
     -------
     offset_map : npt.ArrayLike
         XY image of camera offset in the absence of signal.
+    variance_map : npt.ArrayLike
+        XY image of camera variance in the absence of signal.
+
+    Raises
+    ------
+    ValueError
+        If there are no frames.
     """
-    offset_map = np.mean(image, axis=0).astype(image.dtype)
-    variance_map = np.var(image, axis=0).astype(image.dtype)
+    accumulator = WelfordAccumulator()
+    for frame in image:
+        accumulator.update(frame)
+        if dtype is None:
+            dtype = frame.dtype
+    if accumulator.count == 0:
+        raise ValueError("need at least one frame")
+    offset_map = accumulator.mean.astype(dtype)
+    variance_map = accumulator.variance.astype(dtype)
 
     return offset_map, variance_map
 
 
-def compute_flatfield_map(
-    image: npt.ArrayLike, offset_map: npt.ArrayLike, local: bool = False
+def flatfield_map_from_mean(
+    mean_image: npt.ArrayLike, offset_map: npt.ArrayLike, local: bool = False
 ) -> npt.ArrayLike:
-    """Compute the flatfield map for an evenly-illuminated set of frames from
-    an sCMOS camera.
+    """Compute the flatfield map from the mean of evenly-illuminated frames.
 
     Parameters
     ----------
-    image : npt.ArrayLike
-        ZYX image of multiple camera frames with defocused, even signal.
+    mean_image : npt.ArrayLike
+        XY mean of multiple camera frames with defocused, even signal.
     offset_map : np.ArrayLike
         XY image of camera offset in the absence of signal.
     local : bool
@@ -85,7 +204,7 @@ def compute_flatfield_map(
     flatfield_map : npt.ArrayLike
         XY image of flatfield map.
     """
-    offset_image = np.mean(image, axis=0) - offset_map
+    offset_image = mean_image - offset_map
     if local:
         from scipy.ndimage import gaussian_filter
 
@@ -95,6 +214,85 @@ def compute_flatfield_map(
         return offset_image / (np.max(np.abs(offset_image)) + 1)
 
 
+def compute_flatfield_map(
+    image: npt.ArrayLike, offset_map: npt.ArrayLike, local: bool = False
+) -> npt.ArrayLike:
+    """Compute the flatfield map for an evenly-illuminated set of frames from
+    an sCMOS camera.
+
+    Parameters
+    ----------
+    image : npt.ArrayLike
+        ZYX image of multiple camera frames with defocused, even signal, or an
+        iterable of YX frames.
+    offset_map : np.ArrayLike
+        XY image of camera offset in the absence of signal.
+    local : bool
+        Compute the local flatfield map (as opposed to global).
+
+    Returns
+    -------
+    flatfield_map : npt.ArrayLike
+        XY image of flatfield map.
+    """
+    accumulator = WelfordAccumulator()
+    accumulator.update(image)
+    return flatfield_map_from_mean(accumulator.mean, offset_map, local)
+
+
+def save_camera_maps(map_path, serial_number, **maps):
+    """Save camera maps as memory-mappable float32 .npy files.
+
+    Each map is saved as {serial_number}_{name}.npy, e.g. off, var or flat. A file
+    is written next to the old one and then renamed, so a camera never loads a
+    partially written map.
+
+    Parameters
+    ----------
+    map_path : str
+        Directory of the camera maps.
+    serial_number : str
+        Serial number of the camera.
+    **maps : npt.ArrayLike
+        Maps by name.
+    """
+    os.makedirs(map_path, exist_ok=True)
+    for name, data in maps.items():
+        if data is None:
+            continue
+        file_path = os.path.join(map_path, f"{serial_number}_{name}.npy")
+        with open(file_path + ".tmp", "wb") as f:
+            np.save(f, np.asarray(data, dtype=np.float32))
+        os.replace(file_path + ".tmp", file_path)
+
+
+def load_camera_map(map_path, serial_number, name):
+    """Load a camera map.
+
+    A .npy map is memory-mapped read-only, a .tiff map is read.
+
+    Parameters
+    ----------
+    map_path : str
+        Directory of the camera maps.
+    serial_number : str
+        Serial number of the camera.
+    name : str
+        Name of the map, e.g. off, var or flat.
+
+    Returns
+    -------
+    camera_map : np.ndarray or None
+        The map. None if there is no map.
+    """
+    file_path = os.path.join(map_path, f"{serial_number}_{name}")
+    if os.path.exists(file_path + ".npy"):
+        return np.load(file_path + ".npy", mmap_mode="r")
+    if os.path.exists(file_path + ".tiff"):
+        return tifffile.imread(file_path + ".tiff")
+    return None
+
+
 def compute_noise_sigma(Fn=1.0, qe=0.82, S=0.0, Ib=0.0, Nr=1.4, M=1.0):
     """Compute the noise model for an sCMOS camera.
 
@@ -150,3 +348,180 @@ def compute_signal_to_noise(image, offset_map, variance_map):
     # S min: {S.min()} variance_map min: {variance_map.min()} N min: {N.min()}")
 
     return 1.0 * S / N
+
+
+def find_hot_pixels(variance_map: npt.ArrayLike, factor: float = 10.0) -> np.ndarray:
+    """Find hot pixels of an sCMOS camera from its variance map.
+
+    Parameters
+    ----------
+    variance_map : npt.ArrayLike
+        XY image of camera variance in the absence of signal.
+    factor : float
+        A pixel is hot if its variance is larger than factor times the median
+        variance.
+
+    Returns
+    -------
+    hot_pixel_mask : np.ndarray
+        XY boolean image, True at hot pixels.
+    """
+    variance_map = np.asarray(variance_map, dtype=np.float32)
+    return variance_map > factor * max(float(np.median(variance_map)), 1.0)
+
+
+class CameraCorrection:
+    """In-place offset, flatfield and hot-pixel correction of uint16 frames.
+
+    Everything that doesn't depend on a frame is computed once: the offset is
+    rounded to uint16, the flatfield is inverted into a float32 gain, and each hot
+    pixel gets the flat indices and weights of its valid 4-neighbours. Correcting a
+    frame then takes a few vectorized operations on preallocated arrays, applied
+    to blocks of rows that stay in the CPU cache.
+
+    The correction runs on the data thread, so it has to keep up with the camera.
+    benchmarks/camera_correction.py measures the frame rate of each correction.
+    """
+
+    def __init__(
+        self,
+        shape,
+        offset_map=None,
+        flatfield_map=None,
+        hot_pixel_mask=None,
+        block_size=131072,
+    ):
+        """Initialize the CameraCorrection.
+
+        Parameters
+        ----------
+        shape : tuple
+            (height, width) of the frames.
+        offset_map : npt.ArrayLike, optional
+            XY image of camera offset, subtracted from the frames.
+        flatfield_map : npt.ArrayLike, optional
+            XY flatfield map, the frames are divided by it (normalized to its mean).
+        hot_pixel_mask : npt.ArrayLike, optional
+            XY boolean image, hot pixels are replaced by the mean of their
+            neighbours.
+        block_size : int
+            Number of pixels corrected at a time, 512 KB of float32 by default.
+
+        Raises
+        ------
+        ValueError
+            If a map doesn't match the frame shape.
+        """
+        #: tuple: (height, width) of the frames.
+        self.shape = tuple(shape)
+        for camera_map in (offset_map, flatfield_map, hot_pixel_mask):
+            if camera_map is not None and np.shape(camera_map) != self.shape:
+                raise ValueError(
+                    f"Map shape {np.shape(camera_map)} doesn't match {self.shape}"
+                )
+
+        #: np.ndarray: uint16 offset, None if the offset isn't corrected.
+        self.offset = None
+        if offset_map is not None:
+            self.offset = np.clip(np.rint(offset_map), 0, 65535).astype(np.uint16)
+
+        #: np.ndarray: float32 gain, None if the flatfield isn't corrected.
+        self.gain = None
+        if flatfield_map is not None:
+            flatfield = np.asarray(flatfield_map, dtype=np.float32)
+            valid = np.isfinite(flatfield) & (flatfield > 0)
+            self.gain = np.ones(self.shape, dtype=np.float32)
+            if np.any(valid):
+                self.gain[valid] = flatfield[valid].mean() / flatfield[valid]
+
+        #: int: Number of rows corrected at a time.
+        self.block_rows = max(1, min(self.shape[0], block_size // self.shape[1]))
+        #: np.ndarray: Preallocated float32 block of rows for the gain.
+        self._buffer = np.empty((self.block_rows, self.shape[1]), dtype=np.float32)
+
+        #: np.ndarray: Flat indices of the hot pixels.
+        self.hot_pixels = np.empty(0, dtype=np.intp)
+        #: np.ndarray: (n_hot_pixels x 4) flat indices of the neighbours.
+        self._neighbours = np.empty((0, 4), dtype=np.intp)
+        #: np.ndarray: (n_hot_pixels x 4) weights of the neighbours.
+        self._weights = np.empty((0, 4), dtype=np.float32)
+        if hot_pixel_mask is not None:
+            self._set_hot_pixels(np.asarray(hot_pixel_mask, dtype=bool))
+
+    def _set_hot_pixels(self, hot_pixel_mask):
+        """Compute the neighbour lookups of the hot pixels.
+
+        Parameters
+        ----------
+        hot_pixel_mask : np.ndarray
+            XY boolean image, True at hot pixels.
+        """
+        height, width = self.shape
+        rows, columns = np.nonzero(hot_pixel_mask)
+        neighbours = np.zeros((rows.size, 4), dtype=np.intp)
+        weights = np.zeros((rows.size, 4), dtype=np.float32)
+        for i, (dy, dx) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+            r, c = rows + dy, columns + dx
+            inside = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+            r, c = np.where(inside, r, rows), np.where(inside, c, columns)
+            valid = inside & ~hot_pixel_mask[r, c]
+            neighbours[:, i] = r * width + c
+            weights[:, i] = valid
+        total = weights.sum(axis=1, keepdims=True)
+        # a hot pixel without valid neighbours is kept
+        keep = total[:, 0] > 0
+        self.hot_pixels = (rows * width + columns)[keep]
+        self._neighbours = neighbours[keep]
+        self._weights = weights[keep] / total[keep]
+
+    @property
+    def is_active(self):
+        """bool: Whether any correction is applied."""
+        return (
+            self.offset is not None or self.gain is not None or self.hot_pixels.size > 0
+        )
+
+    def correct(self, frames):
+        """Correct frames in place.
+
+        Parameters
+        ----------
+        frames : np.ndarray or list
+            uint16 YX frame, ZYX stack or a list of them, e.g. views of the data
+            buffer.
+        """
+        if isinstance(frames, np.ndarray):
+            frames = (frames,)
+        for stack in frames:
+            if stack.ndim == 2:
+                self.correct_frame(stack)
+            else:
+                for frame in stack:
+                    self.correct_frame(frame)
+
+    def correct_frame(self, frame):
+        """Correct a uint16 frame in place.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            (height x width) uint16 frame.
+        """
+        for start in range(0, self.shape[0], self.block_rows):
+            rows = slice(start, start + self.block_rows)
+            block = frame[rows]
+            if self.offset is not None:
+                offset = self.offset[rows]
+                # clip at zero instead of wrapping around
+                np.maximum(block, offset, out=block)
+                block -= offset
+            if self.gain is not None:
+                buffer = self._buffer[: block.shape[0]]
+                np.multiply(block, self.gain[rows], out=buffer)
+                np.add(buffer, 0.5, out=buffer)
+                np.minimum(buffer, 65535, out=buffer)
+                np.copyto(block, buffer, casting="unsafe")
+        if self.hot_pixels.size:
+            pixels = frame.reshape(-1)
+            values = np.einsum("ij,ij->i", pixels[self._neighbours], self._weights)
+            pixels[self.hot_pixels] = values + 0.5
@@ -0,0 +1,298 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+
+# Third party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+from navigate.tools.linear_algebra import affine_shear
+
+
+def downsample_frame(frame: npt.ArrayLike, factor: int) -> np.ndarray:
+    """Downsample a frame by averaging blocks of factor x factor pixels.
+
+    Rows and columns that don't fill a block are dropped. The blocks are summed with
+    strided adds, which is several times faster than reducing a reshaped array.
+
+    Parameters
+    ----------
+    frame : npt.ArrayLike
+        YX image.
+    factor : int
+        Downsampling factor.
+
+    Returns
+    -------
+    np.ndarray
+        float32 downsampled image.
+    """
+    frame = np.asarray(frame)
+    if factor <= 1:
+        return frame.astype(np.float32)
+    height = frame.shape[0] // factor
+    width = frame.shape[1] // factor
+    frame = frame[: height * factor, : width * factor]
+    rows = frame[::factor].astype(np.float32)
+    for i in range(1, factor):
+        rows += frame[i::factor]
+    downsampled = rows[:, ::factor].copy()
+    for i in range(1, factor):
+        downsampled += rows[:, i::factor]
+    downsampled *= 1.0 / (factor * factor)
+    return downsampled
+
+
+class DeskewPreview:
+    """Downsampled deskewed volume of an oblique stack, built plane by plane.
+
+    The planes of a stage-scanned oblique stack are sheared along one axis of the
+    frame by the same transform as in the BigDataViewer metadata. Each downsampled
+    plane is added to its slab of the volume at its sheared offset, split between the
+    two nearest rows. Consecutive planes are averaged into one slab, and a slab's
+    contribution to the maximum intensity projections is computed once all its planes
+    are in. The size of the volume is fixed when the preview is created.
+    """
+
+    def __init__(
+        self,
+        frame_shape,
+        number_of_planes,
+        step_size,
+        pixel_size,
+        angle=45.0,
+        dimension="YZ",
+        downsample=4,
+        z_downsample=None,
+        max_megabytes=256,
+    ):
+        """Initialize the DeskewPreview.
+
+        Parameters
+        ----------
+        frame_shape : tuple
+            (height, width) of the frames.
+        number_of_planes : int
+            Number of planes of the stack.
+        step_size : float
+            Stage step between two planes, in microns.
+        pixel_size : float
+            Pixel size of the frames, in microns.
+        angle : float
+            Angle between the scan and the optical axis, in degrees.
+        dimension : str
+            Shear dimension, "YZ" shears the rows and "XZ" shears the columns.
+        downsample : int
+            Lateral downsampling factor.
+        z_downsample : int, optional
+            Number of planes averaged into one slab. Default is downsample.
+        max_megabytes : float
+            Maximum size of the volume, z_downsample is increased to stay below it.
+
+        Raises
+        ------
+        ValueError
+            If the shear dimension is not supported.
+        """
+        dimension = dimension.upper()
+        if dimension in ("YZ", "ZY"):
+            #: int: Axis of the frames that is sheared.
+            self.axis = 0
+        elif dimension in ("XZ", "ZX"):
+            self.axis = 1
+        else:
+            raise ValueError(f"Shear dimension {dimension} is not supported")
+
+        #: int: Lateral downsampling factor.
+        self.factor = max(int(downsample), 1)
+        #: int: Number of planes of the stack.
+        self.number_of_planes = max(int(number_of_planes), 1)
+
+        shear_transform = affine_shear(
+            step_size, pixel_size, pixel_size, dimension=dimension, angle=angle
+        )
+        #: float: Shift between two planes along the sheared axis, in volume pixels.
+        self.shift = shear_transform[self.axis ^ 1, 2] / self.factor
+
+        # planes are stored as (sheared axis, other axis)
+        plane_shape = (frame_shape[0] // self.factor, frame_shape[1] // self.factor)
+        if self.axis == 1:
+            plane_shape = plane_shape[::-1]
+        #: tuple: Shape of a downsampled plane in the volume.
+        self.plane_shape = plane_shape
+        extent = abs(self.shift) * (self.number_of_planes - 1)
+        #: float: Offset of the first plane along the sheared axis.
+        self._origin = extent if self.shift < 0 else 0.0
+        length = plane_shape[0] + int(np.ceil(extent)) + 1
+
+        slab_megabytes = length * plane_shape[1] * 4 / 1e6
+        max_slabs = max(int(max_megabytes / slab_megabytes), 1)
+        z_factor = self.factor if z_downsample is None else max(int(z_downsample), 1)
+        z_factor = max(z_factor, int(np.ceil(self.number_of_planes / max_slabs)))
+        #: int: Number of planes averaged into one slab.
+        self.z_factor = z_factor
+        n_slabs = int(np.ceil(self.number_of_planes / z_factor))
+
+        #: np.ndarray: (slab, sheared axis, other axis) float32 volume.
+        self._volume = np.zeros((n_slabs, length, plane_shape[1]), dtype=np.float32)
+        #: np.ndarray: (slab, sheared axis) sum of the interpolation weights.
+        self._weights = np.zeros((n_slabs, length), dtype=np.float32)
+        #: np.ndarray: Number of planes added to each slab.
+        self._counts = np.zeros(n_slabs, dtype=int)
+        #: np.ndarray: Whether each slab is normalized and projected.
+        self._done = np.zeros(n_slabs, dtype=bool)
+        #: np.ndarray: Preallocated weighted plane.
+        self._buffer = np.empty(plane_shape, dtype=np.float32)
+        #: dict: Maximum intensity projections along each axis of the volume.
+        self._projections = {
+            "slab": np.zeros((length, plane_shape[1]), dtype=np.float32),
+            "sheared": np.zeros((n_slabs, plane_shape[1]), dtype=np.float32),
+            "other": np.zeros((n_slabs, length), dtype=np.float32),
+        }
+
+    @property
+    def planes(self):
+        """int: Number of planes added."""
+        return int(self._counts.sum())
+
+    @property
+    def volume(self):
+        """np.ndarray: (z, y, x) view of the deskewed volume."""
+        if self.axis == 1:
+            return self._volume.swapaxes(1, 2)
+        return self._volume
+
+    @property
+    def mips(self):
+        """dict: Copies of the "xy", "xz" and "yz" maximum intensity projections.
+
+        Only the slabs with all their planes, or finished, are projected.
+        """
+        slab, sheared, other = (
+            self._projections[k] for k in ["slab", "sheared", "other"]
+        )
+        if self.axis == 0:
+            return {"xy": slab.copy(), "xz": sheared.copy(), "yz": other.copy()}
+        return {"xy": slab.T.copy(), "xz": other.copy(), "yz": sheared.copy()}
+
+    def add_frame(self, index, frame):
+        """Downsample a frame and add it to the volume.
+
+        Parameters
+        ----------
+        index : int
+            Plane index of the frame in the stack.
+        frame : npt.ArrayLike
+            YX frame.
+
+        Returns
+        -------
+        bool
+            True if a slab was completed.
+        """
+        return self.add_plane(index, downsample_frame(frame, self.factor))
+
+    def add_plane(self, index, plane):
+        """Add a downsampled plane to the volume.
+
+        Planes beyond the number of planes of the stack are ignored.
+
+        Parameters
+        ----------
+        index : int
+            Plane index in the stack.
+        plane : npt.ArrayLike
+            YX plane downsampled by the lateral factor.
+
+        Returns
+        -------
+        bool
+            True if a slab was completed.
+
+        Raises
+        ------
+        ValueError
+            If the plane doesn't have the downsampled frame shape.
+        """
+        if not 0 <= index < self.number_of_planes:
+            return False
+        plane = np.asarray(plane, dtype=np.float32)
+        if self.axis == 1:
+            plane = plane.T
+        if plane.shape != self.plane_shape:
+            raise ValueError(
+                f"Plane shape {plane.shape} doesn't match {self.plane_shape}"
+            )
+
+        z = index // self.z_factor
+        slab, weights = self._volume[z], self._weights[z]
+        position = self._origin + index * self.shift
+        start = int(position)
+        fraction = position - start
+        end = start + plane.shape[0]
+        # linear interpolation between the two nearest rows
+        for offset, weight in ((0, 1.0 - fraction), (1, fraction)):
+            if weight <= 0:
+                continue
+            np.multiply(plane, weight, out=self._buffer)
+            slab[start + offset : end + offset] += self._buffer
+            weights[start + offset : end + offset] += weight
+
+        self._counts[z] += 1
+        planes_in_slab = min(self.z_factor, self.number_of_planes - z * self.z_factor)
+        if self._counts[z] == planes_in_slab:
+            self._project(z)
+            return True
+        return False
+
+    def _project(self, z):
+        """Normalize a slab and add it to the maximum intensity projections.
+
+        Parameters
+        ----------
+        z : int
+            Slab index.
+        """
+        slab, weights = self._volume[z], self._weights[z]
+        covered = weights > 0
+        slab[covered] /= weights[covered, None]
+        np.maximum(self._projections["slab"], slab, out=self._projections["slab"])
+        self._projections["sheared"][z] = slab.max(axis=0)
+        self._projections["other"][z] = slab.max(axis=1)
+        self._done[z] = True
+
+    def finish(self):
+        """Project the slabs that are missing planes, e.g. after a stop."""
+        for z in np.flatnonzero((self._counts > 0) & ~self._done):
+            self._project(z)
@@ -0,0 +1,223 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+
+# Standard library imports
+
+# Third party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+
+
+def select_focus_samples(positions: npt.ArrayLike, n_samples: int) -> np.ndarray:
+    """
+    Select a sparse, evenly spread subset of positions to autofocus.
+
+    Farthest point sampling, starting from the position closest to the center of the
+    table, so the corners and the center of a tile grid are always sampled.
+
+    Parameters
+    ----------
+    positions : npt.ArrayLike
+        (n_positions x n_axes) array of positions, e.g. (x, y, z).
+    n_samples : int
+        Number of positions to select.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the selected positions.
+    """
+    positions = np.asarray(positions, dtype=float)
+    n = positions.shape[0]
+    if n_samples >= n:
+        return np.arange(n)
+    if n_samples < 1:
+        return np.arange(0)
+
+    distance = np.linalg.norm(positions - positions.mean(axis=0), axis=1)
+    sample_ids = [int(np.argmin(distance))]
+    distance = np.linalg.norm(positions - positions[sample_ids[0]], axis=1)
+    for _ in range(n_samples - 1):
+        sample_ids.append(int(np.argmax(distance)))
+        distance = np.minimum(
+            distance, np.linalg.norm(positions - positions[sample_ids[-1]], axis=1)
+        )
+    return np.sort(sample_ids)
+
+
+class FocusSurface:
+    """Smooth surface of best focus over the stage coordinates.
+
+    The surface is a least-squares plane or a thin-plate spline through the focus
+    measured at a few positions. Coordinates that do not vary between the measured
+    positions, or that follow from the other coordinates (e.g. z on a tilted sample
+    holder), are ignored. Measurements repeated at the same coordinates are averaged,
+    and the surface falls back to a plane, then to a constant, when there are too
+    few measurements for the requested method.
+    """
+
+    def __init__(self, method: str = "thin_plate", smoothing: float = 0.0):
+        """Initialize the FocusSurface.
+
+        Parameters
+        ----------
+        method : str
+            "thin_plate" or "plane".
+        smoothing : float
+            Smoothing of the thin-plate spline, 0 interpolates the measurements.
+        """
+        if method not in ["thin_plate", "plane"]:
+            raise ValueError(f"Unknown focus surface method: {method}")
+        #: str: Requested fitting method.
+        self.method = method
+        #: float: Smoothing of the thin-plate spline.
+        self.smoothing = smoothing
+        #: str: Fitting method in use, "thin_plate", "plane" or "constant".
+        self.fit_method = None
+        #: np.ndarray: Indices of the coordinates the surface depends on.
+        self.axes = None
+        #: np.ndarray: Center of the measured coordinates.
+        self.center = None
+        #: np.ndarray: Spread of the measured coordinates.
+        self.scale = None
+        #: np.ndarray: Plane coefficients, the last one is the constant term.
+        self.coefficients = None
+        #: RBFInterpolator: Thin-plate spline interpolator.
+        self.interpolator = None
+        #: float: Offset added to the surface, e.g. to track drift.
+        self.offset = 0.0
+
+    def fit(self, coordinates: npt.ArrayLike, focus: npt.ArrayLike) -> "FocusSurface":
+        """Fit the surface to measured focus positions.
+
+        Parameters
+        ----------
+        coordinates : npt.ArrayLike
+            (n_measurements x n_axes) stage coordinates of the measurements.
+        focus : npt.ArrayLike
+            (n_measurements,) best focus at each coordinate.
+
+        Returns
+        -------
+        FocusSurface
+            The fitted surface.
+        """
+        coordinates = np.atleast_2d(np.asarray(coordinates, dtype=float))
+        focus = np.asarray(focus, dtype=float).ravel()
+        if focus.size == 0 or coordinates.shape[0] != focus.size:
+            raise ValueError("Focus surface needs one focus value per coordinate")
+
+        # average the measurements repeated at the same coordinates
+        coordinates, inverse = np.unique(coordinates, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        focus = np.bincount(inverse, weights=focus) / np.bincount(inverse)
+
+        spread = np.ptp(coordinates, axis=0)
+        varying = np.flatnonzero(spread > 1e-6 * max(spread.max(), 1.0))
+        points = (coordinates - coordinates.mean(axis=0))[:, varying] / spread[varying]
+        # keep the first coordinates that span the measurements, the thin-plate
+        # spline is degenerate on points that lie in a lower dimensional subspace
+        self.axes = np.array([], dtype=int)
+        for i, axis in enumerate(varying):
+            kept = np.append(np.searchsorted(varying, self.axes), i)
+            if np.linalg.matrix_rank(points[:, kept], tol=1e-6) == kept.size:
+                self.axes = np.append(self.axes, axis)
+        self.center = coordinates[:, self.axes].mean(axis=0)
+        self.scale = spread[self.axes]
+        self.offset = 0.0
+        self.interpolator = None
+        points = self.normalize(coordinates)
+        n, dims = points.shape
+
+        if self.method == "thin_plate" and dims > 0 and n >= dims + 2:
+            from scipy.interpolate import RBFInterpolator
+
+            try:
+                self.interpolator = RBFInterpolator(
+                    points, focus, kernel="thin_plate_spline", smoothing=self.smoothing
+                )
+                self.fit_method = "thin_plate"
+                return self
+            except np.linalg.LinAlgError:
+                # e.g. nearly coincident measurements, fall back to a plane
+                self.interpolator = None
+
+        if dims > 0 and n >= dims + 1:
+            self.fit_method = "plane"
+            self.coefficients = np.linalg.lstsq(
+                np.hstack([points, np.ones((n, 1))]), focus, rcond=None
+            )[0]
+        else:
+            self.fit_method = "constant"
+            self.coefficients = np.array([focus.mean()])
+        return self
+
+    def normalize(self, coordinates: npt.ArrayLike) -> np.ndarray:
+        """Center and scale the coordinates the surface depends on.
+
+        Parameters
+        ----------
+        coordinates : npt.ArrayLike
+            (n x n_axes) stage coordinates.
+
+        Returns
+        -------
+        np.ndarray
+            (n x n_surface_axes) normalized coordinates.
+        """
+        coordinates = np.atleast_2d(np.asarray(coordinates, dtype=float))
+        return (coordinates[:, self.axes] - self.center) / self.scale
+
+    def predict(self, coordinates: npt.ArrayLike) -> np.ndarray:
+        """Interpolate the best focus at stage coordinates.
+
+        Parameters
+        ----------
+        coordinates : npt.ArrayLike
+            (n x n_axes) stage coordinates.
+
+        Returns
+        -------
+        np.ndarray
+            (n,) focus positions.
+        """
+        if self.fit_method is None:
+            raise RuntimeError("Focus surface is not fitted")
+        points = self.normalize(coordinates)
+        if self.fit_method == "thin_plate":
+            focus = self.interpolator(points)
+        elif self.fit_method == "plane":
+            focus = points @ self.coefficients[:-1] + self.coefficients[-1]
+        else:
+            focus = np.full(points.shape[0], self.coefficients[0])
+        return focus + self.offset
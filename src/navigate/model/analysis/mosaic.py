@@ -0,0 +1,242 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+
+# Third party imports
+import numpy as np
+import tifffile
+
+# Local application imports
+from navigate.model.analysis.deskew import downsample_frame
+from navigate.tools.position_table import positions_to_array
+
+
+class MosaicOverview:
+    """Low-resolution overview of the tiles of a multi-position acquisition.
+
+    The frames acquired at one XY stage position are reduced to their maximum
+    intensity projection. When the stage moves on, the projection is downsampled and
+    placed in the overview canvas at its stage position. The canvas covers the
+    fields of view of the planned positions, and the downsampling factor is chosen
+    so it stays below max_megabytes, so the memory used doesn't depend on the number
+    of frames. Stage X increases along the columns and stage Y along the rows.
+    """
+
+    def __init__(
+        self,
+        positions,
+        frame_shape,
+        pixel_size,
+        downsample=8,
+        max_megabytes=64,
+        flip_x=False,
+        flip_y=False,
+    ):
+        """Initialize the MosaicOverview.
+
+        Parameters
+        ----------
+        positions : list, np.array, ListProxy or PositionTable
+            Planned positions, see positions_to_array.
+        frame_shape : tuple
+            (height, width) of the frames.
+        pixel_size : float
+            Pixel size of the frames, in microns.
+        downsample : int
+            Minimum downsampling factor of the tiles.
+        max_megabytes : float
+            Maximum size of the canvas.
+        flip_x : bool
+            Flip the frames along X, as the ImageWriter does.
+        flip_y : bool
+            Flip the frames along Y, as the ImageWriter does.
+
+        Raises
+        ------
+        ValueError
+            If there are no positions or the pixel size isn't positive.
+        """
+        positions = positions_to_array(positions)
+        if positions.shape[0] == 0:
+            raise ValueError("Mosaic overview needs at least one position")
+        if pixel_size <= 0:
+            raise ValueError(f"Pixel size {pixel_size} is not positive")
+
+        #: tuple: (height, width) of the frames.
+        self.frame_shape = tuple(frame_shape)
+        #: float: Pixel size of the frames, in microns.
+        self.pixel_size = float(pixel_size)
+        #: tuple: Flip the frames along (Y, X).
+        self.flips = (flip_y, flip_x)
+
+        # (y, x) extent of the planned fields of view, in microns
+        fov = np.array(self.frame_shape) * self.pixel_size
+        centers = positions[:, [1, 0]]
+        #: np.ndarray: (y, x) stage position of the canvas corner.
+        self.origin = centers.min(axis=0) - fov / 2
+        extent = centers.max(axis=0) + fov / 2 - self.origin
+
+        factor = max(int(downsample), 1)
+        # uint16 canvas
+        max_pixels = max_megabytes * 1e6 / 2
+        min_factor = np.sqrt(np.prod(extent / self.pixel_size) / max_pixels)
+        #: int: Downsampling factor of the tiles.
+        self.factor = max(factor, int(np.ceil(min_factor)))
+        #: float: Pixel size of the canvas, in microns.
+        self.canvas_pixel_size = self.pixel_size * self.factor
+        canvas_shape = np.maximum(np.ceil(extent / self.canvas_pixel_size), 1)
+        #: np.ndarray: uint16 overview canvas.
+        self.canvas = np.zeros(canvas_shape.astype(int), dtype=np.uint16)
+
+        #: np.ndarray: Maximum intensity projection of the current tile.
+        self._tile = np.zeros(self.frame_shape, dtype=np.uint16)
+        #: np.ndarray: (x, y) stage position of the current tile.
+        self._tile_position = None
+        #: int: Number of tiles placed in the canvas.
+        self.tiles = 0
+
+    def add_frame(self, frame, position):
+        """Add a frame to the tile at its stage position.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            YX frame.
+        position : npt.ArrayLike
+            (x, y, ...) stage position of the frame, e.g. a row of the model's
+            data_buffer_positions.
+
+        Returns
+        -------
+        bool
+            True if the stage moved and the previous tile was placed.
+        """
+        position = np.array(position[:2], dtype=float)
+        completed = False
+        if self._tile_position is not None and np.any(
+            np.abs(position - self._tile_position) > self.canvas_pixel_size / 2
+        ):
+            completed = self.finish_tile()
+        if self._tile_position is None:
+            np.copyto(self._tile, frame, casting="unsafe")
+            self._tile_position = position
+        else:
+            np.maximum(self._tile, frame, out=self._tile)
+        return completed
+
+    def finish_tile(self):
+        """Place the current tile in the canvas.
+
+        Returns
+        -------
+        bool
+            True if there was a tile to place.
+        """
+        if self._tile_position is None:
+            return False
+        x, y = self._tile_position
+        self.add_tile(self._tile, x, y)
+        self._tile_position = None
+        return True
+
+    def add_tile(self, image, x, y):
+        """Downsample an image and place it in the canvas.
+
+        Overlapping tiles are combined with their maximum, and the parts outside the
+        canvas are dropped.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            YX image, e.g. the maximum intensity projection of a stack.
+        x : float
+            Stage X position of the center of the image, in microns.
+        y : float
+            Stage Y position of the center of the image, in microns.
+        """
+        image = np.asarray(image)
+        if self.flips[0]:
+            image = image[::-1, :]
+        if self.flips[1]:
+            image = image[:, ::-1]
+        tile = downsample_frame(image, self.factor)
+        np.add(tile, 0.5, out=tile)
+        np.minimum(tile, 65535, out=tile)
+
+        # top-left corner of the tile in the canvas
+        center = (np.array([y, x]) - self.origin) / self.canvas_pixel_size
+        start = np.rint(center - np.array(tile.shape) / 2).astype(int)
+        canvas_start = np.maximum(start, 0)
+        canvas_end = np.minimum(start + tile.shape, self.canvas.shape)
+        if np.any(canvas_end <= canvas_start):
+            return
+        tile = tile[
+            canvas_start[0] - start[0] : canvas_end[0] - start[0],
+            canvas_start[1] - start[1] : canvas_end[1] - start[1],
+        ].astype(np.uint16)
+        region = self.canvas[
+            canvas_start[0] : canvas_end[0], canvas_start[1] : canvas_end[1]
+        ]
+        np.maximum(region, tile, out=region)
+        self.tiles += 1
+
+    def preview(self, max_size=1024):
+        """Return a copy of the canvas subsampled to display it.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of pixels along each axis.
+
+        Returns
+        -------
+        np.ndarray
+            Subsampled copy of the canvas.
+        """
+        step = max(int(np.ceil(max(self.canvas.shape) / max_size)), 1)
+        return self.canvas[::step, ::step].copy()
+
+    def save(self, file_name):
+        """Save the canvas as a tiff file.
+
+        Parameters
+        ----------
+        file_name : str
+            Path of the tiff file.
+        """
+        tifffile.imwrite(
+            file_name,
+            self.canvas,
+            resolution=(1 / self.canvas_pixel_size, 1 / self.canvas_pixel_size),
+            metadata={"unit": "um"},
+        )
@@ -40,6 +40,10 @@ Full docstring at https://github.com/AndrewGYork/tools/blob/master/concurrency_t
 """
 
 
+#: weakref.WeakValueDictionary: Shared memory blocks attached by this process.
+_attached_shared_memory = weakref.WeakValueDictionary()
+
+
 class SharedNDArray(np.ndarray):
     """A numpy array that lives in shared memory
 
@@ -106,7 +110,12 @@ class SharedNDArray(np.ndarray):
                     raise e
             must_unlink = True  # This process is responsible for unlinking
         else:
-            shm = shared_memory.SharedMemory(name=shared_memory_name, create=False)
+            # Views of one block (e.g., the frames of a data buffer) are attached
+            # once per process instead of once per view.
+            shm = _attached_shared_memory.get(shared_memory_name)
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=shared_memory_name, create=False)
+                _attached_shared_memory[shared_memory_name] = shm
             must_unlink = False
         obj = super(SharedNDArray, cls).__new__(
             cls, shape, dtype, shm.buf, offset, strides, order
@@ -0,0 +1,370 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class SharedArrayHandle:
+    """Reference to an array copied into a shared memory block.
+
+    The handle is what travels through the queue. The block is created by the
+    sender and unlinked by the receiver once the array has been restored.
+    """
+
+    def __init__(self, array):
+        """Copy an array into a new shared memory block.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array to share.
+        """
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+
+        #: str: Name of the shared memory block.
+        self.name = shm.name
+
+        #: tuple: Shape of the array.
+        self.shape = array.shape
+
+        #: str: Data type of the array.
+        self.dtype = array.dtype.str
+
+        shm.close()
+
+    def restore(self):
+        """Copy the array out of shared memory and unlink the block.
+
+        Returns
+        -------
+        array : np.ndarray
+            The shared array.
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            array = np.ndarray(self.shape, self.dtype, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        return array
+
+    def release(self):
+        """Unlink the block without reading the array."""
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            logger.debug(f"Event queue - Shared memory {self.name} already released")
+            return
+        shm.close()
+        shm.unlink()
+
+
+class EventQueue:
+    """Queue of (event, value) pairs sent from the model to the controller.
+
+    Behaves like the multiprocessing.Queue it wraps, with three additions:
+
+    - Arrays larger than shared_memory_threshold bytes, alone or nested in
+      tuples, lists and dictionaries, are sent through shared memory instead of
+      being pickled through the queue's pipe.
+    - When the receiver falls behind, pending events of a coalesced type (e.g.,
+      "update_stage") are replaced in place by the most recent one.
+    - The latency and the number of events of every type, and the queue depth, are
+      recorded, see stats.
+    """
+
+    def __init__(
+        self,
+        maxsize=100,
+        shared_memory_threshold=2**18,
+        coalesced_events=("update_stage", "waveform", "multiposition"),
+    ):
+        """Initialize the EventQueue.
+
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of events in the queue.
+        shared_memory_threshold : int
+            Arrays of at least this many bytes are sent through shared memory.
+        coalesced_events : tuple
+            Event types for which only the most recent pending value is delivered.
+        """
+        #: mp.Queue: Queue of (event, value, time sent) tuples.
+        self.queue = mp.Queue(maxsize)
+
+        #: int: Arrays of at least this many bytes are sent through shared memory.
+        self.shared_memory_threshold = shared_memory_threshold
+
+        #: set: Event types for which only the most recent pending value is kept.
+        self.coalesced_events = set(coalesced_events)
+
+        #: deque: Events received from the queue but not returned yet.
+        self.pending = deque()
+
+        #: dict: Statistics per event type.
+        self.event_stats = {}
+
+        #: int: Largest number of events waiting to be handled.
+        self.max_depth = 0
+
+    def put(self, item, block=True, timeout=None):
+        """Send an event.
+
+        Parameters
+        ----------
+        item : tuple
+            (event, value) pair.
+        block : bool
+            Block while the queue is full.
+        timeout : float or None
+            Maximum time to block in seconds.
+        """
+        event, value = item
+        self.queue.put((event, self.share(value), time.time()), block, timeout)
+
+    def put_nowait(self, item):
+        """Send an event without blocking.
+
+        Parameters
+        ----------
+        item : tuple
+            (event, value) pair.
+        """
+        self.put(item, block=False)
+
+    def get(self, block=True, timeout=None):
+        """Receive the next event.
+
+        Parameters
+        ----------
+        block : bool
+            Block until an event is available.
+        timeout : float or None
+            Maximum time to block in seconds.
+
+        Returns
+        -------
+        item : tuple
+            (event, value) pair.
+
+        Raises
+        ------
+        queue.Empty
+            If no event is available.
+        """
+        if not self.pending:
+            self.receive(self.queue.get(block, timeout))
+        while True:
+            try:
+                self.receive(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.max_depth = max(self.max_depth, len(self.pending) + self.qsize())
+
+        event, value, sent_time = self.pending.popleft()
+        stats = self.get_event_stats(event)
+        latency = time.time() - sent_time
+        stats["count"] += 1
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        return event, self.restore(value)
+
+    def get_nowait(self):
+        """Receive the next event without blocking.
+
+        Returns
+        -------
+        item : tuple
+            (event, value) pair.
+        """
+        return self.get(block=False)
+
+    def receive(self, item):
+        """Add an event read from the queue to the pending events.
+
+        Parameters
+        ----------
+        item : tuple
+            (event, value, time sent) tuple.
+        """
+        event = item[0]
+        if event in self.coalesced_events:
+            for i, pending_item in enumerate(self.pending):
+                if pending_item[0] == event:
+                    # keep the place of the event relative to the other events
+                    self.pending[i] = item
+                    self.release(pending_item[1])
+                    self.get_event_stats(event)["coalesced"] += 1
+                    return
+        self.pending.append(item)
+
+    def qsize(self):
+        """Return the approximate number of events in the queue.
+
+        Returns
+        -------
+        size : int
+            Number of events, 0 where the platform cannot tell.
+        """
+        try:
+            return self.queue.qsize()
+        except NotImplementedError:
+            return 0
+
+    def empty(self):
+        """Return True if there are no events to receive."""
+        return not self.pending and self.queue.empty()
+
+    def get_event_stats(self, event):
+        """Return the statistics of an event type.
+
+        Parameters
+        ----------
+        event : str
+            Event type.
+
+        Returns
+        -------
+        stats : dict
+            Statistics of the event type.
+        """
+        if event not in self.event_stats:
+            self.event_stats[event] = {
+                "count": 0,
+                "coalesced": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+            }
+        return self.event_stats[event]
+
+    def stats(self):
+        """Return the receiver statistics.
+
+        Returns
+        -------
+        stats : dict
+            Number of delivered and coalesced events, mean and maximum latency in
+            seconds per event type, and the current and largest queue depth.
+        """
+        events = {}
+        for event, event_stats in self.event_stats.items():
+            count = event_stats["count"]
+            events[event] = {
+                "count": count,
+                "coalesced": event_stats["coalesced"],
+                "mean_latency": event_stats["total_latency"] / count if count else 0.0,
+                "max_latency": event_stats["max_latency"],
+            }
+        return {
+            "events": events,
+            "depth": len(self.pending) + self.qsize(),
+            "max_depth": self.max_depth,
+        }
+
+    def share(self, value):
+        """Replace large arrays in a value with shared memory handles.
+
+        Parameters
+        ----------
+        value : object
+            Event value.
+
+        Returns
+        -------
+        value : object
+            Event value ready to be sent.
+        """
+        if isinstance(value, np.ndarray):
+            if value.nbytes >= self.shared_memory_threshold and value.dtype != object:
+                return SharedArrayHandle(value)
+            return value
+        if isinstance(value, dict):
+            return {k: self.share(v) for k, v in value.items()}
+        if type(value) in (list, tuple):
+            return type(value)(self.share(v) for v in value)
+        return value
+
+    def restore(self, value):
+        """Replace shared memory handles in a received value with arrays.
+
+        Parameters
+        ----------
+        value : object
+            Received event value.
+
+        Returns
+        -------
+        value : object
+            Event value as it was sent.
+        """
+        if isinstance(value, SharedArrayHandle):
+            return value.restore()
+        if isinstance(value, dict):
+            return {k: self.restore(v) for k, v in value.items()}
+        if type(value) in (list, tuple):
+            return type(value)(self.restore(v) for v in value)
+        return value
+
+    def release(self, value):
+        """Release the shared memory of a value that will not be delivered.
+
+        Parameters
+        ----------
+        value : object
+            Received event value.
+        """
+        if isinstance(value, SharedArrayHandle):
+            value.release()
+        elif isinstance(value, dict):
+            for v in value.values():
+                self.release(v)
+        elif type(value) in (list, tuple):
+            for v in value:
+                self.release(v)
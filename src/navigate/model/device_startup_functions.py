@@ -35,6 +35,7 @@ import platform
 import logging
 import time
 import importlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from multiprocessing.managers import ListProxy
 
 # Third Party Imports
@@ -53,9 +54,22 @@ class DummyDeviceConnection:
     pass
 
 
-def auto_redial(func, args, n_tries=10, exception=Exception, **kwargs):
+def auto_redial(
+    func,
+    args,
+    n_tries=10,
+    exception=Exception,
+    retry_delay=0.05,
+    retry_backoff=2.0,
+    max_retry_delay=2.0,
+    **kwargs,
+):
     """Retries connections to a startup device defined by func n_tries times.
 
+    The wait between attempts grows exponentially from retry_delay, so a device
+    that is ready after a short delay is picked up quickly, while a slow device is
+    not polled too often.
+
     Parameters
     ----------
     func : function or class
@@ -66,6 +80,12 @@ def auto_redial(func, args, n_tries=10, exception=Exception, **kwargs):
         The number of tries to redial.
     exception : inherits from BaseException
         An exception type to check on each connection attempt.
+    retry_delay : float
+        Wait (s) after the first failed attempt.
+    retry_backoff : float
+        Factor the wait is multiplied by after each failed attempt.
+    max_retry_delay : float
+        Longest wait (s) between two attempts.
 
     Returns
     -------
@@ -95,9 +115,9 @@ def auto_redial(func, args, n_tries=10, exception=Exception, **kwargs):
                     val.__del__()
                     del val
                     val = None
-                time.sleep(0.5)  # TODO: 0.5 reached by trial and error. Better value?
+                time.sleep(min(retry_delay * retry_backoff**i, max_retry_delay))
             else:
-                raise exception
+                raise e
         else:
             break
 
@@ -358,8 +378,10 @@ def start_mirror(
         device_not_found(microscope_name, "mirror", mirror_type)
 
 
-def load_stages(configuration, is_synthetic=False, plugin_devices={}):
-    """Initializes the stage class on a dedicated thread.
+def load_stage_connection(
+    configuration, stage_id=0, is_synthetic=False, plugin_devices={}
+):
+    """Initializes the connection of a stage.
 
     Stage information is pulled from the configuration file. Proper stage types include
     PI, MP285, Thorlabs, MCL, ASI, GalvoNIStage, and SyntheticStage.
@@ -368,6 +390,8 @@ def load_stages(configuration, is_synthetic=False, plugin_devices={}):
     ----------
     configuration : multiprocessing.managers.DictProxy
         Global configuration of the microscope
+    stage_id : int
+        Index of the stage in the hardware configuration.
     is_synthetic : bool
         Run synthetic version of hardware?
     plugin_devices : dict
@@ -375,136 +399,140 @@ def load_stages(configuration, is_synthetic=False, plugin_devices={}):
 
     Returns
     -------
-    Stage : class
-        Stage class.
+    stage_connection : object
+        Stage connection.
 
     Examples
     --------
-    >>> load_stages(configuration, is_synthetic=False, plugin_devices={})
+    >>> load_stage_connection(configuration, 0, is_synthetic=False)
     """
-    stage_devices = []
+    stage_config = configuration["configuration"]["hardware"]["stage"][stage_id]
+    if is_synthetic:
+        stage_type = "SyntheticStage"
+    else:
+        stage_type = stage_config["type"]
 
-    stages = configuration["configuration"]["hardware"]["stage"]
+    if stage_type == "PI" and platform.system() == "Windows":
+        from navigate.model.devices.stages.stage_pi import build_PIStage_connection
+        from pipython.pidevice.gcserror import GCSError
 
-    if type(stages) != ListProxy:
-        stages = [stages]
+        return auto_redial(
+            build_PIStage_connection,
+            (
+                stage_config["controllername"],
+                stage_config["serial_number"],
+                stage_config["stages"],
+                stage_config["refmode"],
+            ),
+            exception=GCSError,
+        )
 
-    for i in range(len(stages)):
-        stage_config = configuration["configuration"]["hardware"]["stage"][i]
-        if is_synthetic:
-            stage_type = "SyntheticStage"
-        else:
-            stage_type = stage_config["type"]
-
-        if stage_type == "PI" and platform.system() == "Windows":
-            from navigate.model.devices.stages.stage_pi import build_PIStage_connection
-            from pipython.pidevice.gcserror import GCSError
-
-            stage_devices.append(
-                auto_redial(
-                    build_PIStage_connection,
-                    (
-                        stage_config["controllername"],
-                        stage_config["serial_number"],
-                        stage_config["stages"],
-                        stage_config["refmode"],
-                    ),
-                    exception=GCSError,
-                )
-            )
+    elif stage_type == "MP285" and platform.system() == "Windows":
+        from navigate.model.devices.stages.stage_sutter import (
+            build_MP285_connection,
+        )
 
-        elif stage_type == "MP285" and platform.system() == "Windows":
-            from navigate.model.devices.stages.stage_sutter import (
-                build_MP285_connection,
-            )
+        return auto_redial(
+            build_MP285_connection,
+            (
+                stage_config["port"],
+                stage_config["baudrate"],
+                stage_config["timeout"],
+            ),
+            exception=UserWarning,
+        )
 
-            stage_devices.append(
-                auto_redial(
-                    build_MP285_connection,
-                    (
-                        stage_config["port"],
-                        stage_config["baudrate"],
-                        stage_config["timeout"],
-                    ),
-                    exception=UserWarning,
-                )
-            )
+    elif stage_type == "Thorlabs" and platform.system() == "Windows":
+        from navigate.model.devices.stages.stage_tl_kcube_inertial import (
+            build_TLKIMStage_connection,
+        )
+        from navigate.model.devices.APIs.thorlabs.kcube_inertial import (
+            TLFTDICommunicationError,
+        )
 
-        elif stage_type == "Thorlabs" and platform.system() == "Windows":
-            from navigate.model.devices.stages.stage_tl_kcube_inertial import (
-                build_TLKIMStage_connection,
-            )
-            from navigate.model.devices.APIs.thorlabs.kcube_inertial import (
-                TLFTDICommunicationError,
-            )
+        return auto_redial(
+            build_TLKIMStage_connection,
+            (stage_config["serial_number"],),
+            exception=TLFTDICommunicationError,
+        )
 
-            stage_devices.append(
-                auto_redial(
-                    build_TLKIMStage_connection,
-                    (stage_config["serial_number"],),
-                    exception=TLFTDICommunicationError,
-                )
-            )
+    elif stage_type == "MCL" and platform.system() == "Windows":
+        from navigate.model.devices.stages.stage_mcl import (
+            build_MCLStage_connection,
+        )
+        from navigate.model.devices.APIs.mcl.madlib import MadlibError
 
-        elif stage_type == "MCL" and platform.system() == "Windows":
-            from navigate.model.devices.stages.stage_mcl import (
-                build_MCLStage_connection,
-            )
-            from navigate.model.devices.APIs.mcl.madlib import MadlibError
+        return auto_redial(
+            build_MCLStage_connection,
+            (stage_config["serial_number"],),
+            exception=MadlibError,
+        )
 
-            stage_devices.append(
-                auto_redial(
-                    build_MCLStage_connection,
-                    (stage_config["serial_number"],),
-                    exception=MadlibError,
-                )
-            )
+    elif stage_type == "ASI" and platform.system() == "Windows":
+        filter_wheel = configuration["configuration"]["hardware"]["filter_wheel"][
+            "type"
+        ]
+        if filter_wheel == "ASI":
+            return "shared device"
 
-        elif stage_type == "ASI" and platform.system() == "Windows":
-            filter_wheel = configuration["configuration"]["hardware"]["filter_wheel"][
-                "type"
-            ]
-            if filter_wheel == "ASI":
-                stage_devices.append("shared device")
-            else:
-                from navigate.model.devices.stages.stage_asi import (
-                    build_ASI_Stage_connection,
-                )
-                from navigate.model.devices.APIs.asi.asi_tiger_controller import (
-                    TigerException,
-                )
+        from navigate.model.devices.stages.stage_asi import (
+            build_ASI_Stage_connection,
+        )
+        from navigate.model.devices.APIs.asi.asi_tiger_controller import (
+            TigerException,
+        )
 
-                stage_devices.append(
-                    auto_redial(
-                        build_ASI_Stage_connection,
-                        (
-                            stage_config["port"],
-                            stage_config["baudrate"],
-                        ),
-                        exception=TigerException,
-                    )
-                )
+        return auto_redial(
+            build_ASI_Stage_connection,
+            (
+                stage_config["port"],
+                stage_config["baudrate"],
+            ),
+            exception=TigerException,
+        )
 
-        elif stage_type == "GalvoNIStage" and platform.system() == "Windows":
-            stage_devices.append(DummyDeviceConnection())
+    elif stage_type == "GalvoNIStage" and platform.system() == "Windows":
+        return DummyDeviceConnection()
 
-        elif (
-            stage_type.lower() == "syntheticstage" or stage_type.lower() == "synthetic"
-        ):
-            stage_devices.append(DummyDeviceConnection())
+    elif stage_type.lower() == "syntheticstage" or stage_type.lower() == "synthetic":
+        return DummyDeviceConnection()
 
-        elif "stage" in plugin_devices:
-            try:
-                device_connection = plugin_devices["stage"]["load_device"](
-                    configuration, is_synthetic
-                )
-                stage_devices.append(device_connection)
-            except RuntimeError as e:
-                raise e
-        else:
-            device_not_found(stage_type)
+    elif "stage" in plugin_devices:
+        return plugin_devices["stage"]["load_device"](configuration, is_synthetic)
+    else:
+        device_not_found(stage_type)
+
+
+def load_stages(configuration, is_synthetic=False, plugin_devices={}):
+    """Initializes the connections of all the stages.
+
+    Parameters
+    ----------
+    configuration : multiprocessing.managers.DictProxy
+        Global configuration of the microscope
+    is_synthetic : bool
+        Run synthetic version of hardware?
+    plugin_devices : dict
+        Dictionary of plugin devices
+
+    Returns
+    -------
+    Stage : list
+        Stage connections.
 
-    return stage_devices
+    Examples
+    --------
+    >>> load_stages(configuration, is_synthetic=False, plugin_devices={})
+    """
+    stages = configuration["configuration"]["hardware"]["stage"]
+
+    if type(stages) != ListProxy:
+        stages = [stages]
+
+    return [
+        load_stage_connection(configuration, i, is_synthetic, plugin_devices)
+        for i in range(len(stages))
+    ]
 
 
 def start_stage(
@@ -1195,9 +1223,16 @@ def device_not_found(*args):
     raise RuntimeError(f"Device not found in configuration: {args}")
 
 
-def load_devices(configuration, is_synthetic=False, plugin_devices={}) -> dict:
+def load_devices(
+    configuration, is_synthetic=False, plugin_devices={}, timeout=120, max_workers=None
+) -> dict:
     """Load devices from configuration.
 
+    The connections of independent devices are opened concurrently on a thread
+    pool. Cameras are connected one after another, because the vendor SDKs are not
+    safe to initialize from several threads. The time spent on every device is
+    logged and returned in devices["__startup_report__"].
+
     Parameters
     ----------
     configuration
@@ -1206,32 +1241,42 @@ def load_devices(configuration, is_synthetic=False, plugin_devices={}) -> dict:
         Run synthetic version of hardware?
     plugin_devices : dict
         Dictionary of plugin devices
+    timeout : float
+        Time (s) a device may take to connect, counted from the moment its
+        connection starts. None waits forever.
+    max_workers : int
+        Number of threads used to connect devices. None connects all the devices at
+        once.
 
     Returns
     -------
     devices : dict
         Dictionary of devices
 
+    Raises
+    ------
+    RuntimeError
+        If a device does not connect within timeout.
+
     Examples
     --------
     >>> load_devices(configuration, is_synthetic=False)
 
     """
+    hardware = configuration["configuration"]["hardware"]
+    hardware_keys = hardware.keys()
 
-    devices = {}
-    # load camera
-    if "camera" in configuration["configuration"]["hardware"].keys():
-        devices["camera"] = {}
-        for id, device in enumerate(
-            configuration["configuration"]["hardware"]["camera"]
-        ):
+    def load_cameras():
+        cameras = {}
+        for id, device in enumerate(hardware["camera"]):
             try:
                 camera = load_camera_connection(configuration, id, is_synthetic)
             except RuntimeError as e:
-                if "camera" in plugin_devices:
-                    camera = plugin_devices["camera"]["load_device"](
-                        configuration, id, is_synthetic
-                    )
+                if "camera" not in plugin_devices:
+                    raise e
+                camera = plugin_devices["camera"]["load_device"](
+                    configuration, id, is_synthetic
+                )
 
             if (not is_synthetic) and device["type"].startswith("Hamamatsu"):
                 camera_serial_number = str(camera._serial_number)
@@ -1243,56 +1288,133 @@ def load_devices(configuration, is_synthetic=False, plugin_devices={}) -> dict:
                 if camera_serial_number.startswith("0"):
                     try:
                         oct_num = int(camera_serial_number, 8)
-                        devices["camera"][build_ref_name(
-                            "_",
-                            device["type"],
-                            oct_num
-                        )] = camera
+                        cameras[build_ref_name("_", device["type"], oct_num)] = camera
                     except ValueError:
                         pass
             else:
                 device_ref_name = build_ref_name(
                     "_", device["type"], device["serial_number"]
                 )
-            devices["camera"][device_ref_name] = camera
-
-    # load mirror
-    if "mirror" in configuration["configuration"]["hardware"].keys():
-        devices["mirror"] = {}
-        device = configuration["configuration"]["hardware"]["mirror"]
-        device_ref_name = build_ref_name("_", device["type"])
-        devices["mirror"][device_ref_name] = load_mirror(configuration, is_synthetic)
-
-    # load filter wheel
-    if "filter_wheel" in configuration["configuration"]["hardware"].keys():
-        devices["filter_wheel"] = {}
-        device = configuration["configuration"]["hardware"]["filter_wheel"]
-        devices["filter_wheel"][device["type"]] = load_filter_wheel_connection(
-            configuration, is_synthetic, plugin_devices
+            cameras[device_ref_name] = camera
+        return cameras
+
+    def load_stage(stage_id):
+        device = hardware["stage"][stage_id]
+        device_ref_name = build_ref_name("_", device["type"], device["serial_number"])
+        return {
+            device_ref_name: load_stage_connection(
+                configuration, stage_id, is_synthetic, plugin_devices
+            )
+        }
+
+    # device name -> (key in devices, function that connects the device)
+    tasks = {}
+    if "camera" in hardware_keys:
+        tasks["camera"] = ("camera", load_cameras)
+
+    if "mirror" in hardware_keys:
+        device_ref_name = build_ref_name("_", hardware["mirror"]["type"])
+        tasks["mirror"] = (
+            "mirror",
+            lambda: {device_ref_name: load_mirror(configuration, is_synthetic)},
+        )
+
+    if "filter_wheel" in hardware_keys:
+        filter_wheel_type = hardware["filter_wheel"]["type"]
+        tasks["filter_wheel"] = (
+            "filter_wheel",
+            lambda: {
+                filter_wheel_type: load_filter_wheel_connection(
+                    configuration, is_synthetic, plugin_devices
+                )
+            },
         )
 
-    # load zoom
-    if "zoom" in configuration["configuration"]["hardware"].keys():
-        devices["zoom"] = {}
-        device = configuration["configuration"]["hardware"]["zoom"]
-        device_ref_name = build_ref_name("_", device["type"], device["servo_id"])
-        devices["zoom"][device_ref_name] = load_zoom_connection(
-            configuration, is_synthetic, plugin_devices
+    if "zoom" in hardware_keys:
+        device = hardware["zoom"]
+        zoom_ref_name = build_ref_name("_", device["type"], device["servo_id"])
+        tasks["zoom"] = (
+            "zoom",
+            lambda: {
+                zoom_ref_name: load_zoom_connection(
+                    configuration, is_synthetic, plugin_devices
+                )
+            },
         )
 
-    # load daq
-    if "daq" in configuration["configuration"]["hardware"].keys():
-        devices["daq"] = start_daq(configuration, is_synthetic)
-
-    # load stage
-    if "stage" in configuration["configuration"]["hardware"].keys():
-        device_config = configuration["configuration"]["hardware"]["stage"]
-        devices["stages"] = {}
-        stages = load_stages(configuration, is_synthetic, plugin_devices)
-        for i, stage in enumerate(stages):
-            device_ref_name = build_ref_name(
-                "_", device_config[i]["type"], device_config[i]["serial_number"]
+    if "daq" in hardware_keys:
+        tasks["daq"] = ("daq", lambda: start_daq(configuration, is_synthetic))
+
+    if "stage" in hardware_keys:
+        stages = hardware["stage"]
+        stage_num = len(stages) if isinstance(stages, (list, ListProxy)) else 1
+        for i in range(stage_num):
+            tasks[f"stage_{i}"] = ("stages", lambda i=i: load_stage(i))
+
+    # time the connection of each device started
+    started = {}
+
+    def timed(name, func):
+        start_time = time.perf_counter()
+        started[name] = start_time
+        result = func()
+        return result, time.perf_counter() - start_time
+
+    devices = {}
+    startup_report = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers or max(len(tasks), 1),
+        thread_name_prefix="load_devices",
+    )
+    start_time = time.perf_counter()
+    futures = {
+        name: executor.submit(timed, name, func) for name, (_, func) in tasks.items()
+    }
+    try:
+        pending = dict(futures)
+        while pending:
+            # each device has its own deadline, devices waiting for a free thread
+            # are checked again shortly
+            wait_time = None
+            if timeout is not None:
+                now = time.perf_counter()
+                wait_time = timeout
+                for name in pending:
+                    if name not in started:
+                        wait_time = min(wait_time, 0.1)
+                        continue
+                    remaining = started[name] + timeout - now
+                    if remaining <= 0:
+                        raise RuntimeError(
+                            f"Device {name} did not connect within {timeout} "
+                            "seconds."
+                        )
+                    wait_time = min(wait_time, remaining)
+            done, _ = wait(
+                pending.values(), timeout=wait_time, return_when=FIRST_COMPLETED
             )
-            devices["stages"][device_ref_name] = stage
+            for name, future in list(pending.items()):
+                if future in done:
+                    # raise the connection error of a device right away
+                    del pending[name]
+                    future.result()
+
+        for name, future in futures.items():
+            result, startup_report[name] = future.result()
+            device_key = tasks[name][0]
+            if device_key == "daq":
+                devices["daq"] = result
+            else:
+                devices.setdefault(device_key, {}).update(result)
+    finally:
+        # don't wait for a device that failed or timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    startup_report["total"] = time.perf_counter() - start_time
+    logger.info(
+        "Device startup times (s): "
+        + ", ".join(f"{k}: {v:.3f}" for k, v in startup_report.items())
+    )
+    devices["__startup_report__"] = startup_report
 
     return devices
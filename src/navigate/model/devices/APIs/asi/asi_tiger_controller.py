@@ -6,10 +6,11 @@ from serial import EIGHTBITS
 from serial import PARITY_NONE
 from serial import STOPBITS_ONE
 from serial.tools import list_ports
-import threading
 
 import time
 
+from navigate.model.devices.APIs.serial_transport import SerialTransport, adaptive_poll
+
 
 class TigerException(Exception):
     """
@@ -74,8 +75,8 @@ class TigerController:
             If True, will print out messages to the console
 
         """
-        #: Serial: Serial port object
-        self.serial_port = Serial()
+        #: SerialTransport: Serial command transport
+        self.transport = SerialTransport(Serial())
         #: str: COM port of the Tiger Controller
         self.com_port = com_port
         #: int: Baud rate of the Tiger Controller
@@ -86,12 +87,15 @@ class TigerController:
         self.default_axes_sequence = None
         #: list[float]: Maximum speeds of the Tiger Controller
         self._max_speeds = None
-        #: threading.Event: Event to indicate if it is safe to write to the serial port
-        self.safe_to_write = threading.Event()
-        #: threading.Event.set(): Set the safe_to_write event
-        self.safe_to_write.set()
-        #: float: Last time a command was sent to the Tiger Controller
-        self._last_cmd_send_time = time.perf_counter()
+
+    @property
+    def serial_port(self):
+        """Serial: Serial port object"""
+        return self.transport.serial_port
+
+    @serial_port.setter
+    def serial_port(self, serial_port):
+        self.transport.serial_port = serial_port
 
     @staticmethod
     def scan_ports() -> list[str]:
@@ -173,8 +177,7 @@ class TigerController:
         list[str]
             Default motor axis sequence
         """
-        self.send_command("BU X")
-        response = self.read_response()
+        response = self.query("BU X")
         lines = response.split("\r")
         for line in lines:
             if line.startswith("Motor Axes:"):
@@ -186,62 +189,85 @@ class TigerController:
 
         return default_axes_sequence
 
-    ##### TODO: Modify these to accept dictionaries and send a
-    #           single command for all axes
-    def set_feedback_alignment(self, axis, aa):
+    def set_feedback_alignment(self, axis, aa=None):
         """Set the stage feedback alignment.
 
         Parameters
         ----------
-        axis : str
-            Stage axis
-        """
-        self.send_command(f"AA {axis}={aa}\r")
-        self.read_response()
-        self.send_command(f"AZ {axis}\r")
-        self.read_response()
+        axis : str or dict
+            Stage axis, or a dictionary of the form {axis: aa} to set several axes
+            with one command.
+        aa : int
+            Feedback alignment value
+        """
+        values = axis if isinstance(axis, dict) else {axis: aa}
+        self.query_many(
+            [
+                f"AA {' '.join(f'{ax}={v}' for ax, v in values.items())}\r",
+                f"AZ {' '.join(values)}\r",
+            ]
+        )
 
-    def set_backlash(self, axis, val):
+    def set_backlash(self, axis, val=None):
         """Enable/disable stage backlash correction.
 
         Parameters
         ----------
-        axis : str
-            Stage axis
+        axis : str or dict
+            Stage axis, or a dictionary of the form {axis: val} to set several axes
+            with one command.
         val : float
             Distance of anti-backlash motion [mm]
         """
-        self.send_command(f"B {axis}={val:.7f}\r")
-        self.read_response()
+        self.query(self.format_axes_command("B", axis, val))
 
-    def set_finishing_accuracy(self, axis, ac):
+    def set_finishing_accuracy(self, axis, ac=None):
         """Set the stage finishing accuracy.
 
         Parameters
         ----------
-        axis : str
-            Stage axis
+        axis : str or dict
+            Stage axis, or a dictionary of the form {axis: ac} to set several axes
+            with one command.
         ac : float
             Position error [mm]
         """
-        self.send_command(f"PC {axis}={ac:.7f}\r")
-        self.read_response()
+        self.query(self.format_axes_command("PC", axis, ac))
 
-    def set_error(self, axis, ac):
+    def set_error(self, axis, ac=None):
         """
         Set the stage drift error
 
         Parameters
         ----------
-        axis : str
-            Stage axis
+        axis : str or dict
+            Stage axis, or a dictionary of the form {axis: ac} to set several axes
+            with one command.
         ac : float
             Position error [mm]
         """
-        self.send_command(f"E {axis}={ac:.7f}\r")
-        self.read_response()
+        self.query(self.format_axes_command("E", axis, ac))
+
+    @staticmethod
+    def format_axes_command(command, axis, value=None):
+        """Format a command setting a value on one or several axes.
+
+        Parameters
+        ----------
+        command : str
+            Command, e.g. 'B'
+        axis : str or dict
+            Stage axis, or a dictionary of the form {axis: value}
+        value : float
+            Value of the axis
 
-    ##### END TODO #####
+        Returns
+        -------
+        str
+            Command, e.g. 'B X=0.0000000 Y=0.0000000\r'
+        """
+        values = axis if isinstance(axis, dict) else {axis: value}
+        return f"{command} {' '.join(f'{ax}={v:.7f}' for ax, v in values.items())}\r"
 
     def disconnect_from_serial(self) -> None:
         """Disconnect from the serial port if it's open."""
@@ -276,26 +302,29 @@ class TigerController:
     def send_command(self, cmd: bytes) -> None:
         """Send a serial command to the device.
 
+        The serial port is reserved until the response is read with read_response.
+
         Parameters
         ----------
         cmd : bytes
             Serial command to send to the device
         """
-        # always reset the buffers before a new command is sent
-        self.safe_to_write.wait()
-        self.safe_to_write.clear()
-        self.serial_port.read_all()
-        self.serial_port.reset_input_buffer()
-        self.serial_port.reset_output_buffer()
-
-        # send the serial command to the controller
-        self.report_to_console(cmd)
-        command = bytes(f"{cmd}\r", encoding="ascii")
+        self.transport.lock.acquire()
         try:
-            self.serial_port.write(command)
-        except SerialTimeoutException as e:
-            print(f"Tiger Controller -- SerialTimeoutException: {e}")
-            pass
+            # always reset the buffers before a new command is sent
+            self.transport.flush()
+
+            # send the serial command to the controller
+            self.report_to_console(cmd)
+            try:
+                self.transport.write(bytes(f"{cmd}\r", encoding="ascii"))
+            except SerialTimeoutException as e:
+                print(f"Tiger Controller -- SerialTimeoutException: {e}")
+                pass
+        except BaseException:
+            # no response will be read, free the serial port
+            self.transport.lock.release()
+            raise
 
     def read_response(self) -> str:
         """Read a line from the serial response.
@@ -305,17 +334,86 @@ class TigerController:
         str
             Response from the serial port
         """
-        response = self.serial_port.readline()
-        self.safe_to_write.set()
+        try:
+            response = self.transport.read()
+        finally:
+            self.transport.lock.release()
+        return self.decode_response(response)
+
+    def decode_response(self, response: bytes) -> str:
+        """Decode a response and raise the error it reports.
+
+        Parameters
+        ----------
+        response : bytes
+            Response from the serial port
 
+        Returns
+        -------
+        str
+            Response from the serial port
+        """
         response = response.decode(encoding="ascii")
         # Remove leading and trailing empty spaces
         self.report_to_console(f"Received Response: {response.strip()}")
         if response.startswith(":N"):
-            raise TigerException(response)
+            raise TigerException(response.strip())
 
         return response  # in case we want to read the response
 
+    def query(self, cmd: str) -> str:
+        """Send a serial command and read its response.
+
+        Parameters
+        ----------
+        cmd : str
+            Serial command to send to the device
+
+        Returns
+        -------
+        str
+            Response from the serial port
+        """
+        return self.query_many([cmd])[0]
+
+    def query_many(self, cmds) -> list:
+        """Send several serial commands back to back, then read their responses.
+
+        The controller answers the commands in order, so pipelining them saves a
+        round trip per command.
+
+        Parameters
+        ----------
+        cmds : list[str]
+            Serial commands to send to the device
+
+        Returns
+        -------
+        list[str]
+            Responses from the serial port, in the order of the commands
+        """
+        for cmd in cmds:
+            self.report_to_console(cmd)
+        try:
+            responses = self.transport.query_many(
+                [bytes(f"{cmd}\r", encoding="ascii") for cmd in cmds]
+            )
+        except SerialTimeoutException as e:
+            print(f"Tiger Controller -- SerialTimeoutException: {e}")
+            return [""] * len(cmds)
+        # read every response before raising, so no response is left in the buffer
+        errors = []
+        decoded = []
+        for response in responses:
+            try:
+                decoded.append(self.decode_response(response))
+            except TigerException as e:
+                errors.append(e)
+                decoded.append("")
+        if errors:
+            raise errors[0]
+        return decoded
+
     def moverel(self, x: int = 0, y: int = 0, z: int = 0) -> None:
         """Move the stage with a relative move on multiple axes.
 
@@ -328,8 +426,7 @@ class TigerController:
         z : int
             Relative move on the z-axis
         """
-        self.send_command(f"MOVREL X={x} Y={y} Z={z}\r")
-        self.read_response()
+        self.query(f"MOVREL X={x} Y={y} Z={z}\r")
 
     def moverel_axis(self, axis: str, distance: float) -> None:
         """Move the stage with a relative move on one axis
@@ -341,8 +438,7 @@ class TigerController:
         distance : float
             Relative move distance
         """
-        self.send_command(f"MOVREL {axis}={round(distance, 6)}\r")
-        self.read_response()
+        self.query(f"MOVREL {axis}={round(distance, 6)}\r")
 
     def move(self, pos_dict) -> None:
         """Move the stage with an absolute move on multiple axes
@@ -355,8 +451,7 @@ class TigerController:
         pos_str = " ".join(
             [f"{axis}={round(pos, 6)}" for axis, pos in pos_dict.items()]
         )
-        self.send_command(f"MOVE {pos_str}\r")
-        self.read_response()
+        self.query(f"MOVE {pos_str}\r")
 
     def move_axis(self, axis: str, distance: float) -> None:
         """Move the stage with an absolute move on one axis
@@ -368,8 +463,7 @@ class TigerController:
         distance : float
             Absolute move distance
         """
-        self.send_command(f"MOVE {axis}={round(distance, 6)}\r")
-        self.read_response()
+        self.query(f"MOVE {axis}={round(distance, 6)}\r")
 
     def set_max_speed(self, axis: str, speed: float) -> None:
         """Set the speed on a specific axis. Speed is in mm/s.
@@ -381,8 +475,7 @@ class TigerController:
         speed : float
             Speed in mm/s
         """
-        self.send_command(f"SPEED {axis}={speed}\r")
-        self.read_response()
+        self.query(f"SPEED {axis}={speed}\r")
 
     def get_axis_position(self, axis: str) -> int:
         """Return the position of the stage in ASI units (tenths of microns).
@@ -396,8 +489,7 @@ class TigerController:
         int
             Position of the stage in ASI units
         """
-        self.send_command(f"WHERE {axis}\r")
-        response = self.read_response()
+        response = self.query(f"WHERE {axis}\r")
         # try:
         pos = float(response.split(" ")[1])
         # except:
@@ -416,8 +508,7 @@ class TigerController:
         float
             Position of the stage in microns
         """
-        self.send_command(f"WHERE {axis}\r")
-        response = self.read_response()
+        response = self.query(f"WHERE {axis}\r")
         return float(response.split(" ")[1]) / 10.0
 
     def get_position(self, axes) -> dict:
@@ -446,8 +537,7 @@ class TigerController:
 
         if self.default_axes_sequence:
             cmd = f"WHERE {' '.join(axes)}\r"
-            self.send_command(cmd)
-            response = self.read_response()
+            response = self.query(cmd)
 
             # return response.split(" ")[1:-1]
             pos = response.split(" ")
@@ -467,10 +557,12 @@ class TigerController:
                     pass
             return axis_dict
         else:
-            result = {}
-            for axis in axes:
-                result[axis] = self.get_axis_position(axis)
-            return result
+            # pipeline the per-axis queries
+            responses = self.query_many([f"WHERE {axis}" for axis in axes])
+            return {
+                axis: float(response.split(" ")[1])
+                for axis, response in zip(axes, responses)
+            }
 
     # Utility Functions
 
@@ -486,8 +578,7 @@ class TigerController:
         bool
             True if the axis is busy
         """
-        self.send_command(f"RS {axis}?\r")
-        res = self.read_response()
+        res = self.query(f"RS {axis}?\r")
         return "B" in res
 
     def is_device_busy(self) -> bool:
@@ -498,8 +589,7 @@ class TigerController:
         bool
             True if any axis is busy
         """
-        self.send_command("/")
-        res = self.read_response()
+        res = self.query("/")
         return "B" in res
 
     def wait_for_device(self, timeout: float = 1.75) -> None:
@@ -510,15 +600,9 @@ class TigerController:
         """
         if self.verbose:
             print("Waiting for device...")
-        busy = self.is_device_busy()
-        waiting_time = 0.0
-
-        while busy:
-            waiting_time += 0.001
-            if waiting_time >= timeout:
-                break
-            time.sleep(0.001)
-            busy = self.is_device_busy()
+        start_time = time.perf_counter()
+        adaptive_poll(lambda: not self.is_device_busy(), timeout=timeout)
+        waiting_time = time.perf_counter() - start_time
 
         if self.verbose:
             print(f"Waited {waiting_time:.2f} s")
@@ -526,8 +610,7 @@ class TigerController:
     def stop(self):
         """Stop all stage movement immediately"""
 
-        self.send_command("HALT")
-        self.read_response()
+        self.query("HALT")
         if self.verbose:
             print("ASI Stages stopped successfully")
 
@@ -540,8 +623,7 @@ class TigerController:
             Dictionary of the form {axis: speed}
         """
         axes = " ".join([f"{x}={round(v, 6)}" for x, v in speed_dict.items()])
-        self.send_command(f"S {axes}")
-        self.read_response()
+        self.query(f"S {axes}")
 
     def set_speed_as_percent_max(self, pct):
         """Set speed as a percentage of the maximum speed
@@ -557,23 +639,20 @@ class TigerController:
             )
         if self._max_speeds is None:
             # First, set the speed crazy high
-            self.send_command(
+            self.query(
                 f"SPEED {' '.join([f'{ax}=1000' for ax in self.default_axes_sequence])}\r"  # noqa
             )
-            self.read_response()
 
             # Next query the maximum speed
-            self.send_command(
+            res = self.query(
                 f"SPEED {' '.join([f'{ax}?' for ax in self.default_axes_sequence])}\r"
             )
-            res = self.read_response()
             self._max_speeds = [float(x.split("=")[1]) for x in res.split()[1:]]
 
         # Now set to pct
-        self.send_command(
+        self.query(
             f"SPEED {' '.join([f'{ax}={pct*speed:.7f}' for ax, speed in zip(self.default_axes_sequence, self._max_speeds)])}\r"  # noqa
         )
-        self.read_response()
 
     def get_speed(self, axis: str):
         """Get speed
@@ -583,8 +662,7 @@ class TigerController:
         axis : str
             Stage axis
         """
-        self.send_command(f"SPEED {axis}?")
-        response = self.read_response()
+        response = self.query(f"SPEED {axis}?")
         return float(response.split("=")[1])
 
     def get_encoder_counts_per_mm(self, axis: str):
@@ -601,8 +679,7 @@ class TigerController:
             Encoder counts per mm of axis
         """
 
-        self.send_command(f"CNTS {axis}?")
-        response = self.read_response()
+        response = self.query(f"CNTS {axis}?")
         return float(response.split("=")[1].split()[0])
 
     def scanr(
@@ -638,8 +715,7 @@ class TigerController:
             f"Z={round(enc_divide)}"
         )
 
-        self.send_command(command)
-        self.read_response()
+        self.query(command)
 
     def scanv(
         self,
@@ -672,8 +748,7 @@ class TigerController:
             f"F={round(overshoot, 6)}"
         )
 
-        self.send_command(command)
-        self.read_response()
+        self.query(command)
 
     def start_scan(self, axis: str, is_single_axis_scan: bool = True):
         """
@@ -686,13 +761,11 @@ class TigerController:
         is_single_axis_scan : bool
             If True, will only scan on one axis
         """
-        self.send_command("SCAN")
-        self.read_response()
+        self.query("SCAN")
 
     def stop_scan(self):
         """Stop scan."""
-        self.send_command("SCAN P")
-        self.read_response()
+        self.query("SCAN P")
 
     def is_moving(self):
         """Check to see if the stage is moving.
@@ -709,19 +782,9 @@ class TigerController:
             True if any axis is moving. False if not.
         """
 
-        # Calculate duration of time since last command.
-        time_since_last_cmd = time.perf_counter() - self._last_cmd_send_time
-
-        # Wait 50 milliseconds before pinging controller again.
-        sleep_time = 0.050 - time_since_last_cmd
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-
-        self.send_command("/")
-        response = self.read_response().rstrip().rstrip("\r\n")
+        response = self.query("/").rstrip().rstrip("\r\n")
         if response == "ACK":
-            self.send_command("/")
-            response = self.read_response().rstrip().rstrip("\r\n")
+            response = self.query("/").rstrip().rstrip("\r\n")
         if response == "B":
             return True
         elif response == "N":
@@ -759,23 +822,20 @@ class TigerController:
         0> Although FW 0 not ready – can still change FW 0 parameters.
         """
         assert filter_wheel_number in range(2)
-        self.send_filter_wheel_command(f"FW {filter_wheel_number}")
-        self.read_response()
+        self.query(f"FW {filter_wheel_number}\n")
 
     def move_filter_wheel(self, filter_wheel_position=0):
         """
         Move to filter position n , where n is a valid filter position.
         """
         assert filter_wheel_position in range(8)
-        self.send_filter_wheel_command(f"MP {filter_wheel_position}")
-        self.read_response()
+        self.query(f"MP {filter_wheel_position}\n")
 
     def move_filter_wheel_to_home(self):
         """
         Causes current wheel to seek its home position.
         """
-        self.send_filter_wheel_command("HO")
-        self.read_response()
+        self.query("HO\n")
 
     def change_filter_wheel_speed(self, speed=0):
         """
@@ -787,12 +847,10 @@ class TigerController:
         2 to 8	Intermediate switching speeds.
         9	Fastest and but least reliable switching speed.
         """
-        self.send_filter_wheel_command(f"SV {speed}")
-        self.read_response()
+        self.query(f"SV {speed}\n")
 
     def halt_filter_wheel(self):
         """
         Halt filter wheel
         """
-        self.send_filter_wheel_command("HA")
-        self.read_response()
+        self.query("HA\n")
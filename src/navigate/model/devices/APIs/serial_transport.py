@@ -0,0 +1,333 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Third Party Imports
+
+# Local Imports
+
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+def adaptive_poll(
+    is_done, timeout=None, min_interval=0.001, max_interval=0.05, backoff=2.0
+):
+    """Call is_done until it returns True.
+
+    The wait between two calls starts at min_interval and grows by backoff up to
+    max_interval, so short operations are detected quickly while long operations
+    do not flood the device with status requests.
+
+    Parameters
+    ----------
+    is_done : callable
+        Returns True when the operation is finished.
+    timeout : float, optional
+        Give up after timeout seconds. Wait forever if it is None.
+    min_interval : float
+        First wait in seconds.
+    max_interval : float
+        Longest wait in seconds.
+    backoff : float
+        Growth factor of the wait.
+
+    Returns
+    -------
+    bool
+        True if is_done returned True, False if the timeout was reached.
+    """
+    start_time = time.perf_counter()
+    interval = min_interval
+    while not is_done():
+        if timeout is not None and time.perf_counter() - start_time >= timeout:
+            return False
+        time.sleep(interval)
+        interval = min(interval * backoff, max_interval)
+    return True
+
+
+class SerialTransport:
+    """Serial command transport shared by serial device APIs.
+
+    Commands are written and their responses read while holding a single lock, so
+    commands from different threads never interleave. Several commands can be
+    pipelined: they are written back to back and their responses are read
+    afterwards in the same order, which removes a round trip per command. Commands
+    can also be queued with submit, a worker thread pipelines every queued command
+    and resolves the returned futures with the matching responses.
+
+    Responses are either lines (read with readline) or a fixed number of bytes.
+    """
+
+    def __init__(self, serial_port, min_interval=0.0, timeout=1.0, wait_time=0.002):
+        """Initialize the SerialTransport.
+
+        Parameters
+        ----------
+        serial_port : serial.Serial
+            Serial port, or an object with the same interface.
+        min_interval : float
+            Shortest time in seconds between two writes.
+        timeout : float
+            Default time in seconds to wait for a fixed size response.
+        wait_time : float
+            Time in seconds to wait before reading again when no byte was received.
+        """
+        #: serial.Serial: Serial port.
+        self.serial_port = serial_port
+
+        #: float: Shortest time in seconds between two writes.
+        self.min_interval = min_interval
+
+        #: float: Default time in seconds to wait for a fixed size response.
+        self.timeout = timeout
+
+        #: float: Time in seconds to wait before reading again.
+        self.wait_time = wait_time
+
+        #: threading.Lock: Held while a command and its response are exchanged.
+        self.lock = threading.Lock()
+
+        #: threading.Lock: Held while a command is written.
+        self._write_lock = threading.Lock()
+
+        #: int: Number of commands written.
+        self.commands = 0
+
+        #: int: Number of times the transport waited for responses.
+        self.round_trips = 0
+
+        #: float: Time of the last write.
+        self._last_write_time = 0.0
+
+        #: queue.Queue: Commands submitted to the worker thread.
+        self._queue = queue.Queue()
+
+        #: threading.Thread: Worker thread.
+        self._worker = None
+
+        #: threading.Lock: Held while the worker thread is started or stopped.
+        self._worker_lock = threading.Lock()
+
+    def flush(self):
+        """Discard stale bytes in the serial buffers.
+
+        The caller must hold the lock.
+        """
+        self.serial_port.read_all()
+        self.serial_port.reset_input_buffer()
+        self.serial_port.reset_output_buffer()
+
+    def write(self, command):
+        """Write a command.
+
+        The caller must hold the lock.
+
+        Parameters
+        ----------
+        command : bytes
+            Command to write.
+        """
+        with self._write_lock:
+            wait = self.min_interval - (time.perf_counter() - self._last_write_time)
+            if wait > 0:
+                time.sleep(wait)
+            self.serial_port.write(command)
+            self._last_write_time = time.perf_counter()
+            self.commands += 1
+
+    def interrupt(self, command):
+        """Write a command while another thread waits for a response.
+
+        Some devices accept a command, e.g. to stop a move, while a previous command
+        is still running. The thread holding the lock is waiting for the response of
+        the running command, so the interrupt is written without the lock, but still
+        one write at a time, and the waiting thread reads the response.
+
+        Parameters
+        ----------
+        command : bytes
+            Command to write.
+        """
+        self.write(command)
+
+    def read(self, size=None, timeout=None):
+        """Read a response.
+
+        The caller must hold the lock.
+
+        Parameters
+        ----------
+        size : int, optional
+            Number of bytes of the response. A line is read if it is None.
+        timeout : float, optional
+            Time in seconds to wait for a fixed size response. Defaults to timeout.
+
+        Returns
+        -------
+        bytes
+            Response. A fixed size response is shorter than size if the timeout was
+            reached.
+        """
+        if size is None:
+            return self.serial_port.readline()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        response = b""
+        while len(response) < size:
+            data = self.serial_port.read(size - len(response))
+            if data:
+                response += data
+            elif time.perf_counter() >= deadline:
+                break
+            else:
+                time.sleep(self.wait_time)
+        return response
+
+    def query(self, command, size=None, timeout=None):
+        """Write a command and read its response.
+
+        Parameters
+        ----------
+        command : bytes
+            Command to write.
+        size : int, optional
+            Number of bytes of the response. A line is read if it is None.
+        timeout : float, optional
+            Time in seconds to wait for a fixed size response.
+
+        Returns
+        -------
+        bytes
+            Response.
+        """
+        return self.query_many([command], [size], timeout)[0]
+
+    def query_many(self, commands, sizes=None, timeout=None):
+        """Write several commands back to back, then read their responses.
+
+        Parameters
+        ----------
+        commands : list[bytes]
+            Commands to write.
+        sizes : list[int], optional
+            Number of bytes of each response. Lines are read if it is None.
+        timeout : float, optional
+            Time in seconds to wait for each fixed size response.
+
+        Returns
+        -------
+        list[bytes]
+            Responses, in the order of the commands.
+        """
+        if sizes is None:
+            sizes = [None] * len(commands)
+        with self.lock:
+            self.flush()
+            for command in commands:
+                self.write(command)
+            self.round_trips += 1
+            return [self.read(size, timeout) for size in sizes]
+
+    def submit(self, command, size=None):
+        """Queue a command.
+
+        Parameters
+        ----------
+        command : bytes
+            Command to write.
+        size : int, optional
+            Number of bytes of the response. A line is read if it is None.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolved with the response.
+        """
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="SerialTransport", daemon=True
+                )
+                self._worker.start()
+        future = Future()
+        self._queue.put((command, size, future))
+        return future
+
+    def close(self):
+        """Stop the worker thread."""
+        with self._worker_lock:
+            if self._worker is None:
+                return
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        """Pipeline the queued commands."""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            requests = [request]
+            stop = False
+            while True:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                requests.append(request)
+
+            try:
+                responses = self.query_many(
+                    [r[0] for r in requests], [r[1] for r in requests]
+                )
+            except Exception as e:
+                logger.debug(f"SerialTransport - Queued commands failed: {e}")
+                for _, _, future in requests:
+                    future.set_exception(e)
+            else:
+                for (_, _, future), response in zip(requests, responses):
+                    future.set_result(response)
+            if stop:
+                return
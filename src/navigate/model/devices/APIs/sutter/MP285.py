@@ -31,14 +31,13 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 # Standard library imports
-import time
 import serial
-import threading
 
 # Third-party imports
 import numpy as np
 
 # Local application imports
+from navigate.model.devices.APIs.serial_transport import SerialTransport
 
 
 class MP285:
@@ -65,7 +64,20 @@ class MP285:
     """
 
     def __init__(self, com_port, baud_rate, timeout=0.25):
-        self.serial = serial.Serial()
+        self.wait_time = 0.002
+        self.n_waits = max(int(timeout / self.wait_time), 1)
+
+        # The transport holds a lock while a command waits for its response, which
+        # prevents calls to get_current_position() while move_to_specified_position
+        # is waiting for a response. Serial commands must complete or the MP-285A
+        # completely locks up and has to be power cycled. The recommended time
+        # between commands is 2 ms.
+        self.transport = SerialTransport(
+            serial.Serial(),
+            min_interval=0.002,
+            timeout=max(self.n_waits, 13) * (timeout + self.wait_time),
+            wait_time=self.wait_time,
+        )
         self.serial.port = com_port
         self.serial.baudrate = baud_rate
         self.serial.timeout = timeout
@@ -79,30 +91,14 @@ class MP285:
         self.resolution = "high"  # None
         self.wait_until_done = True
 
-        self.wait_time = 0.002
-        self.n_waits = max(int(timeout / self.wait_time), 1)
+    @property
+    def serial(self):
+        """serial.Serial: Serial port"""
+        return self.transport.serial_port
 
-        # Thread blocking here to prevent calls to get_current_position()
-        # while move_to_specified_position is waiting for a response. Serial
-        # commands must complete or the MP-285A completely locks up and has
-        # to be power cycled.
-        self.safe_to_write = threading.Event()
-        self.safe_to_write.set()
-        self.last_write_time = time.time()
-
-    def safe_write(self, command):
-        self.safe_to_write.wait()
-        self.safe_to_write.clear()
-        curr_time = time.time()
-        # Recommended time between commands is 2 ms
-        diff_time = curr_time - self.last_write_time
-        if diff_time < 0.002:
-            time.sleep(0.002 - diff_time + 0.0001)
-        self.serial.read_all()
-        self.serial.reset_input_buffer()
-        self.serial.reset_output_buffer()
-        self.serial.write(command)
-        self.last_write_time = time.time()
+    @serial.setter
+    def serial(self, serial_port):
+        self.transport.serial_port = serial_port
 
     def connect_to_serial(self):
         try:
@@ -116,12 +112,8 @@ class MP285:
 
     def flush_buffers(self):
         """Flush Serial I/O Buffers."""
-        self.safe_to_write.wait()
-        self.safe_to_write.clear()
-        self.serial.read_all()
-        self.serial.reset_input_buffer()
-        self.serial.reset_output_buffer()
-        self.safe_to_write.set()
+        with self.transport.lock:
+            self.transport.flush()
 
     @staticmethod
     def convert_microsteps_to_microns(microsteps):
@@ -179,26 +171,12 @@ class MP285:
         # print("calling get_current_position")
         # self.flush_buffers()
         command = bytes.fromhex("63") + bytes.fromhex("0d")
-        self.safe_write(command)
-        # position_information = self.serial.read_until(
-        #     expected=bytes.fromhex("0d"), size=100
-        # )
-        # print(f"sending: {command}")
-        position_information = b""
-        for _ in range(max(self.n_waits, 13)):
-            curr_read = self.serial.read(1)
-            if curr_read == b"":
-                time.sleep(self.wait_time)
-            else:
-                position_information += curr_read
-            if len(position_information) == 13:
-                break
+        position_information = self.transport.query(command, size=13)
         if len(position_information) != 13:
             raise UserWarning(
                 f"Encountered response {position_information}. "
                 "You need to power cycle the stage."
             )
-        self.safe_to_write.set()
         # print(f"received: {position_information}")
         xs = int.from_bytes(position_information[0:4], byteorder="little", signed=True)
         ys = int.from_bytes(position_information[4:8], byteorder="little", signed=True)
@@ -259,41 +237,15 @@ class MP285:
         move_cmd = (
             bytes.fromhex("6d") + x_steps + y_steps + z_steps + bytes.fromhex("0d")
         )
-        # self.flush_buffers()
-        self.safe_write(move_cmd)
-        # print(f"move command: {move_cmd} wait_until_done {self.wait_until_done}")
-
-        for _ in range(self.n_waits):
-            # time.sleep(time_to_move)
-            response = self.serial.read(1)
-            # print(f"move response: {response}")
-            if response == b"":
-                time.sleep(self.wait_time)
-            elif response == bytes.fromhex("0d"):
-                self.safe_to_write.set()
-                return True
-            else:
-                self.safe_to_write.set()
-                # self.flush_buffers()
-                # print(f"Uh oh: {response}")
-                raise UserWarning(
-                    f"Encountered response {response}. "
-                    "You probably need to power cycle the stage."
-                )
-
-        # # time.sleep(time_to_move)
-        # self.safe_to_write.set()
-
-        # response = self.serial.read(1)
-        # print(f"move response: {response}")
-        # if response == bytes.fromhex("0d"):
-        #     move_complete = True
-        # else:
-        #     move_complete = False
-        # return move_complete
-
-        self.safe_to_write.set()
-        return False
+        response = self.transport.query(move_cmd, size=1)
+        if response == b"":
+            return False
+        elif response == bytes.fromhex("0d"):
+            return True
+        raise UserWarning(
+            f"Encountered response {response}. "
+            "You probably need to power cycle the stage."
+        )
 
     def set_resolution_and_velocity(self, speed, resolution):
         """Sets the MP-285 stage speed and resolution.
@@ -346,9 +298,7 @@ class MP285:
         )
 
         # Write Command and get response
-        # self.flush_buffers()
-        self.safe_write(command)
-        response = self.serial.read(1)
+        response = self.transport.query(command, size=1)
         # print(f"Response {response}")
         if response == bytes.fromhex("0d"):
             self.speed = speed
@@ -357,7 +307,6 @@ class MP285:
         else:
             command_complete = False
         # print(f"Command complete? {command_complete}")
-        self.safe_to_write.set()
         return command_complete
 
     def interrupt_move(self):
@@ -377,32 +326,24 @@ class MP285:
         """
         # print("calling interrupt_move")
 
-        # Send Command
-        self.safe_to_write.set()
-        # self.flush_buffers()
-        self.safe_write(bytes.fromhex("03"))
-
-        # Get Response
-        for _ in range(self.n_waits):
-            # time.sleep(time_to_move)
-            response = self.serial.read(1)
-            # print(f"move response: {response}")
-            if response == b"":
-                time.sleep(self.wait_time)
-            elif response == bytes.fromhex("0d"):
-                self.safe_to_write.set()
-                return True
-            elif response == bytes.fromhex("3d"):
-                for _ in range(self.n_waits):
-                    response2 = self.serial.read(1)
-                    if response2 == b"":
-                        time.sleep(self.wait_time)
-                    elif response2 == bytes.fromhex("0d"):
-                        self.safe_to_write.set()
-                        return True
-
-        self.safe_to_write.set()
-        return False
+        # Send Command. A move in progress holds the transport lock while it waits
+        # for its response, so the interrupt is sent through the transport without
+        # waiting for the lock and the pending move reads the response.
+        if not self.transport.lock.acquire(blocking=False):
+            self.transport.interrupt(bytes.fromhex("03"))
+            return True
+
+        try:
+            self.transport.flush()
+            self.transport.write(bytes.fromhex("03"))
+
+            # Get Response
+            response = self.transport.read(1)
+            if response == bytes.fromhex("3d"):
+                response = self.transport.read(1)
+            return response == bytes.fromhex("0d")
+        finally:
+            self.transport.lock.release()
 
     def set_absolute_mode(self):
         """Set MP285 to Absolute Position Mode.
@@ -421,19 +362,8 @@ class MP285:
         # print("calling set_absolute_mode")
         # self.flush_buffers()
         abs_cmd = bytes.fromhex("61") + bytes.fromhex("0d")
-        self.safe_write(abs_cmd)
-
-        for _ in range(self.n_waits):
-            # time.sleep(time_to_move)
-            response = self.serial.read(1)
-            # print(f"move response: {response}")
-            if response == b"":
-                time.sleep(self.wait_time)
-            elif response == bytes.fromhex("0d"):
-                self.safe_to_write.set()
-                return True
-        self.safe_to_write.set()
-        return False
+        response = self.transport.query(abs_cmd, size=1)
+        return response == bytes.fromhex("0d")
 
     # def set_relative_mode(self):
     #     """Set MP285 to Relative Position Mode.
@@ -474,13 +404,11 @@ class MP285:
         """
         # print("calling refresh_display")
         # self.flush_buffers()
-        self.safe_write(bytes.fromhex("6E") + bytes.fromhex("0d"))
-        response = self.serial.read(1)
+        response = self.transport.query(bytes.fromhex("6E") + bytes.fromhex("0d"), 1)
         if response == bytes.fromhex("0d"):
             command_complete = True
         else:
             command_complete = False
-        self.safe_to_write.set()
         return command_complete
 
     def reset_controller(self):
@@ -497,13 +425,11 @@ class MP285:
         """
         # print("calling reset_controller")
         # self.flush_buffers()
-        self.safe_write(bytes.fromhex("72") + bytes.fromhex("0d"))
-        response = self.serial.read(1)
+        response = self.transport.query(bytes.fromhex("72") + bytes.fromhex("0d"), 1)
         if response == bytes.fromhex("0d"):
             command_complete = True
         else:
             command_complete = False
-        self.safe_to_write.set()
         return command_complete
 
     def get_controller_status(self):
@@ -521,15 +447,13 @@ class MP285:
         """
         # print("calling get_controller_status")
         # self.flush_buffers()
-        self.safe_write(bytes.fromhex("73") + bytes.fromhex("0d"))
-        response = self.serial.read(33)
-        if response[-1] == bytes.fromhex("0d"):
+        response = self.transport.query(bytes.fromhex("73") + bytes.fromhex("0d"), 33)
+        if response[-1:] == bytes.fromhex("0d"):
             command_complete = True
         else:
             command_complete = False
 
         # print(response)
-        self.safe_to_write.set()
         # not implemented yet. See page 74 of documentation.
         return command_complete
 
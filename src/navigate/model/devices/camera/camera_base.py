@@ -35,10 +35,10 @@ import logging
 import os
 
 # Third Party Imports
-import tifffile
 
 # Local Imports
 from navigate.config import get_navigate_path
+from navigate.model.analysis.camera import load_camera_map
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -114,38 +114,35 @@ class CameraBase:
             "Rev. Bidirectional"
         ]
 
-        # Initialize offset and variance maps, if present
+        #: str: Directory of the camera maps.
+        self.map_path = os.path.join(get_navigate_path(), "camera_maps")
+
+        # Initialize offset, variance and flatfield maps, if present
         #: np.ndarray: Offset map
         #: np.ndarray: Variance map
         self._offset, self._variance = None, None
+        #: np.ndarray: Flatfield map
+        self._flatfield = None
         self.get_offset_variance_maps()
 
     def get_offset_variance_maps(self):
-        """Get offset and variance maps from file.
+        """Get offset, variance and flatfield maps from file.
+
+        Maps saved as .npy files are memory-mapped, .tiff maps are read.
 
         Returns
         -------
         offset : np.ndarray
-            Offset map.
+            Offset map. None if not found.
         variance : np.ndarray
-            Variance map.
-
-        Raises
-        ------
-        FileNotFoundError
-            If offset or variance map is not found.
+            Variance map. None if not found.
         """
         serial_number = self.camera_parameters["hardware"]["serial_number"]
-        try:
-            map_path = os.path.join(get_navigate_path(), "camera_maps")
-            self._offset = tifffile.imread(
-                os.path.join(map_path, f"{serial_number}_off.tiff")
-            )
-            self._variance = tifffile.imread(
-                os.path.join(map_path, f"{serial_number}_var.tiff")
-            )
-        except FileNotFoundError:
+        self._offset = load_camera_map(self.map_path, serial_number, "off")
+        self._variance = load_camera_map(self.map_path, serial_number, "var")
+        if self._offset is None or self._variance is None:
             self._offset, self._variance = None, None
+        self._flatfield = load_camera_map(self.map_path, serial_number, "flat")
         return self._offset, self._variance
 
     @property
@@ -175,6 +172,19 @@ class CameraBase:
             self.get_offset_variance_maps()
         return self._variance
 
+    @property
+    def flatfield(self):
+        """Return flatfield map. If not present, load from file.
+
+        Returns
+        -------
+        flatfield : np.ndarray
+            Flatfield map.
+        """
+        if self._flatfield is None:
+            self.get_offset_variance_maps()
+        return self._flatfield
+
     def set_readout_direction(self, mode):
         """Set HamamatsuOrca readout direction.
 
@@ -34,9 +34,10 @@
 import logging
 
 # Third Party Imports
+import numpy as np
 
 # Local Imports
-from navigate.model.waveforms import camera_exposure
+from navigate.model.waveforms import camera_exposure, waveform_cache
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -96,6 +97,15 @@ class DAQBase:
         #: int: Number of times to expand the waveform
         self.waveform_expand_num = 1
 
+        #: int: Maximum number of expanded samples per channel written to an analog
+        #: output buffer. Longer outputs write one period and regenerate it.
+        self.max_buffer_samples = int(
+            self.daq_parameters.get("max_buffer_samples", 2**20)
+        )
+
+        #: dict: Analog outputs.
+        self.analog_outputs = {}
+
     def calculate_all_waveforms(self, microscope_name, exposure_times, sweep_times):
         """Pre-calculates all waveforms necessary for the acquisition and organizes in
         a dictionary format.
@@ -133,7 +143,15 @@ class DAQBase:
                 sweep_time = sweep_times[channel_key]
 
                 # Create 5V TTL for 1 camera exposure.
-                self.waveform_dict[channel_key] = camera_exposure(
+                self.waveform_dict[channel_key] = waveform_cache.get(
+                    (
+                        "camera",
+                        self.sample_rate,
+                        sweep_time,
+                        exposure_time,
+                        self.camera_delay,
+                    ),
+                    camera_exposure,
                     sample_rate=self.sample_rate,
                     sweep_time=sweep_time,
                     exposure=exposure_time,
@@ -159,3 +177,48 @@ class DAQBase:
         self.sample_rate = self.configuration["configuration"]["microscopes"][
             microscope_name
         ]["daq"]["sample_rate"]
+
+    def calculate_analog_output_buffer(self, channel_key, board):
+        """Calculate the samples written to the analog output task of a board.
+
+        Expanded waveforms (e.g., the CVACONPRO template) are only materialized up
+        to max_buffer_samples. Beyond that, if every waveform on the board is
+        exactly one period long, a single period is returned and the device must
+        regenerate it, so memory stays constant regardless of the scan length.
+
+        Parameters
+        ----------
+        channel_key : str
+            Channel key for current channel.
+        board : str
+            Name of the board.
+
+        Returns
+        -------
+        buffer : np.array
+            Samples to write, one row per analog output of the board.
+        regenerate : bool
+            Whether the device has to repeat the buffer waveform_expand_num times.
+        """
+        n_sample = int(self.sample_rate * self.sweep_times[channel_key])
+        max_sample = n_sample * self.waveform_expand_num
+        outputs = [
+            v["waveform"]
+            for k, v in self.analog_outputs.items()
+            if k.split("/")[0] == board
+        ]
+        regenerate = max_sample > self.max_buffer_samples and all(
+            len(waveform[channel_key]) == n_sample for waveform in outputs
+        )
+        if regenerate:
+            return np.vstack([waveform[channel_key] for waveform in outputs]), True
+
+        # TODO: may change this later to automatically expand the waveform to the
+        #  longest
+        buffer = []
+        for waveform in outputs:
+            waveform = waveform[channel_key]
+            if len(waveform) < max_sample:
+                waveform = np.tile(waveform, self.waveform_expand_num)
+            buffer.append(waveform[:max_sample])
+        return np.vstack(buffer), False
@@ -76,10 +76,6 @@ class NIDAQ(DAQBase):
         #: str: NI DAQmx port for laser switching
         self.external_trigger = None
 
-        # keep track of analog outputs and their waveforms
-        #: dict: Analog outputs.
-        self.analog_outputs = {}
-
         #: dict: NI DAQmx tasks for analog output.
         self.analog_output_tasks = {}
 
@@ -296,21 +292,22 @@ class NIDAQ(DAQBase):
             # self.analog_output_tasks[board].triggers.start_trigger.cfg_dig_edge_start_trig(
             #     triggers[0]
             # )
-            # TODO: may change this later to automatically expand the waveform to the
-            #  longest
-            for k, v in self.analog_outputs.items():
-                if k.split("/")[0] == board and len(v["waveform"][channel_key]) < max_sample:
-                    v["waveform"][channel_key] = np.hstack(
-                        [v["waveform"][channel_key]] * self.waveform_expand_num
-                    )
+            waveforms, regenerate = self.calculate_analog_output_buffer(
+                channel_key, board
+            )
+            if regenerate:
+                # write one period and let the device repeat it
+                out_stream = self.analog_output_tasks[board].out_stream
+                out_stream.regen_mode = (
+                    nidaqmx.constants.RegenerationMode.ALLOW_REGENERATION
+                )
+                out_stream.output_buf_size = self.n_sample
+                logger.info(
+                    f"DAQ NI - Regenerating {self.n_sample} samples "
+                    f"{self.waveform_expand_num} times on {board}"
+                )
             # Write values to board
-            waveforms = np.vstack(
-                [
-                    v["waveform"][channel_key][:max_sample]
-                    for k, v in self.analog_outputs.items()
-                    if k.split("/")[0] == board
-                ]
-            ).squeeze()
+            waveforms = waveforms.squeeze()
             self.analog_output_tasks[board].write(waveforms)
 
     def prepare_acquisition(self, channel_key):
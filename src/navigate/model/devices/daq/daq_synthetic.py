@@ -39,6 +39,8 @@ from threading import Lock
 
 # Local Imports
 from navigate.model.devices.daq.daq_base import DAQBase
+from navigate.model.waveforms import waveform_chunks
+from navigate.tools.waveform_template_funcs import get_waveform_template_parameters
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -64,8 +66,11 @@ class SyntheticDAQ(DAQBase):
         #: Lock: Lock for waiting to run.
         self.wait_to_run_lock = Lock()
 
-        #: dict: Analog output tasks.
-        self.analog_outputs = {}
+        #: dict: Analog output buffers and whether they are regenerated, per board.
+        self.analog_output_tasks = {}
+
+        #: int: Number of samples generated per channel by an analog output task.
+        self.analog_output_samples = 0
 
         #: bool: Flag for updating analog task.
         self.is_updating_analog_task = False
@@ -85,6 +90,45 @@ class SyntheticDAQ(DAQBase):
         """Create galvo and remote focus tasks"""
         pass
 
+    def create_analog_output_tasks(self, channel_key):
+        """Create the analog output buffers for each board.
+
+        Parameters
+        ----------
+        channel_key : str
+            Channel key for analog output.
+        """
+        self.analog_output_tasks = {}
+        boards = set([x.split("/")[0] for x in self.analog_outputs.keys()])
+        for board in boards:
+            self.analog_output_tasks[board] = self.calculate_analog_output_buffer(
+                channel_key, board
+            )
+        if boards:
+            self.analog_output_samples = (
+                int(self.sample_rate * self.sweep_times[channel_key])
+                * self.waveform_expand_num
+                * self.waveform_repeat_num
+            )
+
+    def generate_analog_output(self, board, chunk_size=65536):
+        """Generate the samples of an analog output task as a real device would.
+
+        Parameters
+        ----------
+        board : str
+            Name of the board.
+        chunk_size : int
+            Maximum number of samples per chunk.
+
+        Yields
+        ------
+        chunk : np.array
+            Next samples of every analog output of the board.
+        """
+        buffer, _ = self.analog_output_tasks[board]
+        yield from waveform_chunks(buffer, self.analog_output_samples, chunk_size)
+
     def start_tasks(self):
         """Start the tasks for camera triggering and analog outputs.
 
@@ -108,6 +152,17 @@ class SyntheticDAQ(DAQBase):
         channel_key : str
             Channel key for current channel.
         """
+        (
+            self.waveform_repeat_num,
+            self.waveform_expand_num,
+        ) = get_waveform_template_parameters(
+            self.configuration["experiment"]["MicroscopeState"].get(
+                "waveform_template", "Default"
+            ),
+            self.configuration.get("waveform_templates", {}),
+            self.configuration["experiment"]["MicroscopeState"],
+        )
+        self.create_analog_output_tasks(channel_key)
         self.current_channel_key = channel_key
         self.is_updating_analog_task = False
         if self.wait_to_run_lock.locked():
@@ -126,8 +181,10 @@ class SyntheticDAQ(DAQBase):
             self.wait_to_run_lock.release()
         time.sleep(0.01)
         if self.trigger_mode == "self-trigger":
-            for microscope_name in self.camera:
-                self.camera[microscope_name].generate_new_frame()
+            # one camera trigger per expanded and repeated waveform period
+            for _ in range(self.waveform_repeat_num * self.waveform_expand_num):
+                for microscope_name in self.camera:
+                    self.camera[microscope_name].generate_new_frame()
 
     def stop_acquisition(self):
         """Stop Acquisition."""
@@ -40,6 +40,7 @@ import serial
 
 # Local Imports
 from navigate.model.devices.filter_wheel.filter_wheel_base import FilterWheelBase
+from navigate.model.devices.APIs.serial_transport import adaptive_poll
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -230,9 +231,10 @@ class SutterFilterWheel(FilterWheelBase):
                 self.init_finished = True
                 logger.debug("SutterFilterWheel - Initialized.")
 
+            output_command = b""
             for wheel_idx in range(self.number_of_filter_wheels):
-                """Loop through each filter, and send the binary sequence via serial to
-                move to the desired filter wheel position
+                """Loop through each filter, and build the binary sequence to move to
+                the desired filter wheel position
                 When number_of_filter_wheels = 1, loop executes once, and only wheel A
                 changes. When number_of_filter_wheels = 2, loop executes twice, with
                 both wheel A and B moving to the same position sequentially
@@ -240,9 +242,11 @@ class SutterFilterWheel(FilterWheelBase):
                 position = command byte
                 """
                 logger.debug(f"SutterFilterWheel - Moving to Position {wheel_idx}")
-                output_command = wheel_idx * 128 + self.wheel_position + 16 * self.speed
-                output_command = output_command.to_bytes(1, "little")
-                self.serial.write(output_command)
+                command_byte = wheel_idx * 128 + self.wheel_position + 16 * self.speed
+                output_command += command_byte.to_bytes(1, "little")
+
+            # Send the command bytes of every wheel with one write
+            self.serial.write(output_command)
 
             #  Wheel Position Change Delay
             if wait_until_done:
@@ -267,12 +271,9 @@ class SutterFilterWheel(FilterWheelBase):
             The serial port to the Sutter Lambda 10-B is on, but it isn't responding as
             expected.
         """
-        for i in range(100):
-            num_waiting = self.serial.inWaiting()
-            if num_waiting == num_bytes:
-                break
-            time.sleep(0.02)
-        else:
+        if not adaptive_poll(
+            lambda: self.serial.inWaiting() == num_bytes, timeout=2.0, max_interval=0.02
+        ):
             logger.error(
                 "The serial port to the Sutter Lambda 10-B is on, but it isn't "
                 "responding as expected."
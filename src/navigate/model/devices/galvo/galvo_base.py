@@ -34,9 +34,10 @@
 import logging
 
 # Third Party Imports
+import numpy as np
 
 # Local Imports
-from navigate.model.waveforms import sawtooth, sine_wave
+from navigate.model.waveforms import sawtooth, sine_wave, waveform_cache
 
 # # Logger Setup
 p = __name__.split(".")[1]
@@ -162,51 +163,97 @@ class GalvoBase:
                     return
 
                 # Calculate the Waveforms
-                if self.galvo_waveform == "sawtooth":
-                    self.waveform_dict[channel_key] = sawtooth(
-                        sample_rate=self.sample_rate,
-                        sweep_time=self.sweep_time,
-                        frequency=galvo_frequency,
-                        amplitude=galvo_amplitude,
-                        offset=galvo_offset,
-                        phase=self.camera_delay,
-                    )
-                elif self.galvo_waveform == "sine":
-                    self.waveform_dict[channel_key] = sine_wave(
-                        sample_rate=self.sample_rate,
-                        sweep_time=self.sweep_time,
-                        frequency=galvo_frequency,
-                        amplitude=galvo_amplitude,
-                        offset=galvo_offset,
-                        phase=self.device_config["phase"],
-                    )
-                elif self.galvo_waveform == "halfsaw":
-                    new_wave = sawtooth(
-                        sample_rate=self.sample_rate,
-                        sweep_time=self.sweep_time,
-                        frequency=galvo_frequency,
-                        amplitude=galvo_amplitude,
-                        offset=galvo_offset,
-                        phase=self.camera_delay,
-                    )
-                    half_samples = (
-                        new_wave.argmax() if galvo_amplitude > 0 else new_wave.argmin()
-                    )
-                    new_wave[:half_samples] = -galvo_offset
-                    self.waveform_dict[channel_key] = new_wave
-                else:
+                if self.galvo_waveform not in ["sawtooth", "sine", "halfsaw"]:
                     print("Unknown Galvo waveform specified in configuration file.")
                     self.waveform_dict[channel_key] = None
                     continue
-                self.waveform_dict[channel_key][
-                    self.waveform_dict[channel_key] > self.galvo_max_voltage
-                ] = self.galvo_max_voltage
-                self.waveform_dict[channel_key][
-                    self.waveform_dict[channel_key] < self.galvo_min_voltage
-                ] = self.galvo_min_voltage
+                phase = (
+                    self.device_config["phase"]
+                    if self.galvo_waveform == "sine"
+                    else self.camera_delay
+                )
+                waveform_parameters = (
+                    self.galvo_waveform,
+                    self.sample_rate,
+                    self.sweep_time,
+                    galvo_frequency,
+                    galvo_amplitude,
+                    galvo_offset,
+                    phase,
+                    self.galvo_min_voltage,
+                    self.galvo_max_voltage,
+                )
+                self.waveform_dict[channel_key] = waveform_cache.get(
+                    ("galvo",) + waveform_parameters,
+                    self.calculate_waveform,
+                    *waveform_parameters,
+                )
 
         return self.waveform_dict
 
+    @staticmethod
+    def calculate_waveform(
+        waveform,
+        sample_rate,
+        sweep_time,
+        frequency,
+        amplitude,
+        offset,
+        phase,
+        min_voltage,
+        max_voltage,
+    ):
+        """Calculate the galvo waveform of a channel.
+
+        Parameters
+        ----------
+        waveform : str
+            Galvo waveform. sawtooth, sine or halfsaw.
+        sample_rate : int
+            Sample rate of the DAQ in Hz.
+        sweep_time : float
+            Sweep time in seconds.
+        frequency : float
+            Frequency of the waveform in Hz.
+        amplitude : float
+            Amplitude of the waveform in volts.
+        offset : float
+            Offset of the waveform in volts.
+        phase : float
+            Phase of the waveform.
+        min_voltage : float
+            Minimum voltage of the galvo.
+        max_voltage : float
+            Maximum voltage of the galvo.
+
+        Returns
+        -------
+        waveform : numpy.ndarray
+            Waveform for the galvo.
+        """
+        if waveform == "sine":
+            new_wave = sine_wave(
+                sample_rate=sample_rate,
+                sweep_time=sweep_time,
+                frequency=frequency,
+                amplitude=amplitude,
+                offset=offset,
+                phase=phase,
+            )
+        else:
+            new_wave = sawtooth(
+                sample_rate=sample_rate,
+                sweep_time=sweep_time,
+                frequency=frequency,
+                amplitude=amplitude,
+                offset=offset,
+                phase=phase,
+            )
+            if waveform == "halfsaw":
+                half_samples = new_wave.argmax() if amplitude > 0 else new_wave.argmin()
+                new_wave[:half_samples] = -offset
+        return np.clip(new_wave, min_voltage, max_voltage)
+
     def turn_off(self):
         """Turn off the galvo."""
         pass
\ No newline at end of file
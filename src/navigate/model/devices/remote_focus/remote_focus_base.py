@@ -34,12 +34,14 @@
 import logging
 
 # Third Party Imports
+import numpy as np
 
 # Local Imports
 from navigate.model.waveforms import (
     remote_focus_ramp,
     smooth_waveform,
     remote_focus_ramp_triangular,
+    waveform_cache,
 )
 
 # # Logger Setup
@@ -160,8 +162,6 @@ class RemoteFocusBase:
                 exposure_time = exposure_times[channel_key]
                 self.sweep_time = sweep_times[channel_key]
 
-                samples = int(self.sample_rate * self.sweep_time)
-
                 # Remote Focus Parameters
                 temp = waveform_constants["remote_focus_constants"][imaging_mode][zoom][
                     laser
@@ -195,46 +195,110 @@ class RemoteFocusBase:
                     remote_focus_offset += offset
 
                 # Calculate the Waveforms
-                if sensor_mode == "Light-Sheet" and (
+                triangular = sensor_mode == "Light-Sheet" and (
                     readout_direction == "Bidirectional"
                     or readout_direction == "Rev. Bidirectional"
-                ):
-                    self.waveform_dict[channel_key] = remote_focus_ramp_triangular(
-                        sample_rate=self.sample_rate,
-                        exposure_time=exposure_time,
-                        sweep_time=self.sweep_time,
-                        remote_focus_delay=remote_focus_delay,
-                        camera_delay=self.camera_delay,
-                        amplitude=remote_focus_amplitude,
-                        offset=remote_focus_offset,
-                    )
-                    samples *= 2
-
-                else:
-                    self.waveform_dict[channel_key] = remote_focus_ramp(
-                        sample_rate=self.sample_rate,
-                        exposure_time=exposure_time,
-                        sweep_time=self.sweep_time,
-                        remote_focus_delay=remote_focus_delay,
-                        camera_delay=self.camera_delay,
-                        fall=remote_focus_ramp_falling,
-                        amplitude=remote_focus_amplitude,
-                        offset=remote_focus_offset,
-                    )
-
-                # Smooth the Waveform if specified
-                if percent_smoothing > 0:
-                    self.waveform_dict[channel_key] = smooth_waveform(
-                        waveform=self.waveform_dict[channel_key],
-                        percent_smoothing=percent_smoothing,
-                    )[: samples]
-
-                # Clip any values outside of the hardware limits
-                self.waveform_dict[channel_key][
-                    self.waveform_dict[channel_key] > self.remote_focus_max_voltage
-                ] = self.remote_focus_max_voltage
-                self.waveform_dict[channel_key][
-                    self.waveform_dict[channel_key] < self.remote_focus_min_voltage
-                ] = self.remote_focus_min_voltage
+                )
+                waveform_parameters = (
+                    triangular,
+                    self.sample_rate,
+                    exposure_time,
+                    self.sweep_time,
+                    remote_focus_delay,
+                    self.camera_delay,
+                    remote_focus_ramp_falling,
+                    remote_focus_amplitude,
+                    remote_focus_offset,
+                    percent_smoothing,
+                    self.remote_focus_min_voltage,
+                    self.remote_focus_max_voltage,
+                )
+                self.waveform_dict[channel_key] = waveform_cache.get(
+                    ("remote_focus",) + waveform_parameters,
+                    self.calculate_waveform,
+                    *waveform_parameters,
+                )
 
         return self.waveform_dict
+
+    @staticmethod
+    def calculate_waveform(
+        triangular,
+        sample_rate,
+        exposure_time,
+        sweep_time,
+        remote_focus_delay,
+        camera_delay,
+        fall,
+        amplitude,
+        offset,
+        percent_smoothing,
+        min_voltage,
+        max_voltage,
+    ):
+        """Calculate the remote focus waveform of a channel.
+
+        Parameters
+        ----------
+        triangular : bool
+            Calculate a triangular waveform for bidirectional light-sheet readout.
+        sample_rate : int
+            Sample rate of the DAQ in Hz.
+        exposure_time : float
+            Exposure time in seconds.
+        sweep_time : float
+            Sweep time in seconds.
+        remote_focus_delay : float
+            Remote focus delay in seconds.
+        camera_delay : float
+            Camera delay in seconds.
+        fall : float
+            Remote focus ramp falling time in seconds.
+        amplitude : float
+            Amplitude of the waveform in volts.
+        offset : float
+            Offset of the waveform in volts.
+        percent_smoothing : float
+            Percentage of the waveform to be smoothed.
+        min_voltage : float
+            Minimum voltage of the remote focus device.
+        max_voltage : float
+            Maximum voltage of the remote focus device.
+
+        Returns
+        -------
+        waveform : numpy.ndarray
+            Waveform for the remote focus device.
+        """
+        samples = int(sample_rate * sweep_time)
+        if triangular:
+            waveform = remote_focus_ramp_triangular(
+                sample_rate=sample_rate,
+                exposure_time=exposure_time,
+                sweep_time=sweep_time,
+                remote_focus_delay=remote_focus_delay,
+                camera_delay=camera_delay,
+                amplitude=amplitude,
+                offset=offset,
+            )
+            samples *= 2
+        else:
+            waveform = remote_focus_ramp(
+                sample_rate=sample_rate,
+                exposure_time=exposure_time,
+                sweep_time=sweep_time,
+                remote_focus_delay=remote_focus_delay,
+                camera_delay=camera_delay,
+                fall=fall,
+                amplitude=amplitude,
+                offset=offset,
+            )
+
+        # Smooth the Waveform if specified
+        if percent_smoothing > 0:
+            waveform = smooth_waveform(
+                waveform=waveform, percent_smoothing=percent_smoothing
+            )[:samples]
+
+        # Clip any values outside of the hardware limits
+        return np.clip(waveform, min_voltage, max_voltage)
@@ -31,7 +31,6 @@
 
 # Standard Imports
 import logging
-import time
 
 # Third Party Imports
 
@@ -41,6 +40,7 @@ from navigate.model.devices.APIs.asi.asi_tiger_controller import (
     TigerController,
     TigerException,
 )
+from navigate.model.devices.APIs.serial_transport import adaptive_poll
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -128,9 +128,8 @@ class ASIStage(StageBase):
 
         self.tiger_controller = device_connection
         if device_connection is not None:
-            # Set feedback alignment values
-            for ax, aa in feedback_alignment.items():
-                self.tiger_controller.set_feedback_alignment(ax, aa)
+            # Set feedback alignment values of every axis with one command
+            self.tiger_controller.set_feedback_alignment(feedback_alignment)
             logger.debug("ASI Stage Feedback Alignment Settings:", feedback_alignment)
 
             # Set finishing accuracy to half of the minimum pixel size we will use
@@ -150,19 +149,22 @@ class ASIStage(StageBase):
             )
             # If this is changing, the stage must be power cycled for these changes to
             # take effect.
-            for ax in self.asi_axes.keys():
-                if self.asi_axes[ax] == "theta":
-                    self.tiger_controller.set_finishing_accuracy(ax, 0.003013)
-                    self.tiger_controller.set_error(ax, 0.1)
-                else:
-                    self.tiger_controller.set_finishing_accuracy(ax, finishing_accuracy)
-                    self.tiger_controller.set_error(ax, 1.2 * finishing_accuracy)
+            theta_axes = [ax for ax in self.asi_axes if self.asi_axes[ax] == "theta"]
+            accuracy = {
+                ax: 0.003013 if ax in theta_axes else finishing_accuracy
+                for ax in self.asi_axes
+            }
+            error = {
+                ax: 0.1 if ax in theta_axes else 1.2 * finishing_accuracy
+                for ax in self.asi_axes
+            }
+            self.tiger_controller.set_finishing_accuracy(accuracy)
+            self.tiger_controller.set_error(error)
 
             # Set backlash to 0 (less accurate)
-            for ax in self.asi_axes.keys():
-                if self.asi_axes[ax] == "theta":
-                    self.tiger_controller.set_backlash(ax, 0.1)
-                self.tiger_controller.set_backlash(ax, 0.0)
+            if theta_axes:
+                self.tiger_controller.set_backlash({ax: 0.1 for ax in theta_axes})
+            self.tiger_controller.set_backlash({ax: 0.0 for ax in self.asi_axes})
 
             # Speed optimizations - Set speed to 90% of maximum on each axis
             self.set_speed(percent=0.9)
@@ -506,8 +508,9 @@ class ASIStage(StageBase):
 
     def wait_until_complete(self, axis):
         try:
-            while self.tiger_controller.is_axis_busy(axis):
-                time.sleep(0.1)
+            adaptive_poll(
+                lambda: not self.tiger_controller.is_axis_busy(axis), max_interval=0.1
+            )
         except TigerException as e:
             print(f"ASI Stage Exception {e}")
             logger.exception(f"ASI Stage Exception {e}")
@@ -211,6 +211,46 @@ class StageBase:
         """Stop all stage movement abruptly."""
         pass
 
+    def supports_sequence(self, axis):
+        """Whether the axis can step through a hardware-timed position sequence.
+
+        Parameters
+        ----------
+        axis : str
+            An axis: x, y, z, f, theta
+
+        Returns
+        -------
+        bool
+            True if load_sequence is supported for the axis.
+        """
+        return False
+
+    def load_sequence(self, axis, positions):
+        """Load positions the axis steps through, one per camera frame.
+
+        The stage moves to the next position at every frame trigger of the next
+        DAQ acquisition. The reported axis position is the last position of the
+        sequence.
+
+        Parameters
+        ----------
+        axis : str
+            An axis: x, y, z, f, theta
+        positions : list[float]
+            Absolute positions in the order of the frames.
+
+        Returns
+        -------
+        bool
+            Was the sequence loaded?
+        """
+        return False
+
+    def end_sequence(self):
+        """Return to software-timed movement after a position sequence."""
+        pass
+
     def close(self):
         """Close the stage."""
         pass
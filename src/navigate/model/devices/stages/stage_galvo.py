@@ -174,7 +174,8 @@ class GalvoNIStage(StageBase):
         result : bool
             success or failed
         """
-        self.switch_mode("waveform")
+        # keep the exposure and sweep times, load_sequence needs them for every block
+        self.switch_mode("waveform", self.exposure_times, self.sweep_times)
         microscope_state = self.configuration["experiment"]["MicroscopeState"]
         
         for channel_key in microscope_state["channels"].keys():
@@ -276,6 +277,62 @@ class GalvoNIStage(StageBase):
         """Stop all stage movement abruptly."""
         pass
 
+    def supports_sequence(self, axis):
+        """Whether the axis can step through a hardware-timed position sequence.
+
+        Parameters
+        ----------
+        axis : str
+            An axis prefix, e.g. 'z'.
+
+        Returns
+        -------
+        bool
+            True if the axis is the galvo axis.
+        """
+        return axis in self.axes_mapping
+
+    def load_sequence(self, axis, positions):
+        """Load positions the axis steps through, one per camera frame.
+
+        Writes a staircase waveform, one step per sweep, to the analog output of
+        the axis, so the DAQ moves the stage in sync with the camera triggers.
+
+        Parameters
+        ----------
+        axis : str
+            An axis prefix, e.g. 'z'.
+        positions : list[float]
+            Absolute positions in the order of the frames.
+
+        Returns
+        -------
+        bool
+            Was the sequence loaded?
+        """
+        if self.sweep_times is None or not positions:
+            return False
+        positions = [self.get_abs_position(axis, pos) for pos in positions]
+        if -1e50 in positions:
+            return False
+        volts = np.array(
+            [eval(self.volts_per_micron, {"x": pos}) for pos in positions]
+        )
+        waveform_dict = {
+            channel_key: np.repeat(volts, int(self.sample_rate * sweep_time))
+            for channel_key, sweep_time in self.sweep_times.items()
+        }
+        if not self.update_waveform(waveform_dict):
+            return False
+        setattr(self, f"{axis}_pos", positions[-1])
+        return True
+
+    def end_sequence(self):
+        """Return to software-timed movement after a position sequence."""
+        if self.ao_task is None:
+            self.daq.analog_outputs.pop(self.axes_channels[0], None)
+            self.switch_mode("normal", self.exposure_times, self.sweep_times)
+
     def switch_mode(self, mode="normal", exposure_times=None, sweep_times=None):
         """Switch Galvo stage working mode.
 
@@ -77,6 +77,9 @@ class SyntheticStage(StageBase):
         self.volts_per_micron = "0.1 * x"
         self.camera_delay = 0.01
 
+        #: dict: Position sequence of each axis loaded with load_sequence.
+        self.sequence = {}
+
     def report_position(self):
         """Report the current position of the stage.
 
@@ -143,6 +146,47 @@ class SyntheticStage(StageBase):
 
         return True
 
+    def supports_sequence(self, axis):
+        """Whether the axis can step through a hardware-timed position sequence.
+
+        Parameters
+        ----------
+        axis : str
+            An axis. For example, 'x', 'y', 'z', 'f', 'theta'.
+
+        Returns
+        -------
+        bool
+            True for every axis of the stage.
+        """
+        return axis in self.axes
+
+    def load_sequence(self, axis, positions):
+        """Load positions the axis steps through, one per camera frame.
+
+        Parameters
+        ----------
+        axis : str
+            An axis. For example, 'x', 'y', 'z', 'f', 'theta'.
+        positions : list[float]
+            Absolute positions in the order of the frames.
+
+        Returns
+        -------
+        bool
+            Was the sequence loaded?
+        """
+        positions = [self.get_abs_position(axis, pos) for pos in positions]
+        if not positions or -1e50 in positions:
+            return False
+        self.sequence[axis] = positions
+        setattr(self, f"{axis}_pos", positions[-1])
+        return True
+
+    def end_sequence(self):
+        """Return to software-timed movement after a position sequence."""
+        self.sequence = {}
+
     def load_sample(self):
         """Load a sample.
 
@@ -0,0 +1,280 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Third Party Imports
+
+# Local Imports
+
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class ExecutionTracer:
+    """Record the execution of an acquisition as a trace.
+
+    Spans (e.g., the main function of a feature or a thread waiting for another
+    thread) are recorded with the thread they ran on and saved in the Chrome trace
+    event format, which can be opened with Perfetto (https://ui.perfetto.dev) or
+    chrome://tracing.
+    """
+
+    def __init__(self, process_name="navigate model"):
+        """Initialize the ExecutionTracer.
+
+        Parameters
+        ----------
+        process_name : str
+            Name of the process in the trace.
+        """
+        #: str: Name of the process in the trace.
+        self.process_name = process_name
+
+        #: int: Process id.
+        self.pid = os.getpid()
+
+        #: list[dict]: Recorded trace events.
+        self.events = []
+
+        #: dict: Names of the threads in the format of {thread id: name}.
+        self.thread_names = {}
+
+        #: threading.Lock: Lock of the trace events.
+        self.lock = threading.Lock()
+
+        #: float: Time origin of the trace.
+        self.origin = time.perf_counter()
+
+    def now(self):
+        """Return the time since the origin of the trace.
+
+        Returns
+        -------
+        float
+            Time in microseconds.
+        """
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def add_event(self, event):
+        """Record a trace event on the current thread.
+
+        Parameters
+        ----------
+        event : dict
+            Trace event without the process and thread ids.
+        """
+        thread = threading.current_thread()
+        event["pid"] = self.pid
+        event["tid"] = thread.ident
+        with self.lock:
+            self.thread_names[thread.ident] = thread.name
+            self.events.append(event)
+
+    def add_span(self, name, category, start, end, args=None):
+        """Record a span.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span.
+        category : str
+            Category of the span, e.g. 'signal', 'data' or 'wait'.
+        start : float
+            Start time in microseconds, see now.
+        end : float
+            End time in microseconds, see now.
+        args : dict, optional
+            Values shown with the span.
+        """
+        event = {"name": name, "cat": category, "ph": "X", "ts": start}
+        event["dur"] = end - start
+        if args:
+            event["args"] = args
+        self.add_event(event)
+
+    @contextmanager
+    def span(self, name, category="model", **args):
+        """Record the execution of a block as a span.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span.
+        category : str
+            Category of the span.
+        **args : dict
+            Values shown with the span.
+        """
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, self.now(), args)
+
+    def instant(self, name, category="model", **args):
+        """Record an instant event.
+
+        Parameters
+        ----------
+        name : str
+            Name of the event.
+        category : str
+            Category of the event.
+        **args : dict
+            Values shown with the event.
+        """
+        event = {"name": name, "cat": category, "ph": "i", "ts": self.now(), "s": "t"}
+        if args:
+            event["args"] = args
+        self.add_event(event)
+
+    def wrap(self, func, name, category):
+        """Return a function recording each call of func as a span.
+
+        Parameters
+        ----------
+        func : callable
+            Function to trace.
+        name : str
+            Name of the spans.
+        category : str
+            Category of the spans.
+
+        Returns
+        -------
+        callable
+            Traced function.
+        """
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            start = self.now()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_span(name, category, start, self.now())
+
+        return traced
+
+    def wrap_funcs(self, node_name, category, func_dict):
+        """Trace the functions of a feature node.
+
+        Parameters
+        ----------
+        node_name : str
+            Name of the node, e.g. 'ZStackAcquisition'.
+        category : str
+            'signal' or 'data'.
+        func_dict : dict
+            Functions of the node in the format of {'main': func}.
+
+        Returns
+        -------
+        dict
+            Functions of the node, each call of a function is recorded as a span
+            named '<node_name>.<function name>'.
+        """
+        return {
+            k: self.wrap(v, f"{node_name}.{k}", category) if callable(v) else v
+            for k, v in func_dict.items()
+        }
+
+    def summary(self):
+        """Summarize the spans by name.
+
+        Returns
+        -------
+        dict
+            {name: {"count": int, "total": float, "max": float}}, times in seconds.
+        """
+        summary = {}
+        with self.lock:
+            events = [event for event in self.events if event["ph"] == "X"]
+        for event in events:
+            record = summary.setdefault(
+                event["name"], {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            record["count"] += 1
+            record["total"] += event["dur"] / 1e6
+            record["max"] = max(record["max"], event["dur"] / 1e6)
+        return summary
+
+    def to_dict(self):
+        """Return the trace in the Chrome trace event format.
+
+        Returns
+        -------
+        dict
+            Trace with the recorded events and the names of the process and threads.
+        """
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self.pid,
+                "args": {"name": self.process_name},
+            }
+        ]
+        for tid, name in thread_names.items():
+            metadata.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+            )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save(self, path):
+        """Save the trace as a JSON file.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            File name.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+        logger.info(f"ExecutionTracer - Saved {len(self.events)} events to {path}")
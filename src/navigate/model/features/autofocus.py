@@ -36,11 +36,9 @@ import threading
 
 # Third Party Imports
 import numpy as np
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
 
 # Local imports
-from navigate.model.features.feature_container import load_features
+from navigate.model.features.feature_container import DataOffload, load_features
 from navigate.model.analysis.image_contrast import fast_normalized_dct_shannon_entropy
 
 
@@ -133,6 +131,11 @@ class Autofocus:
         #: Queue: Autofocus position queue
         self.autofocus_pos_queue = Queue()
 
+        #: DataOffload: Calculates the entropy of the frames in worker processes
+        self.offload = DataOffload(
+            fast_normalized_dct_shannon_entropy, self.update_entropy
+        )
+
         #: int: Target channel
         self.target_channel = 1
         #: dict: Configuration table
@@ -146,6 +149,7 @@ class Autofocus:
                 "init": self.pre_func_data,
                 "main": self.in_func_data,
                 "end": self.end_func_data,
+                "offload": self.offload,
             },
             "node": {"node_type": "multi-step", "device_related": True},
         }
@@ -358,6 +362,7 @@ class Autofocus:
         self.get_frames_num = 0
         self.plot_data = []
         self.total_frame_num = self.get_autofocus_frame_num()
+        self.offload.cancel()
 
     def in_func_data(self, frame_ids=[]):
         """Run the autofocus routine.
@@ -387,43 +392,52 @@ class Autofocus:
             except Exception:
                 break
 
-            entropy = fast_normalized_dct_shannon_entropy(
-                input_array=self.model.data_buffer[self.f_frame_id],
-                psf_support_diameter_xy=3,
+            # the entropy is calculated in a worker process
+            self.offload.submit(
+                self.model.data_buffer[self.f_frame_id],
+                3,
+                key=(self.f_frame_id, self.frame_num, self.f_pos),
             )
-
-            self.model.logger.debug(
-                f"Appending plot data for frame {self.f_frame_id} focus: {self.f_pos}, "
-                f"entropy: {entropy[0]}"
-            )
-            self.plot_data.append([self.f_pos, entropy[0]])
-            # Need to initialize entropy above for the first iteration of the autofocus
-            # routine. Need to initialize entropy_vector above for the first iteration
-            # of the autofocus routine. Then need to append each measurement to the
-            # entropy_vector.  First column will be the focus position, second column
-            # would be the DCT entropy value.
-
-            # Find Maximum Focus Position
-            if entropy > self.max_entropy:
-                self.max_entropy = entropy
-                self.focus_pos = self.f_pos
-                self.target_frame_id = self.f_frame_id
-
             self.f_frame_id = -1
 
-            if self.frame_num == 1:
-                self.frame_num = 10  # any value but not 1
-                self.model.logger.info(
-                    f"***********max shannon entropy: {self.max_entropy}, "
-                    f"{self.focus_pos}"
-                )
-                # find out the focus
-                self.autofocus_pos_queue.put(self.focus_pos)
-                # return [self.target_frame_id]
-
         if self.get_frames_num > self.total_frame_num:
             return frame_ids
 
+    def update_entropy(self, key, entropy):
+        """Update the focus with the entropy of a frame.
+
+        Called with the results of the offloaded entropy calculation in the order
+        the frames were submitted.
+
+        Parameters
+        ----------
+        key : tuple
+            (frame id, number of remaining frames, focus position) of the frame.
+        entropy : np.ndarray
+            DCT Shannon entropy of the frame.
+        """
+        f_frame_id, frame_num, f_pos = key
+        self.model.logger.debug(
+            f"Appending plot data for frame {f_frame_id} focus: {f_pos}, "
+            f"entropy: {entropy[0]}"
+        )
+        self.plot_data.append([f_pos, entropy[0]])
+        # First column is the focus position, second column is the DCT entropy value.
+
+        # Find Maximum Focus Position
+        if entropy > self.max_entropy:
+            self.max_entropy = entropy
+            self.focus_pos = f_pos
+            self.target_frame_id = f_frame_id
+
+        if frame_num == 1:
+            self.model.logger.info(
+                f"***********max shannon entropy: {self.max_entropy}, "
+                f"{self.focus_pos}"
+            )
+            # find out the focus
+            self.autofocus_pos_queue.put(self.focus_pos)
+
     def end_func_data(self):
         """End the autofocus routine.
 
@@ -435,6 +449,9 @@ class Autofocus:
         if self.get_frames_num <= self.total_frame_num:
             return False
 
+        # Make sure the entropy of every frame is in the plot data
+        self.offload.wait()
+
         # Send the data for plotting via the event queue
         self.model.event_queue.put(("autofocus", [self.plot_data, False, True]))
 
@@ -507,6 +524,8 @@ class Autofocus:
         r_squared : float
             R-Squared value
         """
+        from scipy.optimize import curve_fit
+        from scipy.stats import linregress
 
         # Convert plot data to numpy array
         x_data = np.asarray(self.plot_data)[:, 0]
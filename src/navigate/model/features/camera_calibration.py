@@ -0,0 +1,280 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+import time
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+from navigate.model.analysis.camera import (
+    WelfordAccumulator,
+    flatfield_map_from_mean,
+    save_camera_maps,
+)
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class CameraCalibration:
+    """Calibrate the camera maps from frames streamed out of the data buffer.
+
+    In 'dark' mode, the offset and variance maps are computed from dark frames. In
+    'flatfield' mode, the flatfield map is computed from evenly-illuminated frames
+    and the current offset map. Frames are accumulated with a WelfordAccumulator as
+    they arrive, so thousands of frames can be used without keeping them. The maps
+    are saved as memory-mappable .npy files and loaded by the camera.
+    """
+
+    def __init__(
+        self, model, mode="dark", number_of_frames=1000, precision="float32"
+    ):
+        """Initialize the CameraCalibration class.
+
+        Parameters
+        ----------
+        model : MicroscopeModel
+            The microscope model object.
+        mode : str
+            'dark' or 'flatfield'.
+        number_of_frames : int
+            Number of frames to accumulate.
+        precision : str
+            Precision of the accumulators, 'float32' or 'float64'.
+        """
+        #: MicroscopeModel: The microscope model.
+        self.model = model
+
+        #: str: Calibration mode, 'dark' or 'flatfield'.
+        self.mode = mode
+
+        #: int: Number of frames to accumulate.
+        self.number_of_frames = int(number_of_frames)
+
+        #: np.dtype: Precision of the accumulators.
+        self.precision = np.dtype(precision)
+
+        #: int: Number of frames triggered.
+        self.signal_count = 0
+
+        #: WelfordAccumulator: Per-pixel mean and variance of the frames.
+        self.accumulator = None
+
+        #: float: Time of the first frame.
+        self.start_time = None
+
+        #: float: Time spent accumulating frames.
+        self.processing_time = 0
+
+        #: int: Number of bytes accumulated.
+        self.processing_bytes = 0
+
+        #: dict: Throughput of the last calibration.
+        self.report = None
+
+        #: dict: A dictionary defining the configuration for the calibration.
+        self.config_table = {
+            "signal": {
+                "init": self.pre_signal_func,
+                "main": self.signal_func,
+                "end": self.signal_end,
+            },
+            "data": {
+                "init": self.pre_data_func,
+                "main": self.data_func,
+                "main-batch": self.data_func_batch,
+                "end": self.end_data_func,
+            },
+            "node": {"node_type": "multi-step", "device_related": True},
+        }
+
+    def pre_signal_func(self):
+        """Reset the number of triggered frames and turn off the camera correction.
+
+        The maps are computed from the raw frames, the real-time correction would
+        subtract the offset and divide by the flatfield before they are accumulated.
+        """
+        self.signal_count = 0
+        self.model.camera_correction = None
+
+    def signal_func(self):
+        """Count the frame acquired with this signal.
+
+        Returns
+        -------
+        bool
+            True.
+        """
+        self.signal_count += 1
+        return True
+
+    def signal_end(self):
+        """Check if enough frames are triggered.
+
+        Returns
+        -------
+        bool
+            True if enough frames are triggered or the acquisition is stopped.
+        """
+        return (
+            self.model.stop_acquisition or self.signal_count >= self.number_of_frames
+        )
+
+    def pre_data_func(self):
+        """Create the accumulator."""
+        self.accumulator = WelfordAccumulator(dtype=self.precision)
+        self.start_time = time.perf_counter()
+        self.processing_time = 0
+        self.processing_bytes = 0
+        self.report = None
+
+    def data_func(self, frame_ids):
+        """Accumulate new frames.
+
+        Parameters
+        ----------
+        frame_ids : list
+            Frame ids of the new frames.
+
+        Returns
+        -------
+        bool
+            True if the calibration is finished.
+        """
+        return self.accumulate([self.model.data_buffer[idx] for idx in frame_ids])
+
+    def data_func_batch(self, frame_ids, batch):
+        """Accumulate new frames from views of the frame buffer.
+
+        Parameters
+        ----------
+        frame_ids : list
+            Frame ids of the new frames.
+        batch : FrameBatch
+            The new frames.
+
+        Returns
+        -------
+        bool
+            True if the calibration is finished.
+        """
+        return self.accumulate(batch.views)
+
+    def accumulate(self, stacks):
+        """Accumulate frames and save the maps after the last frame.
+
+        Parameters
+        ----------
+        stacks : list
+            YX frames or ZYX stacks.
+
+        Returns
+        -------
+        bool
+            True if the calibration is finished.
+        """
+        start = time.perf_counter()
+        for stack in stacks:
+            remaining = self.number_of_frames - self.accumulator.count
+            if remaining <= 0:
+                break
+            if stack.ndim == 3:
+                stack = stack[:remaining]
+            self.accumulator.update(stack)
+            self.processing_bytes += stack.nbytes
+        self.processing_time += time.perf_counter() - start
+        if self.accumulator.count < self.number_of_frames or self.report is not None:
+            return self.report is not None
+        self.save_maps()
+        return True
+
+    def end_data_func(self):
+        """Check if the calibration is finished.
+
+        Returns
+        -------
+        bool
+            True if the calibration is finished or the acquisition is stopped.
+        """
+        return self.report is not None or self.model.stop_acquisition
+
+    def save_maps(self):
+        """Save the maps and reload them in the camera and the camera correction.
+
+        The throughput of the calibration is logged and kept in the report.
+        """
+        camera = self.model.active_microscope.camera
+        serial_number = camera.camera_parameters["hardware"]["serial_number"]
+        if self.mode == "flatfield":
+            offset = camera.offset
+            save_camera_maps(
+                camera.map_path,
+                serial_number,
+                flat=flatfield_map_from_mean(
+                    self.accumulator.mean, 0 if offset is None else offset
+                ),
+            )
+        else:
+            save_camera_maps(
+                camera.map_path,
+                serial_number,
+                off=self.accumulator.mean,
+                var=self.accumulator.variance,
+            )
+        camera.get_offset_variance_maps()
+        # correct the next frames, and find the hot pixels, with the new maps
+        self.model.update_camera_correction()
+
+        elapsed = time.perf_counter() - self.start_time
+        frames = self.accumulator.count
+        processing_time = max(self.processing_time, 1e-9)
+        self.report = {
+            "mode": self.mode,
+            "frames": frames,
+            "elapsed": elapsed,
+            "frames_per_second": frames / elapsed,
+            "processing_time": self.processing_time,
+            "processing_frames_per_second": frames / processing_time,
+            "processing_megabytes_per_second": self.processing_bytes
+            / processing_time
+            / 1e6,
+        }
+        logger.info(
+            f"Camera {serial_number} {self.mode} calibration: {frames} frames in "
+            f"{elapsed:.2f} s ({self.report['frames_per_second']:.1f} frames/s), "
+            f"accumulated at {self.report['processing_frames_per_second']:.1f} "
+            f"frames/s ({self.report['processing_megabytes_per_second']:.1f} MB/s)"
+        )
@@ -33,6 +33,7 @@
 # Standard library imports
 import time
 from functools import reduce
+from operator import getitem
 from threading import Lock
 import copy
 
@@ -41,6 +42,8 @@ import copy
 # Local application imports
 from .image_writer import ImageWriter
 from navigate.tools.common_functions import VariableWithLock
+from navigate.tools.position_table import PositionTable
+from navigate.tools.waveform_template_funcs import decimate_waveform_dict
 
 
 class ChangeResolution:
@@ -128,7 +131,9 @@ class ChangeResolution:
         )
         # prepare active microscope
         waveform_dict = self.model.active_microscope.prepare_acquisition()
-        self.model.event_queue.put(("waveform", waveform_dict))
+        self.model.event_queue.put(
+            ("waveform", decimate_waveform_dict(waveform_dict))
+        )
         # resume data thread
         self.model.resume_data_thread()
         return True
@@ -395,9 +400,7 @@ class LoopByCount:
         if type(steps) is str:
             self.step_by_frame = False
             try:
-                parameters = steps.split(".")
-                config_ref = reduce((lambda pre, n: f"{pre}['{n}']"), parameters, "")
-                exec(f"self.steps = int(self.model.configuration{config_ref})")
+                self.steps = int(reduce(getitem, steps.split("."), model.configuration))
             except:  # noqa
                 self.steps = 1
 
@@ -564,10 +567,10 @@ class MoveToNextPositionInMultiPositionTable:
         #: int: The current index of the position being acquired in the multi-position
         self.current_idx = 0
 
-        #: dict: A dictionary defining the configuration for the position control
-        self.multiposition_table = self.model.configuration["experiment"][
-            "MultiPositions"
-        ]
+        #: PositionTable: The multi-position table.
+        self.multiposition_table = PositionTable(
+            self.model.configuration["experiment"]["MultiPositions"]
+        )
 
         #: int: The total number of positions in the multi-position table.
         self.position_count = self.model.configuration["experiment"]["MicroscopeState"][
@@ -679,9 +682,9 @@ class StackPause:
         self.pause_num = pause_num
         if type(pause_num) is str:
             try:
-                parameters = pause_num.split(".")
-                config_ref = reduce((lambda pre, n: f"{pre}['{n}']"), parameters, "")
-                exec(f"self.pause_num = int(self.model.configuration{config_ref})")
+                self.pause_num = int(
+                    reduce(getitem, pause_num.split("."), model.configuration)
+                )
             except:  # noqa
                 self.pause_num = 1
         self.config_table = {"signal": {"main": self.signal_func}}
@@ -873,7 +876,9 @@ class ZStackAcquisition:
         self.restore_f = pos_dict["f_pos"]
 
         if bool(microscope_state["is_multiposition"]):
-            self.positions = self.model.configuration["experiment"]["MultiPositions"]
+            self.positions = PositionTable(
+                self.model.configuration["experiment"]["MultiPositions"]
+            )
         else:
             self.positions = [
                 {
@@ -1177,6 +1182,213 @@ class ZStackAcquisition:
             self.image_writer.cleanup()
 
 
+class SequencedZStackAcquisition(ZStackAcquisition):
+    """Hardware-timed z-stack acquisition.
+
+    Instead of moving the stage, running the DAQ and stopping it again for every
+    plane, each stack is split into blocks that are planned up front: the z (and,
+    if it changes within the stack, the focus) positions of a block are loaded into
+    the stage as a position sequence and the camera, remote focus and galvo
+    waveforms are expanded to the length of the block, so a single DAQ acquisition
+    triggers every frame of the block.
+
+    Only 'per_stack' cycling with stages that support position sequences (e.g.
+    the NI galvo stage or the synthetic stage) is sequenced. Otherwise the
+    acquisition falls back to the per-frame ZStackAcquisition.
+    """
+
+    def __init__(
+        self, model, get_origin=False, saving_flag=False, saving_dir="z-stack"
+    ):
+        """Initialize the SequencedZStackAcquisition class.
+
+        Parameters:
+        ----------
+        model : MicroscopeModel
+            The microscope model object used for z-stack acquisition control.
+        get_origin : bool, optional
+            Flag to determine whether to get the z and focus origin positions.
+            Default is False.
+        saving_flag : bool, optional
+            Flag to enable image saving during z-stack acquisition. Default is False.
+        saving_dir : str, optional
+            The sub-directory for saving z-stack images. Default is "z-stack".
+        """
+        super().__init__(model, get_origin, saving_flag, saving_dir)
+
+        #: bool: Whether the stacks are acquired as hardware-timed sequences.
+        self.is_sequenced = False
+
+        #: list: Axes moved by the position sequences.
+        self.sequence_axes = ["z"]
+
+        #: int: Maximum number of planes acquired in one sequence.
+        self.block_size = 1
+
+        #: int: Number of planes in the current sequence.
+        self.block_frames = 1
+
+        #: str: Waveform template restored after the acquisition.
+        self.waveform_template = "Default"
+
+        self.config_table["signal"]["cleanup"] = self.cleanup_signal_func
+
+    def pre_signal_func(self):
+        """Initialize the z-stack and decide whether it can be sequenced."""
+        super().pre_signal_func()
+        microscope_state = self.model.configuration["experiment"]["MicroscopeState"]
+        self.sequence_axes = ["z"] if self.focus_step_size == 0 else ["z", "f"]
+        self.is_sequenced = (
+            self.stack_cycling_mode == "per_stack"
+            and self.model.active_microscope.supports_stage_sequence(
+                self.sequence_axes
+            )
+        )
+        if not self.is_sequenced:
+            self.model.logger.info(
+                "*** ZStack sequence not supported, acquiring frame by frame."
+            )
+            return
+
+        # leave half of the data buffer to the data thread
+        self.block_size = max(
+            1, min(self.number_z_steps, self.model.number_of_frames // 2)
+        )
+        self.waveform_template = microscope_state.get("waveform_template", "Default")
+        microscope_state["waveform_template"] = "Sequence"
+
+    def signal_func(self):
+        """Plan the next block of planes and load it into the devices.
+
+        Returns:
+        -------
+        bool
+            A boolean value indicating whether to continue the z-stack acquisition
+            process.
+        """
+        if not self.is_sequenced:
+            return super().signal_func()
+
+        # move X, Y, Theta and compute the first plane, but leave Z and F to the
+        # sequence
+        self.need_to_move_z_position = False
+        r = super().signal_func()
+        self.need_to_move_z_position = True
+        if not r:
+            return False
+
+        microscope = self.model.active_microscope
+        n = min(self.block_size, self.number_z_steps - self.z_position_moved_time)
+        z_positions = [
+            self.current_z_position + i * self.z_step_size for i in range(n)
+        ]
+        f_positions = [
+            self.current_focus_position + i * self.focus_step_size for i in range(n)
+        ]
+        sequence = {"z": z_positions}
+        if "f" in self.sequence_axes:
+            sequence["f"] = f_positions
+        else:
+            self.model.move_stage(
+                {"f_abs": self.current_focus_position}, wait_until_done=True
+            )
+        if not microscope.load_stage_sequence(sequence):
+            # acquire this plane frame by frame
+            self.model.logger.info(
+                "*** ZStack loading the stage sequence failed, moving stage: "
+                f"(z: {self.current_z_position}), (f: {self.current_focus_position})"
+            )
+            n = 1
+            self.model.move_stage(
+                {
+                    "z_abs": self.current_z_position,
+                    "f_abs": self.current_focus_position,
+                },
+                wait_until_done=True,
+            )
+        self.block_frames = n
+
+        # expand the waveforms over the block and rewrite the DAQ tasks
+        self.model.configuration["waveform_templates"]["Sequence"] = {
+            "repeat": 1,
+            "expand": n,
+        }
+        microscope.daq.stop_acquisition()
+        microscope.daq.prepare_acquisition(f"channel_{microscope.current_channel}")
+
+        # record the planned positions, the model records the last one
+        pos_dict = self.model.get_stage_position()
+        frame_id = self.model.frame_id
+        for i in range(n - 1):
+            self.model.data_buffer_positions[frame_id] = [
+                pos_dict.get("x_pos", 0),
+                pos_dict.get("y_pos", 0),
+                z_positions[i],
+                pos_dict.get("theta_pos", 0),
+                f_positions[i],
+            ]
+            frame_id = (frame_id + 1) % self.model.number_of_frames
+        self.model.frame_id = frame_id
+
+        self.model.logger.debug(
+            f"*** ZStack sequence: {n} planes from (z: {z_positions[0]}), "
+            f"(f: {f_positions[0]})"
+        )
+        return True
+
+    def signal_end(self):
+        """Advance over the sequenced planes and handle the end of the stack.
+
+        Returns:
+        -------
+        bool
+            A boolean value indicating whether to end the current node.
+        """
+        if not self.is_sequenced:
+            return super().signal_end()
+
+        # the parent advances one plane
+        skipped = self.block_frames - 1
+        self.current_z_position += skipped * self.z_step_size
+        self.current_focus_position += skipped * self.focus_step_size
+        self.z_position_moved_time += skipped
+        self.block_frames = 1
+
+        is_end = self.model.stop_acquisition or (
+            self.z_position_moved_time + 1 >= self.number_z_steps
+        )
+        if is_end:
+            # give the stages back before they move to the next position
+            self.model.active_microscope.end_stage_sequence()
+        r = super().signal_end()
+        if r:
+            self.cleanup_signal_func()
+        return r
+
+    def update_channel(self):
+        """Update the active channel, the DAQ tasks are rewritten with the next
+        sequence."""
+        if not self.is_sequenced:
+            return super().update_channel()
+        self.current_channel_in_list = (
+            self.current_channel_in_list + 1
+        ) % self.channels
+        self.model.active_microscope.prepare_next_channel(update_daq_task_flag=False)
+        if self.defocus is not None:
+            self.current_focus_position += self.defocus[self.current_channel_in_list]
+
+    def cleanup_signal_func(self):
+        """Return the stages and the waveform template to frame by frame
+        acquisition."""
+        if not self.is_sequenced:
+            return
+        self.is_sequenced = False
+        self.model.active_microscope.end_stage_sequence()
+        self.model.configuration["experiment"]["MicroscopeState"][
+            "waveform_template"
+        ] = self.waveform_template
+
+
 class FindTissueSimple2D:
     """FindTissueSimple2D class for detecting tissue and gridding out the imaging
     space in  2D.
@@ -32,9 +32,12 @@
 
 # Standard Library Imports
 import logging
+import time
 
 # Third Party Imports
 import numpy as np
+from navigate.model.analysis.deskew import DeskewPreview, downsample_frame
+from navigate.model.features.feature_container import DataOffload
 from navigate.model.features.image_writer import ImageWriter
 
 # from navigate.model import data_sources
@@ -50,7 +53,15 @@ logger = logging.getLogger(p)
 
 
 class ConstantVelocityAcquisition:
-    def __init__(self, model, axis="z", saving_flag=False, saving_dir="cva"):
+    def __init__(
+        self,
+        model,
+        axis="z",
+        saving_flag=False,
+        saving_dir="cva",
+        preview=False,
+        preview_downsample=4,
+    ):
         self.model = model
 
         self.axis = axis
@@ -62,6 +73,17 @@ class ConstantVelocityAcquisition:
         if self.saving_flag:
             self.image_writer = ImageWriter(model=self.model, sub_dir=saving_dir)
 
+        #: bool: Show a live deskewed preview of the scan.
+        self.preview = preview
+        #: int: Lateral downsampling factor of the preview.
+        self.preview_downsample = preview_downsample
+        #: dict: DeskewPreview of each channel.
+        self.deskew_previews = {}
+        #: float: Time the preview was last sent to the GUI.
+        self.preview_time = 0
+        #: DataOffload: Downsamples the frames for the preview in worker processes.
+        self.offload = DataOffload(downsample_frame, self.update_preview)
+
         self.config_table = {
             "signal": {
                 "init": self.pre_func_signal,
@@ -74,6 +96,7 @@ class ConstantVelocityAcquisition:
                 "main": self.in_data_func,
                 "end": self.end_data_func,
                 "cleanup": self.cleanup_data_function,
+                "offload": self.offload,
             },
             "node": {"node_type": "multi-step", "device_related": True},
         }
@@ -473,9 +496,21 @@ class ConstantVelocityAcquisition:
         self.total_frames = self.expected_frames * self.channels
         print(f"total channels = {self.channels}")
         print(f"total frames = {self.total_frames}")
+        self.deskew_previews = {}
+        self.preview_time = 0
 
     def in_data_func(self, frame_ids):
         # print(f"frame_ids = {len(frame_ids)}")
+        if self.preview:
+            # frames are downsampled off the data thread, in frame order, and left
+            # out of the preview when the workers fall behind
+            for i, frame_id in enumerate(frame_ids):
+                self.offload.submit(
+                    self.model.data_buffer[frame_id],
+                    self.preview_downsample,
+                    key=self.received_frames + i,
+                    block=False,
+                )
         self.received_frames += len(frame_ids)
         if self.image_writer is not None:
             self.image_writer.save_image(frame_ids)
@@ -516,8 +551,91 @@ class ConstantVelocityAcquisition:
         print(f"Position: {pos} Stop Position: {self.stop_position*1000} ")
         logger.info(f"Position: {pos} Stop Position: {self.stop_position*1000} ")
         self.end_acquisition = self.received_frames >= self.total_frames
+        if self.end_acquisition and self.preview:
+            self.offload.wait()
+            for preview in self.deskew_previews.values():
+                preview.finish()
+            self.send_preview()
         return self.end_acquisition
 
+    def get_deskew_preview(self, channel):
+        """Get the DeskewPreview of a channel, created on its first frame.
+
+        The scan is sheared by the stage step between two frames, along the BDV
+        shear dimension and angle if they are configured, otherwise along Y at 45
+        degrees.
+
+        Parameters
+        ----------
+        channel : int
+            Index of the channel in the selected channels.
+
+        Returns
+        -------
+        preview : DeskewPreview
+            Deskewed preview of the channel.
+        """
+        if channel not in self.deskew_previews:
+            configuration = self.model.configuration
+            state = configuration["experiment"]["MicroscopeState"]
+            pixel_size = float(
+                configuration["configuration"]["microscopes"][
+                    state["microscope_name"]
+                ]["zoom"]["pixel_size"][state["zoom"]]
+            )
+            shear = (
+                configuration["configuration"].get("BDVParameters", None) or {}
+            ).get("shear", {})
+            self.deskew_previews[channel] = DeskewPreview(
+                (self.model.img_height, self.model.img_width),
+                self.expected_frames,
+                self.actual_mechanical_step_size_um,
+                pixel_size,
+                angle=shear.get("shear_angle", 0) or 45,
+                dimension=shear.get("shear_dimension", "YZ"),
+                downsample=self.preview_downsample,
+            )
+        return self.deskew_previews[channel]
+
+    def update_preview(self, frame_number, plane):
+        """Add a downsampled frame to the deskewed preview of its channel.
+
+        Called with the offloaded results in frame order. The preview is sent to the
+        GUI at most twice a second.
+
+        Parameters
+        ----------
+        frame_number : int
+            Number of the frame in the acquisition.
+        plane : np.ndarray
+            Downsampled frame.
+        """
+        channel, index = divmod(frame_number, self.expected_frames)
+        preview = self.get_deskew_preview(channel)
+        if preview.add_plane(index, plane) and time.time() - self.preview_time > 0.5:
+            self.send_preview(channel)
+
+    def send_preview(self, channel=None):
+        """Send the maximum intensity projections of the preview to the GUI.
+
+        Parameters
+        ----------
+        channel : int, optional
+            Index of the channel, default is the last channel with a preview.
+        """
+        if not self.deskew_previews:
+            return
+        if channel is None:
+            channel = max(self.deskew_previews)
+        self.preview_time = time.time()
+        mips = self.deskew_previews[channel].mips
+        self.model.event_queue.put(
+            (
+                "deskew_preview",
+                {f"CH{channel + 1} {k.upper()}": mips[k] for k in mips},
+            )
+        )
+
     def cleanup_data_function(self):
         """Clean up the constant velocity acquisition.
 
@@ -527,5 +645,6 @@ class ConstantVelocityAcquisition:
         Cleans up the image writer.
         """
         print("clean up data function called")
+        self.offload.cancel()
         if self.image_writer:
             self.image_writer.cleanup()
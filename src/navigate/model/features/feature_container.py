@@ -32,16 +32,278 @@
 
 # Standard Library Imports
 import logging
+import os
+import threading
+import time
 import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
 
 # Third Party Imports
+import numpy as np
 
 # Local Imports
+from navigate.model.execution_tracer import ExecutionTracer
 
 p = __name__.split(".")[1]
 
 logger = logging.getLogger(p)
 
+#: ProcessPoolExecutor: Worker processes shared by the offloaded data functions.
+_offload_pool = None
+
+#: threading.Lock: Lock of the offload pool creation.
+_offload_pool_lock = threading.Lock()
+
+
+def get_offload_pool(max_workers=None):
+    """Get the worker process pool shared by the offloaded data functions.
+
+    The pool is created on the first call, so acquisitions that do not offload
+    anything do not start worker processes.
+
+    Parameters:
+    ----------
+    max_workers : int, optional
+        Number of worker processes when the pool is created. Default is the number of
+        CPUs minus one, at most 4.
+
+    Returns:
+    -------
+    ProcessPoolExecutor
+        The worker process pool.
+    """
+    global _offload_pool
+    with _offload_pool_lock:
+        if _offload_pool is None:
+            if max_workers is None:
+                max_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+            _offload_pool = ProcessPoolExecutor(max_workers=max_workers)
+        return _offload_pool
+
+
+def shutdown_offload_pool():
+    """Shut down the worker process pool of the offloaded data functions."""
+    global _offload_pool
+    with _offload_pool_lock:
+        if _offload_pool is not None:
+            _offload_pool.shutdown(wait=True, cancel_futures=True)
+            _offload_pool = None
+
+
+class DataOffload:
+    """Run a CPU-heavy data function on frames in worker processes.
+
+    A feature creates a DataOffload with a picklable function and a callback, and
+    registers it as 'offload' in the 'data' part of its configuration table. The
+    feature's 'main' function submits frames, which are passed to the workers as
+    SharedNDArray handles, so only the shared memory name is copied. The callback
+    receives the results in submission order as soon as they are ready, from a
+    thread of the pool, so it should only touch state that 'main' does not.
+
+    The DataNode waits for the outstanding results before it runs the node's 'end'
+    function, so 'end' always sees every result.
+    """
+
+    def __init__(self, func, callback, max_in_flight=None, executor=None):
+        """Initialize the DataOffload object.
+
+        Parameters:
+        ----------
+        func : callable
+            Module level function called as func(frame, *args) in a worker process.
+        callback : callable
+            Called as callback(key, result) with the result of each submission.
+        max_in_flight : int, optional
+            Maximum number of outstanding submissions, submit blocks (or drops the
+            frame) while the limit is reached so the data buffer is not overwritten
+            under a running function. Default is twice the number of workers.
+        executor : concurrent.futures.Executor, optional
+            Executor running the function. Default is the shared worker process
+            pool.
+        """
+        #: callable: Function run in the worker processes.
+        self.func = func
+        #: callable: Function receiving the results.
+        self.callback = callback
+        #: concurrent.futures.Executor: Executor running the function.
+        self._executor = executor
+        #: int: Maximum number of outstanding submissions.
+        self.max_in_flight = max_in_flight
+        #: deque: (key, future) of the outstanding submissions in submission order.
+        self._pending = deque()
+        #: threading.Lock: Lock of the outstanding submissions.
+        self._lock = threading.Lock()
+        #: threading.Lock: Lock keeping the callbacks in submission order.
+        self._deliver_lock = threading.Lock()
+        #: BaseException or None: First exception raised by the function.
+        self.error = None
+
+    @property
+    def executor(self):
+        """concurrent.futures.Executor: Executor running the function."""
+        if self._executor is None:
+            self._executor = get_offload_pool()
+        return self._executor
+
+    @property
+    def pending(self):
+        """int: Number of submissions whose results are not delivered yet."""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, frame, *args, key=None, block=True):
+        """Run the function on a frame in a worker process.
+
+        Parameters:
+        ----------
+        frame : SharedNDArray or np.ndarray
+            Frame passed to the function.
+        *args : tuple
+            Additional arguments passed to the function.
+        key : object, optional
+            Passed to the callback with the result.
+        block : bool, optional
+            Wait while the maximum number of outstanding submissions is reached.
+            If False, the frame is not submitted instead. Default is True.
+
+        Returns:
+        -------
+        bool
+            Whether the frame was submitted.
+        """
+        max_in_flight = self.max_in_flight or 2 * getattr(
+            self.executor, "_max_workers", 1
+        )
+        while True:
+            with self._lock:
+                if len(self._pending) < max_in_flight:
+                    future = self.executor.submit(self.func, frame, *args)
+                    self._pending.append((key, future))
+                    break
+                if not block:
+                    return False
+                oldest = self._pending[0][1]
+            wait_futures([oldest])
+            self._deliver()
+        future.add_done_callback(self._deliver)
+        return True
+
+    def _deliver(self, *args):
+        """Pass the finished results to the callback in submission order.
+
+        The callback runs outside of the lock of the outstanding submissions, so
+        submit isn't held up by a slow callback.
+        """
+        with self._deliver_lock:
+            while True:
+                with self._lock:
+                    if not self._pending or not self._pending[0][1].done():
+                        return
+                    key, future = self._pending.popleft()
+                try:
+                    result = future.result()
+                except BaseException as e:
+                    logger.debug(f"DataOffload - {e}")
+                    if self.error is None:
+                        self.error = e
+                    continue
+                self.callback(key, result)
+
+    def wait(self):
+        """Wait until every result is delivered.
+
+        Raises:
+        ------
+        BaseException
+            The first exception raised by the function since the last wait.
+        """
+        with self._lock:
+            futures = [future for _, future in self._pending]
+        wait_futures(futures)
+        self._deliver()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def cancel(self):
+        """Cancel the submissions that have not started."""
+        with self._lock:
+            for _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+
+
+class FrameBatch:
+    """New frames of a data function call as views of the frame buffer.
+
+    The frame buffer is a (n_frames x height x width) array written by the camera
+    as a ring. Each run of consecutive frame ids is a single view of the buffer, so
+    no frame is copied. A batch wrapping around the end of the buffer has two runs.
+    """
+
+    def __init__(self, frame_buffer, frame_ids):
+        """Initialize the FrameBatch.
+
+        Parameters
+        ----------
+        frame_buffer : np.ndarray
+            (n_frames x height x width) frame buffer.
+        frame_ids : list[int]
+            Frame ids of the batch.
+        """
+        #: np.ndarray: (n_frames x height x width) frame buffer.
+        self.frame_buffer = frame_buffer
+
+        #: list[int]: Frame ids of the batch.
+        self.frame_ids = list(frame_ids)
+
+        #: list[np.ndarray]: (n x height x width) views, one per run of frame ids.
+        self._views = None
+
+    def __len__(self):
+        """Return the number of frames."""
+        return len(self.frame_ids)
+
+    def __iter__(self):
+        """Iterate over the (height x width) frames."""
+        for view in self.views:
+            yield from view
+
+    @property
+    def views(self):
+        """list[np.ndarray]: (n x height x width) views of the runs of frame ids."""
+        if self._views is None:
+            self._views = []
+            start = 0
+            for i in range(1, len(self.frame_ids) + 1):
+                if (
+                    i == len(self.frame_ids)
+                    or self.frame_ids[i] != self.frame_ids[i - 1] + 1
+                ):
+                    first, last = self.frame_ids[start], self.frame_ids[i - 1]
+                    self._views.append(self.frame_buffer[first : last + 1])
+                    start = i
+        return self._views
+
+    def stack(self):
+        """Return the frames as one (n x height x width) array.
+
+        The array is a view of the frame buffer unless the batch has several runs,
+        in which case the runs are copied into a new array.
+
+        Returns
+        -------
+        np.ndarray
+            (n x height x width) frames.
+        """
+        views = self.views
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return self.frame_buffer[0:0]
+        return np.concatenate(views)
+
 
 class TreeNode:
     """
@@ -339,7 +601,7 @@ class DataNode(TreeNode):
         #: bool: A boolean indicating whether the node is marked.
         self.is_marked = False
 
-    def run(self, *args):
+    def run(self, *args, batch=None):
         """Execute the data processing functions associated with this node.
 
         This method is used to execute the data processing functions associated with
@@ -347,10 +609,16 @@ class DataNode(TreeNode):
         initialized and determines whether the current frame meets the criteria to
         execute the main data processing function.
 
+        A node registering a 'main-batch' data function opts in to batch processing:
+        the function is called with the frame ids and a FrameBatch instead of the
+        'main' function.
+
         Parameters:
         ----------
         *args : any
             Additional arguments to pass to the data processing functions.
+        batch : FrameBatch, optional
+            The new frames as views of the frame buffer.
 
         Returns:
         -------
@@ -372,7 +640,15 @@ class DataNode(TreeNode):
         if not self.node_funcs["pre-main"](*args):
             return False, False
 
-        result = self.node_funcs["main"](*args)
+        if batch is not None and "main-batch" in self.node_funcs:
+            result = self.node_funcs["main-batch"](*args, batch)
+        else:
+            result = self.node_funcs["main"](*args)
+
+        # wait for the offloaded data functions before the node ends
+        offload = self.node_funcs.get("offload", None)
+        if offload and (self.node_type == "one-step" or result):
+            offload.wait()
 
         if self.node_type == "multi-step" and not self.node_funcs["end"]():
             return result, False
@@ -600,7 +876,7 @@ class DataContainer(Container):
       between nodes and manages node cleanup when necessary.
     """
 
-    def __init__(self, root=None, cleanup_list=[]):
+    def __init__(self, root=None, cleanup_list=[], frame_buffer=None):
         """Initialize the DataContainer object.
 
         Parameters:
@@ -610,9 +886,43 @@ class DataContainer(Container):
         cleanup_list : list of TreeNode, optional
             A list of nodes containing 'cleanup' functions to be executed when the
             container is closed. Default is an empty list.
+        frame_buffer : callable, optional
+            Returns the (n_frames x height x width) frame buffer, or None if the
+            frames are not stored in one array. Default is None.
         """
         super().__init__(root, cleanup_list)
 
+        #: callable: Returns the frame buffer.
+        self.frame_buffer = frame_buffer
+
+        #: dict: Running time of the data nodes in the format of
+        # {node_name: {"calls": int, "frames": int, "time": float}}.
+        self.timings = {}
+
+    def reset(self):
+        """Reset the container's state and the node timings."""
+        super().reset()
+        self.timings = {}
+
+    def record_timing(self, node, frame_num, elapsed_time):
+        """Accumulate the running time of a data node.
+
+        Parameters:
+        ----------
+        node : DataNode
+            The data node.
+        frame_num : int
+            Number of frames the node was called with.
+        elapsed_time : float
+            Running time of the node in seconds.
+        """
+        timing = self.timings.setdefault(
+            node.node_name, {"calls": 0, "frames": 0, "time": 0.0}
+        )
+        timing["calls"] += 1
+        timing["frames"] += frame_num
+        timing["time"] += elapsed_time
+
     def run(self, *args):
         """Run the data-based control sequence.
 
@@ -639,9 +949,20 @@ class DataContainer(Container):
             return
         if not self.curr_node:
             self.curr_node = self.root
+
+        # the new frames as views of the frame buffer
+        batch = None
+        frame_num = 0
+        if args and isinstance(args[0], (list, tuple)):
+            frame_num = len(args[0])
+            frame_buffer = self.frame_buffer() if self.frame_buffer else None
+            if isinstance(frame_buffer, np.ndarray):
+                batch = FrameBatch(frame_buffer, args[0])
+
         while self.curr_node:
+            start_time = time.perf_counter()
             try:
-                result, is_end = self.curr_node.run(*args)
+                result, is_end = self.curr_node.run(*args, batch=batch)
             except Exception:
                 logger.debug(f"DataContainer - {traceback.format_exc()}")
                 if (
@@ -669,6 +990,10 @@ class DataContainer(Container):
                     self.end_flag = True
                     self.cleanup()
                     return
+            finally:
+                self.record_timing(
+                    self.curr_node, frame_num, time.perf_counter() - start_time
+                )
             if not is_end:
                 return
             if result and self.curr_node.child:
@@ -784,6 +1109,7 @@ def load_features(model, feature_list):
 
     signal_cleanup_list, data_cleanup_list = [], []
     shared_variables = {}
+    tracer = getattr(model, "tracer", None)
 
     def create_node(feature_dict):
         """Create SignalNode and DataNode instances for a feature module.
@@ -841,16 +1167,16 @@ def load_features(model, feature_list):
         if node_config.get("node_type", "") == "multi-step":
             node_config["device_related"] = True
 
-        signal_node = SignalNode(
-            feature_dict["name"].__name__,
-            get_registered_funcs(feature, "signal"),
-            **node_config,
-        )
-        data_node = DataNode(
-            feature_dict["name"].__name__,
-            get_registered_funcs(feature, "data"),
-            **node_config,
-        )
+        node_name = feature_dict["name"].__name__
+        signal_funcs = get_registered_funcs(feature, "signal")
+        data_funcs = get_registered_funcs(feature, "data")
+        # record each call of the node functions when the acquisition is traced
+        if isinstance(tracer, ExecutionTracer):
+            signal_funcs = tracer.wrap_funcs(node_name, "signal", signal_funcs)
+            data_funcs = tracer.wrap_funcs(node_name, "data", data_funcs)
+
+        signal_node = SignalNode(node_name, signal_funcs, **node_config)
+        data_node = DataNode(node_name, data_funcs, **node_config)
 
         if "cleanup" in feature.config_table.get("signal", {}):
             signal_cleanup_list.append(signal_node)
@@ -1021,7 +1347,9 @@ def load_features(model, feature_list):
         if node[0] == "child":
             node[1].child, node[2].child = create_node({"name": DummyFeature})
     return SignalContainer(signal_root, signal_cleanup_list), DataContainer(
-        data_root, data_cleanup_list
+        data_root,
+        data_cleanup_list,
+        frame_buffer=lambda: getattr(model, "data_buffer_block", None),
     )
 
 
@@ -0,0 +1,254 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import ast
+import functools
+from dataclasses import dataclass
+
+# Third Party Imports
+
+# Local Imports
+
+
+class FeatureListError(ValueError):
+    """Raised when a string can not be compiled to a valid feature list."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A name in a feature list, resolved when the feature list is instantiated."""
+
+    #: str: Name of the feature class or function.
+    name: str
+
+
+@dataclass(frozen=True)
+class FrozenList:
+    """Hashable form of a list."""
+
+    #: tuple: Frozen items of the list.
+    items: tuple
+
+
+@dataclass(frozen=True)
+class FrozenDict:
+    """Hashable form of a dictionary, the key order is kept."""
+
+    #: tuple: Frozen (key, value) pairs of the dictionary.
+    items: tuple
+
+
+@dataclass(frozen=True)
+class CompiledFeatureList:
+    """Validated, hashable intermediate representation of a feature list.
+
+    A feature list string is parsed and validated once. Feature lists, with
+    fresh dictionaries and lists that features are free to modify, are built
+    from it with instantiate.
+    """
+
+    #: FrozenList: Frozen feature list.
+    root: FrozenList
+
+    def instantiate(self, namespace):
+        """Build a feature list.
+
+        Parameters
+        ----------
+        namespace : dict
+            Maps the names in the feature list to feature classes and functions.
+
+        Returns
+        -------
+        feature_list : list
+            A new feature list.
+
+        Raises
+        ------
+        FeatureListError
+            If a name is not in the namespace.
+        """
+
+        def thaw(value):
+            if isinstance(value, Reference):
+                try:
+                    return namespace[value.name]
+                except KeyError:
+                    raise FeatureListError(f"Unknown name: {value.name}")
+            if isinstance(value, FrozenDict):
+                return {k: thaw(v) for k, v in value.items}
+            if isinstance(value, FrozenList):
+                return [thaw(v) for v in value.items]
+            if type(value) is tuple:
+                return tuple(thaw(v) for v in value)
+            return value
+
+        return thaw(self.root)
+
+
+def _evaluate(node):
+    """Convert a literal expression to its frozen value.
+
+    Only literals (numbers, strings, booleans, None), names, lists, tuples and
+    dictionaries are allowed, nothing is executed.
+
+    Parameters
+    ----------
+    node : ast.AST
+        Expression node.
+
+    Returns
+    -------
+    value : object
+        Frozen value of the expression.
+
+    Raises
+    ------
+    FeatureListError
+        If the expression is not allowed in a feature list.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return Reference(node.id)
+    if isinstance(node, ast.List):
+        return FrozenList(tuple(_evaluate(item) for item in node.elts))
+    if isinstance(node, ast.Tuple):
+        return tuple(_evaluate(item) for item in node.elts)
+    if isinstance(node, ast.Dict):
+        if None in node.keys:
+            raise FeatureListError("Dictionary unpacking is not allowed")
+        keys = [_evaluate(key) for key in node.keys]
+        if not all(type(key) in (str, int, float, bool) for key in keys):
+            raise FeatureListError("Dictionary keys should be literals")
+        return FrozenDict(tuple(zip(keys, (_evaluate(v) for v in node.values))))
+    if (
+        isinstance(node, ast.UnaryOp)
+        and isinstance(node.op, (ast.USub, ast.UAdd))
+        and isinstance(node.operand, ast.Constant)
+        and type(node.operand.value) in (int, float)
+    ):
+        value = node.operand.value
+        return -value if isinstance(node.op, ast.USub) else value
+    raise FeatureListError(
+        f"'{ast.unparse(node)}' is not allowed in a feature list"
+    )
+
+
+def _validate(feature_list):
+    """Check the structure of a frozen feature list.
+
+    'args' of a feature which is not a tuple is wrapped in a tuple.
+
+    Parameters
+    ----------
+    feature_list : FrozenList or tuple
+        Frozen feature list or a loop in it.
+
+    Returns
+    -------
+    feature_list : FrozenList or tuple
+        Validated feature list.
+
+    Raises
+    ------
+    FeatureListError
+        If the feature list is not valid.
+    """
+    items = []
+    for item in (
+        feature_list.items if isinstance(feature_list, FrozenList) else feature_list
+    ):
+        if isinstance(item, FrozenDict):
+            feature = dict(item.items)
+            name = feature.get("name", None)
+            if isinstance(name, str):
+                name = Reference(name)
+            if not isinstance(name, Reference):
+                raise FeatureListError(f"Feature has no valid name: {feature}")
+            feature["name"] = name
+            if "args" in feature and type(feature["args"]) is not tuple:
+                feature["args"] = (feature["args"],)
+            if "node" in feature and not isinstance(feature["node"], FrozenDict):
+                raise FeatureListError("'node' of a feature should be a dictionary")
+            for k in ("true", "false"):
+                if k not in feature or isinstance(feature[k], str):
+                    continue
+                if not isinstance(feature[k], FrozenList):
+                    raise FeatureListError(f"'{k}' of a feature should be a list")
+                feature[k] = _validate(feature[k])
+            items.append(FrozenDict(tuple(feature.items())))
+        elif isinstance(item, (FrozenList, tuple)):
+            items.append(_validate(item))
+        elif item in ("break", "continue"):
+            items.append(item)
+        else:
+            raise FeatureListError(f"'{item}' is not a feature")
+    if isinstance(feature_list, FrozenList):
+        return FrozenList(tuple(items))
+    return tuple(items)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_feature_list(content):
+    """Compile a feature list string.
+
+    The result is cached, so a feature list string is parsed once.
+
+    Parameters
+    ----------
+    content : str
+        A string value that represents a feature list.
+
+    Returns
+    -------
+    compiled_feature_list : CompiledFeatureList
+        Compiled feature list.
+
+    Raises
+    ------
+    FeatureListError
+        If the string is not a valid feature list.
+    """
+    if not isinstance(content, str):
+        raise FeatureListError("Please make sure the feature list is a string!")
+    try:
+        expression = ast.parse(content.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FeatureListError(f"Can't parse the feature list: {e}")
+    root = _evaluate(expression.body)
+    if not isinstance(root, FrozenList):
+        raise FeatureListError("Please make sure the feature list is a list!")
+    return CompiledFeatureList(_validate(root))
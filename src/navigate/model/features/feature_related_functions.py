@@ -40,6 +40,8 @@ import importlib
 # Local application imports
 from navigate.model.features.auto_tile_scan import CalculateFocusRange  # noqa
 from navigate.model.features.autofocus import Autofocus  # noqa
+from navigate.model.features.camera_calibration import CameraCalibration  # noqa
+from navigate.model.features.focus_map import FocusMap  # noqa
 from navigate.model.features.common_features import (
     ChangeResolution,  # noqa
     Snap,  # noqa
@@ -49,6 +51,7 @@ from navigate.model.features.common_features import (
     MoveToNextPositionInMultiPositionTable,  # noqa
     StackPause,  # noqa
     ZStackAcquisition,  # noqa
+    SequencedZStackAcquisition,  # noqa
     FindTissueSimple2D,  # noqa
 )
 from navigate.model.features.image_writer import ImageWriter  # noqa
@@ -58,7 +61,13 @@ from navigate.model.features.remove_empty_tiles import (
     DetectTissueInStack,  # noqa
     DetectTissueInStackAndReturn, #noqa
     DetectTissueInStackAndRecord,  # noqa
+    DetectTissueRangeInStackAndRecord,  # noqa
     RemoveEmptyPositions,  # noqa
+    AdaptZRange,  # noqa
+)
+from navigate.model.features.feature_list_compiler import (
+    compile_feature_list,
+    FeatureListError,
 )
 from navigate.tools.file_functions import load_yaml_file
 from navigate.tools.common_functions import load_module_from_file
@@ -126,59 +135,21 @@ def convert_str_to_feature_list(content: str):
     feature_list : List
         A list: If the string value can be converted to a valid feature list
         None: If can not.
-    """
-
-    def convert_args_to_tuple(feature_list):
-        """Recursively convert 'args' within a feature list to tuples.
-
-        This function takes a feature list, which is typically used for specifying
-        configuration options, and ensures that all 'args' elements within the list
-        are converted to tuples. It operates recursively to handle nested feature
-        lists.
-
-        Parameters:
-        ----------
-        feature_list : list
-            The feature list to process. It can contain dictionaries with 'args'
-            elements that need to be converted to tuples.
-
-        Returns:
-        -------
-        None
 
-        Notes:
-        ------
-        - This function operates in-place and does not return a new list.
-        - It is useful for ensuring that 'args' elements within a feature list are
-          of tuple type, as required by certain functions or processes.
-        - The function does not modify elements that are not dictionaries or do not
-          have an 'args' key.
-        - It handles nested feature lists, converting 'args' in inner lists as well.
-        """
-
-        if not feature_list:
-            return
-        for item in feature_list:
-            if type(item) is dict:
-                if "args" in item and type(item["args"]) is not tuple:
-                    item["args"] = (item["args"],)
-            else:
-                convert_args_to_tuple(item)
+    Note
+    ----
+        The string is compiled once (see compile_feature_list) and only literals,
+        names, lists, tuples and dictionaries are accepted, nothing is executed.
+        Every call returns a new list.
+    """
 
     if content in ["break", '"break"', "'break'"]:
         return "break"
     if content in ["continue", '"continue"', "'continue'"]:
         return "continue"
     try:
-        exec_result = {}
-        exec(f"result={content}", globals(), exec_result)
-        if type(exec_result["result"]) is not list:
-            print("Please make sure the feature list is a list!")
-            return None
-        # 'args' should be tuple
-        convert_args_to_tuple(exec_result["result"])
-        return exec_result["result"]
-    except Exception as e:
+        return compile_feature_list(content).instantiate(globals())
+    except FeatureListError as e:
         print("Can't build this feature list!", e)
         return None
 
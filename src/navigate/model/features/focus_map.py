@@ -0,0 +1,276 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+# Standard library imports
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from navigate.model.analysis.focus_surface import FocusSurface, select_focus_samples
+from navigate.model.features.autofocus import Autofocus
+from navigate.tools.position_table import PositionTable
+
+
+class FocusMap:
+    """FocusMap class for interpolating the focus of every multi-position tile.
+
+    This class autofocuses a sparse subset of the multi-position table, fits a
+    smooth surface of best focus over x, y and z, and writes the interpolated focus
+    to every position in the table.
+
+    Notes:
+    ------
+    - The autofocus measurements are performed using an instance of the `Autofocus`
+    class with the autofocus settings of the active microscope.
+
+    - The first run samples `n_samples` positions. If the feature runs again in the
+    same acquisition, e.g. inside a time-lapse loop, it only re-samples
+    `drift_samples` positions and shifts the surface by their median residual to
+    track drift. Every `resample_every` runs, the full set is sampled and the
+    surface is fitted again (0 never refits).
+    """
+
+    def __init__(
+        self,
+        model,
+        n_samples=9,
+        method="thin_plate",
+        drift_samples=3,
+        resample_every=0,
+    ):
+        """Initialize the FocusMap class.
+
+        Parameters:
+        ----------
+        model : MicroscopeModel
+            The microscope model object.
+        n_samples : int
+            Number of positions autofocused to fit the surface.
+        method : str
+            Surface fitting method, "thin_plate" or "plane".
+        drift_samples : int
+            Number of positions autofocused to track drift in later runs.
+        resample_every : int
+            Refit the surface every `resample_every` runs, 0 never refits.
+        """
+        #: MicroscopeModel: The microscope model object.
+        self.model = model
+        #: Autofocus: The autofocus object used at each sample position.
+        self.autofocus = Autofocus(model)
+        #: int: Number of positions autofocused to fit the surface.
+        self.n_samples = int(n_samples)
+        #: int: Number of positions autofocused to track drift.
+        self.drift_samples = int(drift_samples)
+        #: int: Refit the surface every `resample_every` runs.
+        self.resample_every = int(resample_every)
+        #: FocusSurface: The surface of best focus.
+        self.surface = FocusSurface(method)
+        #: int: Number of completed runs.
+        self.run_count = 0
+        #: PositionTable: The multi-position table.
+        self.positions = None
+        #: np.ndarray: Indices of the positions being autofocused.
+        self.sample_ids = None
+        #: list: Best focus measured at each sample position.
+        self.sample_focus = []
+        #: int: Number of autofocus routines finished by the data thread.
+        self.data_count = 0
+
+        #: dict: A dictionary that defines the configuration for each stage of the
+        # focus map process, including initialization, main execution, and
+        # finalization steps.
+        self.config_table = {
+            "signal": {
+                "init": self.pre_func_signal,
+                "main": self.in_func_signal,
+                "end": self.end_func_signal,
+            },
+            "data": {
+                "init": self.pre_func_data,
+                "main": self.in_func_data,
+                "end": self.end_func_data,
+            },
+            "node": {"node_type": "multi-step", "device_related": True},
+        }
+
+    def is_refit(self):
+        """Check whether this run fits a new surface.
+
+        Returns:
+        -------
+        bool
+            True if the full set of positions is sampled.
+        """
+        return (
+            self.run_count == 0
+            or self.drift_samples < 1
+            or (self.resample_every > 0 and self.run_count % self.resample_every == 0)
+        )
+
+    def move_to_sample(self):
+        """Move the stage to the next sample position and prepare the autofocus.
+
+        The autofocus is centered on the focus expected from the current surface,
+        or on the focus in the table before the first fit.
+        """
+        position = self.positions[self.sample_ids[len(self.sample_focus)]]
+        if self.surface.fit_method is not None:
+            position["f"] = float(self.predict([position])[0])
+        self.model.configuration["experiment"]["StageParameters"]["f"] = position["f"]
+        self.model.move_stage(
+            {f"{axis}_abs": value for axis, value in position.items()},
+            wait_until_done=True,
+        )
+        self.autofocus.pre_func_signal()
+
+    def predict(self, positions):
+        """Interpolate the best focus at positions.
+
+        Parameters:
+        ----------
+        positions : list or PositionTable
+            Positions in the format of [{axis: value}].
+
+        Returns:
+        -------
+        np.ndarray
+            Focus of each position.
+        """
+        return self.surface.predict(
+            [[position[axis] for axis in ["x", "y", "z"]] for position in positions]
+        )
+
+    def pre_func_signal(self):
+        """Select the sample positions and move to the first one."""
+        self.model.active_microscope.current_channel = 0
+        self.model.active_microscope.prepare_next_channel()
+        self.positions = PositionTable(
+            self.model.configuration["experiment"]["MultiPositions"]
+        )
+        if self.is_refit():
+            self.sample_ids = select_focus_samples(
+                self.positions.array[:, :3], self.n_samples
+            )
+        else:
+            self.sample_ids = select_focus_samples(
+                self.positions.array[:, :3], self.drift_samples
+            )
+        self.sample_focus = []
+        self.model.logger.info(
+            f"FocusMap: autofocus {len(self.sample_ids)} of {len(self.positions)} "
+            "positions"
+        )
+        if len(self.sample_ids) > 0:
+            self.move_to_sample()
+
+    def in_func_signal(self):
+        """Run the autofocus routine at the current sample position."""
+        if len(self.sample_ids) == 0:
+            return
+        focus = self.autofocus.in_func_signal()
+        if focus is not None:
+            self.sample_focus.append(focus)
+
+    def end_func_signal(self):
+        """Move to the next sample position, or update the table when all the sample
+        positions are autofocused.
+
+        Returns:
+        -------
+        bool
+            A boolean value indicating whether the focus map is finished.
+        """
+        if len(self.sample_ids) > 0 and not self.autofocus.end_func_signal():
+            return False
+        if len(self.sample_focus) < len(self.sample_ids):
+            self.move_to_sample()
+            return False
+        if len(self.sample_ids) > 0:
+            self.update_positions()
+        self.run_count += 1
+        return True
+
+    def update_positions(self):
+        """Fit the surface and write the interpolated focus to the table."""
+        samples = [self.positions[i] for i in self.sample_ids]
+        if self.is_refit():
+            self.surface.fit(
+                [[sample[axis] for axis in ["x", "y", "z"]] for sample in samples],
+                self.sample_focus,
+            )
+        else:
+            residuals = np.asarray(self.sample_focus) - self.predict(samples)
+            self.surface.offset += float(np.median(residuals))
+        self.model.logger.info(
+            f"FocusMap: {self.surface.fit_method} surface from focus "
+            f"{self.sample_focus}, offset {self.surface.offset}"
+        )
+
+        table = self.positions.array.copy()
+        table[:, 4] = self.predict(self.positions)
+        self.positions.set(table)
+        self.model.configuration["experiment"]["MultiPositions"][
+            :
+        ] = self.positions.to_list()
+        self.model.event_queue.put(("multiposition", table.tolist()))
+
+    def pre_func_data(self):
+        """Prepare the autofocus data processing."""
+        self.autofocus.pre_func_data()
+        self.data_count = 0
+
+    def in_func_data(self, frame_ids=[]):
+        """Process autofocus frames.
+
+        Parameters:
+        ----------
+        frame_ids : list, optional
+            A list of frame IDs to process. Default is an empty list.
+        """
+        self.autofocus.in_func_data(frame_ids)
+
+    def end_func_data(self):
+        """Finish the autofocus data processing of a sample position.
+
+        Returns:
+        -------
+        bool
+            A boolean value indicating whether every sample position is processed.
+        """
+        if len(self.sample_ids) == 0:
+            return True
+        r = self.autofocus.end_func_data()
+        if r:
+            self.data_count += 1
+            self.autofocus.pre_func_data()
+        return r and self.data_count >= len(self.sample_ids)
@@ -35,9 +35,11 @@ from math import ceil
 from queue import Queue
 
 # Third Party Imports
+import numpy as np
 
 # Local Imports
 from navigate.model.analysis.boundary_detect import find_tissue_boundary_2d
+from navigate.tools.position_table import PositionTable
 
 
 def detect_tissue(image_data, percentage=0.0):
@@ -478,6 +480,108 @@ class DetectTissueInStackAndRecord(DetectTissueInStack):
         return super().end_func_data()
 
 
+class DetectTissueRangeInStackAndRecord(DetectTissueInStack):
+    """Detect the Z Range of Tissue in a Stack of Images and Record it.
+
+    This class scans a low-resolution stack of `planes` planes between the start
+    and end of the z-stack and records, for every position, the part of the stack
+    that contains tissue. The range is widened by one pre-scan plane on each side,
+    because tissue may extend up to the neighbouring empty plane.
+
+    Each record is a tuple (start, end) of fractions of the z-stack range, where 0 is
+    the start and 1 is the end of the stack, or None if no tissue was detected.
+    """
+
+    def __init__(
+        self, model, planes=5, percentage=0.75, range_records=[], detect_func=None
+    ):
+        """Initialize the DetectTissueRangeInStackAndRecord class.
+
+        Parameters:
+        -----------
+        model : object
+            The model object representing the microscope.
+        planes : int, optional
+            The number of Z planes to capture in the stack. Default is 5.
+        percentage : float, optional
+            The minimum percentage of tissue required to consider a frame as having
+            tissue. Default is 0.75 (75%).
+        range_records : list, optional
+            A list to record the z range of tissue of each position. It is shared
+            with AdaptZRange and emptied here, so every acquisition starts with new
+            records. Default is an empty list.
+        detect_func : function, optional
+            The custom tissue detection function to use. If not specified, the default
+            `detect_tissue` function will be used.
+        """
+        super().__init__(model, planes, percentage, detect_func)
+
+        #: list: A list to record the z range of tissue of each position.
+        self.range_records = range_records
+        self.range_records.clear()
+
+        #: list: Indices of the planes with tissue at the current position.
+        self.tissue_planes = []
+
+    def pre_func_data(self):
+        """Initialization function for data processing. Extends the base class method.
+
+        This method is called at the beginning of the data processing phase and
+        initializes variables for tracking received frames, tissue detection,
+        and the z range record of the position.
+        """
+        super().pre_func_data()
+        self.tissue_planes = []
+        self.range_records.append(None)
+
+    def in_func_data(self, frame_ids):
+        """Data processing function to find the planes with tissue.
+
+        Unlike the base class, every frame is analyzed, so that both the first and
+        the last plane with tissue are known.
+
+        Parameters:
+        -----------
+        frame_ids : list
+            A list of frame IDs to analyze.
+
+        Returns:
+        --------
+        bool
+            True if tissue is detected, False otherwise.
+        """
+        for i, frame_id in enumerate(frame_ids):
+            if self.detect_func(self.model.data_buffer[frame_id], self.percentage):
+                self.tissue_planes.append(self.received_frames + i)
+                self.has_tissue_flag = True
+        self.received_frames += len(frame_ids)
+        return self.has_tissue_flag
+
+    def end_func_data(self):
+        """Data processing function to end the data phase. Extends the base class
+        method.
+
+        This method is called to determine whether the data phase should end. It
+        updates the z range record of the position.
+
+        Returns:
+        --------
+        bool
+            True if the data phase should end, False otherwise.
+        """
+        if self.tissue_planes and self.planes > 1:
+            first_plane = max(min(self.tissue_planes) - 1, 0)
+            last_plane = min(max(self.tissue_planes) + 1, self.planes - 1)
+            self.range_records[-1] = (
+                first_plane / (self.planes - 1),
+                last_plane / (self.planes - 1),
+            )
+        elif self.tissue_planes:
+            # a single plane can't bound the tissue
+            self.range_records[-1] = (0.0, 1.0)
+        return super().end_func_data()
+
+
 class RemoveEmptyPositions:
     """Remove Empty Positions from the Model.
 
@@ -521,3 +625,131 @@ class RemoveEmptyPositions:
 
         self.model.event_queue.put(("remove_positions", self.position_records))
         return True
+
+
+class AdaptZRange:
+    """Adapt the Z Range of Each Position to the Tissue.
+
+    This class uses the z range records of DetectTissueRangeInStackAndRecord to
+    shift the z and focus of every position to the start of its tissue, and shortens
+    the z-stack to the longest tissue range, so that the z-stack acquisition skips
+    the empty planes.
+
+    Notes:
+    ------
+    - The data sources expect the same number of z steps at every position, so the
+      step count is shared by all positions and set by the thickest tissue.
+    - Positions without tissue keep their z and focus, or are removed if
+      `remove_empty` is True.
+    - The positions in the multi-position table are changed, so running the pre-scan
+      again searches the shortened range.
+    """
+
+    def __init__(self, model, range_records=[], remove_empty=False):
+        """Initialize the AdaptZRange class.
+
+        Parameters:
+        -----------
+        model : object
+            The model object representing the microscope.
+        range_records : list, optional
+            The z range records of the positions. Default is an empty list.
+        remove_empty : bool, optional
+            Remove the positions without tissue. Default is False.
+        """
+
+        #: navigate.model.Model: The model object representing the microscope.
+        self.model = model
+
+        #: list: The z range records of the positions.
+        self.range_records = range_records
+
+        #: bool: Remove the positions without tissue.
+        self.remove_empty = remove_empty
+
+        #: dict: Frames and bytes saved by the last adaptation.
+        self.report = {}
+
+        #: dict: A dictionary specifying the configuration for signal and data
+        # functions.
+        self.config_table = {"signal": {"main": self.signal_func}}
+
+    def signal_func(self):
+        """Main signal processing function to adapt the z range.
+
+        This method updates the positions and the z-stack settings in the
+        experiment, and puts a "multiposition" and an "update_z_range" event into the
+        model's event queue to update the GUI.
+
+        Returns:
+        --------
+        bool
+            True indicating the successful execution of the signal function.
+        """
+        experiment = self.model.configuration["experiment"]
+        microscope_state = experiment["MicroscopeState"]
+        positions = PositionTable(experiment["MultiPositions"])
+        records = list(self.range_records)[: len(positions)]
+        occupied_ranges = [record for record in records if record is not None]
+
+        start_position = float(microscope_state["start_position"])
+        z_range = float(microscope_state["end_position"]) - start_position
+        start_focus = float(microscope_state["start_focus"])
+        f_range = float(microscope_state["end_focus"]) - start_focus
+        step_size = abs(float(microscope_state["step_size"]))
+        number_z_steps = int(microscope_state["number_z_steps"])
+
+        if not occupied_ranges or z_range == 0 or step_size == 0:
+            self.model.logger.info("AdaptZRange: no tissue range to adapt to.")
+            return True
+
+        # shared step count, set by the thickest tissue
+        extent = max(end - start for start, end in occupied_ranges)
+        new_z_steps = int(np.ceil(round(extent * abs(z_range) / step_size, 6)))
+        new_z_steps = min(max(new_z_steps, 1), number_z_steps)
+        new_extent = min(new_z_steps * step_size / abs(z_range), 1.0)
+
+        table = positions.array.copy()
+        keep_flags = np.ones(len(positions), dtype=bool)
+        for i, record in enumerate(records):
+            if record is None:
+                keep_flags[i] = not self.remove_empty
+                continue
+            # keep the stack within the scanned range
+            offset = min(record[0], 1.0 - new_extent)
+            table[i, 2] += offset * z_range
+            table[i, 4] += offset * f_range
+        table = table[keep_flags]
+        positions.set(table, notify=False)
+
+        channel_num = len(
+            [v for v in microscope_state["channels"].values() if v["is_selected"]]
+        )
+        camera_parameters = experiment["CameraParameters"]
+        # binned frames are smaller than the sensor
+        frame_bytes = (
+            int(camera_parameters["img_x_pixels"])
+            * int(camera_parameters["img_y_pixels"])
+            * 2
+        )
+        frames = number_z_steps * keep_flags.shape[0] * channel_num
+        saved_frames = frames - new_z_steps * len(positions) * channel_num
+        self.report = {
+            "number_z_steps": new_z_steps,
+            "frames_saved": saved_frames,
+            "bytes_saved": saved_frames * frame_bytes,
+            "fraction_saved": saved_frames / frames if frames else 0.0,
+        }
+        self.model.logger.info(f"AdaptZRange: {self.report}")
+
+        z_range_setting = {
+            "end_focus": start_focus + new_extent * f_range,
+            "end_position": round(start_position + new_extent * z_range, 6),
+        }
+        microscope_state.update(z_range_setting)
+        microscope_state["number_z_steps"] = new_z_steps
+        microscope_state["multiposition_count"] = len(positions)
+        experiment["MultiPositions"][:] = positions.to_list()
+        self.model.event_queue.put(("multiposition", table.tolist()))
+        self.model.event_queue.put(("update_z_range", z_range_setting))
+        return True
@@ -31,9 +31,13 @@
 # POSSIBILITY OF SUCH DAMAGE.
 #
 import base64
-import requests
 import numpy
 import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
 from math import ceil
 
@@ -60,6 +64,8 @@ def prepare_service(service_url, **kwargs):
     dict
         response from the server
     """
+    import requests
+
     service_url = service_url.rstrip("/")
     if service_url.endswith("ilastik"):
         r = requests.get(f"{service_url}/load?project={kwargs['project_file']}")
@@ -69,6 +75,330 @@ def prepare_service(service_url, **kwargs):
     return None
 
 
+def downsample_images(images, factor):
+    """Downsample a stack of images by block averaging.
+
+    Parameters
+    ----------
+    images : numpy.ndarray
+        (n_images x height x width) array.
+    factor : int
+        Downsampling factor. Rows and columns beyond a multiple of the factor are
+        dropped.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_images x height // factor x width // factor) array of the same dtype.
+    """
+    if factor <= 1:
+        return images
+    n, h, w = images.shape
+    h, w = h // factor, w // factor
+    blocks = images[:, : h * factor, : w * factor].reshape(n, h, factor, w, factor)
+    return blocks.mean(axis=(2, 4)).astype(images.dtype)
+
+
+def upsample_mask(mask, factor, shape):
+    """Upsample a segmentation mask back to the image grid.
+
+    Parameters
+    ----------
+    mask : numpy.ndarray
+        (height x width x ...) segmentation mask.
+    factor : int
+        Downsampling factor of the segmented image.
+    shape : tuple
+        (height, width) of the image grid.
+
+    Returns
+    -------
+    numpy.ndarray
+        Segmentation mask of the image grid, rows and columns dropped by
+        downsampling repeat the last label.
+    """
+    if factor <= 1:
+        return mask
+    mask = mask.repeat(factor, axis=0).repeat(factor, axis=1)
+    pad = [(0, max(shape[0] - mask.shape[0], 0)), (0, max(shape[1] - mask.shape[1], 0))]
+    pad += [(0, 0)] * (mask.ndim - 2)
+    return numpy.pad(mask, pad, mode="edge")
+
+
+class IlastikClient:
+    """Client of the Ilastik segmentation service.
+
+    Requests share one HTTP session, so the connections are kept alive. Images are
+    sent as raw, optionally zlib compressed, bytes; if the service does not accept
+    binary payloads, the client falls back to the base64 JSON payload. Requests
+    submitted with submit run in a thread pool, at most max_in_flight at a time.
+    """
+
+    def __init__(
+        self,
+        service_url,
+        payload="auto",
+        compression_level=1,
+        max_in_flight=2,
+        timeout=30,
+    ):
+        """Initialize the IlastikClient.
+
+        Parameters
+        ----------
+        service_url : str
+            url of the service
+        payload : str
+            "binary", "json" or "auto". "auto" sends binary payloads and falls back
+            to JSON if the service rejects them.
+        compression_level : int
+            zlib compression level of binary payloads, 0 sends raw bytes.
+        max_in_flight : int
+            Maximum number of requests running at a time.
+        timeout : float
+            Timeout of a request in seconds.
+        """
+        #: str: url of the service
+        self.service_url = service_url.rstrip("/")
+
+        #: str: payload format, "binary", "json" or "auto"
+        self.payload = payload
+
+        #: int: zlib compression level of binary payloads
+        self.compression_level = compression_level
+
+        #: int: maximum number of requests running at a time
+        self.max_in_flight = max(1, int(max_in_flight))
+
+        #: float: timeout of a request in seconds
+        self.timeout = timeout
+
+        #: requests.Session: HTTP session, created on the first request
+        self._session = None
+
+        #: ThreadPoolExecutor: threads running the submitted requests
+        self._executor = None
+
+        #: threading.BoundedSemaphore: free slots of the in-flight window
+        self._window = threading.BoundedSemaphore(self.max_in_flight)
+
+        #: threading.Lock: lock of the session and the statistics
+        self._lock = threading.Lock()
+
+        #: dict: request statistics
+        self._stats = {"requests": 0, "bytes_sent": 0, "images": 0, "time": 0.0}
+
+    @property
+    def session(self):
+        """requests.Session: HTTP session with a connection pool."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.max_in_flight
+                )
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def encode_binary(self, images):
+        """Encode images as a binary payload.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array.
+
+        Returns
+        -------
+        tuple
+            (body, headers) of the request.
+        """
+        images = numpy.ascontiguousarray(images)
+        body = images.tobytes()
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Image-Dtype": images.dtype.name,
+            "X-Image-Shape": ",".join(str(v) for v in images.shape),
+        }
+        if self.compression_level > 0:
+            body = zlib.compress(body, self.compression_level)
+            headers["X-Image-Compression"] = "zlib"
+        return body, headers
+
+    @staticmethod
+    def encode_json(images):
+        """Encode images as the base64 JSON payload.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array.
+
+        Returns
+        -------
+        tuple
+            (body, headers) of the request.
+        """
+        json_data = {
+            "dtype": images.dtype.name,
+            "shape": images.shape[1:],
+            "image": [
+                base64.b64encode(numpy.ascontiguousarray(img)).decode("utf-8")
+                for img in images
+            ],
+        }
+        return json.dumps(json_data).encode("utf-8"), {
+            "Content-Type": "application/json"
+        }
+
+    def post(self, body, headers):
+        """Post a segmentation request.
+
+        Parameters
+        ----------
+        body : bytes
+            Request body.
+        headers : dict
+            Request headers.
+
+        Returns
+        -------
+        requests.Response
+            Response of the service.
+        """
+        return self.session.post(
+            f"{self.service_url}/segmentation",
+            data=body,
+            headers=headers,
+            timeout=self.timeout,
+        )
+
+    def segment(self, images):
+        """Segment images.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array.
+
+        Returns
+        -------
+        list[numpy.ndarray] or None
+            Segmentation masks in the order of the images, None if the request
+            failed.
+        """
+        start_time = time.perf_counter()
+        if self.payload == "json":
+            body, headers = self.encode_json(images)
+        else:
+            body, headers = self.encode_binary(images)
+        response = self.post(body, headers)
+        if response.status_code in (400, 404, 415) and self.payload == "auto":
+            logger.info(
+                "Ilastik service does not accept binary payloads, "
+                f"falling back to JSON: {response.status_code}"
+            )
+            self.payload = "json"
+            body, headers = self.encode_json(images)
+            response = self.post(body, headers)
+        elif response.status_code == 200 and self.payload == "auto":
+            self.payload = "binary"
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["bytes_sent"] += len(body)
+            self._stats["images"] += len(images)
+            self._stats["time"] += time.perf_counter() - start_time
+        if response.status_code != 200:
+            logger.error(
+                f"Ilastik segmentation failed: {response.status_code}, "
+                f"{response.content[:200]}"
+            )
+            return None
+        # segmentation_mask is a dictionary like object with keys 'arr_0',
+        # 'arr_1'...
+        segmentation_mask = numpy.load(BytesIO(response.content))
+        return [segmentation_mask[f"arr_{i}"] for i in range(len(segmentation_mask))]
+
+    def submit(self, images, callback):
+        """Segment images asynchronously.
+
+        Blocks while max_in_flight requests are running, so a slow service applies
+        back pressure instead of queueing images without limit.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array, it should not be modified afterwards.
+        callback : callable
+            Called with the segmentation masks from a worker thread.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the request.
+        """
+        self._window.acquire()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_in_flight, thread_name_prefix="IlastikClient"
+            )
+        try:
+            return self._executor.submit(self._run, images, callback)
+        except Exception:
+            self._window.release()
+            raise
+
+    def _run(self, images, callback):
+        """Run a submitted request and call its callback.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array.
+        callback : callable
+            Called with the segmentation masks.
+        """
+        try:
+            masks = self.segment(images)
+            if masks is not None:
+                callback(masks)
+        except Exception as e:
+            logger.error(f"Ilastik segmentation failed: {e}")
+        finally:
+            self._window.release()
+
+    def wait(self):
+        """Wait until the submitted requests are finished."""
+        for _ in range(self.max_in_flight):
+            self._window.acquire()
+        for _ in range(self.max_in_flight):
+            self._window.release()
+
+    def close(self):
+        """Wait for the submitted requests and close the session."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def stats(self):
+        """Return the request statistics.
+
+        Returns
+        -------
+        dict
+            Number of requests, bytes sent, images and the total round-trip time.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
 class IlastikSegmentation:
     """Ilastik segmentation class.
 
@@ -105,8 +435,28 @@ class IlastikSegmentation:
         #: int: size of pieces
         self.pieces_size = 1
 
+        service_config = self.model.configuration["rest_api_config"]["Ilastik"]
+
+        #: int: downsampling factor of the images sent to the service
+        self.downsample = max(1, int(service_config.get("downsample", 1)))
+
+        #: IlastikClient: segmentation client
+        self.client = IlastikClient(
+            self.service_url,
+            payload=service_config.get("payload", "auto"),
+            compression_level=int(service_config.get("compression_level", 1)),
+            max_in_flight=int(service_config.get("max_in_flight", 2)),
+        )
+
         #: dict: configuration table
-        self.config_table = {"data": {"init": self.init_func, "main": self.data_func}}
+        self.config_table = {
+            "data": {
+                "init": self.init_func,
+                "main": self.data_func,
+                "main-batch": self.data_func_batch,
+                "cleanup": self.cleanup,
+            }
+        }
 
     def init_func(self, *args):
         """Initialize Ilastik segmentation.
@@ -129,38 +479,78 @@ class IlastikSegmentation:
     def data_func(self, frame_ids):
         """Perform Ilastik segmentation.
 
+        The frames are copied out of the data buffer and segmented asynchronously,
+        the masks are handled by handle_masks.
+
         Parameters
         ----------
         frame_ids : list
             list of frame ids
         """
         # Ilastik process multiple images in sequence.
-        img_data = [base64.b64encode(self.model.data_buffer[idx]) for idx in frame_ids]
-        json_data = {
-            "dtype": "uint16",
-            "shape": (self.model.img_height, self.model.img_width),
-            "image": [img.decode("utf-8") for img in img_data],
-        }
+        images = numpy.stack([self.model.data_buffer[idx] for idx in frame_ids])
+        images = downsample_images(images, self.downsample)
+        self.submit(images)
 
-        response = requests.post(
-            f"{self.service_url}/segmentation", json=json_data, stream=True
-        )
-        if response.status_code == 200:
-            # segmentation_mask is a dictionary like object with keys 'arr_0',
-            # 'arr_1'...
-            segmentation_mask = numpy.load(BytesIO(response.raw.read()))
-            # display segmentation
-            for idx in range(len(segmentation_mask)):
-                segmentation_id = "arr_{}".format(idx)
-                if self.model.display_ilastik_segmentation:
-                    self.model.event_queue.put(
-                        ("ilastik_mask", segmentation_mask[segmentation_id])
-                    )
-                # mark position
-                if self.model.mark_ilastik_position:
-                    self.mark_position(segmentation_mask[segmentation_id])
+    def data_func_batch(self, frame_ids, batch):
+        """Perform Ilastik segmentation on frames in the data buffer.
+
+        The frames are downsampled directly from the data buffer, so only the
+        images sent to Ilastik are copied.
+
+        Parameters
+        ----------
+        frame_ids : list
+            list of frame ids
+        batch : FrameBatch
+            The frames as views of the data buffer.
+        """
+        images = batch.stack().view(numpy.ndarray)
+        if self.downsample > 1:
+            images = downsample_images(images, self.downsample)
         else:
-            print("There is something wrong!")
+            # the frames are segmented asynchronously
+            images = images.copy()
+        self.submit(images)
+
+    def submit(self, images):
+        """Segment images asynchronously, the masks are handled by handle_masks.
+
+        Parameters
+        ----------
+        images : numpy.ndarray
+            (n_images x height x width) array
+        """
+        position = None
+        if self.model.mark_ilastik_position:
+            # the stage may have moved on when the masks come back
+            position = self.get_stage_position()
+        self.client.submit(images, partial(self.handle_masks, position=position))
+
+    def handle_masks(self, masks, position=None):
+        """Display the segmentation masks and mark positions.
+
+        Parameters
+        ----------
+        masks : list[numpy.ndarray]
+            segmentation masks
+        position : dict, optional
+            stage position of the segmented frames, see get_stage_position
+        """
+        shape = (self.model.img_height, self.model.img_width)
+        for mask in masks:
+            mask = upsample_mask(mask, self.downsample, shape)
+            # display segmentation
+            if self.model.display_ilastik_segmentation:
+                self.model.event_queue.put(("ilastik_mask", mask))
+            # mark position
+            if self.model.mark_ilastik_position:
+                self.mark_position(mask, position)
+
+    def cleanup(self):
+        """Wait for the running segmentation requests and close the client."""
+        self.client.close()
+        logger.debug(f"Ilastik segmentation statistics: {self.client.stats()}")
 
     def update_setting(self):
         """Update Ilastik segmentation settings."""
@@ -195,13 +585,15 @@ class IlastikSegmentation:
         #: float: position step size
         self.posistion_step_size = self.pieces_size * pixel_size
         # calculate corner (x,y)
-        curr_fov_x = (
+        #: float: field of view in x
+        self.fov_x = (
             float(
                 self.model.configuration["experiment"]["CameraParameters"]["x_pixels"]
             )
             * curr_pixel_size
         )
-        curr_fov_y = (
+        #: float: field of view in y
+        self.fov_y = (
             float(
                 self.model.configuration["experiment"]["CameraParameters"]["y_pixels"]
             )
@@ -211,33 +603,49 @@ class IlastikSegmentation:
         #: float: x start position
         self.x_start = (
             float(self.model.configuration["experiment"]["StageParameters"]["x"])
-            - curr_fov_x / 2
+            - self.fov_x / 2
         )
 
         #: float: y start position
         self.y_start = (
             float(self.model.configuration["experiment"]["StageParameters"]["y"])
-            - curr_fov_y / 2
+            - self.fov_y / 2
         )
 
-    def mark_position(self, mask):
+    def get_stage_position(self):
+        """Get the current stage position.
+
+        Returns
+        -------
+        dict
+            stage position {axis: value}
+        """
+        stage = self.model.configuration["experiment"]["StageParameters"]
+        return {axis: float(stage[axis]) for axis in ["x", "y", "z", "theta", "f"]}
+
+    def mark_position(self, mask, position=None):
         """Mark position based on the segmentation mask.
 
         Parameters
         ----------
         mask : numpy.ndarray
             segmentation mask
+        position : dict, optional
+            stage position of the segmented frame, the current stage position if
+            it is None
         """
+        if position is None:
+            position = self.get_stage_position()
 
         # target_label = self.model.ilastik_target
         target_label = self.model.ilastik_target_labels
         lx, rx = 0, self.pieces_size
-        # get current z, theta, focus
+        # z, theta, focus of the segmented frame
         # TODO: are they same as high resolution?
-        z = self.model.configuration["experiment"]["StageParameters"]["z"]
-        theta = self.model.configuration["experiment"]["StageParameters"]["theta"]
-        f = self.model.configuration["experiment"]["StageParameters"]["f"]
-        pos_x, pos_y = self.x_start, self.y_start
+        z, theta, f = position["z"], position["theta"], position["f"]
+        x_start = position["x"] - self.fov_x / 2
+        y_start = position["y"] - self.fov_y / 2
+        pos_x, pos_y = x_start, y_start
         table_values = []
         for i in range(self.pieces_num):
             ly, ry = 0, self.pieces_size
@@ -252,5 +660,5 @@ class IlastikSegmentation:
             lx += self.pieces_size
             rx += self.pieces_size
             pos_x += self.posistion_step_size
-            pos_y = self.y_start
+            pos_y = y_start
         self.model.event_queue.put(("multiposition", table_values))
@@ -32,11 +32,14 @@
 # Standard Library imports
 import logging
 import importlib  # noqa: F401
+import time
 from multiprocessing.managers import ListProxy
 
 from navigate.model.device_startup_functions import (
     start_stage,
 )
+from navigate.model.position_tracker import PositionTracker
+from navigate.model.waveforms import waveform_cache
 from navigate.tools.common_functions import build_ref_name
 
 p = __name__.split(".")[1]
@@ -76,8 +79,12 @@ class Microscope:
         self.stages = {}
         #: list: List of stages.
         self.stages_list = []
-        #: bool: Ask stage for position.
-        self.ask_stage_for_position = True
+        #: PositionTracker: Cache of the stage positions.
+        self.position_tracker = PositionTracker(
+            self.configuration["configuration"]["microscopes"][self.microscope_name][
+                "stage"
+            ].get("position_readback_interval", 0)
+        )
         #: dict: Dictionary of lasers.
         self.lasers = {}
         #: dict: Dictionary of galvanometers.
@@ -104,8 +111,6 @@ class Microscope:
         self.is_synthetic = is_synthetic
         #: list: List of laser wavelengths.
         self.laser_wavelength = []
-        #: dict: Dictionary of returned stage positions.
-        self.ret_pos_dict = {}
         #: dict: Dictionary of commands
         self.commands = {}
         #: dict: Dictionary of plugin devices
@@ -321,11 +326,24 @@ class Microscope:
                 self.info[f"stage_{axis}"] = device_ref_name
 
             self.stages_list.append((stage, list(device_config["axes"])))
+            self.position_tracker.add_stage(stage, device_config["axes"])
 
         # connect daq and camera in synthetic mode
         if is_synthetic:
             self.daq.add_camera(self.microscope_name, self.camera)
 
+    @property
+    def ask_stage_for_position(self):
+        """bool: Whether a stage has to be asked for its position."""
+        return self.position_tracker.is_stale
+
+    @ask_stage_for_position.setter
+    def ask_stage_for_position(self, value):
+        if value:
+            self.position_tracker.invalidate()
+        else:
+            self.position_tracker.validate()
+
     def update_data_buffer(self, img_width, img_height, data_buffer, number_of_frames):
         """Update the data buffer for the camera.
 
@@ -423,6 +441,7 @@ class Microscope:
 
         # calculate all the waveform
         self.shutter.open_shutter()
+        self.position_tracker.start_readback()
 
         return self.calculate_all_waveform()
 
@@ -434,6 +453,7 @@ class Microscope:
             for stage, _ in self.stages_list:
                 if type(stage).__name__ == "GalvoNIStage":
                     stage.switch_mode("normal")
+        self.position_tracker.stop_readback()
         self.stop_stage()
         if self.central_focus is not None:
             self.move_stage({"f_abs": self.central_focus})
@@ -456,6 +476,9 @@ class Microscope:
     def calculate_all_waveform(self):
         """Calculate all the waveforms.
 
+        Waveforms are memoized in the waveform cache, so switching channels or
+        repeating an acquisition with unchanged settings does not recalculate them.
+
         Returns
         -------
         waveform : dict
@@ -481,6 +504,11 @@ class Microscope:
             "remote_focus_waveform": remote_focus_waveform,
             "galvo_waveform": galvo_waveform,
         }
+        stats = waveform_cache.stats()
+        logger.debug(
+            f"Waveform cache - {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['compute_time']:.4f}s spent calculating waveforms"
+        )
         return waveform_dict
 
     def calculate_exposure_sweep_times(self):
@@ -691,16 +719,22 @@ class Microscope:
         success : bool
             True if stage is successfully moved, False otherwise.
         """
-        self.ask_stage_for_position = True
-
         if len(pos_dict.keys()) == 1:
             axis_key = list(pos_dict.keys())[0]
             axis = axis_key[: axis_key.index("_")]
             if update_focus and axis == "f":
                 self.central_focus = None
-            return self.stages[axis].move_axis_absolute(
+            stage = self.stages[axis]
+            generation = self.position_tracker.generation
+            start = time.perf_counter()
+            success = stage.move_axis_absolute(
                 axis, pos_dict[axis_key], wait_until_done
             )
+            duration = time.perf_counter() - start if wait_until_done else None
+            self.position_tracker.record(
+                stage, pos_dict, success, generation, duration
+            )
+            return success
 
         success = True
         for stage, axes in self.stages_list:
@@ -710,20 +744,69 @@ class Microscope:
                 if axis[: axis.index("_")] in axes
             }
             if pos:
-                success = stage.move_absolute(pos, wait_until_done) and success
+                generation = self.position_tracker.generation
+                start = time.perf_counter()
+                result = stage.move_absolute(pos, wait_until_done)
+                duration = time.perf_counter() - start if wait_until_done else None
+                self.position_tracker.record(stage, pos, result, generation, duration)
+                success = result and success
 
         if update_focus and "f_abs" in pos_dict:
             self.central_focus = None
 
         return success
 
-    def stop_stage(self):
-        """Stop stage."""
+    def supports_stage_sequence(self, axes):
+        """Whether the axes can step through hardware-timed position sequences.
+
+        Parameters
+        ----------
+        axes : list[str]
+            Axes, e.g. ['z', 'f'].
 
+        Returns
+        -------
+        bool
+            True if every axis supports position sequences.
+        """
+        return all(
+            axis in self.stages and self.stages[axis].supports_sequence(axis)
+            for axis in axes
+        )
+
+    def load_stage_sequence(self, sequence):
+        """Load position sequences executed by the next DAQ acquisition.
+
+        Parameters
+        ----------
+        sequence : dict
+            Positions of each axis in the order of the frames, e.g. {'z': [...]}.
+
+        Returns
+        -------
+        success : bool
+            True if every sequence is loaded, otherwise no sequence is loaded.
+        """
+        self.ask_stage_for_position = True
+        for axis, positions in sequence.items():
+            if not self.stages[axis].load_sequence(axis, positions):
+                self.end_stage_sequence()
+                return False
+        return True
+
+    def end_stage_sequence(self):
+        """Return every stage to software-timed movement."""
         self.ask_stage_for_position = True
+        for stage, _ in self.stages_list:
+            stage.end_sequence()
+
+    def stop_stage(self):
+        """Stop stage."""
 
+        # not serialized with the moves, the stop interrupts a move in progress
         for stage, axes in self.stages_list:
             stage.stop()
+        self.position_tracker.invalidate()
 
         self.central_focus = self.get_stage_position().get("f_pos", self.central_focus)
 
@@ -735,13 +818,7 @@ class Microscope:
         stage_position : dict
             Dictionary of stage positions.
         """
-        if self.ask_stage_for_position:
-            # self.ret_pos_dict = {}
-            for stage, axes in self.stages_list:
-                temp_pos = stage.report_position()
-                self.ret_pos_dict.update(temp_pos)
-            self.ask_stage_for_position = False
-        return self.ret_pos_dict
+        return self.position_tracker.get_positions()
 
     def move_remote_focus(self, offset=None):
         """Move remote focus.
@@ -874,6 +951,7 @@ class Microscope:
 
     def terminate(self):
         """Close hardware explicitly."""
+        self.position_tracker.stop_readback()
         self.camera.close_camera()
 
         for k in self.galvo:
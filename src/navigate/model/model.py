@@ -36,20 +36,25 @@ import logging
 import multiprocessing as mp
 import time
 import os
+from contextlib import nullcontext
 
 # Third Party Imports
 
 # Local Imports
+from navigate.model.analysis.camera import CameraCorrection, find_hot_pixels
+from navigate.model.analysis.mosaic import MosaicOverview
 from navigate.model.concurrency.concurrency_tools import SharedNDArray
 from navigate.model.features.autofocus import Autofocus
 from navigate.model.features.cva_conpro import ConstantVelocityAcquisition
 from navigate.model.features.adaptive_optics import TonyWilson
 from navigate.model.features.image_writer import ImageWriter
 from navigate.model.features.auto_tile_scan import CalculateFocusRange  # noqa
+from navigate.model.features.focus_map import FocusMap
 from navigate.model.features.common_features import (
     ChangeResolution,
     Snap,
     ZStackAcquisition,
+    SequencedZStackAcquisition,
     FindTissueSimple2D,
     PrepareNextChannel,
     LoopByCount,
@@ -59,9 +64,15 @@ from navigate.model.features.common_features import (
 )
 from navigate.model.features.remove_empty_tiles import (
     DetectTissueInStackAndRecord,
+    DetectTissueRangeInStackAndRecord,
     RemoveEmptyPositions,
+    AdaptZRange,
+)
+from navigate.model.features.feature_container import (
+    FrameBatch,
+    load_features,
+    shutdown_offload_pool,
 )
-from navigate.model.features.feature_container import load_features
 from navigate.model.features.restful_features import IlastikSegmentation
 from navigate.model.features.volume_search import VolumeSearch
 from navigate.model.features.feature_related_functions import (
@@ -74,8 +85,12 @@ from navigate.log_files.log_functions import log_setup
 from navigate.tools.common_dict_tools import update_stage_dict
 from navigate.tools.common_functions import load_module_from_file, VariableWithLock
 from navigate.tools.file_functions import load_yaml_file, save_yaml_file
+from navigate.tools.waveform_template_funcs import decimate_waveform_dict
+from navigate.model.waveforms import waveform_cache
 from navigate.model.device_startup_functions import load_devices
 from navigate.model.microscope import Microscope
+from navigate.model.acquisition_planner import AcquisitionPlanner
+from navigate.model.execution_tracer import ExecutionTracer
 from navigate.config.config import get_navigate_path
 from navigate.model.plugins_model import PluginsModel
 
@@ -159,6 +174,20 @@ class Model:
         self.start_time = None
         #: object: Data buffer.
         self.data_buffer = None
+        #: SharedNDArray: (n_frames x height x width) block holding the data buffer.
+        self.data_buffer_block = None
+        #: CameraCorrection: In-place correction of new frames, None if disabled.
+        self.camera_correction = None
+        #: MosaicOverview: Overview of a multi-position acquisition, None otherwise.
+        self.mosaic_overview = None
+        #: float: Time the mosaic overview was last sent to the GUI.
+        self.mosaic_overview_time = 0
+        #: str: File or directory the execution traces of acquisitions are saved to.
+        self.trace_path = getattr(args, "trace_file", None)
+        #: ExecutionTracer: Tracer of the running acquisition, None if not traced.
+        self.tracer = None
+        #: dict: Span summary of the last traced acquisition.
+        self.trace_summary = {}
         #: int: Number of active pixels in the x-dimension.
         self.img_width = int(
             self.configuration["experiment"]["CameraParameters"]["img_x_pixels"]
@@ -327,6 +356,34 @@ class Model:
                 {"name": RemoveEmptyPositions, "args": (records,)},
             ]
         )
+        # interpolate the focus of every position from a few autofocused positions
+        self.feature_list.append([{"name": FocusMap}, {"name": ZStackAcquisition}])
+
+        # pre-scan the tissue range of every position and shorten the z-stacks
+        range_records = SharedList([], "range_records")
+        self.feature_list.append(
+            [
+                {"name": PrepareNextChannel},
+                (
+                    {"name": MoveToNextPositionInMultiPositionTable},
+                    {
+                        "name": DetectTissueRangeInStackAndRecord,
+                        "args": (
+                            10,
+                            0.75,
+                            range_records,
+                        ),
+                    },
+                    {
+                        "name": LoopByCount,
+                        "args": ("experiment.MicroscopeState.multiposition_count",),
+                    },
+                ),
+                {"name": AdaptZRange, "args": (range_records,)},
+            ]
+        )
+        # acquire each z-stack as hardware-timed sequences
+        self.feature_list.append([{"name": SequencedZStackAcquisition}])
 
         self.acquisition_modes_feature_setting = {
             "single": [
@@ -380,9 +437,11 @@ class Model:
         """
         self.img_width = img_width
         self.img_height = img_height
+        self.data_buffer_block = SharedNDArray(
+            shape=(self.number_of_frames, img_height, img_width), dtype="uint16"
+        )
         self.data_buffer = [
-            SharedNDArray(shape=(img_height, img_width), dtype="uint16")
-            for i in range(self.number_of_frames)
+            self.data_buffer_block[i] for i in range(self.number_of_frames)
         ]
         self.data_buffer_positions = SharedNDArray(
             shape=(self.number_of_frames, 5), dtype=float
@@ -483,6 +542,146 @@ class Model:
 
         return self.active_microscope.camera.get_offset_variance_maps()
 
+    def update_camera_correction(self):
+        """Build the real-time correction of the active camera.
+
+        The offset, flatfield and hot-pixel corrections are enabled in the
+        experiment CameraParameters. A correction is skipped if its map is missing
+        or doesn't match the frame size.
+
+        Returns
+        -------
+        camera_correction : CameraCorrection
+            The correction, None if no correction is applied.
+        """
+        self.camera_correction = None
+        camera_setting = self.configuration["experiment"]["CameraParameters"]
+        enabled = {
+            k: camera_setting.get(f"{k}_correction", False)
+            for k in ["offset", "flatfield", "hot_pixel"]
+        }
+        if not any(enabled.values()):
+            return None
+
+        camera = self.active_microscope.camera
+        shape = (self.img_height, self.img_width)
+        maps = {
+            "offset": camera.offset,
+            "flatfield": camera.flatfield,
+            "hot_pixel": camera.variance,
+        }
+        for k in enabled:
+            if not enabled[k]:
+                maps[k] = None
+            elif maps[k] is None or maps[k].shape != shape:
+                self.logger.warning(
+                    f"Navigate Model - No {k} map of the size {shape} for the "
+                    f"camera, the {k} correction is skipped."
+                )
+                maps[k] = None
+
+        correction = CameraCorrection(
+            shape,
+            offset_map=maps["offset"],
+            flatfield_map=maps["flatfield"],
+            hot_pixel_mask=(
+                None if maps["hot_pixel"] is None else find_hot_pixels(maps["hot_pixel"])
+            ),
+        )
+        if correction.is_active:
+            self.camera_correction = correction
+        return self.camera_correction
+
+    def correct_frames(self, frame_ids):
+        """Apply the real-time camera correction to new frames in place.
+
+        Parameters
+        ----------
+        frame_ids : list
+            Frame ids of the new frames.
+        """
+        # a feature may turn the correction off while the data thread runs
+        camera_correction = self.camera_correction
+        if camera_correction is None:
+            return
+        if self.data_buffer_block is not None:
+            frames = FrameBatch(self.data_buffer_block, frame_ids).views
+        else:
+            frames = [self.data_buffer[idx] for idx in frame_ids]
+        camera_correction.correct(frames)
+
+    def update_mosaic_overview(self):
+        """Create the mosaic overview of a multi-position acquisition.
+
+        Returns
+        -------
+        mosaic_overview : MosaicOverview
+            The overview, None if the acquisition isn't a multi-position one.
+        """
+        self.mosaic_overview = None
+        self.mosaic_overview_time = 0
+        state = self.configuration["experiment"]["MicroscopeState"]
+        if self.imaging_mode == "live" or not state["is_multiposition"]:
+            return None
+
+        microscope_config = self.configuration["configuration"]["microscopes"][
+            self.active_microscope_name
+        ]
+        try:
+            self.mosaic_overview = MosaicOverview(
+                self.configuration["experiment"]["MultiPositions"],
+                (self.img_height, self.img_width),
+                float(microscope_config["zoom"]["pixel_size"][state["zoom"]]),
+                flip_x=microscope_config["camera"].get("flip_x", False),
+                flip_y=microscope_config["camera"].get("flip_y", False),
+            )
+        except (ValueError, KeyError) as e:
+            self.logger.warning(f"Navigate Model - No mosaic overview: {e}")
+        return self.mosaic_overview
+
+    def update_mosaic(self, frame_ids):
+        """Add new frames to the mosaic overview.
+
+        The overview is sent to the GUI when a tile is placed, at most twice a
+        second.
+
+        Parameters
+        ----------
+        frame_ids : list
+            Frame ids of the new frames.
+        """
+        completed = False
+        for idx in frame_ids:
+            completed |= self.mosaic_overview.add_frame(
+                self.data_buffer[idx], self.data_buffer_positions[idx]
+            )
+        if completed and time.time() - self.mosaic_overview_time > 0.5:
+            self.send_mosaic_overview()
+
+    def send_mosaic_overview(self):
+        """Send a display-sized copy of the mosaic overview to the GUI."""
+        self.mosaic_overview_time = time.time()
+        self.event_queue.put(
+            ("mosaic_overview", {"Overview": self.mosaic_overview.preview()})
+        )
+
+    def finish_mosaic_overview(self):
+        """Place the last tile, send the overview and save it with the data."""
+        if self.mosaic_overview is None:
+            return
+        self.mosaic_overview.finish_tile()
+        self.send_mosaic_overview()
+        if self.is_save and self.image_writer is not None:
+            file_name = os.path.join(
+                self.image_writer.save_directory, "mosaic_overview.tif"
+            )
+            try:
+                self.mosaic_overview.save(file_name)
+            except OSError as e:
+                self.logger.warning(
+                    f"Navigate Model - Unable to save the mosaic overview: {e}"
+                )
+
     def run_command(self, command, *args, **kwargs):
         """Receives commands from the controller.
 
@@ -521,8 +720,12 @@ class Model:
                         "is_multiposition"
                     ] = False
 
+            if self.trace_path:
+                self.tracer = ExecutionTracer()
+
             # Calculate waveforms, turn on lasers, etc.
-            self.prepare_acquisition()
+            with self.trace("prepare_acquisition"):
+                self.prepare_acquisition()
 
             # load features
             if self.imaging_mode == "customized":
@@ -623,7 +826,7 @@ class Model:
             else:
                 waveform_dict = self.active_microscope.calculate_all_waveform()
 
-            self.event_queue.put(("waveform", waveform_dict))
+            self.event_queue.put(("waveform", decimate_waveform_dict(waveform_dict)))
 
             if self.is_acquiring:
                 # prepare devices based on updated info
@@ -724,6 +927,13 @@ class Model:
                     self.logger.debug(
                         f"run_command - load_feature - Unknown feature {args[0]}."
                     )
+        elif command == "estimate_acquisition":
+            """
+            args[0]: dict, optional, measured timings
+            """
+            self.event_queue.put(
+                ("acquisition_estimate", self.estimate_acquisition(*args))
+            )
         elif command == "stage_limits":
             for microscope_name in self.microscopes:
                 self.microscopes[microscope_name].update_stage_limits(args[0])
@@ -851,6 +1061,44 @@ class Model:
             self.image_writer.close()
         #: obj: Add on feature.
         self.addon_feature = None
+        self.save_trace()
+
+    def trace(self, name, category="model"):
+        """Return a context manager recording a block as a span of the trace.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span.
+        category : str
+            Category of the span, e.g. 'wait'.
+
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            Records the span if the acquisition is traced, does nothing otherwise.
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, category)
+
+    def save_trace(self):
+        """Save the execution trace of the acquisition.
+
+        The trace is saved to trace_path, or to a time-stamped file in trace_path if
+        it is a directory.
+        """
+        tracer, self.tracer = self.tracer, None
+        if tracer is None:
+            return
+        self.trace_summary = tracer.summary()
+        path = self.trace_path
+        if os.path.isdir(path):
+            path = os.path.join(path, time.strftime("trace_%Y%m%d-%H%M%S.json"))
+        try:
+            tracer.save(path)
+        except OSError as e:
+            self.logger.warning(f"Navigate Model - Could not save the trace: {e}")
 
     def run_data_process(self, num_of_frames=0, data_func=None):
         """Run the data process.
@@ -874,8 +1122,10 @@ class Model:
             if self.ask_to_pause_data_thread:
                 self.pause_data_ready_lock.release()
                 self.pause_data_event.clear()
-                self.pause_data_event.wait()
-            frame_ids = self.active_microscope.camera.get_new_frame()
+                with self.trace("data thread paused", "wait"):
+                    self.pause_data_event.wait()
+            with self.trace("camera.get_new_frame", "wait"):
+                frame_ids = self.active_microscope.camera.get_new_frame()
             self.logger.info(
                 f"Navigate Model - Running data process, get frames {frame_ids}"
             )
@@ -892,6 +1142,11 @@ class Model:
 
             wait_num = self.camera_wait_iterations
 
+            # correct the frames before they are processed, saved or displayed
+            if self.camera_correction is not None:
+                with self.trace("camera correction", "data"):
+                    self.correct_frames(frame_ids)
+
             if hasattr(self, "data_container") and not self.data_container.end_flag:
                 if self.data_container.is_closed:
                     self.logger.info("Navigate Model - Data container is closed.")
@@ -902,7 +1157,12 @@ class Model:
 
             # ImageWriter to save images
             if data_func:
-                data_func(frame_ids)
+                with self.trace("save images", "data"):
+                    data_func(frame_ids)
+
+            if self.mosaic_overview is not None:
+                with self.trace("mosaic overview", "data"):
+                    self.update_mosaic(frame_ids)
 
             # show image
             self.logger.info(f"Navigate Model - Sent through pipe{frame_ids[0]}")
@@ -914,6 +1174,11 @@ class Model:
 
         self.show_img_pipe.send("stop")
         self.logger.info("Navigate Model - Data thread stopped.")
+        self.finish_mosaic_overview()
+        if hasattr(self, "data_container"):
+            self.logger.info(
+                f"Navigate Model - Data node timings: {self.data_container.timings}"
+            )
         self.logger.info(
             f"Navigate Model - Received frames in total: {acquired_frame_num}"
         )
@@ -930,9 +1195,10 @@ class Model:
         Function is called when user pauses the acquisition.
         """
 
-        self.pause_data_ready_lock.acquire()
-        self.ask_to_pause_data_thread = True
-        self.pause_data_ready_lock.acquire()
+        with self.trace("pause_data_thread", "wait"):
+            self.pause_data_ready_lock.acquire()
+            self.ask_to_pause_data_thread = True
+            self.pause_data_ready_lock.acquire()
 
     def resume_data_thread(self):
         """Resume the data thread.
@@ -1030,7 +1296,9 @@ class Model:
 
         # prepare active microscope
         waveform_dict = self.active_microscope.prepare_acquisition()
-        self.event_queue.put(("waveform", waveform_dict))
+        self.event_queue.put(("waveform", decimate_waveform_dict(waveform_dict)))
+        self.update_camera_correction()
+        self.update_mosaic_overview()
 
         self.frame_id = 0
 
@@ -1045,8 +1313,9 @@ class Model:
             self.signal_container.run()
 
         # Stash current position, channel, timepoint. Do this here, because signal
-        # container functions can inject changes to the stage. NOTE: This line is
-        # wildly expensive when get_stage_position() does not cache results.
+        # container functions can inject changes to the stage. The positions come
+        # from the position tracker, the stages are only queried after they were
+        # invalidated (e.g., stopped).
         stage_pos = self.get_stage_position()
         self.data_buffer_positions[self.frame_id][0] = stage_pos.get("x_pos", 0)
         self.data_buffer_positions[self.frame_id][1] = stage_pos.get("y_pos", 0)
@@ -1057,7 +1326,8 @@ class Model:
         # Run the acquisition
         try:
             self.active_microscope.turn_on_laser()
-            self.active_microscope.daq.run_acquisition()
+            with self.trace("daq.run_acquisition", "device"):
+                self.active_microscope.daq.run_acquisition()
         except:  # noqa
             self.active_microscope.daq.stop_acquisition()
             if self.active_microscope.current_channel == 0:
@@ -1202,6 +1472,43 @@ class Model:
 
         self.active_microscope.ask_stage_for_position = True
 
+    def estimate_acquisition(self, telemetry=None, feature_list=None):
+        """Estimate the duration and data volume of an acquisition.
+
+        Parameters
+        ----------
+        telemetry : dict, optional
+            Timings, see AcquisitionPlanner. They take precedence over the timings
+            measured by the model: the spans of the last traced acquisition, the
+            stage moves of the position tracker and the waveform cache counters.
+        feature_list : list, optional
+            Feature list to estimate. Defaults to the feature list of the current
+            imaging mode.
+
+        Returns
+        -------
+        report : dict
+            Predicted duration, frame count, bytes and per-phase breakdown.
+        """
+        if feature_list is None:
+            imaging_mode = self.configuration["experiment"]["MicroscopeState"][
+                "image_mode"
+            ]
+            if imaging_mode == "customized":
+                feature_list = (
+                    self.addon_feature or self.acquisition_modes_feature_setting["single"]
+                )
+            else:
+                feature_list = self.acquisition_modes_feature_setting[imaging_mode]
+        planner = AcquisitionPlanner(self, telemetry)
+        tracer = self.tracer
+        planner.add_measured_telemetry(
+            tracer.summary() if tracer is not None else self.trace_summary,
+            planner.get_microscope().position_tracker.get_moves(),
+            waveform_cache.stats(),
+        )
+        return planner.estimate(feature_list)
+
     def get_camera_line_interval_and_exposure_time(
         self, exposure_time, number_of_pixel
     ):
@@ -1290,11 +1597,12 @@ class Model:
             List of data buffer.
         """
 
-        # create databuffer
-        data_buffer = [
-            SharedNDArray(shape=(self.img_height, self.img_width), dtype="uint16")
-            for i in range(self.number_of_frames)
-        ]
+        # create databuffer, the frames are views of one contiguous block
+        data_buffer_block = SharedNDArray(
+            shape=(self.number_of_frames, self.img_height, self.img_width),
+            dtype="uint16",
+        )
+        data_buffer = [data_buffer_block[i] for i in range(self.number_of_frames)]
 
         # create virtual microscope
         from navigate.model.devices import (
@@ -1374,10 +1682,11 @@ class Model:
         """
         data_buffer = self.virtual_microscopes[microscope_name].data_buffer
         del self.virtual_microscopes[microscope_name]
-        # delete shared_buffer
-        for i in range(self.number_of_frames):
-            data_buffer[i].shared_memory.close()
-            data_buffer[i].shared_memory.unlink()
+        # delete shared_buffer, the frames may share one shared memory block
+        shared_memories = {id(f.shared_memory): f.shared_memory for f in data_buffer}
+        for shared_memory in shared_memories.values():
+            shared_memory.close()
+            shared_memory.unlink()
         del data_buffer
 
     def terminate(self):
@@ -1385,6 +1694,7 @@ class Model:
         self.active_microscope.terminate()
         for microscope_name in self.virtual_microscopes:
             self.virtual_microscopes[microscope_name].terminate()
+        shutdown_offload_pool()
 
     def load_feature_list_from_file(self, filename, features):
         """Append feature list from file
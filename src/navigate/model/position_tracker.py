@@ -0,0 +1,254 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import logging
+import threading
+import time
+from collections import deque
+
+# Third Party Imports
+
+# Local Imports
+
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class PositionTracker:
+    """Cache of the stage positions.
+
+    Positions are updated from the setpoints of the moves, so reading the position of
+    a stage that was only commanded to move does not require a query to the device.
+    A stage is only asked for its position when it is invalidated, e.g. after it was
+    stopped or a move failed, and, optionally, by a background thread at a fixed
+    interval to follow the encoders. Every position is stored with the time it was
+    set or read, and the durations of the moves that were waited for are kept to
+    measure the stage settle time.
+    """
+
+    def __init__(self, readback_interval=0):
+        """Initialize the PositionTracker.
+
+        Parameters
+        ----------
+        readback_interval : float
+            Interval in seconds between two background position queries. The
+            background queries are disabled if it is 0.
+        """
+        #: list: Stages and their axes, [(stage, [axis, ...])].
+        self.stages = []
+
+        #: float: Interval in seconds between two background position queries.
+        self.readback_interval = float(readback_interval or 0)
+
+        #: dict: Stage positions in the format of {'x_pos': value}.
+        self.positions = {}
+
+        #: dict: Time each position was set or read, {'x_pos': time.time()}.
+        self.timestamps = {}
+
+        #: collections.deque: Last moves that were waited for, in the format of
+        #: [({'x': distance}, duration)], durations in seconds.
+        self.moves = deque(maxlen=100)
+
+        #: threading.RLock: Lock to serialize the position queries and updates.
+        self.lock = threading.RLock()
+
+        #: set: Indices of the stages that have to be asked for their positions.
+        self._stale = set()
+
+        #: int: Number of times the positions were invalidated.
+        self._generation = 0
+
+        #: threading.Thread: Background position query thread.
+        self._readback_thread = None
+
+        #: threading.Event: Stop the background position queries.
+        self._stop_readback = threading.Event()
+
+    @property
+    def is_stale(self):
+        """bool: Whether a stage has to be asked for its position."""
+        return len(self._stale) > 0
+
+    @property
+    def generation(self):
+        """int: Changes every time the positions are invalidated."""
+        return self._generation
+
+    def add_stage(self, stage, axes):
+        """Track the positions of a stage.
+
+        Parameters
+        ----------
+        stage : StageBase
+            Stage device.
+        axes : list[str]
+            Axes of the stage, e.g. ['x', 'y'].
+        """
+        self.stages.append((stage, list(axes)))
+        self._stale.add(len(self.stages) - 1)
+
+    def invalidate(self, stage=None):
+        """Ask a stage for its position the next time the positions are read.
+
+        Parameters
+        ----------
+        stage : StageBase, optional
+            Stage device. All the stages are invalidated if it is None.
+        """
+        with self.lock:
+            self._generation += 1
+            if stage is None:
+                self._stale.update(range(len(self.stages)))
+                return
+            for i, (s, _) in enumerate(self.stages):
+                if s is stage:
+                    self._stale.add(i)
+
+    def validate(self):
+        """Use the cached positions without asking the stages."""
+        with self.lock:
+            self._stale.clear()
+
+    def record(self, stage, pos_dict, success=True, generation=None, duration=None):
+        """Record the setpoints of a move.
+
+        Parameters
+        ----------
+        stage : StageBase
+            Stage device that was moved.
+        pos_dict : dict
+            Setpoints in the format of {'x_abs': value}.
+        success : bool
+            Whether the move succeeded. The stage is invalidated if it did not.
+        generation : int, optional
+            Generation read before the move. The stage is invalidated if the
+            positions were invalidated during the move, e.g. it was stopped.
+        duration : float, optional
+            Duration of the move in seconds if it was waited for.
+        """
+        with self.lock:
+            if not success or (
+                generation is not None and generation != self._generation
+            ):
+                self.invalidate(stage)
+                return
+            timestamp = time.time()
+            distances = {}
+            for axis_abs, value in pos_dict.items():
+                axis = axis_abs[: axis_abs.index("_")]
+                # the stage ignores setpoints out of its limits
+                if not stage.stage_limits or (
+                    getattr(stage, f"{axis}_min", value)
+                    <= value
+                    <= getattr(stage, f"{axis}_max", value)
+                ):
+                    if f"{axis}_pos" in self.positions:
+                        distances[axis] = abs(value - self.positions[f"{axis}_pos"])
+                    self.positions[f"{axis}_pos"] = value
+                    self.timestamps[f"{axis}_pos"] = timestamp
+            if duration is not None and distances:
+                self.moves.append((distances, duration))
+
+    def get_moves(self):
+        """Return the last moves that were waited for.
+
+        Returns
+        -------
+        list
+            Moves in the format of [({'x': distance}, duration)].
+        """
+        with self.lock:
+            return list(self.moves)
+
+    def readback(self, indices=None):
+        """Ask the stages for their positions.
+
+        Parameters
+        ----------
+        indices : iterable[int], optional
+            Indices of the stages to ask. All the stages are asked if it is None.
+        """
+        with self.lock:
+            if indices is None:
+                indices = range(len(self.stages))
+            for i in list(indices):
+                stage, _ = self.stages[i]
+                temp_pos = stage.report_position()
+                timestamp = time.time()
+                self.positions.update(temp_pos)
+                self.timestamps.update(dict.fromkeys(temp_pos, timestamp))
+                self._stale.discard(i)
+
+    def get_positions(self):
+        """Return the stage positions.
+
+        Only the invalidated stages are asked for their positions.
+
+        Returns
+        -------
+        dict
+            Stage positions in the format of {'x_pos': value}.
+        """
+        with self.lock:
+            if self._stale:
+                self.readback(sorted(self._stale))
+            return dict(self.positions)
+
+    def start_readback(self):
+        """Start the background position queries if they are enabled."""
+        if self.readback_interval <= 0 or self._readback_thread is not None:
+            return
+        self._stop_readback.clear()
+        self._readback_thread = threading.Thread(
+            target=self._run_readback, name="PositionReadback", daemon=True
+        )
+        self._readback_thread.start()
+
+    def stop_readback(self):
+        """Stop the background position queries."""
+        if self._readback_thread is None:
+            return
+        self._stop_readback.set()
+        self._readback_thread.join()
+        self._readback_thread = None
+
+    def _run_readback(self):
+        """Query the stages every readback_interval seconds."""
+        while not self._stop_readback.wait(self.readback_interval):
+            try:
+                self.readback()
+            except Exception as e:
+                logger.debug(f"PositionTracker - Position readback failed: {e}")
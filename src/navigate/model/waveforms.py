@@ -32,10 +32,12 @@
 
 # Standard Library Imports
 import logging
+import threading
+import time
+from collections import OrderedDict
 
 # Third Party Imports
 import numpy as np
-from scipy import signal
 
 # Local Imports
 
@@ -326,6 +328,7 @@ def sawtooth(
     --------
     >>> typical_galvo = sawtooth(sample_rate, sweep_time, 10, 1, 0, 50, np.pi/2)
     """
+    from scipy import signal
 
     samples = int(np.multiply(sample_rate, sweep_time))
     duty_cycle = duty_cycle / 100
@@ -402,6 +405,8 @@ def square(
     --------
     >>> typical_laser = square(sample_rate, sweep_time, 10, 1, 0, 50, np.pi)
     """
+    from scipy import signal
+
     samples = int(sample_rate * sweep_time)
     duty_cycle = duty_cycle / 100
     t = np.linspace(0, sweep_time, samples)
@@ -478,3 +483,157 @@ def smooth_waveform(waveform, percent_smoothing=10):
     )
 
     return smoothed_waveform
+
+
+def waveform_chunks(waveform, n_samples, chunk_size=65536):
+    """Yield a periodic waveform in chunks without materializing it.
+
+    Memory use depends on the chunk size and the period only, not on the number of
+    samples generated.
+
+    Parameters
+    ----------
+    waveform : np.array
+        One period of the waveform. Samples are along the last axis, so a
+        (n_channels x samples) array yields chunks for every channel.
+    n_samples : int
+        Total number of samples to generate.
+    chunk_size : int
+        Maximum number of samples per chunk.
+
+    Yields
+    ------
+    chunk : np.array
+        Next samples of the repeated waveform.
+    """
+    period = waveform.shape[-1]
+    position = 0
+    while position < n_samples:
+        size = min(chunk_size, n_samples - position)
+        indices = (position + np.arange(size)) % period
+        yield np.take(waveform, indices, axis=-1)
+        position += size
+
+
+class WaveformCache:
+    """Least-recently-used cache of calculated waveforms.
+
+    Waveforms are keyed by a hashable tuple of every value they are calculated from
+    (e.g., sample rate, exposure and sweep times, waveform constants), so they are
+    reused across channel switches and repeated acquisitions. Cached arrays are
+    read-only: a waveform that needs changing must be recalculated under a new key.
+    The cache is bounded by the number of waveforms and by their total size, and
+    may be shared by threads.
+    """
+
+    def __init__(self, max_size=128, max_megabytes=64):
+        """Initialize the WaveformCache.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of cached waveforms.
+        max_megabytes : float
+            Maximum total size of the cached waveforms in megabytes.
+        """
+        #: int: Maximum number of cached waveforms.
+        self.max_size = max_size
+
+        #: int: Maximum total size of the cached waveforms in bytes.
+        self.max_bytes = int(max_megabytes * 1024**2)
+
+        #: OrderedDict: Cached waveforms, least recently used first.
+        self.waveforms = OrderedDict()
+
+        #: int: Total size of the cached waveforms in bytes.
+        self.nbytes = 0
+
+        #: threading.Lock: Lock of the cached waveforms and the counters.
+        self._lock = threading.Lock()
+
+        #: int: Number of waveforms returned from the cache.
+        self.hits = 0
+
+        #: int: Number of waveforms calculated.
+        self.misses = 0
+
+        #: float: Total time spent calculating waveforms in seconds.
+        self.compute_time = 0.0
+
+    def __len__(self):
+        """Return the number of cached waveforms."""
+        return len(self.waveforms)
+
+    def get(self, key, func, *args, **kwargs):
+        """Return the cached waveform for key, calculating it on a miss.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable values the waveform is calculated from.
+        func : callable
+            Function calculating the waveform, called as func(*args, **kwargs).
+
+        Returns
+        -------
+        waveform : np.array
+            Read-only waveform, or whatever func returns if it is not an array.
+        """
+        with self._lock:
+            waveform = self.waveforms.get(key)
+            if waveform is not None:
+                self.waveforms.move_to_end(key)
+                self.hits += 1
+                return waveform
+
+        # calculate outside of the lock, a thread calculating the same waveform
+        # at the same time only costs a second calculation
+        start_time = time.perf_counter()
+        waveform = func(*args, **kwargs)
+        compute_time = time.perf_counter() - start_time
+
+        nbytes = 0
+        if isinstance(waveform, np.ndarray):
+            waveform.setflags(write=False)
+            nbytes = waveform.nbytes
+        with self._lock:
+            self.compute_time += compute_time
+            self.misses += 1
+            if nbytes > self.max_bytes or key in self.waveforms:
+                return waveform
+            self.waveforms[key] = waveform
+            self.nbytes += nbytes
+            while len(self.waveforms) > self.max_size or self.nbytes > self.max_bytes:
+                _, evicted = self.waveforms.popitem(last=False)
+                if isinstance(evicted, np.ndarray):
+                    self.nbytes -= evicted.nbytes
+        return waveform
+
+    def clear(self):
+        """Remove all cached waveforms and reset the counters."""
+        with self._lock:
+            self.waveforms.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.compute_time = 0.0
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns
+        -------
+        stats : dict
+            Number of cached waveforms, hits, misses and compute time in seconds.
+        """
+        with self._lock:
+            return {
+                "size": len(self.waveforms),
+                "hits": self.hits,
+                "misses": self.misses,
+                "compute_time": self.compute_time,
+            }
+
+
+#: WaveformCache: Waveform cache shared by the devices of the model.
+waveform_cache = WaveformCache()
@@ -0,0 +1,241 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import base64
+import json
+import logging
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+def decode_json_payload(content):
+    """Decode the JSON segmentation payload into a stack of images.
+
+    Parameters
+    ----------
+    content : bytes
+        JSON document with "dtype", "shape" and base64 encoded "image" entries.
+
+    Returns
+    -------
+    np.ndarray
+        (n_images x height x width) array.
+    """
+    payload = json.loads(content)
+    shape = tuple(payload["shape"])
+    images = [
+        np.frombuffer(base64.b64decode(image), dtype=payload["dtype"]).reshape(shape)
+        for image in payload["image"]
+    ]
+    return np.stack(images) if images else np.empty((0,) + shape)
+
+
+def decode_binary_payload(content, headers):
+    """Decode the binary segmentation payload into a stack of images.
+
+    Parameters
+    ----------
+    content : bytes
+        Raw image bytes, zlib compressed if the X-Image-Compression header is "zlib".
+    headers : email.message.Message or dict
+        Request headers with X-Image-Dtype and X-Image-Shape.
+
+    Returns
+    -------
+    np.ndarray
+        (n_images x height x width) array.
+    """
+    if headers.get("X-Image-Compression", "none") == "zlib":
+        content = zlib.decompress(content)
+    shape = tuple(int(v) for v in headers["X-Image-Shape"].split(","))
+    return np.frombuffer(content, dtype=headers["X-Image-Dtype"]).reshape(shape)
+
+
+def threshold_segmentation(images, threshold=None):
+    """Label pixels above the threshold as 2 and the others as 1.
+
+    Parameters
+    ----------
+    images : np.ndarray
+        (n_images x height x width) array.
+    threshold : float or None
+        Intensity threshold, the mean of each image if None.
+
+    Returns
+    -------
+    list[np.ndarray]
+        (height x width x 1) uint8 masks, one per image.
+    """
+    masks = []
+    for image in images:
+        t = image.mean() if threshold is None else threshold
+        masks.append(np.where(image > t, 2, 1).astype(np.uint8)[..., np.newaxis])
+    return masks
+
+
+class IlastikStandInServer:
+    """Local stand-in for the Ilastik segmentation service.
+
+    Implements the /load and /segmentation endpoints of the Ilastik REST API with a
+    threshold segmentation, so the segmentation client can be tested and
+    benchmarked without Ilastik. The server accepts the JSON payload and, unless
+    accept_binary is False, the binary payload.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, accept_binary=True, threshold=None):
+        """Initialize the IlastikStandInServer.
+
+        Parameters
+        ----------
+        host : str
+            Host address.
+        port : int
+            Port, 0 picks a free port.
+        accept_binary : bool
+            Accept binary payloads, otherwise answer them with 415.
+        threshold : float or None
+            Segmentation threshold, the mean of each image if None.
+        """
+        #: bool: Accept binary payloads.
+        self.accept_binary = accept_binary
+
+        #: float: Segmentation threshold.
+        self.threshold = threshold
+
+        #: str: Loaded project file.
+        self.project_file = None
+
+        #: list: (content type, number of bytes, number of images) of each request.
+        self.requests = []
+
+        #: threading.Lock: Lock of the request records.
+        self.lock = threading.Lock()
+
+        #: ThreadingHTTPServer: HTTP server.
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+        #: threading.Thread: Thread serving the requests.
+        self.thread = None
+
+    @property
+    def url(self):
+        """str: Service url, ending in /ilastik as the real service."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/ilastik"
+
+    def start(self):
+        """Serve the requests in a daemon thread."""
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, name="IlastikStandInServer", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _make_handler(self):
+        """Create the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"IlastikStandInServer - {format % args}")
+
+            def send(self, status, content=b"", content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if not url.path.endswith("/load"):
+                    return self.send(404)
+                server.project_file = parse_qs(url.query).get("project", [None])[0]
+                self.send(200, json.dumps({"project": server.project_file}).encode())
+
+            def do_POST(self):
+                content = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not urlparse(self.path).path.endswith("/segmentation"):
+                    return self.send(404)
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.startswith("application/octet-stream"):
+                    if not server.accept_binary:
+                        return self.send(415)
+                    images = decode_binary_payload(content, self.headers)
+                else:
+                    images = decode_json_payload(content)
+                with server.lock:
+                    server.requests.append((content_type, len(content), len(images)))
+                buffer = BytesIO()
+                np.savez(buffer, *threshold_segmentation(images, server.threshold))
+                self.send(200, buffer.getvalue(), "application/octet-stream")
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ilastik stand-in server")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+    stand_in = IlastikStandInServer(port=args.port)
+    print(f"Serving {stand_in.url}")
+    stand_in.httpd.serve_forever()
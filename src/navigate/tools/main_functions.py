@@ -224,4 +224,15 @@ def create_parser():
         "This file specifies how the logging will be performed.",
     )
 
+    input_args.add_argument(
+        "--trace-file",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path of the execution trace of each acquisition. \n"
+        "Records how long each function of each feature and the waits between the "
+        "signal and data threads take, in the Chrome trace format (Perfetto). A "
+        "time-stamped file is created for each acquisition if it is a directory.",
+    )
+
     return parser
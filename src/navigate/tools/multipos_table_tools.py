@@ -30,9 +30,12 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
-import numpy as np
-import pandas as pd
 from math import ceil
+import time
+
+import numpy as np
+
+from navigate.tools.position_table import TABLE_AXES
 
 
 def sign(x):
@@ -228,12 +231,303 @@ def update_table(table, pos, append=False):
     None :
         Table is updated
     """
+    import pandas as pd
+
     frame = pd.DataFrame(pos, columns=list("XYZRF"))
     if append:
-        table.model.df = table.model.df.append(frame, ignore_index=True)
+        table.model.df = pd.concat([table.model.df, frame], ignore_index=True)
     else:
         table.model.df = frame
     table.currentrow = table.model.df.shape[0] - 1
     table.update_rowcolors()
     table.redraw()
     table.tableChanged()
+
+
+def get_axis_velocities(velocities=None):
+    """Get the velocity of each multi-position table axis.
+
+    Parameters
+    ----------
+    velocities : dict, list, float or None
+        Velocity of each axis. A dictionary is keyed by axis name ("x", "y", "z",
+        "theta", "f"), a list follows the table column order and a single number is
+        used for all axes. Missing or non-positive values are treated as 1.
+
+    Returns
+    -------
+    np.array
+        Velocity of each table column.
+    """
+    if velocities is None:
+        return np.ones(len(TABLE_AXES))
+    if isinstance(velocities, dict):
+        velocities = [velocities.get(axis, 1) for axis in TABLE_AXES]
+    velocities = np.broadcast_to(
+        np.asarray(velocities, dtype=float), (len(TABLE_AXES),)
+    ).copy()
+    velocities[~(velocities > 0)] = 1
+    return velocities
+
+
+def calc_travel_times(positions, velocities=None):
+    """Calculate the stage travel time between consecutive positions.
+
+    All axes move simultaneously, so the slowest axis limits each move.
+
+    Parameters
+    ----------
+    positions : list or np.array
+        (n_positions x (x, y, z, theta, f)) array of positions.
+    velocities : dict, list, float or None
+        Velocity of each axis, see get_axis_velocities.
+
+    Returns
+    -------
+    np.array
+        (n_positions - 1) travel times.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, len(TABLE_AXES))
+    if positions.shape[0] < 2:
+        return np.zeros(0)
+    scaled = positions / get_axis_velocities(velocities)
+    return np.abs(np.diff(scaled, axis=0)).max(axis=1)
+
+
+def serpentine_order(positions, axes_order=(3, 4, 2, 1, 0), decimals=3):
+    """Order positions in a serpentine (boustrophedon) path.
+
+    Positions are grouped along the slow axes and the direction of each faster axis
+    is reversed in every other group, so the stage never jumps back to the start
+    of a row.
+
+    Parameters
+    ----------
+    positions : list or np.array
+        (n_positions x (x, y, z, theta, f)) array of positions.
+    axes_order : tuple
+        Table columns from the slowest to the fastest axis.
+    decimals : int
+        Positions are rounded to this many decimals before grouping.
+
+    Returns
+    -------
+    np.array
+        Indices of the positions in the serpentine order.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, len(TABLE_AXES))
+    n = positions.shape[0]
+    group_id = np.zeros(n, dtype=int)
+    order = np.arange(n)
+    for axis in axes_order:
+        _, rank = np.unique(
+            np.round(positions[:, axis], decimals), return_inverse=True
+        )
+        key = np.where(group_id % 2 == 1, -rank, rank)
+        order = np.lexsort((key, group_id))
+        sorted_group, sorted_rank = group_id[order], rank[order]
+        changed = np.ones(n, dtype=bool)
+        changed[1:] = (np.diff(sorted_group) != 0) | (np.diff(sorted_rank) != 0)
+        group_id[order] = np.cumsum(changed) - 1
+    return order
+
+
+def nearest_neighbor_order(positions, velocities=None, start=0):
+    """Order positions by always travelling to the closest unvisited position.
+
+    Parameters
+    ----------
+    positions : list or np.array
+        (n_positions x (x, y, z, theta, f)) array of positions.
+    velocities : dict, list, float or None
+        Velocity of each axis, see get_axis_velocities.
+    start : int
+        Index of the first position.
+
+    Returns
+    -------
+    np.array
+        Indices of the positions in the visiting order.
+    """
+    from scipy.spatial import cKDTree
+
+    positions = np.asarray(positions, dtype=float).reshape(-1, len(TABLE_AXES))
+    n = positions.shape[0]
+    if n < 3:
+        return np.arange(n)
+    scaled = positions / get_axis_velocities(velocities)
+    tree = cKDTree(scaled)
+    tree_ids = np.arange(n)
+    close_ids = tree.query(scaled, k=min(9, n), p=np.inf)[1][:, 1:].tolist()
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    is_visited = visited.tolist()
+    order = [start]
+    current = start
+    for _ in range(n - 1):
+        next_position = -1
+        for candidate in close_ids[current]:
+            if not is_visited[candidate]:
+                next_position = candidate
+                break
+        if next_position < 0:
+            idx = tree_ids[
+                tree.query(scaled[current], k=min(64, tree_ids.size), p=np.inf)[1]
+            ]
+            candidates = idx[~visited[idx]]
+            if candidates.size > 0:
+                next_position = int(candidates[0])
+        if next_position < 0:
+            # the tree is crowded with visited positions, rebuild it
+            tree_ids = np.flatnonzero(~visited)
+            tree = cKDTree(scaled[tree_ids])
+            next_position = int(tree_ids[tree.query(scaled[current], p=np.inf)[1]])
+        current = next_position
+        order.append(current)
+        visited[current] = True
+        is_visited[current] = True
+    return np.array(order)
+
+
+def two_opt_order(positions, order, velocities=None, neighbors=8, time_limit=0.5):
+    """Improve a path with 2-opt moves restricted to nearby positions.
+
+    The path is open, it does not return to the first position. Each move
+    reverses a section of the path if that shortens the total travel time.
+
+    Parameters
+    ----------
+    positions : list or np.array
+        (n_positions x (x, y, z, theta, f)) array of positions.
+    order : list or np.array
+        Indices of the positions in the initial visiting order.
+    velocities : dict, list, float or None
+        Velocity of each axis, see get_axis_velocities.
+    neighbors : int
+        Number of nearby positions considered for each position.
+    time_limit : float
+        Time budget in seconds.
+
+    Returns
+    -------
+    np.array
+        Indices of the positions in the improved visiting order.
+    """
+    from scipy.spatial import cKDTree
+
+    start_time = time.perf_counter()
+    positions = np.asarray(positions, dtype=float).reshape(-1, len(TABLE_AXES))
+    path = np.array(order, dtype=int)
+    n = path.shape[0]
+    if n < 4:
+        return path
+    scaled = positions / get_axis_velocities(velocities)
+    neighbor_times, neighbor_ids = cKDTree(scaled).query(
+        scaled, k=min(neighbors + 1, n), p=np.inf
+    )
+    neighbor_times = neighbor_times[:, 1:].tolist()
+    neighbor_ids = neighbor_ids[:, 1:].tolist()
+    points = [tuple(v) for v in scaled.tolist()]
+
+    def travel_time(a, b):
+        # -1 is a virtual position before the first and after the last position
+        if a < 0 or b < 0:
+            return 0.0
+        return max(abs(u - v) for u, v in zip(points[a], points[b]))
+
+    # edge_times[k + 1] is the travel time from path[k] to path[k + 1]
+    edge_times = np.zeros(n + 1)
+    edge_times[1:n] = calc_travel_times(scaled[path], 1)
+    index = np.empty(n, dtype=int)
+    index[path] = np.arange(n)
+
+    def node(k):
+        return path[k] if 0 <= k < n else -1
+
+    improved = True
+    while improved and time.perf_counter() - start_time < time_limit:
+        improved = False
+        for a in range(n):
+            if time.perf_counter() - start_time > time_limit:
+                break
+            for t_ac, c in zip(neighbor_times[a], neighbor_ids[a]):
+                i, j = sorted((index[a], index[c]))
+                # new edge a-c either after or before a in the path
+                for p, q, u, v in ((i, j, i + 1, j + 1), (i - 1, j - 1, i - 1, j - 1)):
+                    old = edge_times[p + 1] + edge_times[q + 1]
+                    if old - t_ac <= 1e-9:
+                        continue
+                    # the other new edge after reversing path[p + 1 : q + 1]
+                    t_other = travel_time(node(u), node(v))
+                    if old - t_ac - t_other > 1e-9:
+                        path[p + 1 : q + 1] = path[p + 1 : q + 1][::-1]
+                        index[path[p + 1 : q + 1]] = np.arange(p + 1, q + 1)
+                        edge_times[p + 2 : q + 1] = edge_times[p + 2 : q + 1][::-1]
+                        edge_times[p + 1] = travel_time(node(p), node(p + 1))
+                        edge_times[q + 1] = travel_time(node(q), node(q + 1))
+                        improved = True
+                        break
+                else:
+                    continue
+                break
+    return path
+
+
+def optimize_tile_order(
+    positions, velocities=None, method="auto", two_opt=True, time_limit=0.25
+):
+    """Reorder positions to reduce the stage travel time.
+
+    Parameters
+    ----------
+    positions : list or np.array
+        (n_positions x (x, y, z, theta, f)) array of positions.
+    velocities : dict, list, float or None
+        Velocity of each axis, see get_axis_velocities.
+    method : str
+        "serpentine", "nearest_neighbor" or "auto". "auto" keeps the fastest of the
+        original, the serpentine and the nearest neighbor path.
+    two_opt : bool
+        Improve the path with 2-opt moves.
+    time_limit : float
+        Time budget of the 2-opt improvement in seconds.
+
+    Returns
+    -------
+    order : np.array
+        Indices of the positions in the new visiting order.
+    report : dict
+        Method used, original and optimized travel time and time saved in seconds.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, len(TABLE_AXES))
+    velocities = get_axis_velocities(velocities)
+
+    def path_time(order):
+        return float(calc_travel_times(positions[order], velocities).sum())
+
+    candidates = {"original": np.arange(positions.shape[0])}
+    if method in ["auto", "serpentine"]:
+        candidates["serpentine"] = serpentine_order(positions)
+    if method in ["auto", "nearest_neighbor"]:
+        candidates["nearest_neighbor"] = nearest_neighbor_order(positions, velocities)
+    times = {name: path_time(order) for name, order in candidates.items()}
+    best = min(times, key=times.get)
+    order = candidates[best]
+    optimized_time = times[best]
+
+    if two_opt:
+        improved_order = two_opt_order(
+            positions, order, velocities, time_limit=time_limit
+        )
+        improved_time = path_time(improved_order)
+        if improved_time < optimized_time:
+            order, optimized_time = improved_order, improved_time
+            best += "+2-opt"
+
+    report = {
+        "method": best,
+        "original_time": times["original"],
+        "optimized_time": optimized_time,
+        "time_saved": times["original"] - optimized_time,
+    }
+    return order, report
@@ -0,0 +1,291 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+from multiprocessing.managers import DictProxy, ListProxy
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+
+#: list: Order of the stage axes in a multi-position table row.
+TABLE_AXES = ["x", "y", "z", "theta", "f"]
+
+
+def positions_to_array(positions):
+    """Convert positions to a (n_positions x (x, y, z, theta, f)) array.
+
+    Parameters
+    ----------
+    positions : list, np.array, ListProxy, PositionTable or None
+        Positions as dictionaries keyed by axis name or as rows in the table axis
+        order. A ListProxy is read with a single call to the manager.
+
+    Returns
+    -------
+    np.array
+        (n_positions x (x, y, z, theta, f)) float array.
+
+    Raises
+    ------
+    ValueError
+        If a position is not valid.
+    """
+    if positions is None:
+        return np.empty((0, len(TABLE_AXES)))
+    if isinstance(positions, PositionTable):
+        return positions.array.copy()
+    if isinstance(positions, ListProxy):
+        positions = positions[:]
+    if isinstance(positions, np.ndarray):
+        return positions.astype(float).reshape(-1, len(TABLE_AXES))
+    rows = []
+    for position in positions:
+        if isinstance(position, DictProxy):
+            position = position.copy()
+        if isinstance(position, dict):
+            try:
+                position = [position[axis] for axis in TABLE_AXES]
+            except KeyError as e:
+                raise ValueError(f"Position is missing axis {e}")
+        rows.append(position)
+    if not rows:
+        return np.empty((0, len(TABLE_AXES)))
+    try:
+        return np.array(rows, dtype=float).reshape(-1, len(TABLE_AXES))
+    except TypeError as e:
+        raise ValueError(f"Position is not valid: {e}")
+
+
+class PositionTable:
+    """NumPy-backed multi-position table.
+
+    Positions are stored as rows of a float array in the order of TABLE_AXES.
+    Indexing a single position returns a dictionary keyed by axis name, so the table
+    can be used wherever a list of position dictionaries was used.
+
+    Listeners registered with subscribe are called with the event name ("reset",
+    "append", "remove" or "reorder") and the event data after every change.
+    """
+
+    def __init__(self, positions=None):
+        """Initialize the PositionTable.
+
+        Parameters
+        ----------
+        positions : list, np.array, ListProxy, PositionTable or None
+            Initial positions, see positions_to_array.
+        """
+        #: np.array: Position buffer, only the first size rows are valid.
+        self._data = positions_to_array(positions)
+
+        #: int: Number of positions in the table.
+        self._size = self._data.shape[0]
+
+        #: list: Functions called when the table changes.
+        self._listeners = []
+
+    def __len__(self):
+        """Return the number of positions."""
+        return self._size
+
+    def __getitem__(self, index):
+        """Return the position at index as a dictionary keyed by axis name.
+
+        Parameters
+        ----------
+        index : int
+            Position index, negative indices count from the end.
+
+        Returns
+        -------
+        dict
+            Position in the format of {axis: value}.
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("position index out of range")
+        return dict(zip(TABLE_AXES, self._data[index].tolist()))
+
+    def __iter__(self):
+        """Iterate over the positions as dictionaries keyed by axis name."""
+        for row in self.array.tolist():
+            yield dict(zip(TABLE_AXES, row))
+
+    def __repr__(self):
+        """Return the string representation of the table."""
+        return f"PositionTable({self.to_list()})"
+
+    @property
+    def array(self):
+        """np.array: (n_positions x (x, y, z, theta, f)) view of the positions."""
+        return self._data[: self._size]
+
+    def subscribe(self, listener):
+        """Register a function called when the table changes.
+
+        Parameters
+        ----------
+        listener : callable
+            Called as listener(event, data).
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Remove a function registered with subscribe.
+
+        Parameters
+        ----------
+        listener : callable
+            Function to remove.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self, event, data=None):
+        """Call every registered listener.
+
+        Parameters
+        ----------
+        event : str
+            Name of the change.
+        data : object
+            Data of the change.
+        """
+        for listener in self._listeners:
+            listener(event, data)
+
+    def set(self, positions, notify=True):
+        """Replace all the positions.
+
+        Parameters
+        ----------
+        positions : list, np.array, ListProxy, PositionTable or None
+            New positions, see positions_to_array.
+        notify : bool
+            Send a "reset" event.
+        """
+        self._data = positions_to_array(positions)
+        self._size = self._data.shape[0]
+        if notify:
+            self.notify("reset", self.array)
+
+    def append(self, position):
+        """Append a position.
+
+        Parameters
+        ----------
+        position : dict or list
+            Position in the format of {axis: value} or in the table axis order.
+        """
+        self.extend([position])
+
+    def extend(self, positions):
+        """Append positions.
+
+        The buffer grows geometrically, so appending is amortized O(1).
+
+        Parameters
+        ----------
+        positions : list, np.array, ListProxy or PositionTable
+            Positions to append, see positions_to_array.
+        """
+        rows = positions_to_array(positions)
+        new_size = self._size + rows.shape[0]
+        if new_size > self._data.shape[0]:
+            buffer = np.empty((max(new_size, 2 * self._data.shape[0]), len(TABLE_AXES)))
+            buffer[: self._size] = self.array
+            self._data = buffer
+        self._data[self._size : new_size] = rows
+        self._size = new_size
+        self.notify("append", rows)
+
+    def remove(self, keep_flags):
+        """Remove positions in bulk.
+
+        Parameters
+        ----------
+        keep_flags : list[bool] or np.array
+            False: the position should be removed
+            True: the position should be kept
+            Positions beyond the end of keep_flags are kept.
+        """
+        keep = np.ones(self._size, dtype=bool)
+        flags = np.asarray(keep_flags, dtype=bool)[: self._size]
+        keep[: flags.shape[0]] = flags
+        self._data = self.array[keep]
+        self._size = self._data.shape[0]
+        self.notify("remove", keep)
+
+    def reorder(self, order):
+        """Reorder the positions.
+
+        Parameters
+        ----------
+        order : list[int] or np.array
+            Indices of the positions in the new order.
+        """
+        order = np.asarray(order, dtype=int)
+        self._data = self.array[order]
+        self._size = self._data.shape[0]
+        self.notify("reorder", order)
+
+    def to_list(self):
+        """Return the positions as a list of dictionaries keyed by axis name.
+
+        Returns
+        -------
+        list[dict]
+            Positions in the format of [{axis: value}].
+        """
+        return list(self)
+
+    def to_list_proxy(self, manager):
+        """Return the positions as a shared list.
+
+        The positions are stored as plain dictionaries in a single ListProxy, which
+        is created with one call to the manager.
+
+        Parameters
+        ----------
+        manager : multiprocessing.Manager
+            Shares objects (e.g., dict) between processes
+
+        Returns
+        -------
+        ListProxy
+            Shared list of positions in the format of [{axis: value}].
+        """
+        return manager.list(self.to_list())
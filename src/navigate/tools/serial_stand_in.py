@@ -0,0 +1,336 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+import threading
+import time
+
+# Third Party Imports
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class LoopbackSerial:
+    """Stand-in for a serial port connected to a device.
+
+    Implements the part of the serial.Serial interface used by the device APIs.
+    Every write is handed to a responder, which returns the bytes the device
+    answers. Responses arrive after the link latency plus the processing time of
+    the device. The device processes one command at a time, so commands written
+    back to back share the latency but not the processing time, as with a real
+    controller.
+    """
+
+    def __init__(self, responder, latency=0.0, process_time=0.0, timeout=1.0):
+        """Initialize the LoopbackSerial.
+
+        Parameters
+        ----------
+        responder : callable
+            Called with each written command (bytes), returns the response (bytes)
+            or None.
+        latency : float
+            Round trip time of the link in seconds.
+        process_time : float
+            Time in seconds the device needs to process a command.
+        timeout : float
+            Read timeout in seconds.
+        """
+        #: callable: Returns the response of the device to a command.
+        self.responder = responder
+
+        #: float: Round trip time of the link in seconds.
+        self.latency = latency
+
+        #: float: Time in seconds the device needs to process a command.
+        self.process_time = process_time
+
+        #: float: Read timeout in seconds.
+        self.timeout = timeout
+
+        #: bool: Is the port open.
+        self.is_open = False
+
+        #: list[bytes]: Commands written to the port.
+        self.log = []
+
+        #: threading.Condition: Guards the buffers.
+        self._condition = threading.Condition()
+
+        #: list[tuple]: (arrival time, response) of the responses in flight.
+        self._pending = []
+
+        #: bytes: Received bytes.
+        self._buffer = b""
+
+        #: float: Time at which the device finishes the last command.
+        self._busy_until = 0.0
+
+    def open(self):
+        """Open the port."""
+        self.is_open = True
+
+    def close(self):
+        """Close the port."""
+        self.is_open = False
+
+    def set_buffer_size(self, rx_size=4096, tx_size=None):
+        """Set the buffer sizes, which are not limited."""
+        pass
+
+    def write(self, data):
+        """Send a command to the device.
+
+        Parameters
+        ----------
+        data : bytes
+            Command.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+        """
+        now = time.perf_counter()
+        response = self.responder(data)
+        with self._condition:
+            self.log.append(data)
+            done = max(now + self.latency / 2, self._busy_until) + self.process_time
+            self._busy_until = done
+            if response:
+                self._pending.append((done + self.latency / 2, response))
+            self._condition.notify_all()
+        return len(data)
+
+    def _receive(self):
+        """Move the responses that arrived into the buffer.
+
+        Returns
+        -------
+        float or None
+            Arrival time of the next response in flight.
+        """
+        now = time.perf_counter()
+        while self._pending and self._pending[0][0] <= now:
+            self._buffer += self._pending.pop(0)[1]
+        return self._pending[0][0] if self._pending else None
+
+    def _wait(self, is_ready, timeout):
+        """Wait until is_ready returns True or the timeout is reached."""
+        deadline = time.perf_counter() + (self.timeout if timeout is None else timeout)
+        with self._condition:
+            while True:
+                next_arrival = self._receive()
+                if is_ready():
+                    return
+                now = time.perf_counter()
+                if now >= deadline:
+                    return
+                wait = deadline - now
+                if next_arrival is not None:
+                    wait = min(wait, next_arrival - now)
+                self._condition.wait(max(wait, 0))
+
+    def read(self, size=1):
+        """Read up to size bytes.
+
+        Parameters
+        ----------
+        size : int
+            Number of bytes.
+
+        Returns
+        -------
+        bytes
+            Received bytes, fewer than size if the timeout was reached.
+        """
+        self._wait(lambda: len(self._buffer) >= size, None)
+        with self._condition:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self):
+        """Read up to and including a line feed.
+
+        Returns
+        -------
+        bytes
+            Received line, incomplete if the timeout was reached.
+        """
+        self._wait(lambda: b"\n" in self._buffer, None)
+        with self._condition:
+            index = self._buffer.find(b"\n") + 1 or len(self._buffer)
+            data, self._buffer = self._buffer[:index], self._buffer[index:]
+        return data
+
+    def read_all(self):
+        """Read the received bytes without waiting.
+
+        Returns
+        -------
+        bytes
+            Received bytes.
+        """
+        with self._condition:
+            self._receive()
+            data, self._buffer = self._buffer, b""
+        return data
+
+    @property
+    def in_waiting(self):
+        """int: Number of received bytes."""
+        with self._condition:
+            self._receive()
+            return len(self._buffer)
+
+    def inWaiting(self):
+        """Return the number of received bytes."""
+        return self.in_waiting
+
+    def reset_input_buffer(self):
+        """Discard the received bytes."""
+        self.read_all()
+
+    def reset_output_buffer(self):
+        """Discard the bytes not yet sent, writes are sent immediately."""
+        pass
+
+
+class TigerStandIn:
+    """Responder emulating an ASI Tiger controller.
+
+    Answers the serial commands used by the TigerController, so it can be tested
+    and benchmarked with a LoopbackSerial instead of a controller. Moves complete
+    instantly.
+    """
+
+    def __init__(self, axes=("X", "Y", "Z", "M", "N")):
+        """Initialize the TigerStandIn.
+
+        Parameters
+        ----------
+        axes : tuple[str]
+            Motor axes in the order of the controller.
+        """
+        #: list[str]: Motor axes in the order of the controller.
+        self.axes = list(axes)
+
+        #: dict: Positions in ASI units (tenths of microns).
+        self.positions = {axis: 0.0 for axis in self.axes}
+
+        #: dict: Speeds in mm/s.
+        self.speeds = {axis: 1.0 for axis in self.axes}
+
+        #: dict: Values of the settings, e.g. {"B": {"X": 0.0}}.
+        self.settings = {}
+
+    def __call__(self, command):
+        """Return the response to a command.
+
+        Parameters
+        ----------
+        command : bytes
+            Command terminated with a carriage return.
+
+        Returns
+        -------
+        bytes
+            Response terminated with a carriage return and a line feed.
+        """
+        temps = command.decode(encoding="ascii").split()
+        if not temps:
+            return b":N-1\r\n"
+        return bytes(f"{self.respond(temps[0], temps[1:])}\r\n", encoding="ascii")
+
+    def respond(self, name, args):
+        """Return the response to a command.
+
+        Parameters
+        ----------
+        name : str
+            Command name, e.g. "MOVE".
+        args : list[str]
+            Command arguments, e.g. ["X=10"].
+
+        Returns
+        -------
+        str
+            Response.
+        """
+        values = dict(arg.split("=", 1) for arg in args if "=" in arg)
+        queried = [arg[:-1] for arg in args if arg.endswith("?")]
+        if any(axis not in self.axes for axis in list(values) + queried):
+            return ":N-2"
+        if name in ("MOVE", "M"):
+            for axis, value in values.items():
+                self.positions[axis] = float(value)
+        elif name in ("MOVREL", "R"):
+            for axis, value in values.items():
+                self.positions[axis] += float(value)
+        elif name in ("WHERE", "W"):
+            return " ".join(
+                [":A"]
+                + [f"{self.positions[axis]:.1f}" for axis in self.axes if axis in args]
+            )
+        elif name == "/":
+            return "N"
+        elif name == "RS":
+            return ":A N"
+        elif name == "BU":
+            return (
+                f"TIGER_COMM\rMotor Axes: {' '.join(self.axes)} 0 1\r"
+                "Axis Addr: 1 1 2 2 8 8"
+            )
+        elif name in ("SPEED", "S"):
+            if queried:
+                return " ".join(
+                    [":A"] + [f"{axis}={self.speeds[axis]:.6f}" for axis in queried]
+                )
+            for axis, value in values.items():
+                self.speeds[axis] = float(value)
+        elif name == "CNTS":
+            return " ".join([":A"] + [f"{axis}=10000.0" for axis in queried])
+        elif name in ("AA", "AZ", "B", "PC", "E"):
+            settings = self.settings.setdefault(name, {})
+            for axis, value in values.items():
+                settings[axis] = float(value)
+            for axis in args:
+                if axis in self.axes:
+                    settings[axis] = None
+        elif name not in ("HALT", "SCAN", "SCANR", "SCANV"):
+            return ":N-1"
+        return ":A"
@@ -31,8 +31,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 # Standard library imports
+import hashlib
 
 # Third-party imports
+import numpy as np
 
 # Local application imports
 
@@ -81,3 +83,139 @@ def get_waveform_template_parameters(
         expand_num = 1
 
     return repeat_num, expand_num
+
+
+def decimate_waveform(waveform, max_points=2000, positions=None):
+    """Decimate a waveform to a min/max envelope for display.
+
+    The waveform is split into max_points // 2 bins, and the minimum and maximum of
+    each bin are kept in the order they occur, so peaks survive the decimation.
+
+    Parameters
+    ----------
+    waveform : np.array
+        Waveform to decimate.
+    max_points : int
+        Maximum number of points returned.
+    positions : np.array or None
+        Sample positions of the waveform. Defaults to 0, 1, 2, ...
+
+    Returns
+    -------
+    positions : np.array
+        Sample positions of the decimated waveform.
+    values : np.array
+        Values of the decimated waveform.
+    """
+    waveform = np.asarray(waveform, dtype=float)
+    if positions is None:
+        positions = np.arange(len(waveform))
+    if len(waveform) <= max_points:
+        return np.asarray(positions), waveform
+
+    n_bins = max(max_points // 2, 1)
+    bin_size = int(np.ceil(len(waveform) / n_bins))
+    n_bins = int(np.ceil(len(waveform) / bin_size))
+    pad = n_bins * bin_size - len(waveform)
+    bins = np.pad(waveform, (0, pad), mode="edge").reshape(n_bins, bin_size)
+    bin_positions = np.pad(positions, (0, pad), mode="edge").reshape(n_bins, bin_size)
+
+    rows = np.arange(n_bins)
+    arg_min = np.argmin(bins, axis=1)
+    arg_max = np.argmax(bins, axis=1)
+    first = np.minimum(arg_min, arg_max)
+    second = np.maximum(arg_min, arg_max)
+    indices = np.stack([first, second], axis=1)
+    values = bins[rows[:, None], indices].ravel()
+    positions = bin_positions[rows[:, None], indices].ravel()
+    return positions, values
+
+
+def repeat_decimated_waveform(positions, values, n_samples, repeat, max_points=2000):
+    """Repeat a decimated waveform without exceeding max_points.
+
+    Parameters
+    ----------
+    positions : np.array
+        Sample positions of the decimated waveform.
+    values : np.array
+        Values of the decimated waveform.
+    n_samples : int
+        Number of samples in one period of the original waveform.
+    repeat : int
+        Number of periods.
+    max_points : int
+        Maximum number of points returned.
+
+    Returns
+    -------
+    positions : np.array
+        Sample positions of the repeated waveform.
+    values : np.array
+        Values of the repeated waveform.
+    """
+    repeat = max(int(repeat), 1)
+    if len(values) * repeat > max_points:
+        points_per_period = max_points // repeat
+        if points_per_period >= 2:
+            positions, values = decimate_waveform(values, points_per_period, positions)
+        else:
+            # each bin of the display spans several periods
+            n_bins = max(max_points // 2, 1)
+            edges = np.linspace(0, n_samples * repeat, n_bins + 1)
+            positions = np.repeat(edges[:-1], 2) + np.tile([0, 1], n_bins) * (
+                (edges[1] - edges[0]) / 2
+            )
+            values = np.tile([np.min(values), np.max(values)], n_bins)
+            return positions, values
+
+    offsets = np.repeat(np.arange(repeat) * n_samples, len(positions))
+    return np.tile(positions, repeat) + offsets, np.tile(values, repeat)
+
+
+def decimate_waveform_dict(waveform_dict, max_points=2000):
+    """Decimate the waveforms of a microscope for display.
+
+    Each waveform is replaced by a (positions, values, n_samples) tuple, see
+    decimate_waveform. A hash of the decimated waveforms is added as "hash", so
+    the display can skip redrawing waveforms it already shows.
+
+    Parameters
+    ----------
+    waveform_dict : dict
+        Waveforms with the "camera_waveform", "remote_focus_waveform" and
+        "galvo_waveform" keys, as returned by Microscope.calculate_all_waveform.
+    max_points : int
+        Maximum number of points per waveform.
+
+    Returns
+    -------
+    plot_dict : dict
+        Decimated waveforms with the same keys, plus "hash".
+    """
+    digest = hashlib.sha1()
+
+    def decimate(waveforms):
+        decimated = {}
+        for channel_key in sorted(waveforms or {}):
+            waveform = waveforms[channel_key]
+            if waveform is None:
+                decimated[channel_key] = None
+                digest.update(f"{channel_key}:None".encode())
+                continue
+            positions, values = decimate_waveform(waveform, max_points)
+            decimated[channel_key] = (positions, values, len(waveform))
+            digest.update(f"{channel_key}:{len(waveform)}".encode())
+            digest.update(np.ascontiguousarray(positions).tobytes())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        return decimated
+
+    plot_dict = {
+        "camera_waveform": decimate(waveform_dict["camera_waveform"]),
+        "remote_focus_waveform": decimate(waveform_dict["remote_focus_waveform"]),
+        "galvo_waveform": [
+            decimate(galvo_waveform) for galvo_waveform in waveform_dict["galvo_waveform"]
+        ],
+    }
+    plot_dict["hash"] = digest.hexdigest()
+    return plot_dict
@@ -36,8 +36,6 @@ from tkinter import ttk
 import logging
 
 # Third Party Imports
-import pandas as pd
-from pandastable import Table, Menu, RowHeader, ColumnHeader
 
 # Local Imports
 
@@ -121,6 +119,7 @@ class MultiPointFrame(ttk.Labelframe):
             "save_data": ttk.Button(self, text="Save Positions to Disk"),
             "load_data": ttk.Button(self, text="Load Positions from Disk"),
             "eliminate_tiles": ttk.Button(self, text="Eliminate Empty Positions"),
+            "optimize_path": ttk.Button(self, text="Optimize Stage Path"),
         }
         counter = 0
         for key, button in self.buttons.items():
@@ -132,6 +131,8 @@ class MultiPointFrame(ttk.Labelframe):
                 row, column = 1, 1
             elif counter == 3:
                 row, column = 0, 1
+            elif counter == 4:
+                row, column = 2, 0
 
             button.grid(
                 row=row, column=column, sticky=tk.NSEW, padx=(4, 1), pady=(4, 6)
@@ -188,6 +189,12 @@ class MultiPointList(ttk.Frame):
         """
         ttk.Frame.__init__(self, settings_tab, *args, **kwargs)
 
+        # pandas and pandastable are imported when the tab is built, not on startup
+        import pandas as pd
+        from navigate.view.main_window_content.multiposition_table import (
+            MultiPositionTable,
+        )
+
         df = pd.DataFrame({"X": [0], "Y": [0], "Z": [0], "R": [0], "F": [0]})
         #: MultiPositionTable: The PandasTable instance that is being used.
         self.pt = MultiPositionTable(self, showtoolbar=False)
@@ -208,234 +215,3 @@ class MultiPointList(ttk.Frame):
             Reference to table data as dataframe
         """
         return self.pt
-
-
-class MultiPositionRowHeader(RowHeader):
-    """MultiPositionRowHeader
-
-    MultiPositionRowHeader is a class that inherits from RowHeader. It is used to
-    customize the row header for the multipoint table.
-    """
-
-    def __init__(self, parent=None, table=None, width=50):
-        """Initialize the MultiPositionRowHeader
-
-        Parameters
-        ----------
-        parent : tk.Frame
-            The frame that contains the settings tab.
-        table : PandasTable
-            The PandasTable instance that is being used.
-        width : int
-            The width of the row header.
-        """
-        super().__init__(parent, table, width)
-
-    def popupMenu(self, event, rows=None, cols=None, outside=None):
-        """Add right click behaviour for row header
-
-        Parameters
-        ----------
-        event : tk.Event
-            The event that triggers the popup menu.
-        rows : list
-            The list of rows that are selected.
-        cols : list
-            The list of columns that are selected.
-        outside : bool
-            Whether the popup menu is triggered outside the table.
-
-        Returns
-        -------
-        popupmenu : tk.Menu
-            The popup menu.
-        """
-
-        defaultactions = {
-            "Sort by index": lambda: self.table.sortTable(index=True),
-            "Reset index": lambda: self.table.resetIndex(),
-            "Toggle index": lambda: self.toggleIndex(),
-            "Copy index to column": lambda: self.table.copyIndex(),
-            "Rename index": lambda: self.table.renameIndex(),
-            "Sort columns by row": lambda: self.table.sortColumnIndex(),
-            "Select All": self.table.selectAll,
-            "Insert New Position": self.table.insertRow,
-            "Add Current Position": self.table.addStagePosition,
-            "Add New Position(s)": lambda: self.table.addRows(),
-            "Delete Position(s)": lambda: self.table.deleteRow(),
-            "Duplicate Row(s)": lambda: self.table.duplicateRows(),
-            "Set Row Color": lambda: self.table.setRowColors(cols="all"),
-        }
-        main = [
-            "Insert New Position",
-            "Add Current Position",
-            "Add New Position(s)",
-            "Delete Position(s)",
-        ]
-
-        popupmenu = Menu(self, tearoff=0)
-
-        def popupFocusOut(event):
-            popupmenu.unpost()
-
-        for action in main:
-            popupmenu.add_command(label=action, command=defaultactions[action])
-
-        popupmenu.bind("<FocusOut>", popupFocusOut)
-        popupmenu.focus_set()
-        popupmenu.post(event.x_root, event.y_root)
-        # applyStyle(popupmenu)
-        return popupmenu
-
-
-class MultiPositionColumnHeader(ColumnHeader):
-    """MultiPositionColumnHeader
-
-    MultiPositionColumnHeader is a class that inherits from ColumnHeader. It is used to
-    customize the column header for the multipoint table.
-    """
-
-    def __init__(self, parent=None, table=None, bg="gray25"):
-        """Initialize the MultiPositionColumnHeader
-
-        Parameters
-        ----------
-        parent : tk.Frame
-            The frame that contains the settings tab.
-        table : PandasTable
-            The PandasTable instance that is being used.
-        bg : str
-            The background color of the column header.
-        """
-
-        super().__init__(parent, table, bg)
-
-    def popupMenu(self, event):
-        """Add left and right click behaviour for column header
-
-        Parameters
-        ----------
-        event : tk.Event
-            The event that triggers the popup menu.
-
-        Returns
-        -------
-        popupmenu : tk.Menu
-            The popup menu.
-        """
-
-        df = self.table.model.df
-        if len(df.columns) == 0:
-            return
-
-        multicols = self.table.multiplecollist
-        colnames = list(df.columns[multicols])[:4]
-        colnames = [str(i)[:20] for i in colnames]
-        if len(colnames) > 2:
-            colnames = ",".join(colnames[:2]) + "+%s others" % str(len(colnames) - 2)
-        else:
-            colnames = ",".join(colnames)
-        popupmenu = Menu(self, tearoff=0)
-
-        def popupFocusOut(event):
-            """Unpost the popup menu"""
-            popupmenu.unpost()
-
-        popupmenu.add_command(
-            label="Sort by " + colnames + " \u2193",
-            command=lambda: self.table.sortTable(
-                columnIndex=multicols, ascending=[0 for i in multicols]
-            ),
-        )
-        popupmenu.add_command(
-            label="Sort by " + colnames + " \u2191",
-            command=lambda: self.table.sortTable(
-                columnIndex=multicols, ascending=[1 for i in multicols]
-            ),
-        )
-        popupmenu.bind("<FocusOut>", popupFocusOut)
-        popupmenu.focus_set()
-        popupmenu.post(event.x_root, event.y_root)
-        # applyStyle(popupmenu)
-        return popupmenu
-
-
-class MultiPositionTable(Table):
-    """MultiPositionTable
-
-    MultiPositionTable is a class that inherits from Table. It is used to
-    customize the table for the multipoint table.
-    """
-
-    def __init__(self, parent=None, **kwargs):
-        """Initialize the MultiPositionTable
-
-        Parameters
-        ----------
-        parent : tk.Frame
-            The frame that contains the settings tab.
-        **kwargs : dict
-            Arbitrary keyword arguments.
-        """
-
-        super().__init__(parent, width=400, height=500, columns=4, **kwargs)
-
-        self.loadCSV = None
-        self.exportCSV = None
-        self.insertRow = None
-        self.addStagePosition = None
-
-    def show(self, callback=None):
-        """Show the table
-
-        Parameters
-        ----------
-        callback : function
-            The function that is called when the table is shown.
-        """
-        super().show(callback)
-
-        # Formatting
-        tk.Grid.columnconfigure(self, "all", weight=1)
-        tk.Grid.rowconfigure(self, "all", weight=1)
-
-        #: MultiPositionRowHeader: The row header for the table.
-        self.rowheader = MultiPositionRowHeader(self.parentframe, self)
-        self.rowheader.grid(row=1, column=0, rowspan=1, sticky="news")
-
-        #: MultiPositionColumnHeader: The column header for the table.
-        self.tablecolheader = MultiPositionColumnHeader(
-            self.parentframe, self, bg=self.colheadercolor
-        )
-        self.tablecolheader.grid(row=0, column=1, rowspan=1, sticky="news")
-
-    def popupMenu(self, event, rows=None, cols=None, outside=None):
-        """Add right click behaviour for table
-
-        Parameters
-        ----------
-        event : tk.Event
-            The event that triggers the popup menu.
-        rows : list
-            The list of rows that are selected.
-        cols : list
-            The list of columns that are selected.
-        outside : bool
-            Whether the popup menu is triggered outside the table.
-
-        Returns
-        -------
-        popupmenu : tk.Menu
-            The popup menu.
-        """
-        popupmenu = Menu(self, tearoff=0)
-
-        def popupFocusOut(event):
-            popupmenu.unpost()
-
-        popupmenu.add_command(label="Load Positions from Disk", command=self.loadCSV)
-        popupmenu.add_command(label="Save Positions to Disk", command=self.exportCSV)
-        popupmenu.bind("<FocusOut>", popupFocusOut)
-        popupmenu.focus_set()
-        popupmenu.post(event.x_root, event.y_root)
-        return popupmenu
@@ -0,0 +1,76 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import tkinter as tk
+
+# Third Party Imports
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Local Imports
+from navigate.view.custom_widgets.popup import PopUp
+
+
+class ImagePreviewPopup:
+    """Popup window showing preview images, e.g. live projections of a scan."""
+
+    def __init__(self, root, title, *args, **kwargs):
+        """Initialize the ImagePreviewPopup class.
+
+        Parameters
+        ----------
+        root : tk.Tk
+            Root window.
+        title : str
+            Title of the popup window.
+        *args
+            Variable length argument list.
+        **kwargs
+            Arbitrary keyword arguments.
+        """
+        #: PopUp: PopUp window
+        self.popup = PopUp(root, title, "+320+180", top=False, transient=False)
+        self.popup.resizable(tk.TRUE, tk.TRUE)
+
+        content_frame = self.popup.get_frame()
+        tk.Grid.columnconfigure(content_frame, 0, weight=1)
+        tk.Grid.rowconfigure(content_frame, 0, weight=1)
+
+        #: matplotlib.figure.Figure: Figure for the images.
+        self.fig = Figure(figsize=(8, 4), dpi=100)
+        #: FigureCanvasTkAgg: Canvas of the figure.
+        self.canvas = FigureCanvasTkAgg(self.fig, master=content_frame)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().grid(
+            row=0, column=0, sticky=tk.NSEW, padx=(5, 5), pady=(5, 5)
+        )
@@ -803,3 +803,46 @@ class TestVerifyExperimentConfig(unittest.TestCase):
             if k in parameter_dict.keys():
                 del parameter_dict[k]
         return deleted_parameters
+
+
+def to_plain(data):
+    if isinstance(data, (dict, DictProxy)):
+        return {k: to_plain(v) for k, v in data.items()}
+    if isinstance(data, (list, ListProxy)):
+        return [to_plain(v) for v in data]
+    return data
+
+
+class TestVerifyConfigLocally(unittest.TestCase):
+    def setUp(self):
+        self.manager = Manager()
+        current_path = os.path.abspath(os.path.dirname(__file__))
+        root_path = os.path.dirname(os.path.dirname(current_path))
+        config_path = os.path.join(root_path, "src", "navigate", "config")
+        self.config_files = {
+            "configuration": os.path.join(config_path, "configuration.yaml"),
+            "experiment": os.path.join(config_path, "experiment.yml"),
+            "waveform_constants": os.path.join(config_path, "waveform_constants.yml"),
+        }
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_verify_before_sharing(self):
+        shared_configuration = config.load_configs(self.manager, **self.config_files)
+        config.verify_configuration(self.manager, shared_configuration)
+        config.verify_experiment_config(self.manager, shared_configuration)
+        config.verify_waveform_constants(self.manager, shared_configuration)
+
+        configuration = config.load_configs(None, **self.config_files)
+        assert type(configuration["experiment"]) is dict
+        config.verify_configuration(None, configuration)
+        config.verify_experiment_config(None, configuration)
+        config.verify_waveform_constants(None, configuration)
+        assert type(configuration["experiment"]["MultiPositions"]) is list
+
+        configuration = config.load_configs(self.manager, **configuration)
+        assert type(configuration) is DictProxy
+        assert type(configuration["experiment"]["MicroscopeState"]) is DictProxy
+        assert type(configuration["experiment"]["MultiPositions"]) is ListProxy
+        assert to_plain(configuration) == to_plain(shared_configuration)
@@ -350,6 +350,7 @@ class TestConfiguration(unittest.TestCase):
             "flip_x",
             "flip_y",
             "flip_z",
+            "position_readback_interval",
         ]
         type_keys = [
             "name",
@@ -0,0 +1,66 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.controller.sub_controllers import ImagePreviewPopupController
+from navigate.view.popups.image_preview_popup import ImagePreviewPopup
+
+
+@pytest.fixture
+def preview_controller(dummy_controller):
+    popup = ImagePreviewPopup(dummy_controller.view, "Deskew Preview")
+    yield ImagePreviewPopupController(popup, dummy_controller, "Deskew Preview")
+    popup.popup.dismiss()
+
+
+def test_display_images(preview_controller):
+    images = {"XY": np.random.rand(16, 8), "XZ": np.random.rand(4, 8)}
+    preview_controller.display_images(images)
+    axes = preview_controller.view.fig.axes
+    assert list(preview_controller.images) == ["XY", "XZ"]
+    assert len(axes) == 2
+
+    # the same layout is updated in place
+    preview_controller.display_images({k: v + 1 for k, v in images.items()})
+    assert preview_controller.view.fig.axes == axes
+    np.testing.assert_allclose(
+        preview_controller.images["XY"].get_array(), images["XY"] + 1
+    )
+
+    preview_controller.display_images({"XY": np.random.rand(8, 8)})
+    assert len(preview_controller.view.fig.axes) == 1
@@ -129,6 +129,7 @@ class TestMenuController(unittest.TestCase):
             "popup_microscope_setting",
             "toggle_save",
             "acquire_data",
+            "estimate_acquisition",
             "not_implemented",
             "stage_movement",
             "switch_tabs",
@@ -0,0 +1,95 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+import pytest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+
+
+@pytest.fixture
+def multi_position_controller():
+    from navigate.controller.sub_controllers.multi_position_controller import (
+        MultiPositionController,
+    )
+
+    # the pandastable is mocked, only its data frame is used
+    view = MagicMock()
+    view.pt.model.df = pd.DataFrame(np.zeros((1, 5)), columns=list("XYZRF"))
+    return MultiPositionController(view, MagicMock())
+
+
+def table_values(controller):
+    return controller.table.model.df.to_numpy(dtype=float)
+
+
+def test_set_positions(multi_position_controller):
+    controller = multi_position_controller
+    positions = np.arange(20, dtype=float).reshape(4, 5)
+
+    # lists of rows and of dictionaries, as the model sends them
+    controller.set_positions(positions.tolist())
+    np.testing.assert_array_equal(table_values(controller), positions)
+    assert controller.get_position_num() == 4
+
+    controller.set_positions(
+        [dict(zip(["x", "y", "z", "theta", "f"], row)) for row in positions[:2]]
+    )
+    np.testing.assert_array_equal(table_values(controller), positions[:2])
+    assert len(controller.positions) == 2
+    controller.table.redraw.assert_called()
+
+
+def test_position_changes(multi_position_controller):
+    controller = multi_position_controller
+    positions = np.arange(20, dtype=float).reshape(4, 5)
+    controller.set_positions(positions)
+
+    controller.append_position({"x": 1, "y": 2, "z": 3, "theta": 4, "f": 5})
+    positions = np.vstack([positions, [1, 2, 3, 4, 5]])
+    np.testing.assert_array_equal(table_values(controller), positions)
+
+    controller.remove_positions([True, False, True, False, True])
+    positions = positions[[0, 2, 4]]
+    np.testing.assert_array_equal(table_values(controller), positions)
+
+    controller.positions.reorder([2, 0, 1])
+    positions = positions[[2, 0, 1]]
+    np.testing.assert_array_equal(table_values(controller), positions)
+    # the table and the positions agree
+    np.testing.assert_array_equal(controller.positions.array, positions)
+    assert list(controller.table.model.df.index) == [0, 1, 2]
+
+    # an invalid row is skipped, the table is rebuilt from the positions
+    controller.table.model.df.iloc[1, 0] = "a"
+    controller.remove_positions([False])
+    np.testing.assert_array_equal(table_values(controller), positions[2:])
@@ -0,0 +1,184 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import numpy as np
+
+
+def make_axes():
+    # plot returns a list with one line, as matplotlib does
+    ax = MagicMock()
+    ax.plot.side_effect = lambda *args, **kwargs: [MagicMock()]
+    return ax
+
+
+@pytest.fixture
+def waveform_tab_controller():
+    from navigate.controller.sub_controllers.waveform_tab_controller import (
+        WaveformTabController,
+    )
+
+    # the figure and its axes are mocked
+    view = MagicMock()
+    view.is_docked = False
+    view.fig.add_subplot.side_effect = [make_axes(), make_axes()]
+    configuration = {
+        "experiment": {
+            "MicroscopeState": {
+                "microscope_name": "Mesoscale",
+                "waveform_template": "Default",
+            }
+        },
+        "configuration": {
+            "microscopes": {"Mesoscale": {"daq": {"sample_rate": 100000}}}
+        },
+        "waveform_templates": {"Default": {"repeat": 1, "expand": 1}},
+    }
+    return WaveformTabController(view, SimpleNamespace(configuration=configuration))
+
+
+def make_waveforms(channel_num=2, amplitude=1.0, n_samples=10000):
+    t = np.linspace(0, 1, n_samples)
+    camera, remote_focus, galvo = {}, {}, {}
+    for i in range(1, channel_num + 1):
+        channel_key = f"channel_{i}"
+        camera[channel_key] = (t < 0.5).astype(float)
+        remote_focus[channel_key] = amplitude * t
+        galvo[channel_key] = amplitude * np.sin(2 * np.pi * i * t)
+    return {
+        "camera_waveform": camera,
+        "remote_focus_waveform": remote_focus,
+        "galvo_waveform": [galvo],
+    }
+
+
+def reset_axes(controller):
+    controller.view.plot_etl.reset_mock()
+    controller.view.plot_galvo.reset_mock()
+    controller.view.canvas.draw_idle.reset_mock()
+    for line in controller.plot_lines.values():
+        line.reset_mock()
+
+
+def test_repeated_hash(waveform_tab_controller):
+    from navigate.tools.waveform_template_funcs import decimate_waveform_dict
+
+    controller = waveform_tab_controller
+    waveform_dict = decimate_waveform_dict(make_waveforms())
+    controller.update_waveforms(waveform_dict, 100000)
+    # remote focus, galvo and camera lines of 2 channels
+    assert len(controller.plot_lines) == 8
+    controller.view.canvas.draw_idle.assert_called_once()
+
+    # the same waveforms are not drawn again
+    reset_axes(controller)
+    controller.update_waveforms(decimate_waveform_dict(make_waveforms()), 100000)
+    for ax in [controller.view.plot_etl, controller.view.plot_galvo]:
+        ax.clear.assert_not_called()
+        ax.plot.assert_not_called()
+    for line in controller.plot_lines.values():
+        line.set_data.assert_not_called()
+    controller.view.canvas.draw_idle.assert_not_called()
+
+    # a different sample rate redraws them
+    controller.update_waveforms(waveform_dict, 50000)
+    controller.view.canvas.draw_idle.assert_called_once()
+
+
+def test_changed_values(waveform_tab_controller):
+    from navigate.tools.waveform_template_funcs import decimate_waveform_dict
+
+    controller = waveform_tab_controller
+    controller.update_waveforms(decimate_waveform_dict(make_waveforms()), 100000)
+    lines = dict(controller.plot_lines)
+
+    # the same lines are updated in place
+    reset_axes(controller)
+    controller.update_waveforms(
+        decimate_waveform_dict(make_waveforms(amplitude=2.0)), 100000
+    )
+    assert controller.plot_lines == lines
+    for ax in [controller.view.plot_etl, controller.view.plot_galvo]:
+        ax.clear.assert_not_called()
+        ax.plot.assert_not_called()
+        ax.relim.assert_called_once()
+    for line in controller.plot_lines.values():
+        line.set_data.assert_called_once()
+    x, y = lines[("etl", "channel_1", "remote_focus")].set_data.call_args.args
+    assert np.max(y) == pytest.approx(2.0)
+    controller.view.canvas.draw_idle.assert_called_once()
+
+
+def test_added_channels(waveform_tab_controller):
+    from navigate.tools.waveform_template_funcs import decimate_waveform_dict
+
+    controller = waveform_tab_controller
+    controller.update_waveforms(decimate_waveform_dict(make_waveforms()), 100000)
+    lines = dict(controller.plot_lines)
+
+    # the plots are cleared and all the lines are plotted again
+    reset_axes(controller)
+    controller.update_waveforms(
+        decimate_waveform_dict(make_waveforms(channel_num=3)), 100000
+    )
+    assert len(controller.plot_lines) == 12
+    assert not set(controller.plot_lines.values()) & set(lines.values())
+    for ax in [controller.view.plot_etl, controller.view.plot_galvo]:
+        ax.clear.assert_called_once()
+        assert ax.plot.call_count == 6
+        ax.legend.assert_called_once()
+    for line in lines.values():
+        line.set_data.assert_not_called()
+
+
+def test_waveforms_without_hash(waveform_tab_controller):
+    controller = waveform_tab_controller
+    n_samples = 10 * controller.max_plot_points
+
+    # waveforms that were not decimated by the model are decimated for display
+    controller.update_waveforms(make_waveforms(n_samples=n_samples), 100000)
+    assert "hash" in controller.waveform_dict
+    assert len(controller.plot_lines) == 8
+    for ax in [controller.view.plot_etl, controller.view.plot_galvo]:
+        for call in ax.plot.call_args_list:
+            x, y = call.args
+            assert len(x) == len(y) <= controller.max_plot_points
+    x, _ = controller.view.plot_etl.plot.call_args_list[0].args
+    assert x[-1] == pytest.approx((n_samples - 1) / 100000)
+
+    # and are not drawn again if they did not change
+    reset_axes(controller)
+    controller.update_waveforms(make_waveforms(n_samples=n_samples), 100000)
+    controller.view.plot_etl.plot.assert_not_called()
+    controller.view.canvas.draw_idle.assert_not_called()
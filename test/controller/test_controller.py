@@ -89,3 +89,24 @@ def test_prepare_acquire_data(controller):
 def test_execute(controller):
     controller.execute("acquire", "single")
     assert True
+
+
+def test_show_acquisition_estimate(controller):
+    from unittest.mock import patch
+
+    estimate = {
+        "duration": 3725.4,
+        "frames": 1200,
+        "bytes": 1200 * 2048 * 2048 * 2,
+        "phases": {"exposure": 240.0, "stage": 3485.4},
+        "stage_moves": 40,
+        "channel_switches": 2,
+        "unknown_features": ["CustomFeature"],
+    }
+    with patch("navigate.controller.controller.messagebox") as messagebox:
+        controller.show_acquisition_estimate(estimate)
+    message = messagebox.showinfo.call_args.kwargs["message"]
+    assert "Duration: 1h 02m 05s" in message
+    assert "Frames: 1200" in message
+    assert "Data: 9.38 GB" in message
+    assert "Not estimated: CustomFeature" in message
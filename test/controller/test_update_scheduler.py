@@ -0,0 +1,107 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+import threading
+from unittest.mock import MagicMock
+
+# Third Party Imports
+
+# Local Imports
+from navigate.controller.update_scheduler import UpdateScheduler
+
+
+def test_coalesce_updates_from_threads():
+    root = MagicMock()
+    scheduler = UpdateScheduler(root, refresh_rate=20)
+    progress = MagicMock()
+    framerate = MagicMock()
+
+    def worker():
+        for i in range(1000):
+            scheduler.schedule("progress_bar", progress, images_received=i)
+            scheduler.schedule("framerate", framerate, i / 10)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    # nothing is applied from the worker thread
+    progress.assert_not_called()
+    scheduler.flush()
+    progress.assert_called_once_with(images_received=999)
+    framerate.assert_called_once_with(99.9)
+
+    stats = scheduler.stats()
+    assert stats["progress_bar"] == {"submitted": 1000, "coalesced": 999}
+    assert stats["framerate"] == {"submitted": 1000, "coalesced": 999}
+
+    # applied updates are not applied twice
+    scheduler.flush()
+    progress.assert_called_once()
+
+
+def test_refresh_loop():
+    root = MagicMock()
+    root.after.return_value = "after#1"
+    scheduler = UpdateScheduler(root, refresh_rate=20)
+    scheduler.start()
+    root.after.assert_called_once_with(50, scheduler.refresh)
+
+    update = MagicMock(side_effect=[RuntimeError, None])
+    scheduler.schedule("update_stage", update, {"x": 1})
+    scheduler.refresh()
+    # a failing update does not stop the refresh loop
+    assert root.after.call_count == 2
+    scheduler.schedule("update_stage", update, {"x": 2})
+    scheduler.refresh()
+    update.assert_called_with({"x": 2})
+
+    scheduler.stop()
+    root.after_cancel.assert_called_once_with("after#1")
+    assert scheduler.after_id is None
+
+
+def test_failing_update_is_logged(caplog):
+    scheduler = UpdateScheduler(MagicMock(), refresh_rate=20)
+    failing = MagicMock(side_effect=KeyError("x"))
+    update = MagicMock()
+    scheduler.schedule("failing", failing)
+    scheduler.schedule("update", update)
+    with caplog.at_level(logging.DEBUG):
+        scheduler.flush()
+    # the error is reported with its traceback and the next update is applied
+    records = [r for r in caplog.records if "GUI update failing" in r.getMessage()]
+    assert records[0].levelno == logging.ERROR
+    assert records[0].exc_info is not None
+    update.assert_called_once_with()
@@ -54,3 +54,156 @@ def test_compute_signal_to_noise():
     snr = compute_signal_to_noise(image, offset, variance)
 
     np.testing.assert_allclose(snr, 0.5, rtol=0.2)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_welford_accumulator(dtype):
+    from navigate.model.analysis.camera import WelfordAccumulator
+
+    frames = np.random.normal(100, 3, (50, 32, 48)).astype(np.uint16)
+
+    accumulator = WelfordAccumulator(dtype=dtype)
+    # a stack, single frames and a generator of frames
+    accumulator.update(frames[:20])
+    accumulator.update(frames[20])
+    accumulator.update(frame for frame in frames[21:])
+
+    assert accumulator.count == 50
+    assert accumulator.mean.dtype == dtype
+    np.testing.assert_allclose(accumulator.mean, frames.mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(
+        accumulator.variance, frames.var(axis=0), rtol=1e-3, atol=1e-3
+    )
+
+    with pytest.raises(ValueError):
+        accumulator.update(np.zeros((10, 10)))
+
+
+def test_compute_scmos_offset_and_variance_map_streaming():
+    from navigate.model.analysis.camera import compute_scmos_offset_and_variance_map
+
+    frames = np.random.normal(100, 3, (40, 32, 48)).astype(np.uint16)
+    offset, variance = compute_scmos_offset_and_variance_map(
+        (frame for frame in frames), dtype=np.float32
+    )
+
+    assert offset.dtype == np.float32
+    np.testing.assert_allclose(offset, frames.mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(variance, frames.var(axis=0), rtol=1e-3, atol=1e-3)
+
+    offset, variance = compute_scmos_offset_and_variance_map(frames)
+    assert offset.dtype == frames.dtype
+
+
+@pytest.mark.parametrize("frames", [iter([]), np.empty((0, 32, 48))])
+def test_compute_scmos_offset_and_variance_map_no_frames(frames):
+    from navigate.model.analysis.camera import compute_scmos_offset_and_variance_map
+
+    with pytest.raises(ValueError, match="need at least one frame"):
+        compute_scmos_offset_and_variance_map(frames)
+
+
+def test_save_and_load_camera_maps(tmp_path):
+    import tifffile
+    from navigate.model.analysis.camera import load_camera_map, save_camera_maps
+
+    offset = np.random.rand(32, 48) * 100
+    save_camera_maps(str(tmp_path), "1234", off=offset, var=None)
+
+    camera_map = load_camera_map(str(tmp_path), "1234", "off")
+    assert isinstance(camera_map, np.memmap)
+    assert camera_map.dtype == np.float32
+    np.testing.assert_allclose(camera_map, offset, rtol=1e-6)
+    assert load_camera_map(str(tmp_path), "1234", "var") is None
+
+    # maps saved as tiff are still loaded
+    tifffile.imwrite(tmp_path / "1234_var.tiff", offset.astype(np.uint16))
+    np.testing.assert_array_equal(
+        load_camera_map(str(tmp_path), "1234", "var"), offset.astype(np.uint16)
+    )
+
+
+def test_find_hot_pixels():
+    from navigate.model.analysis.camera import find_hot_pixels
+
+    variance = np.full((32, 48), 4.0)
+    variance[3, 5] = 100
+    variance[10, 0] = 41
+    mask = find_hot_pixels(variance)
+
+    assert mask.dtype == bool
+    assert np.argwhere(mask).tolist() == [[3, 5], [10, 0]]
+    assert not find_hot_pixels(variance, factor=30)[10, 0]
+
+
+# the whole frame, and blocks of 5 rows with a partial last block
+@pytest.mark.parametrize("block_size", [131072, 5 * 48])
+def test_camera_correction(block_size):
+    from navigate.model.analysis.camera import CameraCorrection
+
+    shape = (32, 48)
+    offset = np.full(shape, 100.4)
+    flatfield = np.linspace(0.5, 1.5, shape[1])[None, :] * np.ones(shape)
+    hot_pixel_mask = np.zeros(shape, dtype=bool)
+    hot_pixel_mask[[0, 5, 5], [0, 10, 11]] = True
+
+    with pytest.raises(ValueError):
+        CameraCorrection(shape, offset_map=np.zeros((4, 4)))
+    assert not CameraCorrection(shape).is_active
+
+    correction = CameraCorrection(
+        shape,
+        offset_map=offset,
+        flatfield_map=flatfield,
+        hot_pixel_mask=hot_pixel_mask,
+        block_size=block_size,
+    )
+    assert correction.is_active
+    assert correction.block_rows == min(32, block_size // 48)
+    frames = np.random.randint(50, 1000, (3,) + shape).astype(np.uint16)
+    expected = np.clip(frames.astype(np.float64) - 100, 0, None) / flatfield
+    expected = np.rint(expected).astype(np.uint16)
+
+    corrected = frames.copy()
+    correction.correct([corrected[0], corrected[1:]])
+
+    hot = hot_pixel_mask
+    np.testing.assert_allclose(corrected[:, ~hot], expected[:, ~hot], atol=1)
+    # hot pixels are the mean of their valid neighbours
+    for frame, target in zip(corrected, expected):
+        assert abs(int(frame[0, 0]) - np.mean(target[[0, 1], [1, 0]])) <= 1
+        assert abs(int(frame[5, 10]) - np.mean(target[[4, 6, 5], [10, 10, 9]])) <= 1
+
+    # no wrap-around below the offset
+    dark = np.full((1,) + shape, 90, dtype=np.uint16)
+    CameraCorrection(shape, offset_map=offset).correct(dark)
+    assert not dark.any()
+
+
+def test_camera_correction_composes():
+    from navigate.model.analysis.camera import CameraCorrection, find_hot_pixels
+
+    shape = (64, 96)
+    offset = np.random.normal(100, 2, shape)
+    variance = np.random.gamma(2, 2, shape)
+    variance.flat[np.random.choice(variance.size, 30, replace=False)] = 1e4
+    maps = {
+        "offset": {"offset_map": offset},
+        "flatfield": {"flatfield_map": np.random.uniform(0.8, 1.2, shape)},
+        "hot pixel": {"hot_pixel_mask": find_hot_pixels(variance)},
+    }
+    frames = np.random.randint(90, 2000, (8,) + shape).astype(np.uint16)
+
+    # each correction alone, one after the other
+    expected = frames.copy()
+    for kwargs in maps.values():
+        correction = CameraCorrection(shape, **kwargs)
+        assert correction.is_active
+        correction.correct(expected)
+    assert not np.array_equal(expected, frames)
+
+    # all corrections at once
+    all_maps = {k: v for m in maps.values() for k, v in m.items()}
+    corrected = frames.copy()
+    CameraCorrection(shape, **all_maps).correct(corrected)
+    np.testing.assert_array_equal(corrected, expected)
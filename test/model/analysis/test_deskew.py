@@ -0,0 +1,128 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.model.analysis.deskew import DeskewPreview, downsample_frame
+
+
+def test_downsample_frame():
+    frame = np.random.randint(0, 4000, (66, 45)).astype(np.uint16)
+    downsampled = downsample_frame(frame, 4)
+
+    assert downsampled.dtype == np.float32
+    np.testing.assert_allclose(
+        downsampled, frame[:64, :44].reshape(16, 4, 11, 4).mean(axis=(1, 3))
+    )
+    np.testing.assert_array_equal(downsample_frame(frame, 1), frame)
+
+
+def skewed_stack(n_planes, shift, axis=0):
+    """Stack of a bright column that moves by shift pixels per plane."""
+    stack = np.zeros((n_planes, 40, 24), dtype=np.uint16)
+    for k in range(n_planes):
+        if axis == 0:
+            stack[k, 30 - k * shift, :] = 1000
+        else:
+            stack[k, :, 20 - k * shift] = 1000
+    return stack
+
+
+@pytest.mark.parametrize("dimension", ["YZ", "XZ"])
+def test_deskew_preview(dimension):
+    axis = 0 if dimension == "YZ" else 1
+    # cos(60) * 0.4 / 0.1 = 2 pixels per plane, 1 pixel after downsampling
+    preview = DeskewPreview(
+        (40, 24), 8, 0.4, 0.1, angle=60, dimension=dimension, downsample=2
+    )
+    assert preview.shift == pytest.approx(1)
+    assert preview.z_factor == 2
+
+    for k, frame in enumerate(skewed_stack(8, 2, axis)):
+        preview.add_frame(k, frame)
+    assert preview.planes == 8
+    assert not preview.add_frame(8, frame)
+
+    # the moving column is at the same deskewed position in every slab
+    volume = preview.volume
+    assert volume.shape[0] == 4
+    profile = volume.max(axis=2 - axis)
+    assert np.all(profile.argmax(axis=1) == profile[0].argmax())
+    np.testing.assert_allclose(profile.max(axis=1), 500)
+
+    mips = preview.mips
+    assert mips["xy"].shape == volume.shape[1:]
+    assert mips["xz"].shape == (4, volume.shape[2])
+    assert mips["yz"].shape == (4, volume.shape[1])
+    np.testing.assert_allclose(mips["xy"], volume.max(axis=0))
+
+
+def test_deskew_preview_interpolation():
+    # 0.5 pixel per plane
+    preview = DeskewPreview(
+        (16, 8), 4, 0.2, 0.1, angle=60, downsample=1, z_downsample=4
+    )
+    plane = np.ones((16, 8), dtype=np.float32)
+    for k in range(3):
+        assert not preview.add_plane(k, plane)
+    with pytest.raises(ValueError):
+        preview.add_plane(3, np.ones((4, 4)))
+    # stopped before the last plane
+    preview.finish()
+    slab = preview.volume[0]
+    # rows covered by any plane are normalized to the plane value
+    np.testing.assert_allclose(slab[:17], 1)
+    np.testing.assert_allclose(preview.mips["xy"], slab)
+
+
+def test_deskew_preview_memory_bound():
+    preview = DeskewPreview(
+        (2048, 2048), 2000, 0.226, 0.1, downsample=4, max_megabytes=64
+    )
+    assert preview.volume.nbytes <= 64e6
+    assert preview.z_factor > 4
+
+
+def test_deskew_preview_frames_and_planes():
+    frames = np.random.randint(90, 2000, (4, 256, 256)).astype(np.uint16)
+    from_frames = DeskewPreview((256, 256), 40, 0.226, 0.1, downsample=4)
+    from_planes = DeskewPreview((256, 256), 40, 0.226, 0.1, downsample=4)
+
+    for k in range(40):
+        from_frames.add_frame(k, frames[k % 4])
+        from_planes.add_plane(k, downsample_frame(frames[k % 4], 4))
+
+    assert from_frames.planes == from_planes.planes == 40
+    np.testing.assert_allclose(from_frames.volume, from_planes.volume)
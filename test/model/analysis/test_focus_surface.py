@@ -0,0 +1,157 @@
+# Copyright (c) 2021-2023  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import numpy as np
+import pytest
+
+
+def grid(n=20):
+    x, y = np.meshgrid(np.linspace(0, 5000, n), np.linspace(0, 3000, n))
+    z = np.full(x.size, 100.0)
+    return np.vstack([x.ravel(), y.ravel(), z]).T
+
+
+def test_select_focus_samples():
+    from navigate.model.analysis.focus_surface import select_focus_samples
+
+    positions = grid()
+    sample_ids = select_focus_samples(positions, 9)
+    assert len(set(sample_ids.tolist())) == 9
+    # corners of the grid are sampled
+    for corner in [0, 19, 380, 399]:
+        assert corner in sample_ids
+    assert len(select_focus_samples(positions[:5], 9)) == 5
+    assert len(select_focus_samples(positions, 0)) == 0
+
+
+@pytest.mark.parametrize("method", ["plane", "thin_plate"])
+def test_focus_surface_plane(method):
+    from navigate.model.analysis.focus_surface import (
+        FocusSurface,
+        select_focus_samples,
+    )
+
+    positions = grid()
+    focus = 0.01 * positions[:, 0] - 0.02 * positions[:, 1] + 50
+    sample_ids = select_focus_samples(positions, 12)
+    surface = FocusSurface(method).fit(positions[sample_ids], focus[sample_ids])
+    # z does not vary, the surface only depends on x and y
+    np.testing.assert_array_equal(surface.axes, [0, 1])
+    np.testing.assert_allclose(surface.predict(positions), focus, atol=1e-6)
+
+    surface.offset = 5
+    np.testing.assert_allclose(surface.predict(positions), focus + 5, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["plane", "thin_plate"])
+def test_focus_surface_tilted_plane(method):
+    from navigate.model.analysis.focus_surface import (
+        FocusSurface,
+        select_focus_samples,
+    )
+
+    # z follows x and y on a tilted sample holder
+    positions = grid()
+    positions[:, 2] += 0.1 * positions[:, 0] + 0.05 * positions[:, 1]
+    focus = 0.01 * positions[:, 0] - 0.02 * positions[:, 1] + 50
+    sample_ids = select_focus_samples(positions, 12)
+    surface = FocusSurface(method).fit(positions[sample_ids], focus[sample_ids])
+    assert surface.fit_method == method
+    np.testing.assert_array_equal(surface.axes, [0, 1])
+    np.testing.assert_allclose(surface.predict(positions), focus, atol=1e-6)
+
+
+def test_focus_surface_thin_plate():
+    from navigate.model.analysis.focus_surface import (
+        FocusSurface,
+        select_focus_samples,
+    )
+
+    positions = grid()
+    x, y = positions[:, 0] / 5000, positions[:, 1] / 3000
+    focus = 20 * np.sin(np.pi * x) * np.cos(np.pi * y / 2)
+    sample_ids = select_focus_samples(positions, 40)
+    thin_plate = FocusSurface("thin_plate").fit(positions[sample_ids], focus[sample_ids])
+    plane = FocusSurface("plane").fit(positions[sample_ids], focus[sample_ids])
+    np.testing.assert_allclose(
+        thin_plate.predict(positions[sample_ids]), focus[sample_ids], atol=1e-6
+    )
+    thin_plate_error = np.abs(thin_plate.predict(positions) - focus).max()
+    plane_error = np.abs(plane.predict(positions) - focus).max()
+    assert thin_plate_error < plane_error / 5
+
+
+def test_focus_surface_fallback():
+    from navigate.model.analysis.focus_surface import FocusSurface
+
+    surface = FocusSurface("thin_plate").fit([[0, 0, 0], [100, 0, 0]], [1, 3])
+    assert surface.fit_method == "plane"
+    np.testing.assert_allclose(surface.predict([[50, 10, 10]]), [2])
+
+    surface = FocusSurface().fit([[0, 0, 0]], [7])
+    assert surface.fit_method == "constant"
+    np.testing.assert_allclose(surface.predict([[50, 10, 10], [0, 0, 0]]), [7, 7])
+
+    with pytest.raises(ValueError):
+        FocusSurface("spline")
+    with pytest.raises(RuntimeError):
+        FocusSurface().predict([[0, 0, 0]])
+
+
+def test_focus_surface_repeated_samples():
+    from navigate.model.analysis.focus_surface import FocusSurface
+
+    # every sample at the same coordinates
+    surface = FocusSurface("thin_plate").fit([[10, 20, 30]] * 4, [1, 2, 3, 6])
+    assert surface.fit_method == "constant"
+    np.testing.assert_allclose(surface.predict([[0, 0, 0]]), [3])
+
+    # a tile measured again is averaged
+    positions = grid(4)
+    focus = 0.01 * positions[:, 0] + 10
+    coordinates = np.vstack([positions, positions[:1]])
+    focus = np.append(focus, focus[0] + 2)
+    surface = FocusSurface("thin_plate").fit(coordinates, focus)
+    assert surface.fit_method == "thin_plate"
+    np.testing.assert_allclose(surface.predict(positions[:1]), focus[:1] + 1, atol=1e-6)
+    np.testing.assert_allclose(surface.predict(positions[1:]), focus[1:-1], atol=1e-6)
+
+    # a singular kernel matrix falls back to a plane
+    from unittest.mock import patch
+
+    with patch(
+        "scipy.interpolate.RBFInterpolator", side_effect=np.linalg.LinAlgError
+    ):
+        surface = FocusSurface("thin_plate").fit(positions, focus[:-1])
+    assert surface.fit_method == "plane"
+    assert surface.interpolator is None
+    np.testing.assert_allclose(surface.predict(positions), focus[:-1], atol=1e-6)
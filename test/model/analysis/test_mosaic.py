@@ -0,0 +1,117 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Third Party Imports
+import numpy as np
+import pytest
+import tifffile
+
+# Local Imports
+from navigate.model.analysis.mosaic import MosaicOverview
+
+
+def position(x, y):
+    return {"x": x, "y": y, "z": 0, "theta": 0, "f": 0}
+
+
+def test_mosaic_overview_geometry():
+    # two 64 x 32 pixel tiles of 1 micron pixels, side by side along X
+    overview = MosaicOverview(
+        [position(16, 32), position(48, 32)], (64, 32), 1.0, downsample=4
+    )
+    assert overview.factor == 4
+    assert overview.canvas.shape == (16, 16)
+    with pytest.raises(ValueError):
+        MosaicOverview([], (64, 32), 1.0)
+
+    frame = np.full((64, 32), 100, dtype=np.uint16)
+    assert not overview.add_frame(frame, (16, 32, 0))
+    # the tile is the maximum of its frames
+    assert not overview.add_frame(frame * 2, (16, 32, 1))
+    assert overview.tiles == 0
+    assert overview.add_frame(frame * 3, (48, 32, 0))
+    assert overview.tiles == 1
+    overview.finish_tile()
+    assert not overview.finish_tile()
+    assert overview.tiles == 2
+
+    np.testing.assert_array_equal(overview.canvas[:, :8], 200)
+    np.testing.assert_array_equal(overview.canvas[:, 8:], 300)
+
+
+def test_mosaic_overview_clipping_and_flips():
+    overview = MosaicOverview([position(0, 0)], (16, 16), 1.0, downsample=2)
+    frame = np.zeros((16, 16), dtype=np.uint16)
+    frame[0, 0] = 400
+    # half of the tile is outside the canvas
+    overview.add_tile(frame, 8, 0)
+    assert overview.canvas[0, 4] == 100
+    assert overview.canvas[:, :4].sum() == 0
+    # a tile outside the canvas is dropped
+    overview.add_tile(frame, 100, 100)
+    assert overview.tiles == 1
+
+    flipped = MosaicOverview(
+        [position(0, 0)], (16, 16), 1.0, downsample=2, flip_x=True, flip_y=True
+    )
+    flipped.add_tile(frame, 0, 0)
+    assert flipped.canvas[-1, -1] == 100
+
+
+def test_mosaic_overview_memory_bound(tmp_path):
+    positions = [position(x, y) for x in (0, 20000) for y in (0, 30000)]
+    overview = MosaicOverview(positions, (2048, 2048), 0.1, max_megabytes=16)
+    assert overview.canvas.nbytes <= 16e6
+    assert max(overview.preview(512).shape) <= 512
+
+    overview.add_tile(np.ones((2048, 2048), dtype=np.uint16), 0, 0)
+    overview.save(str(tmp_path / "overview.tif"))
+    np.testing.assert_array_equal(
+        tifffile.imread(tmp_path / "overview.tif"), overview.canvas
+    )
+
+
+def test_mosaic_overview_frames_and_tiles():
+    positions = [position(x * 20, 0) for x in range(5)]
+    from_frames = MosaicOverview(positions, (256, 256), 0.1, downsample=4)
+    from_tiles = MosaicOverview(positions, (256, 256), 0.1, downsample=4)
+    frames = np.random.randint(90, 2000, (4, 256, 256)).astype(np.uint16)
+
+    # the stacks are placed as their maximum intensity projections
+    for p in positions:
+        for frame in frames:
+            from_frames.add_frame(frame, (p["x"], p["y"]))
+        from_tiles.add_tile(frames.max(axis=0), p["x"], p["y"])
+    from_frames.finish_tile()
+
+    assert from_frames.tiles == from_tiles.tiles == len(positions)
+    np.testing.assert_array_equal(from_frames.canvas, from_tiles.canvas)
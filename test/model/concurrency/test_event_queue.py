@@ -0,0 +1,139 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.model.concurrency.event_queue import EventQueue, SharedArrayHandle
+
+
+def send_events(event_queue):
+    event_queue.put(("small", np.arange(10)))
+    event_queue.put(("ilastik_mask", {"mask": np.ones((512, 512), dtype="uint16")}))
+    event_queue.put(("stop", None))
+
+
+def receive_sent_events(event_queue):
+    """Receive the events sent so far, followed by a sentinel event.
+
+    multiprocessing.Queue sends items from a feeder thread, so the events are
+    received until the sentinel arrives instead of waiting for the feeder.
+    """
+    event_queue.put(("sentinel", None))
+    while True:
+        item = event_queue.queue.get(timeout=10)
+        event_queue.receive(item)
+        if item[0] == "sentinel":
+            break
+
+
+def test_shared_memory_transport_between_processes():
+    event_queue = EventQueue(shared_memory_threshold=1024)
+    process = mp.Process(target=send_events, args=(event_queue,))
+    process.start()
+
+    event, value = event_queue.get(timeout=10)
+    assert event == "small"
+    np.testing.assert_array_equal(value, np.arange(10))
+
+    event, value = event_queue.get(timeout=10)
+    assert event == "ilastik_mask"
+    np.testing.assert_array_equal(value["mask"], np.ones((512, 512)))
+    assert value["mask"].dtype == np.uint16
+
+    assert event_queue.get(timeout=10) == ("stop", None)
+    process.join()
+    assert event_queue.stats()["events"]["ilastik_mask"]["count"] == 1
+
+
+def test_handle_is_unlinked_after_restore():
+    array = np.random.rand(64, 64)
+    handle = SharedArrayHandle(array)
+    np.testing.assert_array_equal(handle.restore(), array)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=handle.name)
+
+
+def test_coalesce_events():
+    event_queue = EventQueue(shared_memory_threshold=1024)
+    for i in range(5):
+        event_queue.put(("update_stage", {"x": i}))
+        event_queue.put(("waveform", np.full(1024, i)))
+    event_queue.put(("autofocus", 1))
+    event_queue.put(("autofocus", 2))
+    receive_sent_events(event_queue)
+
+    events = []
+    while True:
+        try:
+            events.append(event_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    assert [event for event, _ in events] == [
+        "update_stage",
+        "waveform",
+        "autofocus",
+        "autofocus",
+        "sentinel",
+    ]
+    assert events[0][1] == {"x": 4}
+    np.testing.assert_array_equal(events[1][1], np.full(1024, 4))
+    assert [value for event, value in events[2:4]] == [1, 2]
+
+    stats = event_queue.stats()
+    assert stats["events"]["update_stage"]["count"] == 1
+    assert stats["events"]["update_stage"]["coalesced"] == 4
+    assert stats["events"]["waveform"]["coalesced"] == 4
+    assert stats["events"]["autofocus"]["coalesced"] == 0
+    # the four events and the sentinel
+    assert stats["max_depth"] == 5
+    assert stats["depth"] == 0
+
+
+def test_coalesce_events_keeps_order():
+    event_queue = EventQueue()
+    event_queue.put(("update_stage", {"x": 0}))
+    event_queue.put(("autofocus", 1))
+    event_queue.put(("update_stage", {"x": 1}))
+    receive_sent_events(event_queue)
+
+    events = [event_queue.get_nowait() for _ in range(2)]
+    # the replaced event is delivered at the place of the first one
+    assert events == [("update_stage", {"x": 1}), ("autofocus", 1)]
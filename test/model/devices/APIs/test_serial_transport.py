@@ -0,0 +1,208 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import threading
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.devices.APIs.serial_transport import SerialTransport, adaptive_poll
+from navigate.model.devices.APIs.asi.asi_tiger_controller import (
+    TigerController,
+    TigerException,
+)
+from navigate.tools.serial_stand_in import LoopbackSerial, TigerStandIn
+
+
+def echo(command):
+    return command.strip() + b"\r\n"
+
+
+@pytest.fixture
+def tiger():
+    stand_in = TigerStandIn()
+    controller = TigerController("COM1", 115200)
+    controller.serial_port = LoopbackSerial(stand_in, latency=0.001)
+    controller.connect_to_serial()
+    return controller, stand_in
+
+
+def test_query():
+    transport = SerialTransport(LoopbackSerial(echo))
+    transport.serial_port.open()
+    assert transport.query(b"A\r") == b"A\r\n"
+    assert transport.query_many([b"B\r", b"C\r", b"D\r"]) == [
+        b"B\r\n",
+        b"C\r\n",
+        b"D\r\n",
+    ]
+    assert transport.commands == 4
+    assert transport.round_trips == 2
+
+
+def test_query_fixed_size():
+    transport = SerialTransport(LoopbackSerial(lambda c: c[:1]), timeout=0.05)
+    assert transport.query(b"ab", size=1) == b"a"
+    # a missing response is returned short after the timeout
+    assert transport.query(b"cd", size=2) == b"c"
+
+
+def test_submit():
+    transport = SerialTransport(LoopbackSerial(echo, latency=0.005))
+    futures = [transport.submit(bytes(f"{i}\r", encoding="ascii")) for i in range(20)]
+    responses = [future.result(timeout=5) for future in futures]
+    transport.close()
+    assert responses == [bytes(f"{i}\r\n", encoding="ascii") for i in range(20)]
+    # queued commands are pipelined
+    assert transport.round_trips < 20
+
+
+def test_submit_from_threads():
+    transport = SerialTransport(LoopbackSerial(echo))
+    barrier = threading.Barrier(8)
+    futures = []
+
+    def submit(i):
+        barrier.wait()
+        futures.append(transport.submit(bytes(f"{i}\r", encoding="ascii")))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len([f.result(timeout=5) for f in futures]) == 8
+    # a single worker thread serves every caller
+    workers = [t for t in threading.enumerate() if t.name == "SerialTransport"]
+    assert workers == [transport._worker]
+    transport.close()
+
+
+def test_interrupt():
+    transport = SerialTransport(LoopbackSerial(echo))
+    with transport.lock:
+        # a command waiting for its response holds the lock
+        thread = threading.Thread(target=transport.interrupt, args=(b"\x03",))
+        thread.start()
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+    assert transport.serial_port.log == [b"\x03"]
+    assert transport.commands == 1
+
+
+def test_adaptive_poll():
+    calls = []
+
+    def is_done():
+        calls.append(time.perf_counter())
+        return len(calls) == 5
+
+    assert adaptive_poll(is_done, min_interval=0.001, max_interval=0.004)
+    assert len(calls) == 5
+    intervals = [b - a for a, b in zip(calls, calls[1:])]
+    assert intervals[-1] >= intervals[0]
+
+    start_time = time.perf_counter()
+    assert not adaptive_poll(lambda: False, timeout=0.05)
+    assert time.perf_counter() - start_time < 0.5
+
+
+def test_tiger_batched_settings(tiger):
+    controller, stand_in = tiger
+    assert controller.default_axes_sequence == stand_in.axes
+    controller.serial_port.log.clear()
+
+    controller.set_backlash({"X": 0.0, "Y": 0.1})
+    controller.set_finishing_accuracy({"X": 0.001, "Y": 0.002, "Z": 0.003})
+    controller.set_feedback_alignment({"X": 85, "Y": 80})
+    assert controller.serial_port.log == [
+        b"B X=0.0000000 Y=0.1000000\r\r",
+        b"PC X=0.0010000 Y=0.0020000 Z=0.0030000\r\r",
+        b"AA X=85 Y=80\r\r",
+        b"AZ X Y\r\r",
+    ]
+    assert stand_in.settings["B"] == {"X": 0.0, "Y": 0.1}
+    assert stand_in.settings["AA"] == {"X": 85, "Y": 80}
+
+    # a single axis is still accepted
+    controller.set_error("Z", 0.5)
+    assert stand_in.settings["E"] == {"Z": 0.5}
+
+
+def test_tiger_move_and_position(tiger):
+    controller, stand_in = tiger
+    controller.move({"X": 10.0, "Z": -5.0})
+    controller.wait_for_device()
+    assert controller.get_position(["X", "Z"]) == {"X": 10.0, "Z": -5.0}
+    assert not controller.is_moving()
+
+    # the per-axis fallback pipelines the queries
+    controller.default_axes_sequence = None
+    round_trips = controller.transport.round_trips
+    assert controller.get_position(["Z", "X"]) == {"Z": -5.0, "X": 10.0}
+    assert controller.transport.round_trips == round_trips + 1
+
+    with pytest.raises(TigerException):
+        controller.move({"Q": 1.0})
+    # the error does not leave a response in the buffer
+    assert controller.get_axis_position("X") == 10.0
+
+
+def test_tiger_send_command_error(tiger):
+    controller, _ = tiger
+
+    def flush():
+        raise OSError("port closed")
+
+    controller.transport.flush = flush
+    with pytest.raises(OSError):
+        controller.send_command("WHERE X")
+    # the serial port is not left reserved
+    assert not controller.transport.lock.locked()
+
+
+def test_pipelined_round_trips():
+    n_commands = 40
+    transport = SerialTransport(LoopbackSerial(echo, latency=0.001))
+    commands = [bytes(f"{i}\r", encoding="ascii") for i in range(n_commands)]
+    expected = [echo(command) for command in commands]
+
+    assert [transport.query(command) for command in commands] == expected
+    assert transport.round_trips == n_commands
+
+    # pipelined commands wait for their responses once
+    assert transport.query_many(commands) == expected
+    assert transport.round_trips == n_commands + 1
+    assert transport.commands == 2 * n_commands
@@ -50,3 +50,69 @@ def test_synthetic_daq_functions():
             getattr(daq, f)(*a)
         else:
             getattr(daq, f)()
+
+
+def test_synthetic_daq_regenerates_long_waveforms():
+    import numpy as np
+
+    from navigate.model.devices.daq.daq_synthetic import SyntheticDAQ
+    from test.model.dummy import DummyModel
+
+    model = DummyModel()
+    daq = SyntheticDAQ(model.configuration)
+    daq.sample_rate = 1000
+    daq.sweep_times = {"channel_1": 0.1}
+    daq.max_buffer_samples = 1000
+    remote_focus = np.linspace(-1, 1, 100)
+    galvo = np.linspace(0, 2, 100)
+    daq.analog_outputs = {
+        "PXI6259/ao0": {"waveform": {"channel_1": remote_focus}},
+        "PXI6259/ao1": {"waveform": {"channel_1": galvo}},
+    }
+
+    # a short expansion is written in full
+    daq.waveform_expand_num = 5
+    daq.create_analog_output_tasks("channel_1")
+    buffer, regenerate = daq.analog_output_tasks["PXI6259"]
+    assert not regenerate
+    assert buffer.shape == (2, 500)
+
+    # a long expansion writes one period, and the output is the same
+    daq.waveform_expand_num = 10000
+    daq.create_analog_output_tasks("channel_1")
+    buffer, regenerate = daq.analog_output_tasks["PXI6259"]
+    assert regenerate
+    assert buffer.shape == (2, 100)
+    assert daq.analog_output_samples == 100 * 10000
+
+    n_samples = 0
+    for chunk in daq.generate_analog_output("PXI6259", chunk_size=4096):
+        assert chunk.shape[1] <= 4096
+        indices = (n_samples + np.arange(chunk.shape[1])) % 100
+        np.testing.assert_array_equal(chunk[0], remote_focus[indices])
+        np.testing.assert_array_equal(chunk[1], galvo[indices])
+        n_samples += chunk.shape[1]
+    assert n_samples == daq.analog_output_samples
+
+
+def test_synthetic_daq_triggers_expanded_frames():
+    from navigate.model.devices.daq.daq_synthetic import SyntheticDAQ
+    from test.model.dummy import DummyModel
+
+    model = DummyModel()
+    microscope_name = model.configuration["experiment"]["MicroscopeState"][
+        "microscope_name"
+    ]
+    camera = model.camera[microscope_name]
+    daq = SyntheticDAQ(model.configuration)
+    daq.add_camera(microscope_name, camera)
+    daq.trigger_mode = "self-trigger"
+
+    frames = []
+    camera.generate_new_frame = lambda: frames.append(1)
+
+    # one frame for each waveform period
+    daq.waveform_repeat_num = 2
+    daq.waveform_expand_num = 3
+    daq.run_acquisition()
+    assert len(frames) == 6
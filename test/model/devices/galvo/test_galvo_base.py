@@ -32,6 +32,7 @@
 import unittest
 from unittest.mock import MagicMock
 from navigate.model.devices.galvo.galvo_base import GalvoBase
+from navigate.model.waveforms import waveform_cache
 from navigate.config import load_configs, get_configuration_paths, verify_configuration, verify_waveform_constants
 from multiprocessing import Manager
 import numpy as np
@@ -131,3 +132,19 @@ class TestGalvoBase(unittest.TestCase):
         for channel in "channel_1", "channel_2", "channel_3":
             assert np.all(result[channel] <= self.galvo.galvo_max_voltage)
             assert np.all(result[channel] >= self.galvo.galvo_min_voltage)
+
+    def test_adjust_reuses_cached_waveforms(self):
+        self.galvo.galvo_waveform = "sawtooth"
+        first = self.galvo.adjust(self.exposure_times, self.sweep_times)
+        hits = waveform_cache.hits
+        second = self.galvo.adjust(self.exposure_times, self.sweep_times)
+        assert waveform_cache.hits == hits + len(first)
+        for channel in first:
+            assert second[channel] is first[channel]
+
+        # changing a waveform constant calculates a new waveform
+        self.galvo.galvo_max_voltage = 0.1
+        third = self.galvo.adjust(self.exposure_times, self.sweep_times)
+        for channel in first:
+            assert third[channel] is not first[channel]
+            assert np.all(third[channel] <= 0.1)
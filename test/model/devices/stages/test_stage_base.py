@@ -229,4 +229,31 @@ class TestStageBase:
 
         assert stage.verify_abs_position(move_dict) == abs_dict
         stage.stage_limits = False
-        assert stage.verify_abs_position(move_dict) == abs_dict
\ No newline at end of file
+        assert stage.verify_abs_position(move_dict) == abs_dict
+
+    def test_sequence(self):
+        from navigate.model.devices.stages.stage_synthetic import SyntheticStage
+
+        self.stage_configuration["stage"]["hardware"]["axes"] = ["x", "z"]
+        self.stage_configuration["stage"]["hardware"]["axes_mapping"] = None
+
+        # stages are software-timed by default
+        stage = StageBase(self.microscope_name, None, self.configuration)
+        assert not stage.supports_sequence("z")
+        assert not stage.load_sequence("z", [1, 2, 3])
+        stage.end_sequence()
+
+        stage = SyntheticStage(self.microscope_name, None, self.configuration)
+        assert stage.supports_sequence("z")
+        assert not stage.supports_sequence("f")
+        assert stage.load_sequence("z", [1, 2, 3])
+        assert stage.sequence == {"z": [1, 2, 3]}
+        assert stage.z_pos == 3
+
+        # a position out of the limits fails the whole sequence
+        assert not stage.load_sequence("x", [1, 1000])
+        assert "x" not in stage.sequence
+        assert stage.x_pos == 0
+
+        stage.end_sequence()
+        assert stage.sequence == {}
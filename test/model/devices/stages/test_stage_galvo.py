@@ -165,3 +165,32 @@ class TestStageGalvo:
             self.random_multiple_axes_test(stage)
             stage.stage_limits = False
             self.random_multiple_axes_test(stage)
+
+    def test_load_sequence(self):
+        self.stage_configuration["stage"]["hardware"]["axes"] = ["z"]
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        channels = [
+            k for k, v in microscope_state["channels"].items() if v["is_selected"]
+        ]
+        exposure_times = {k: 0.1 for k in channels}
+        sweep_times = {k: 0.12 for k in channels}
+        with patch("nidaqmx.Task"):
+            daq = MagicMock()
+            daq.analog_outputs = {}
+            stage = GalvoNIStage(self.microscope_name, daq, self.configuration)
+            stage.switch_mode("normal", exposure_times, sweep_times)
+
+            # every block of a stack loads its own sequence
+            for positions in ([1.0, 2.0, 3.0], [4.0, 5.0]):
+                assert stage.load_sequence("z", positions)
+                assert stage.sweep_times == sweep_times
+                assert stage.z_pos == positions[-1]
+                waveform = daq.analog_outputs[stage.axes_channels[0]]["waveform"]
+                samples = int(stage.sample_rate * 0.12)
+                for k in channels:
+                    assert len(waveform[k]) == len(positions) * samples
+
+            stage.end_sequence()
+            assert stage.exposure_times == exposure_times
+            assert stage.sweep_times == sweep_times
+            assert stage.ao_task is not None
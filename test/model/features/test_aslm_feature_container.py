@@ -32,11 +32,19 @@
 import unittest
 import random
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
 from navigate.model.features.feature_container import (
     SignalNode,
     DataNode,
     DataContainer,
+    DataOffload,
+    FrameBatch,
+    get_offload_pool,
     load_features,
 )
 from navigate.model.features.common_features import WaitToContinue, LoopByCount
@@ -959,5 +967,196 @@ class TestFeatureContainer(unittest.TestCase):
         assert data_container.end_flag == True
 
 
+def slow_max(frame, delay):
+    time.sleep(delay)
+    return frame.max()
+
+
+class TestDataOffload(unittest.TestCase):
+    def test_results_in_submission_order(self):
+        results = []
+        with ThreadPoolExecutor(4) as executor:
+            offload = DataOffload(
+                slow_max, lambda k, r: results.append((k, r)), executor=executor
+            )
+            for i, delay in enumerate([0.1, 0.01, 0.05, 0]):
+                offload.submit(np.full((4, 4), i), delay, key=i)
+            offload.wait()
+        assert results == [(i, i) for i in range(4)]
+        assert offload.pending == 0
+
+    def test_bounded_in_flight(self):
+        running = [0, 0]
+        lock = threading.Lock()
+
+        def func(frame):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return frame
+
+        with ThreadPoolExecutor(8) as executor:
+            offload = DataOffload(
+                func, lambda k, r: None, max_in_flight=2, executor=executor
+            )
+            for i in range(8):
+                offload.submit(i)
+                assert offload.pending <= 2
+            offload.wait()
+        assert running[1] <= 2
+
+    def test_drop_when_full(self):
+        results = []
+        release = threading.Event()
+
+        def func(frame):
+            release.wait(5)
+            return frame
+
+        with ThreadPoolExecutor(1) as executor:
+            offload = DataOffload(
+                func, lambda k, r: results.append(r), max_in_flight=2, executor=executor
+            )
+            submitted = [offload.submit(i, block=False) for i in range(4)]
+            assert submitted == [True, True, False, False]
+            release.set()
+            offload.wait()
+        assert results == [0, 1]
+
+    def test_callback_outside_lock(self):
+        results = []
+
+        def callback(key, result):
+            # a callback may use the offload, e.g. to check what is pending
+            results.append((offload.pending, result))
+
+        with ThreadPoolExecutor(2) as executor:
+            offload = DataOffload(slow_max, callback, executor=executor)
+            for i in range(4):
+                offload.submit(np.full((2, 2), i), 0.01)
+            offload.wait()
+        assert [r for _, r in results] == [0, 1, 2, 3]
+
+    def test_error_is_raised_by_wait(self):
+        with ThreadPoolExecutor(1) as executor:
+            offload = DataOffload(np.max, lambda k, r: None, executor=executor)
+            offload.submit(np.zeros(0))
+            self.assertRaises(ValueError, offload.wait)
+            # the error is reported once
+            offload.wait()
+
+    def test_shared_frames_in_worker_processes(self):
+        frames = [SharedNDArray(shape=(8, 8), dtype="uint16") for _ in range(3)]
+        for i, frame in enumerate(frames):
+            frame[:] = i + 1
+        results = {}
+        offload = DataOffload(slow_max, results.__setitem__, executor=get_offload_pool())
+        for i, frame in enumerate(frames):
+            offload.submit(frame, 0, key=i)
+        offload.wait()
+        assert results == {0: 1, 1: 2, 2: 3}
+
+    def test_data_node_waits_before_end(self):
+        results = []
+
+        class OffloadFeature:
+            def __init__(self, model, executor):
+                self.offload = DataOffload(
+                    slow_max, lambda k, r: results.append(r), executor=executor
+                )
+                self.received = 0
+                self.config_table = {
+                    "data": {
+                        "main": self.data_func,
+                        "end": self.end_func,
+                        "offload": self.offload,
+                    },
+                    "node": {"node_type": "multi-step"},
+                }
+
+            def data_func(self, frame_ids):
+                for frame_id in frame_ids:
+                    self.offload.submit(np.full((2, 2), frame_id), 0.02)
+                self.received += len(frame_ids)
+                return frame_ids if self.received >= 4 else None
+
+            def end_func(self):
+                return len(results) == self.received
+
+        with ThreadPoolExecutor(2) as executor:
+            model = DummyModel()
+            signal_container, data_container = load_features(
+                model, [{"name": OffloadFeature, "args": (executor,)}]
+            )
+            data_container.run([0, 1])
+            assert data_container.end_flag is False
+            data_container.run([2, 3])
+            assert data_container.end_flag is True
+        assert results == [0, 1, 2, 3]
+
+
+class TestFrameBatch(unittest.TestCase):
+    def test_views_share_memory(self):
+        frame_buffer = SharedNDArray(shape=(6, 4, 4), dtype="uint16")
+        for i in range(6):
+            frame_buffer[i] = i
+
+        batch = FrameBatch(frame_buffer, [1, 2, 3])
+        assert len(batch.views) == 1
+        stack = batch.stack()
+        assert stack.shape == (3, 4, 4)
+        assert np.shares_memory(stack, frame_buffer)
+        assert [int(frame.max()) for frame in batch] == [1, 2, 3]
+
+        # the ring buffer wraps around
+        batch = FrameBatch(frame_buffer, [4, 5, 0])
+        assert [view.shape[0] for view in batch.views] == [2, 1]
+        assert all(np.shares_memory(v, frame_buffer) for v in batch.views)
+        assert batch.stack().max(axis=(1, 2)).tolist() == [4, 5, 0]
+
+        assert len(FrameBatch(frame_buffer, [])) == 0
+        assert FrameBatch(frame_buffer, []).stack().shape == (0, 4, 4)
+
+    def test_batch_nodes_and_timings(self):
+        received = {}
+
+        class BatchFeature:
+            def __init__(self, model):
+                self.config_table = {
+                    "data": {"main": self.data_func, "main-batch": self.batch_func}
+                }
+
+            def data_func(self, frame_ids):
+                received["main"] = frame_ids
+                return True
+
+            def batch_func(self, frame_ids, batch):
+                received["batch"] = batch.stack().max(axis=(1, 2)).tolist()
+                return True
+
+        model = DummyModel()
+        model.data_buffer_block = np.arange(5, dtype="uint16")[:, None, None] * np.ones(
+            (5, 2, 2), dtype="uint16"
+        )
+        _, data_container = load_features(
+            model, [{"name": BatchFeature}, {"name": WaitToContinue}]
+        )
+        data_container.run([2, 3])
+        assert received == {"batch": [2, 3]}
+        assert data_container.timings["BatchFeature"]["calls"] == 1
+        assert data_container.timings["BatchFeature"]["frames"] == 2
+        assert data_container.timings["BatchFeature"]["time"] >= 0
+
+        # without a frame buffer, main is called
+        model.data_buffer_block = None
+        data_container.reset()
+        assert data_container.timings == {}
+        data_container.run([4])
+        assert received["main"] == [4]
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,172 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import logging
+from types import MethodType, SimpleNamespace
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.model.features.camera_calibration import CameraCalibration
+from navigate.model.features.feature_container import load_features
+from navigate.model.model import Model
+
+
+@pytest.fixture
+def calibration_model(dummy_model, tmp_path):
+    camera = dummy_model.active_microscope.camera
+    map_path = camera.map_path
+    camera.map_path = str(tmp_path)
+    frames = np.random.normal(100, 3, (16, 32, 48)).astype(np.uint16)
+    model = SimpleNamespace(
+        stop_acquisition=False,
+        active_microscope=dummy_model.active_microscope,
+        data_buffer_block=frames,
+        data_buffer=[frames[i] for i in range(frames.shape[0])],
+        configuration=dummy_model.configuration,
+        img_height=frames.shape[1],
+        img_width=frames.shape[2],
+        camera_correction=None,
+        logger=logging.getLogger("model"),
+    )
+    model.update_camera_correction = MethodType(Model.update_camera_correction, model)
+    model.correct_frames = MethodType(Model.correct_frames, model)
+    camera_setting = dummy_model.configuration["experiment"]["CameraParameters"]
+    corrections = {
+        k: camera_setting[k]
+        for k in ["offset_correction", "flatfield_correction", "hot_pixel_correction"]
+    }
+    yield model
+    camera_setting.update(corrections)
+    camera.map_path = map_path
+    camera.get_offset_variance_maps()
+
+
+def run_calibration(model, feature_list, frame_num):
+    """Run the signal and data containers over frame_num frames of the ring."""
+    signal_container, data_container = load_features(model, feature_list)
+    frame_ids = []
+    for i in range(frame_num):
+        signal_container.run()
+        frame_ids.append(i % len(model.data_buffer))
+        # deliver the frames in batches, like the camera does
+        if len(frame_ids) == 5 or i == frame_num - 1:
+            # the data thread corrects the frames before the data container
+            model.correct_frames(frame_ids)
+            data_container.run(frame_ids)
+            frame_ids = []
+    return signal_container, data_container
+
+
+def test_dark_calibration(calibration_model):
+    model = calibration_model
+    camera = model.active_microscope.camera
+    signal_container, data_container = run_calibration(
+        model, [{"name": CameraCalibration, "args": ("dark", 32)}], 32
+    )
+    assert data_container.end_flag
+
+    calibration = data_container.root.node_funcs["main"].__self__
+    assert calibration.signal_end()
+    assert calibration.report["frames"] == 32
+    assert calibration.report["processing_frames_per_second"] > 0
+
+    # two passes over the ring have the statistics of the ring
+    frames = model.data_buffer_block
+    assert isinstance(camera.offset, np.memmap)
+    np.testing.assert_allclose(camera.offset, frames.mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(
+        camera.variance, frames.var(axis=0), rtol=1e-3, atol=1e-3
+    )
+
+
+def test_flatfield_calibration(calibration_model):
+    model = calibration_model
+    camera = model.active_microscope.camera
+    run_calibration(model, [{"name": CameraCalibration, "args": ("dark", 16)}], 16)
+    offset = np.array(camera.offset)
+
+    model.data_buffer_block[:] = offset.astype(np.uint16) + 1000
+    run_calibration(
+        model, [{"name": CameraCalibration, "args": ("flatfield", 10)}], 10
+    )
+    expected = (model.data_buffer_block[0] - offset) / (
+        np.max(np.abs(model.data_buffer_block[0] - offset)) + 1
+    )
+    np.testing.assert_allclose(camera.flatfield, expected, rtol=1e-4)
+
+
+def test_calibration_precisions(calibration_model):
+    model = calibration_model
+    camera = model.active_microscope.camera
+    maps = {}
+    for precision in ["float32", "float64"]:
+        _, data_container = run_calibration(
+            model,
+            [{"name": CameraCalibration, "args": ("dark", 40, precision)}],
+            40,
+        )
+        report = data_container.root.node_funcs["main"].__self__.report
+        assert report["frames"] == 40
+        maps[precision] = (np.array(camera.offset), np.array(camera.variance))
+
+    # both accumulators agree on the maps
+    np.testing.assert_allclose(maps["float32"][0], maps["float64"][0], rtol=1e-5)
+    np.testing.assert_allclose(
+        maps["float32"][1], maps["float64"][1], rtol=1e-3, atol=1e-3
+    )
+
+
+def test_dark_calibration_with_offset_correction(calibration_model):
+    model = calibration_model
+    camera = model.active_microscope.camera
+    camera_setting = model.configuration["experiment"]["CameraParameters"]
+
+    # an offset map of the camera is corrected in the acquisitions
+    run_calibration(model, [{"name": CameraCalibration, "args": ("dark", 16)}], 16)
+    camera_setting["offset_correction"] = True
+    assert model.update_camera_correction() is not None
+
+    frames = model.data_buffer_block.copy()
+    run_calibration(model, [{"name": CameraCalibration, "args": ("dark", 16)}], 16)
+
+    # the calibration accumulates the raw frames
+    np.testing.assert_array_equal(model.data_buffer_block, frames)
+    np.testing.assert_allclose(camera.offset, frames.mean(axis=0), rtol=1e-5)
+    # the correction is rebuilt from the new maps
+    assert model.camera_correction is not None
+    np.testing.assert_array_equal(
+        model.camera_correction.offset, np.rint(camera.offset).astype(np.uint16)
+    )
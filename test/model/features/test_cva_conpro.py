@@ -0,0 +1,97 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.model.analysis.deskew import downsample_frame
+from navigate.model.features.cva_conpro import ConstantVelocityAcquisition
+from navigate.model.features.feature_container import DataOffload
+
+
+@pytest.fixture
+def cva(dummy_model):
+    frames = np.random.randint(0, 1000, (10, 32, 48)).astype(np.uint16)
+    model = SimpleNamespace(
+        configuration=dummy_model.configuration,
+        event_queue=MagicMock(),
+        img_height=32,
+        img_width=48,
+        data_buffer=[frames[i] for i in range(frames.shape[0])],
+    )
+    cva = ConstantVelocityAcquisition(model, preview=True)
+    cva.expected_frames = 6
+    cva.channels = 2
+    cva.received_frames = 0
+    cva.actual_mechanical_step_size_um = 0.4
+    with ThreadPoolExecutor(1) as executor:
+        cva.offload = DataOffload(
+            downsample_frame, cva.update_preview, max_in_flight=12, executor=executor
+        )
+        yield cva
+
+
+def test_deskew_preview(cva):
+    cva.pre_data_func()
+    cva.in_data_func([0, 1, 2, 3, 4])
+    cva.in_data_func([5, 6, 7, 8, 9, 0, 1])
+    cva.offload.wait()
+
+    assert sorted(cva.deskew_previews) == [0, 1]
+    assert cva.deskew_previews[0].planes == 6
+    assert cva.deskew_previews[1].planes == 6
+    # every slab of the preview is filled
+    assert np.all(cva.deskew_previews[0].volume.max(axis=(1, 2)) > 0)
+
+    cva.send_preview()
+    event, images = cva.model.event_queue.put.call_args[0][0]
+    assert event == "deskew_preview"
+    assert list(images) == ["CH2 XY", "CH2 XZ", "CH2 YZ"]
+    assert images["CH2 XY"].shape == cva.deskew_previews[1].volume.shape[1:]
+
+
+def test_deskew_preview_disabled(cva):
+    # the preview is opt-in
+    assert ConstantVelocityAcquisition(cva.model).preview is False
+    cva.preview = False
+    cva.pre_data_func()
+    cva.in_data_func([0, 1, 2])
+    cva.offload.wait()
+    assert cva.deskew_previews == {}
+    assert cva.received_frames == 3
@@ -0,0 +1,151 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.features.feature_list_compiler import (
+    compile_feature_list,
+    CompiledFeatureList,
+    FeatureListError,
+)
+from navigate.model.features import feature_related_functions
+from navigate.model.features.feature_related_functions import (
+    convert_str_to_feature_list,
+    convert_feature_list_to_str,
+    PrepareNextChannel,
+    LoopByCount,
+    Snap,
+)
+from navigate.model.features.feature_container import load_features
+
+
+def large_feature_list_str(n):
+    """Return the string of a customized feature list with n loops."""
+    loop = (
+        "({'name': PrepareNextChannel}, {'name': Snap}, "
+        "{'name': WaitToContinue, 'node': {'device_related': True}}, "
+        "{'name': LoopByCount, 'args': "
+        "('experiment.MicroscopeState.selected_channels',), 'true': 'break'})"
+    )
+    return "[" + ", ".join([loop] * n) + "]"
+
+
+def test_compile_is_cached_and_hashable():
+    content = (
+        "[{'name': PrepareNextChannel}, "
+        "({'name': Snap}, {'name': LoopByCount, 'args': 3})]"
+    )
+    compiled = compile_feature_list(content)
+    assert compile_feature_list(content) is compiled
+    assert isinstance(compiled, CompiledFeatureList)
+    assert hash(compiled) == hash(compile_feature_list(" " + content))
+    assert compiled == compile_feature_list(" " + content)
+
+    namespace = {
+        "PrepareNextChannel": PrepareNextChannel,
+        "Snap": Snap,
+        "LoopByCount": LoopByCount,
+    }
+    feature_list = compiled.instantiate(namespace)
+    assert feature_list == [
+        {"name": PrepareNextChannel},
+        ({"name": Snap}, {"name": LoopByCount, "args": (3,)}),
+    ]
+    # every feature list is a new object
+    feature_list[0]["args"] = (1,)
+    assert compiled.instantiate(namespace)[0] == {"name": PrepareNextChannel}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "{'name': Snap}",
+        "[__import__('os').system('echo')]",
+        "[{'name': Snap, 'args': (open('f'),)}]",
+        "[Snap.__class__]",
+        "[{'args': (1,)}]",
+        "[{'name': Snap, 'true': Snap}]",
+        "[{**{'name': Snap}}]",
+        "[lambda: 1]",
+    ],
+)
+def test_compile_invalid(content):
+    with pytest.raises(FeatureListError):
+        compile_feature_list(content)
+    assert convert_str_to_feature_list(content) is None
+
+
+def test_instantiate_unknown_name():
+    with pytest.raises(FeatureListError):
+        compile_feature_list("[{'name': NonExistFeature}]").instantiate({})
+
+
+def test_round_trip():
+    feature_list = [
+        {"name": PrepareNextChannel},
+        (
+            {"name": Snap, "args": (False,)},
+            {"name": LoopByCount, "args": (-2,), "true": "break"},
+        ),
+    ]
+    assert (
+        convert_str_to_feature_list(convert_feature_list_to_str(feature_list))
+        == feature_list
+    )
+
+
+def test_large_feature_list(dummy_model):
+    """A large customized feature list is compiled once and loads."""
+    content = large_feature_list_str(200)
+    compile_feature_list.cache_clear()
+
+    exec_result = {}
+    exec(f"result={content}", vars(feature_related_functions), exec_result)
+    feature_list = convert_str_to_feature_list(content)
+    assert feature_list == exec_result["result"]
+
+    repeats = 20
+    for _ in range(repeats):
+        assert convert_str_to_feature_list(content) == feature_list
+    cache_info = compile_feature_list.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits >= repeats
+
+    signal_container, data_container = load_features(
+        dummy_model, convert_str_to_feature_list(content)
+    )
+    assert signal_container.root is not None
@@ -0,0 +1,128 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard library imports
+from unittest.mock import MagicMock
+
+# Third party imports
+import numpy as np
+import pytest
+
+# Local imports
+from navigate.model.features.focus_map import FocusMap
+
+
+class FakeAutofocus:
+    """Autofocus that finds the focus of a tilted sample in one step."""
+
+    def __init__(self, model, drift=0):
+        self.model = model
+        self.drift = drift
+        self.count = 0
+
+    def pre_func_signal(self):
+        pass
+
+    def in_func_signal(self):
+        self.count += 1
+        args = self.model.move_stage.call_args[0][0]
+        return 0.1 * args["x_abs"] + 0.2 * args["y_abs"] + self.drift
+
+    def end_func_signal(self):
+        return True
+
+
+def run_signal(focus_map):
+    focus_map.pre_func_signal()
+    for _ in range(100):
+        focus_map.in_func_signal()
+        if focus_map.end_func_signal():
+            return
+    assert False, "FocusMap didn't finish"
+
+
+@pytest.fixture
+def focus_map():
+    model = MagicMock()
+    x, y = np.meshgrid(np.arange(10) * 100.0, np.arange(8) * 100.0)
+    model.configuration = {
+        "experiment": {
+            "MultiPositions": [
+                {"x": xi, "y": yi, "z": 0.0, "theta": 0.0, "f": 0.0}
+                for xi, yi in zip(x.ravel(), y.ravel())
+            ],
+            "StageParameters": {"f": 0.0},
+        }
+    }
+    focus_map = FocusMap(model, 6, "plane", 2)
+    focus_map.autofocus = FakeAutofocus(model)
+    return focus_map
+
+
+def test_focus_map(focus_map):
+    model = focus_map.model
+    run_signal(focus_map)
+    assert focus_map.autofocus.count == 6
+    assert focus_map.surface.fit_method == "plane"
+
+    positions = model.configuration["experiment"]["MultiPositions"]
+    assert len(positions) == 80
+    for position in positions:
+        assert position["f"] == pytest.approx(
+            0.1 * position["x"] + 0.2 * position["y"]
+        )
+    event, table = model.event_queue.put.call_args[0][0]
+    assert event == "multiposition"
+    np.testing.assert_allclose(np.array(table)[:, 4], [p["f"] for p in positions])
+
+
+def test_focus_map_drift(focus_map):
+    model = focus_map.model
+    run_signal(focus_map)
+
+    # later runs only sample drift_samples positions and shift the surface
+    focus_map.autofocus.drift = 5
+    focus_map.autofocus.count = 0
+    run_signal(focus_map)
+    assert focus_map.autofocus.count == 2
+    assert focus_map.surface.offset == pytest.approx(5)
+    for position in model.configuration["experiment"]["MultiPositions"]:
+        assert position["f"] == pytest.approx(
+            0.1 * position["x"] + 0.2 * position["y"] + 5
+        )
+
+    # resample the full set
+    focus_map.resample_every = 2
+    focus_map.autofocus.count = 0
+    run_signal(focus_map)
+    assert focus_map.autofocus.count == 6
+    assert focus_map.surface.offset == 0
@@ -0,0 +1,153 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard library imports
+from unittest.mock import MagicMock
+
+# Third party imports
+import numpy as np
+import pytest
+
+# Local imports
+from navigate.model.features.remove_empty_tiles import (
+    AdaptZRange,
+    DetectTissueRangeInStackAndRecord,
+)
+
+
+def test_detect_tissue_range():
+    model = MagicMock()
+    model.data_buffer = [np.full((4, 4), i) for i in range(5)]
+    records = []
+    detect = DetectTissueRangeInStackAndRecord(
+        model, 5, 0, records, detect_func=lambda image, p: 1 <= image[0, 0] <= 2
+    )
+    detect.pre_func_data()
+    detect.in_func_data([0, 1])
+    assert detect.end_func_data() is False
+    detect.in_func_data([2, 3, 4])
+    assert detect.end_func_data() is True
+    # tissue in planes 1-2, widened by one plane on each side
+    assert records == [(0.0, 0.75)]
+
+    detect.detect_func = lambda image, p: False
+    detect.pre_func_data()
+    detect.in_func_data([0, 1, 2, 3, 4])
+    detect.end_func_data()
+    assert records == [(0.0, 0.75), None]
+
+    # the records of a previous acquisition are cleared
+    DetectTissueRangeInStackAndRecord(model, 5, 0, records)
+    assert records == []
+
+
+@pytest.fixture
+def model():
+    model = MagicMock()
+    model.configuration = {
+        "experiment": {
+            "MicroscopeState": {
+                "start_position": 0.0,
+                "end_position": 100.0,
+                "step_size": 1.0,
+                "number_z_steps": 100,
+                "start_focus": 0.0,
+                "end_focus": 50.0,
+                "multiposition_count": 3,
+                "channels": {
+                    "channel_1": {"is_selected": True},
+                    "channel_2": {"is_selected": False},
+                },
+            },
+            "CameraParameters": {
+                "x_pixels": 4,
+                "y_pixels": 4,
+                "img_x_pixels": 4,
+                "img_y_pixels": 4,
+            },
+            "MultiPositions": [
+                {"x": float(i), "y": 0.0, "z": 10.0, "theta": 0.0, "f": 5.0}
+                for i in range(3)
+            ],
+        }
+    }
+    return model
+
+
+def test_adapt_z_range(model):
+    adapt = AdaptZRange(model, [(0.2, 0.4), (0.9, 1.0), None])
+    assert adapt.signal_func() is True
+
+    microscope_state = model.configuration["experiment"]["MicroscopeState"]
+    assert microscope_state["number_z_steps"] == 20
+    assert microscope_state["end_position"] == pytest.approx(20)
+    assert microscope_state["end_focus"] == pytest.approx(10)
+
+    positions = model.configuration["experiment"]["MultiPositions"]
+    assert [p["z"] for p in positions] == pytest.approx([30, 90, 10])
+    assert [p["f"] for p in positions] == pytest.approx([15, 45, 5])
+    assert adapt.report["frames_saved"] == 3 * 80
+    assert adapt.report["bytes_saved"] == 3 * 80 * 32
+
+    events = [call[0][0][0] for call in model.event_queue.put.call_args_list]
+    assert events == ["multiposition", "update_z_range"]
+
+
+def test_adapt_z_range_binning(model):
+    camera_parameters = model.configuration["experiment"]["CameraParameters"]
+    # 2x2 binning
+    camera_parameters["img_x_pixels"] = 2
+    camera_parameters["img_y_pixels"] = 2
+    adapt = AdaptZRange(model, [(0.2, 0.4), (0.9, 1.0), None])
+    adapt.signal_func()
+
+    assert adapt.report["frames_saved"] == 3 * 80
+    assert adapt.report["bytes_saved"] == 3 * 80 * 8
+
+
+def test_adapt_z_range_remove_empty(model):
+    adapt = AdaptZRange(model, [None, (0.5, 0.55), None], remove_empty=True)
+    adapt.signal_func()
+
+    microscope_state = model.configuration["experiment"]["MicroscopeState"]
+    assert microscope_state["number_z_steps"] == 5
+    assert microscope_state["multiposition_count"] == 1
+    positions = model.configuration["experiment"]["MultiPositions"]
+    assert len(positions) == 1
+    assert positions[0]["x"] == 1
+    assert adapt.report["frames_saved"] == 300 - 5
+
+
+def test_adapt_z_range_without_tissue(model):
+    AdaptZRange(model, [None, None, None]).signal_func()
+    assert model.configuration["experiment"]["MicroscopeState"]["number_z_steps"] == 100
+    model.event_queue.put.assert_not_called()
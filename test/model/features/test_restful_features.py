@@ -0,0 +1,214 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+# Local Imports
+from navigate.model.features.feature_container import FrameBatch
+from navigate.model.features.restful_features import (
+    IlastikClient,
+    IlastikSegmentation,
+    downsample_images,
+    prepare_service,
+    upsample_mask,
+)
+from navigate.tools.ilastik_stand_in import IlastikStandInServer
+
+
+@pytest.fixture
+def images():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 1000, size=(3, 32, 48), dtype=np.uint16)
+
+
+def expected_mask(image):
+    return np.where(image > image.mean(), 2, 1).astype(np.uint8)[..., np.newaxis]
+
+
+def test_prepare_service():
+    with IlastikStandInServer() as server:
+        r = prepare_service(server.url, project_file="test.ilp")
+        assert r == {"project": "test.ilp"}
+        assert server.project_file == "test.ilp"
+
+
+@pytest.mark.parametrize("payload", ["binary", "json"])
+def test_segment(images, payload):
+    with IlastikStandInServer() as server:
+        client = IlastikClient(server.url, payload=payload)
+        masks = client.segment(images)
+        masks += client.segment(images[:1])
+        client.close()
+        content_type = server.requests[0][0]
+
+    assert len(masks) == 4
+    for mask, image in zip(masks, list(images) + [images[0]]):
+        np.testing.assert_array_equal(mask, expected_mask(image))
+    assert content_type.startswith(
+        "application/octet-stream" if payload == "binary" else "application/json"
+    )
+    # binary payloads are smaller than the base64 encoded images
+    if payload == "binary":
+        assert client.stats()["bytes_sent"] < images.nbytes * 4 / 3
+    assert client.stats()["requests"] == 2
+    assert client.stats()["images"] == 4
+
+
+def test_segment_falls_back_to_json(images):
+    with IlastikStandInServer(accept_binary=False) as server:
+        client = IlastikClient(server.url)
+        assert len(client.segment(images)) == 3
+        assert client.payload == "json"
+        assert len(client.segment(images)) == 3
+        client.close()
+        assert [r[0] for r in server.requests] == ["application/json"] * 2
+
+
+def test_submit_bounds_in_flight_requests(images):
+    with IlastikStandInServer() as server:
+        client = IlastikClient(server.url, max_in_flight=2)
+        running = [0, 0]
+        lock = threading.Lock()
+        results = []
+        segment = client.segment
+
+        def slow_segment(imgs):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return segment(imgs)
+
+        client.segment = slow_segment
+        for i in range(6):
+            client.submit(images[i % 3 : i % 3 + 1], results.append)
+        client.wait()
+        assert len(results) == 6
+        client.close()
+
+    assert running[1] == 2
+
+
+def test_downsample_and_upsample(images):
+    small = downsample_images(images, 4)
+    assert small.shape == (3, 8, 12)
+    assert small.dtype == images.dtype
+    assert small[0, 0, 0] == int(images[0, :4, :4].mean())
+    assert downsample_images(images, 1) is images
+
+    mask = np.arange(6, dtype=np.uint8).reshape(2, 3, 1)
+    big = upsample_mask(mask, 4, (9, 13))
+    assert big.shape == (9, 13, 1)
+    assert big[8, 12, 0] == 5
+    assert big[3, 4, 0] == 1
+
+
+def test_ilastik_segmentation(images):
+    with IlastikStandInServer() as server:
+        model = MagicMock()
+        model.configuration = {
+            "rest_api_config": {"Ilastik": {"url": server.url, "downsample": 2}}
+        }
+        model.data_buffer = images
+        model.img_height, model.img_width = images.shape[1:]
+        model.display_ilastik_segmentation = True
+        model.mark_ilastik_position = False
+
+        seg = IlastikSegmentation(model)
+        seg.data_func([0, 2])
+        seg.cleanup()
+
+    masks = [c.args[0][1] for c in model.event_queue.put.call_args_list]
+    assert len(masks) == 2
+    assert all(mask.shape == (32, 48, 1) for mask in masks)
+    assert server.requests[0][2] == 2
+
+
+@pytest.mark.parametrize("downsample", [1, 2])
+def test_ilastik_segmentation_batch(images, downsample):
+    with IlastikStandInServer() as server:
+        model = MagicMock()
+        model.configuration = {
+            "rest_api_config": {
+                "Ilastik": {"url": server.url, "downsample": downsample}
+            }
+        }
+        model.img_height, model.img_width = images.shape[1:]
+        model.display_ilastik_segmentation = True
+        model.mark_ilastik_position = False
+
+        seg = IlastikSegmentation(model)
+        seg.data_func_batch([1, 2], FrameBatch(images, [1, 2]))
+        seg.cleanup()
+
+    masks = [c.args[0][1] for c in model.event_queue.put.call_args_list]
+    assert len(masks) == 2
+    if downsample == 1:
+        for mask, image in zip(masks, images[1:]):
+            np.testing.assert_array_equal(mask, expected_mask(image))
+
+
+def test_ilastik_mark_position_at_submission(images):
+    model = MagicMock()
+    stage = {"x": 100.0, "y": 200.0, "z": 10.0, "theta": 0.0, "f": 5.0}
+    model.configuration = {
+        "rest_api_config": {"Ilastik": {"url": "http://localhost"}},
+        "experiment": {"StageParameters": stage},
+    }
+    model.data_buffer = images
+    model.img_height, model.img_width = images.shape[1:]
+    model.display_ilastik_segmentation = False
+    model.mark_ilastik_position = True
+    model.ilastik_target_labels = [2]
+
+    seg = IlastikSegmentation(model)
+    seg.client = MagicMock()
+    seg.pieces_num, seg.pieces_size, seg.posistion_step_size = 1, 32, 10.0
+    seg.fov_x, seg.fov_y = 20.0, 30.0
+    seg.data_func([0])
+    callback = seg.client.submit.call_args.args[1]
+
+    # the stage moves on before the masks come back
+    stage.update({"x": 0.0, "y": 0.0, "z": 50.0, "f": 9.0})
+    callback([expected_mask(images[0])])
+    event, positions = model.event_queue.put.call_args.args[0]
+    assert event == "multiposition"
+    assert positions == [[90.0, 185.0, 10.0, 0.0, 5.0]]
@@ -0,0 +1,220 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.acquisition_planner import AcquisitionPlanner, get_config_value
+from navigate.model.features.feature_related_functions import (
+    convert_str_to_feature_list,
+)
+
+
+@pytest.fixture
+def planner(dummy_model):
+    microscope_state = dummy_model.configuration["experiment"]["MicroscopeState"]
+    backup = {
+        k: microscope_state[k]
+        for k in [
+            "number_z_steps",
+            "stack_cycling_mode",
+            "is_multiposition",
+            "multiposition_count",
+            "timepoints",
+        ]
+    }
+    microscope_state["number_z_steps"] = 10
+    microscope_state["stack_cycling_mode"] = "per_stack"
+    microscope_state["is_multiposition"] = False
+    microscope_state["timepoints"] = 1
+    yield AcquisitionPlanner(dummy_model)
+    for k, v in backup.items():
+        microscope_state[k] = v
+
+
+def selected_channel_num(planner):
+    channels = planner.configuration["experiment"]["MicroscopeState"]["channels"]
+    return len([k for k, v in channels.items() if v["is_selected"]])
+
+
+def test_get_config_value(dummy_model):
+    assert get_config_value(
+        dummy_model.configuration, "experiment.MicroscopeState.timepoints"
+    ) == int(dummy_model.configuration["experiment"]["MicroscopeState"]["timepoints"])
+    assert get_config_value(dummy_model.configuration, "experiment.Nothing", 5) == 5
+
+
+def test_estimate_single(planner):
+    feature_list = convert_str_to_feature_list(
+        "[({'name': PrepareNextChannel}, {'name': LoopByCount, 'args': "
+        "('experiment.MicroscopeState.selected_channels',),})]"
+    )
+    report = planner.estimate(feature_list)
+    channel_num = selected_channel_num(planner)
+    assert report["frames"] == int(
+        planner.configuration["experiment"]["MicroscopeState"]["selected_channels"]
+    )
+    assert report["channel_switches"] == min(channel_num, report["frames"])
+    assert report["phases"]["exposure"] == pytest.approx(
+        sum(
+            planner.sweep_times[planner.channels[i % channel_num]]
+            for i in range(report["frames"])
+        )
+    )
+    camera_parameters = planner.configuration["experiment"]["CameraParameters"]
+    x = int(camera_parameters["img_x_pixels"])
+    y = int(camera_parameters["img_y_pixels"])
+    assert report["bytes"] == report["frames"] * x * y * 2
+    assert report["duration"] == pytest.approx(sum(report["phases"].values()))
+
+
+def test_estimate_z_stack(planner):
+    feature_list = convert_str_to_feature_list("[{'name': ZStackAcquisition}]")
+    report = planner.estimate(feature_list)
+    channel_num = selected_channel_num(planner)
+    assert report["frames"] == 10 * channel_num
+    assert report["phases"]["stage"] > 0
+    assert report["unknown_features"] == []
+
+    # per_slice switches channels at every plane
+    planner.configuration["experiment"]["MicroscopeState"][
+        "stack_cycling_mode"
+    ] = "per_slice"
+    per_slice_report = planner.estimate(feature_list)
+    assert per_slice_report["frames"] == report["frames"]
+    if channel_num > 1:
+        assert per_slice_report["channel_switches"] > report["channel_switches"]
+
+
+def test_estimate_binning(planner):
+    camera_parameters = planner.configuration["experiment"]["CameraParameters"]
+    backup = {k: camera_parameters[k] for k in ["img_x_pixels", "img_y_pixels"]}
+    feature_list = convert_str_to_feature_list("[{'name': ZStackAcquisition}]")
+    report = planner.estimate(feature_list)
+    # 2x2 binning saves a quarter of the bytes
+    camera_parameters["img_x_pixels"] = int(backup["img_x_pixels"]) // 2
+    camera_parameters["img_y_pixels"] = int(backup["img_y_pixels"]) // 2
+    binned = AcquisitionPlanner(planner.model).estimate(feature_list)
+    camera_parameters.update(backup)
+    assert binned["frames"] == report["frames"]
+    assert binned["bytes"] == report["bytes"] // 4
+
+
+def test_estimate_multiposition(planner):
+    configuration = planner.configuration
+    positions = configuration["experiment"]["MultiPositions"]
+    configuration["experiment"]["MicroscopeState"]["multiposition_count"] = len(
+        positions
+    )
+    feature_list = convert_str_to_feature_list(
+        "[{'name': PrepareNextChannel}, ({'name': MoveToNextPositionInMultiPositionTable},"
+        "{'name': Snap}, {'name': LoopByCount, 'args': "
+        "('experiment.MicroscopeState.multiposition_count',),}),]"
+    )
+    slow = planner.estimate(feature_list)
+    assert slow["frames"] == len(positions)
+
+    fast = AcquisitionPlanner(
+        planner.model,
+        telemetry={"stage_velocity": {axis: 1e9 for axis in "xyzf"}},
+    ).estimate(feature_list)
+    assert fast["frames"] == slow["frames"]
+    assert fast["phases"]["stage"] < slow["phases"]["stage"]
+
+
+def test_estimate_unknown_feature(planner):
+    class UnknownFeature:
+        pass
+
+    report = planner.estimate([{"name": UnknownFeature}])
+    assert report["unknown_features"] == ["UnknownFeature"]
+    assert report["frames"] == 1
+
+
+def test_estimate_focus_map(planner):
+    positions = planner.configuration["experiment"]["MultiPositions"]
+    autofocus = planner.estimate(convert_str_to_feature_list("[{'name': Autofocus}]"))
+    focus_map = planner.estimate(
+        convert_str_to_feature_list("[{'name': FocusMap, 'args': (4,)}]")
+    )
+    assert focus_map["unknown_features"] == []
+    assert focus_map["frames"] == min(4, len(positions)) * autofocus["frames"]
+
+
+def test_measured_telemetry(planner):
+    positions = planner.configuration["experiment"]["MultiPositions"]
+    planner.configuration["experiment"]["MicroscopeState"]["multiposition_count"] = len(
+        positions
+    )
+    feature_list = convert_str_to_feature_list(
+        "[({'name': PrepareNextChannel}, {'name': MoveToNextPositionInMultiPositionTable},"
+        "{'name': Snap}, {'name': LoopByCount, 'args': "
+        "('experiment.MicroscopeState.multiposition_count',),}),]"
+    )
+    report = planner.estimate(feature_list)
+
+    # a traced channel switch takes 2 s and a 100 um move takes 1 s more than
+    # the travel at the configured velocity
+    velocity = planner.get_stage_velocity("x")
+    measured = AcquisitionPlanner(planner.model)
+    measured.add_measured_telemetry(
+        trace_summary={
+            "PrepareNextChannel.main": {"count": 4, "total": 8.0, "max": 3.0}
+        },
+        stage_moves=[({"x": 100.0}, 100.0 / velocity + 1.0)] * 3,
+    )
+    assert measured.telemetry["channel_switch"] == pytest.approx(2.0)
+    assert measured.telemetry["stage_settle"] == pytest.approx(1.0)
+    measured_report = measured.estimate(feature_list)
+    assert measured_report["frames"] == report["frames"]
+    assert measured_report["channel_switches"] == report["channel_switches"] > 0
+    assert measured_report["phases"]["channel_switch"] == pytest.approx(
+        2.0 * report["channel_switches"]
+    )
+    assert measured_report["stage_moves"] == report["stage_moves"] > 0
+    assert measured_report["phases"]["stage"] == pytest.approx(
+        report["phases"]["stage"] + 1.0 * report["stage_moves"]
+    )
+
+    # the timings the planner is initialized with are kept
+    given = AcquisitionPlanner(planner.model, telemetry={"channel_switch": 0.5})
+    given.add_measured_telemetry(
+        trace_summary={
+            "PrepareNextChannel.main": {"count": 4, "total": 8.0, "max": 3.0}
+        },
+        waveform_stats={"size": 1, "hits": 0, "misses": 2, "compute_time": 0.2},
+    )
+    assert given.telemetry["channel_switch"] == 0.5
+    assert given.telemetry["resolution_switch"] == pytest.approx(0.1)
@@ -30,14 +30,17 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 # Standard library imports
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 # Third party imports
 
 # Local application imports
 from navigate.model.device_startup_functions import auto_redial
 from navigate.model.device_startup_functions import load_camera_connection
+from navigate.model.device_startup_functions import load_devices
 from navigate.model.devices.camera.camera_synthetic import SyntheticCameraController
 
 
@@ -79,6 +82,14 @@ class TestAutoRedial(unittest.TestCase):
         auto_redial(mock_func, (1, 2), n_tries=1, kwarg1="test")
         mock_func.assert_called_with(1, 2, kwarg1="test")
 
+    @patch("navigate.model.device_startup_functions.time.sleep")
+    def test_exponential_backoff(self, mock_sleep):
+        """Test that the wait between attempts grows exponentially."""
+        mock_func = MagicMock(side_effect=[Exception("fail")] * 5 + ["success"])
+        auto_redial(mock_func, (), n_tries=6, retry_delay=0.1, max_retry_delay=0.5)
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        assert waits == [0.1, 0.2, 0.4, 0.5, 0.5]
+
 
 class TestLoadCameraConnection(unittest.TestCase):
     """Test the load_camera_connection function."""
@@ -118,3 +129,84 @@ class TestLoadCameraConnection(unittest.TestCase):
     #     camera = load_camera_connection(configuration=self.configuration,
     #                                     camera_id=1)
     #     self.assertTrue(isinstance(camera, HamamatsuController))
+
+
+class TestLoadDevices(unittest.TestCase):
+    """Test the load_devices function."""
+
+    def setUp(self):
+        self.configuration = {
+            "configuration": {
+                "hardware": {
+                    "camera": [
+                        {"type": "SyntheticCamera", "serial_number": 1},
+                        {"type": "SyntheticCamera", "serial_number": 2},
+                    ],
+                    "filter_wheel": {"type": "SyntheticFilterWheel"},
+                    "zoom": {"type": "SyntheticZoom", "servo_id": 1},
+                    "stage": [
+                        {"type": "SyntheticStage", "serial_number": 1},
+                        {"type": "SyntheticStage", "serial_number": 2},
+                    ],
+                }
+            }
+        }
+
+    def test_load_synthetic_devices(self):
+        """Test that every configured device is loaded and timed."""
+        devices = load_devices(self.configuration, is_synthetic=True)
+        assert set(devices["camera"].keys()) == {
+            "SyntheticCamera_1",
+            "SyntheticCamera_2",
+        }
+        assert set(devices["stages"].keys()) == {
+            "SyntheticStage_1",
+            "SyntheticStage_2",
+        }
+        assert list(devices["zoom"].keys()) == ["SyntheticZoom_1"]
+        assert list(devices["filter_wheel"].keys()) == ["SyntheticFilterWheel"]
+        assert set(devices["__startup_report__"].keys()) == {
+            "camera",
+            "filter_wheel",
+            "zoom",
+            "stage_0",
+            "stage_1",
+            "total",
+        }
+
+    @patch("navigate.model.device_startup_functions.load_stage_connection")
+    def test_load_devices_concurrently(self, mock_load_stage):
+        """Test that devices connect at the same time."""
+        # each stage waits for the other, which only passes if they overlap
+        barrier = threading.Barrier(2)
+        overlapped = []
+
+        def load_stage(*args):
+            try:
+                barrier.wait(timeout=5)
+                overlapped.append(True)
+            except threading.BrokenBarrierError:
+                overlapped.append(False)
+
+        mock_load_stage.side_effect = load_stage
+        devices = load_devices(self.configuration, is_synthetic=True)
+        assert overlapped == [True, True]
+        assert len(devices["stages"]) == 2
+
+    @patch("navigate.model.device_startup_functions.load_stage_connection")
+    def test_load_devices_timeout(self, mock_load_stage):
+        """Test that a device that doesn't connect in time raises an error."""
+        mock_load_stage.side_effect = lambda *args: time.sleep(0.5)
+        with self.assertRaises(RuntimeError):
+            load_devices(self.configuration, is_synthetic=True, timeout=0.1)
+
+    @patch("navigate.model.device_startup_functions.load_stage_connection")
+    def test_load_devices_timeout_per_device(self, mock_load_stage):
+        """Test that the timeout starts when the connection of a device starts."""
+        mock_load_stage.side_effect = lambda *args: time.sleep(0.3)
+        # one thread connects the stages one after another, 0.6 s in total
+        devices = load_devices(
+            self.configuration, is_synthetic=True, timeout=0.5, max_workers=1
+        )
+        assert len(devices["stages"]) == 2
+        assert devices["__startup_report__"]["total"] > 0.5
@@ -0,0 +1,126 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import json
+import threading
+import time
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.execution_tracer import ExecutionTracer
+from navigate.model.features.feature_container import load_features
+from test.model.dummy import DummyModel
+
+
+def test_span_and_instant():
+    tracer = ExecutionTracer()
+    with tracer.span("outer", "wait", frame=3):
+        time.sleep(0.01)
+    tracer.instant("marker")
+
+    span, instant = tracer.events
+    assert span["ph"] == "X" and span["cat"] == "wait"
+    assert span["dur"] >= 10000
+    assert span["args"] == {"frame": 3}
+    assert instant["ph"] == "i" and instant["ts"] >= span["ts"] + span["dur"]
+    assert tracer.summary()["outer"]["count"] == 1
+
+
+def test_wrap_records_errors():
+    tracer = ExecutionTracer()
+
+    def func(x):
+        if x < 0:
+            raise ValueError
+        return x
+
+    traced = tracer.wrap(func, "func", "data")
+    assert traced(2) == 2
+    try:
+        traced(-1)
+    except ValueError:
+        pass
+    assert [e["name"] for e in tracer.events] == ["func", "func"]
+    assert traced.__wrapped__ is func
+
+
+def test_threads_and_save(tmp_path):
+    tracer = ExecutionTracer()
+
+    def work():
+        with tracer.span("work"):
+            pass
+
+    thread = threading.Thread(target=work, name="worker")
+    thread.start()
+    thread.join()
+    work()
+
+    path = tmp_path / "trace.json"
+    tracer.save(path)
+    with open(path) as f:
+        trace = json.load(f)
+    thread_names = {
+        e["tid"]: e["args"]["name"]
+        for e in trace["traceEvents"]
+        if e["name"] == "thread_name"
+    }
+    tids = [e["tid"] for e in trace["traceEvents"] if e["name"] == "work"]
+    assert len(set(tids)) == 2
+    assert thread_names[tids[0]] == "worker"
+
+
+def test_traced_feature_nodes():
+    class Feature:
+        def __init__(self, model):
+            self.config_table = {
+                "signal": {"main": self.signal_func},
+                "data": {"main": self.data_func},
+            }
+
+        def signal_func(self):
+            return True
+
+        def data_func(self, frame_ids):
+            return True
+
+    model = DummyModel()
+    model.tracer = ExecutionTracer()
+    signal_container, data_container = load_features(model, [{"name": Feature}])
+    signal_container.run()
+    data_container.run([0])
+    names = [(e["cat"], e["name"]) for e in model.tracer.events]
+    assert ("signal", "Feature.main") in names
+    assert ("data", "Feature.main") in names
+    assert ("data", "Feature.pre-main") in names
@@ -81,9 +81,11 @@ def test_get_stage_position(dummy_microscope):
         f"{k}_abs": v
         for k, v in zip(["x", "y", "z", "theta", "f"], np.random.rand(5) * 100)
     }
+    dummy_microscope.get_stage_position()
     dummy_microscope.move_stage(pos_dict, wait_until_done=True)
 
-    assert dummy_microscope.ask_stage_for_position is True
+    # the setpoints are recorded, the stages are not queried
+    assert dummy_microscope.ask_stage_for_position is False
 
     stage_dict = dummy_microscope.get_stage_position()
 
@@ -101,6 +103,41 @@ def test_get_stage_position(dummy_microscope):
     assert ret_pos_dict == stage_dict
     assert dummy_microscope.ask_stage_for_position is False
 
+    # invalidated stages are queried again
+    dummy_microscope.ask_stage_for_position = True
+    assert dummy_microscope.ask_stage_for_position is True
+    assert dummy_microscope.get_stage_position() == ret_pos_dict
+    assert dummy_microscope.ask_stage_for_position is False
+
+
+def test_stop_stage_interrupts_move(dummy_microscope):
+    import threading
+    from unittest.mock import patch
+
+    stage = dummy_microscope.stages["x"]
+    x_pos = stage.report_position()["x_pos"]
+    moving = threading.Event()
+    stopped = threading.Event()
+
+    def blocking_move(axis, abs_pos, wait_until_done=False):
+        # the move only returns once the stage is stopped
+        moving.set()
+        return stopped.wait(timeout=5)
+
+    with patch.object(stage, "move_axis_absolute", side_effect=blocking_move):
+        with patch.object(stage, "stop", side_effect=stopped.set):
+            mover = threading.Thread(
+                target=dummy_microscope.move_stage, args=({"x_abs": x_pos + 10},)
+            )
+            mover.start()
+            assert moving.wait(timeout=5)
+            dummy_microscope.stop_stage()
+            mover.join(timeout=5)
+
+    assert stopped.is_set()
+    assert not mover.is_alive()
+    # the setpoint of the interrupted move is not recorded
+    assert dummy_microscope.get_stage_position()["x_pos"] == x_pos
 
 def test_prepare_next_channel(dummy_microscope):
     dummy_microscope.prepare_acquisition()
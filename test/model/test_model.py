@@ -31,6 +31,7 @@
 #
 import random
 import pytest
+import numpy as np
 import os
 from multiprocessing import Manager
 from unittest.mock import MagicMock
@@ -68,6 +69,9 @@ def model():
             configuration_directory, "waveform_constants.yml"
         )
         rest_api_path = Path.joinpath(configuration_directory, "rest_api_config.yml")
+        waveform_templates_path = Path.joinpath(
+            configuration_directory, "waveform_templates.yml"
+        )
 
         event_queue = MagicMock()
 
@@ -77,6 +81,7 @@ def model():
             experiment=experiment_path,
             waveform_constants=waveform_constants_path,
             rest_api_config=rest_api_path,
+            waveform_templates=waveform_templates_path,
         )
         verify_configuration(manager, configuration)
         verify_experiment_config(manager, configuration)
@@ -414,3 +419,252 @@ def test_load_feature_records(model):
     feature_records_2 = load_yaml_file(f"{feature_lists_path}/__sequence.yml")
     assert feature_records == feature_records_2
     os.remove(f"{feature_lists_path}/__sequence.yml")
+
+
+def run_z_stack(model, feature):
+    """Acquire a z-stack with a customized feature list.
+
+    Returns the feature object, the number of frames it received and the expected
+    number of frames.
+    """
+    import inspect
+
+    state = model.configuration["experiment"]["MicroscopeState"]
+    model.addon_feature = [{"name": feature}]
+    n_frames = int(state["number_z_steps"]) * int(state["selected_channels"])
+
+    show_img_pipe = model.create_pipe("show_img_pipe")
+    model.run_command("acquire")
+    z_stack = inspect.unwrap(model.signal_container.root.node_funcs["main"]).__self__
+
+    while show_img_pipe.recv() != "stop":
+        pass
+    model.data_thread.join()
+    model.release_pipe("show_img_pipe")
+    model.addon_feature = None
+    return z_stack, z_stack.received_frames, n_frames
+
+
+def test_sequenced_z_stack_acquisition(model):
+    from navigate.model.features.common_features import (
+        ZStackAcquisition,
+        SequencedZStackAcquisition,
+    )
+
+    state = model.configuration["experiment"]["MicroscopeState"]
+    backup = {
+        k: state[k]
+        for k in [
+            "image_mode",
+            "is_save",
+            "is_multiposition",
+            "stack_cycling_mode",
+            "number_z_steps",
+            "waveform_template",
+        ]
+    }
+    state["image_mode"] = "customized"
+    state["is_save"] = False
+    state["is_multiposition"] = False
+    state["stack_cycling_mode"] = "per_stack"
+    # more planes than half of the data buffer, so the stack is split into blocks
+    state["number_z_steps"] = model.number_of_frames // 2 + 5
+
+    microscope = model.active_microscope
+    for feature in [ZStackAcquisition, SequencedZStackAcquisition]:
+        microscope.load_stage_sequence = MagicMock(
+            wraps=microscope.load_stage_sequence
+        )
+        z_stack, received_frames, n_frames = run_z_stack(model, feature)
+        calls = microscope.load_stage_sequence.call_args_list
+        del microscope.load_stage_sequence
+        assert received_frames == n_frames
+
+        if feature is ZStackAcquisition:
+            assert calls == []
+            continue
+
+        # the stack is loaded block by block, one block per DAQ acquisition
+        assert z_stack.block_size < state["number_z_steps"]
+        n_channels = int(state["selected_channels"])
+        blocks_per_stack = -(-state["number_z_steps"] // z_stack.block_size)
+        assert len(calls) == blocks_per_stack * n_channels
+
+        # every plane of every channel is loaded once, in steps of the z step size
+        z_positions = [z for c in calls for z in c.args[0]["z"]]
+        assert len(z_positions) == n_frames
+        for c in range(n_channels):
+            stack = z_positions[
+                c * state["number_z_steps"] : (c + 1) * state["number_z_steps"]
+            ]
+            assert np.allclose(np.diff(stack), z_stack.z_step_size)
+            assert stack[0] == pytest.approx(
+                z_stack.start_z_position + z_stack.positions[0]["z"]
+            )
+
+    # the waveform template is restored
+    assert state["waveform_template"] == backup["waveform_template"]
+    for stage, _ in model.active_microscope.stages_list:
+        assert getattr(stage, "sequence", {}) == {}
+
+    for k, v in backup.items():
+        state[k] = v
+
+
+def test_traced_acquisition(model, tmp_path):
+    import json
+    from navigate.model.features.common_features import ZStackAcquisition
+
+    state = model.configuration["experiment"]["MicroscopeState"]
+    backup = {
+        k: state[k]
+        for k in [
+            "image_mode",
+            "is_save",
+            "is_multiposition",
+            "stack_cycling_mode",
+            "number_z_steps",
+        ]
+    }
+    state["image_mode"] = "customized"
+    state["is_save"] = False
+    state["is_multiposition"] = False
+    state["stack_cycling_mode"] = "per_stack"
+    state["number_z_steps"] = 5
+
+    model.trace_path = str(tmp_path)
+    try:
+        _, received_frames, n_frames = run_z_stack(model, ZStackAcquisition)
+    finally:
+        model.trace_path = None
+        for k, v in backup.items():
+            state[k] = v
+    assert received_frames == n_frames
+    assert model.tracer is None
+
+    traces = list(tmp_path.glob("trace_*.json"))
+    assert len(traces) == 1
+    with open(traces[0]) as f:
+        events = json.load(f)["traceEvents"]
+    spans = {}
+    for event in events:
+        if event["ph"] == "X":
+            spans.setdefault((event["cat"], event["name"]), []).append(event)
+    assert ("signal", "ZStackAcquisition.init") in spans
+    assert len(spans[("signal", "ZStackAcquisition.main")]) >= n_frames
+    data_main = spans[("data", "ZStackAcquisition.main")]
+    assert 0 < len(data_main) <= n_frames
+    assert ("wait", "camera.get_new_frame") in spans
+    # the signal and the data functions run on different threads
+    assert spans[("signal", "ZStackAcquisition.main")][0]["tid"] != data_main[0]["tid"]
+    thread_names = [e["args"]["name"] for e in events if e["name"] == "thread_name"]
+    assert "customized signal" in thread_names
+    assert "ZStackAcquisition.main" in model.trace_summary
+
+
+def test_estimate_acquisition_from_measured_telemetry(model):
+    from navigate.model.features.feature_related_functions import (
+        convert_str_to_feature_list,
+    )
+
+    feature_list = convert_str_to_feature_list(
+        "[{'name': PrepareNextChannel}, {'name': Snap}]"
+    )
+    backup = model.trace_summary
+    try:
+        model.trace_summary = {}
+        report = model.estimate_acquisition(feature_list=feature_list)
+        model.trace_summary = {
+            "PrepareNextChannel.main": {"count": 1, "total": 5.0, "max": 5.0}
+        }
+        measured = model.estimate_acquisition(feature_list=feature_list)
+        given = model.estimate_acquisition({"channel_switch": 0}, feature_list)
+    finally:
+        model.trace_summary = backup
+    assert measured["channel_switches"] == report["channel_switches"] > 0
+    assert measured["phases"]["channel_switch"] == pytest.approx(
+        5.0 * report["channel_switches"]
+    )
+    assert given["phases"]["channel_switch"] == 0
+
+
+def test_update_camera_correction(model):
+    camera = model.active_microscope.camera
+    camera_setting = model.configuration["experiment"]["CameraParameters"]
+    shape = (model.img_height, model.img_width)
+    backup = (camera._offset, camera._variance, camera._flatfield)
+    flags = ["offset_correction", "flatfield_correction", "hot_pixel_correction"]
+
+    try:
+        for k in flags:
+            camera_setting[k] = False
+        assert model.update_camera_correction() is None
+
+        camera._offset = np.full(shape, 100.0)
+        camera._variance = np.full(shape, 4.0)
+        camera._variance[1, 1] = 1000
+        # a flatfield of the wrong size is skipped
+        camera._flatfield = np.ones((4, 4))
+        for k in flags:
+            camera_setting[k] = True
+        correction = model.update_camera_correction()
+        assert correction is model.camera_correction
+        assert correction.offset is not None and correction.gain is None
+        assert correction.hot_pixels.tolist() == [shape[1] + 1]
+
+        model.data_buffer[0][:] = 150
+        model.correct_frames([0])
+        assert np.all(model.data_buffer[0] == 50)
+    finally:
+        for k in flags:
+            camera_setting[k] = False
+        camera._offset, camera._variance, camera._flatfield = backup
+        model.camera_correction = None
+
+
+def test_mosaic_overview(model, tmp_path):
+    from types import SimpleNamespace
+
+    experiment = model.configuration["experiment"]
+    state = experiment["MicroscopeState"]
+    backup = (
+        experiment["MultiPositions"][:],
+        state["is_multiposition"],
+        model.imaging_mode,
+        model.is_save,
+        model.image_writer,
+    )
+    positions = [
+        {"x": 0.0, "y": 0.0, "z": 0.0, "theta": 0.0, "f": 0.0},
+        {"x": 1000.0, "y": 500.0, "z": 0.0, "theta": 0.0, "f": 0.0},
+    ]
+
+    try:
+        experiment["MultiPositions"] = positions
+        model.imaging_mode = "z-stack"
+        state["is_multiposition"] = False
+        assert model.update_mosaic_overview() is None
+
+        state["is_multiposition"] = True
+        overview = model.update_mosaic_overview()
+        assert overview is model.mosaic_overview
+        for i, p in enumerate(positions):
+            model.data_buffer[i][:] = 100 * (i + 1)
+            model.data_buffer_positions[i][:] = [p[k] for k in "xyz"] + [0, 0]
+        model.update_mosaic([0, 1])
+        assert overview.tiles == 1
+
+        model.is_save = True
+        model.image_writer = SimpleNamespace(save_directory=str(tmp_path))
+        model.finish_mosaic_overview()
+        assert overview.tiles == 2
+        assert overview.canvas.max() == 200
+        assert (tmp_path / "mosaic_overview.tif").exists()
+        event, images = model.event_queue.put.call_args[0][0]
+        assert event == "mosaic_overview"
+        assert images["Overview"].max() == 200
+    finally:
+        experiment["MultiPositions"] = backup[0]
+        state["is_multiposition"] = backup[1]
+        model.imaging_mode, model.is_save, model.image_writer = backup[2:]
+        model.mosaic_overview = None
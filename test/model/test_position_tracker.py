@@ -0,0 +1,173 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import time
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.position_tracker import PositionTracker
+
+
+class CountingStage:
+    """Stage that counts the position queries."""
+
+    def __init__(self, axes):
+        self.axes = axes
+        self.stage_limits = True
+        self.queries = 0
+        for axis in axes:
+            setattr(self, f"{axis}_pos", 0)
+            setattr(self, f"{axis}_min", -100)
+            setattr(self, f"{axis}_max", 100)
+
+    def move_absolute(self, move_dictionary, wait_until_done=False):
+        for axis in self.axes:
+            value = move_dictionary.get(f"{axis}_abs")
+            if value is not None and -100 <= value <= 100:
+                setattr(self, f"{axis}_pos", value)
+        return True
+
+    def report_position(self):
+        self.queries += 1
+        return {f"{axis}_pos": getattr(self, f"{axis}_pos") for axis in self.axes}
+
+
+def make_tracker(readback_interval=0):
+    tracker = PositionTracker(readback_interval)
+    xy_stage = CountingStage(["x", "y"])
+    z_stage = CountingStage(["z"])
+    tracker.add_stage(xy_stage, ["x", "y"])
+    tracker.add_stage(z_stage, ["z"])
+    return tracker, xy_stage, z_stage
+
+
+def test_setpoints_are_cached():
+    tracker, xy_stage, z_stage = make_tracker()
+
+    # the stages are queried once
+    assert tracker.is_stale
+    assert tracker.get_positions() == {"x_pos": 0, "y_pos": 0, "z_pos": 0}
+    assert not tracker.is_stale
+    assert (xy_stage.queries, z_stage.queries) == (1, 1)
+
+    for i in range(10):
+        pos = {"z_abs": float(i)}
+        tracker.record(z_stage, pos, z_stage.move_absolute(pos))
+        assert tracker.get_positions()["z_pos"] == i
+        assert tracker.timestamps["z_pos"] >= tracker.timestamps["x_pos"]
+    assert (xy_stage.queries, z_stage.queries) == (1, 1)
+
+    # a setpoint out of the limits is ignored by the stage
+    pos = {"x_abs": 1.0, "y_abs": 1000.0}
+    tracker.record(xy_stage, pos, xy_stage.move_absolute(pos))
+    assert tracker.get_positions() == {"x_pos": 1.0, "y_pos": 0, "z_pos": 9.0}
+    assert tracker.get_positions() == xy_stage.report_position() | {"z_pos": 9.0}
+
+
+def test_invalidate():
+    tracker, xy_stage, z_stage = make_tracker()
+    tracker.get_positions()
+
+    # a failed move queries the stage
+    z_stage.z_pos = 5
+    tracker.record(z_stage, {"z_abs": 10.0}, False)
+    assert tracker.get_positions()["z_pos"] == 5
+    assert (xy_stage.queries, z_stage.queries) == (1, 2)
+
+    tracker.invalidate(xy_stage)
+    tracker.get_positions()
+    assert (xy_stage.queries, z_stage.queries) == (2, 2)
+
+    tracker.invalidate()
+    tracker.get_positions()
+    assert (xy_stage.queries, z_stage.queries) == (3, 3)
+
+    tracker.invalidate()
+    tracker.validate()
+    tracker.get_positions()
+    assert (xy_stage.queries, z_stage.queries) == (3, 3)
+
+
+def test_interrupted_move():
+    tracker, xy_stage, z_stage = make_tracker()
+    tracker.get_positions()
+
+    # the stage is stopped while it moves, the setpoint is not recorded
+    generation = tracker.generation
+    z_stage.z_pos = 5
+    tracker.invalidate()
+    tracker.record(z_stage, {"z_abs": 10.0}, True, generation)
+    assert tracker.get_positions()["z_pos"] == 5
+
+    generation = tracker.generation
+    tracker.record(z_stage, {"z_abs": 10.0}, True, generation)
+    assert tracker.get_positions()["z_pos"] == 10.0
+
+
+def test_waited_moves():
+    tracker, xy_stage, z_stage = make_tracker()
+    tracker.get_positions()
+
+    # only the moves that were waited for are kept
+    pos = {"z_abs": 10.0}
+    tracker.record(z_stage, pos, z_stage.move_absolute(pos))
+    pos = {"x_abs": 3.0, "y_abs": 4.0}
+    tracker.record(xy_stage, pos, xy_stage.move_absolute(pos), duration=0.5)
+    pos = {"z_abs": 4.0}
+    tracker.record(z_stage, pos, False, duration=0.5)
+    assert tracker.get_moves() == [({"x": 3.0, "y": 4.0}, 0.5)]
+
+
+def test_background_readback():
+    tracker, xy_stage, z_stage = make_tracker(readback_interval=0.01)
+    tracker.get_positions()
+
+    tracker.start_readback()
+    xy_stage.x_pos = 50
+    timeout = time.time() + 5
+    while tracker.get_positions()["x_pos"] != 50 and time.time() < timeout:
+        time.sleep(0.01)
+    tracker.stop_readback()
+    assert tracker.get_positions()["x_pos"] == 50
+
+    # no queries after the readback is stopped
+    queries = z_stage.queries
+    time.sleep(0.05)
+    assert z_stage.queries == queries
+
+    # disabled readback does not start a thread
+    tracker, _, _ = make_tracker()
+    tracker.start_readback()
+    assert tracker._readback_thread is None
@@ -232,3 +232,76 @@ class TestWaveforms(unittest.TestCase):
             sample_rate=sr, sweep_time=st, exposure=ex, camera_delay=cd
         )
         assert np.sum(v > 0) == int(sr * (ex - cd))
+
+
+class TestWaveformCache(unittest.TestCase):
+    """Unit Tests for the WaveformCache"""
+
+    def setUp(self):
+        self.cache = waveforms.WaveformCache(max_size=2)
+
+    def test_hits_and_misses(self):
+        key = ("ramp", 100000, 0.2)
+        first = self.cache.get(key, waveforms.remote_focus_ramp, 100000, 0.2)
+        second = self.cache.get(key, waveforms.remote_focus_ramp, 100000, 0.2)
+        assert first is second
+        assert not first.flags.writeable
+        stats = self.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["compute_time"] > 0
+
+    def test_lru_eviction(self):
+        for i in range(2):
+            self.cache.get(("dc", i), waveforms.dc_value, amplitude=i)
+        # use the first waveform so the second one is the least recently used
+        self.cache.get(("dc", 0), waveforms.dc_value, amplitude=0)
+        self.cache.get(("dc", 2), waveforms.dc_value, amplitude=2)
+        assert len(self.cache) == 2
+        assert ("dc", 0) in self.cache.waveforms
+        assert ("dc", 1) not in self.cache.waveforms
+
+    def test_size_bound(self):
+        cache = waveforms.WaveformCache(max_size=8, max_megabytes=1)
+        for i in range(3):
+            # 400000 bytes each, only two of them fit in a megabyte
+            cache.get(("ones", i), np.ones, 50000)
+        assert list(cache.waveforms) == [("ones", 1), ("ones", 2)]
+        assert cache.nbytes == 800000
+
+        # a waveform larger than the cache is returned without being cached
+        waveform = cache.get(("ones", 3), np.ones, 200000)
+        assert len(waveform) == 200000
+        assert ("ones", 3) not in cache.waveforms
+        assert cache.nbytes == 800000
+
+    def test_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def get(i):
+            return self.cache.get(("dc", i % 3), waveforms.dc_value, amplitude=i % 3)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(get, range(200)))
+        for i, waveform in enumerate(results):
+            assert waveform[0] == i % 3
+        stats = self.cache.stats()
+        assert stats["hits"] + stats["misses"] == 200
+        assert len(self.cache) == 2
+
+    def test_clear(self):
+        self.cache.get(("dc", 1), waveforms.dc_value)
+        self.cache.clear()
+        assert self.cache.stats() == {
+            "size": 0,
+            "hits": 0,
+            "misses": 0,
+            "compute_time": 0.0,
+        }
+
+
+def test_waveform_chunks():
+    waveform = np.arange(10.0)
+    chunks = list(waveforms.waveform_chunks(waveform, 25, chunk_size=7))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 4]
+    np.testing.assert_array_equal(np.hstack(chunks), np.tile(waveform, 3)[:25])
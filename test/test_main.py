@@ -32,6 +32,8 @@
 #
 
 # Standard Library Imports
+import subprocess
+import sys
 import unittest
 from pathlib import Path
 
@@ -61,10 +63,65 @@ class TestMain(unittest.TestCase):
             "--waveform-constants-path",
             "--rest-api-file",
             "--logging-config",
+            "--trace-file",
         ]
         for arg in input_arguments:
             parser.parse_args([arg, str(Path.joinpath(navigate_path, "test.yml"))])
 
 
+def imported_modules(module):
+    """Import a module in a new interpreter and return the modules it imported.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module to import.
+
+    Returns
+    -------
+    modules : set
+        Names of the modules in sys.modules after the import.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(chr(10).join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestStartupImports(unittest.TestCase):
+    """Heavy optional modules are imported where they are used, not at startup."""
+
+    def check_startup_imports(self, module, deferred_modules):
+        modules = imported_modules(module)
+        assert module in modules
+        for name in deferred_modules:
+            assert name not in modules, f"{module} imports {name}"
+
+    def test_main_imports(self):
+        self.check_startup_imports(
+            "navigate.main",
+            ["navigate.controller.controller", "numpy", "pandas", "scipy"],
+        )
+
+    def test_controller_imports(self):
+        self.check_startup_imports(
+            "navigate.controller.controller",
+            ["scipy", "skimage", "requests", "pandas", "pandastable", "h5py", "zarr"],
+        )
+
+    def test_model_imports(self):
+        self.check_startup_imports(
+            "navigate.model.model",
+            ["scipy", "skimage", "requests", "pandas", "matplotlib", "h5py", "zarr"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
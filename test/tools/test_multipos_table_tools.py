@@ -43,7 +43,7 @@ import numpy as np
 from navigate.tools.multipos_table_tools import (
     update_table,
 )
-from navigate.view.main_window_content.multiposition_tab import MultiPositionTable
+from navigate.view.main_window_content.multiposition_table import MultiPositionTable
 
 
 @pytest.mark.parametrize("pair", zip([5.6, -3.8, 0], [1, -1, 1]))
@@ -261,3 +261,83 @@ class UpdateTableTestCase(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+def grid_positions(x_tiles=20, y_tiles=15):
+    from navigate.tools.multipos_table_tools import compute_tiles_from_bounding_box
+
+    return compute_tiles_from_bounding_box(
+        0, x_tiles, 100, 0, 0, y_tiles, 100, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0
+    )
+
+
+def test_calc_travel_times():
+    from navigate.tools.multipos_table_tools import calc_travel_times
+
+    positions = np.array([[0, 0, 0, 0, 0], [100, 50, 0, 0, 0], [100, 50, 0, 90, 0]])
+    velocities = {"x": 100, "y": 10, "z": 1, "theta": 30, "f": 1}
+    np.testing.assert_allclose(calc_travel_times(positions, velocities), [5, 3])
+    assert calc_travel_times(positions[:1]).size == 0
+
+
+def test_serpentine_order():
+    from navigate.tools.multipos_table_tools import (
+        calc_travel_times,
+        serpentine_order,
+    )
+
+    positions = grid_positions()
+    order = serpentine_order(positions)
+    assert sorted(order) == list(range(len(positions)))
+    # every move is a single tile step
+    np.testing.assert_allclose(calc_travel_times(positions[order]), 100)
+
+
+def test_nearest_neighbor_and_two_opt_order():
+    from navigate.tools.multipos_table_tools import (
+        calc_travel_times,
+        nearest_neighbor_order,
+        two_opt_order,
+    )
+
+    rng = np.random.default_rng(0)
+    positions = rng.random((500, 5)) * [5000, 5000, 500, 0, 500]
+    nn_order = nearest_neighbor_order(positions)
+    assert sorted(nn_order) == list(range(len(positions)))
+    assert nn_order[0] == 0
+    nn_time = calc_travel_times(positions[nn_order]).sum()
+    assert nn_time < calc_travel_times(positions).sum()
+
+    improved_order = two_opt_order(positions, nn_order, time_limit=5)
+    assert sorted(improved_order) == list(range(len(positions)))
+    assert calc_travel_times(positions[improved_order]).sum() <= nn_time
+
+
+def test_optimize_tile_order():
+    from navigate.tools.multipos_table_tools import (
+        calc_travel_times,
+        optimize_tile_order,
+    )
+
+    positions = grid_positions()
+    velocities = {"x": 1000, "y": 500, "z": 1000, "theta": 10, "f": 1000}
+    order, report = optimize_tile_order(positions, velocities)
+    assert sorted(order) == list(range(len(positions)))
+    assert report["original_time"] == pytest.approx(
+        calc_travel_times(positions, velocities).sum()
+    )
+    assert report["optimized_time"] == pytest.approx(
+        calc_travel_times(positions[order], velocities).sum()
+    )
+    assert report["time_saved"] > 0
+
+    # never worse than the original order
+    _, report = optimize_tile_order(positions[order], velocities)
+    assert report["time_saved"] >= 0
+
+    # large tables
+    rng = np.random.default_rng(1)
+    positions = rng.random((10000, 5)) * [10000, 10000, 1000, 0, 1000]
+    order, report = optimize_tile_order(positions, velocities)
+    assert sorted(order) == list(range(len(positions)))
+    assert report["time_saved"] > 0
@@ -0,0 +1,112 @@
+# Copyright (c) 2021-2022  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+
+# Standard library imports
+from multiprocessing import Manager
+
+# Third party imports
+import numpy as np
+import pytest
+
+# Local application imports
+from navigate.tools.position_table import (
+    TABLE_AXES,
+    PositionTable,
+    positions_to_array,
+)
+
+
+def test_positions_to_array():
+    positions = [
+        {"x": 1, "y": 2, "z": 3, "theta": 4, "f": 5},
+        {"f": 10, "theta": 9, "z": 8, "y": 7, "x": 6},
+    ]
+    expected = np.arange(1, 11).reshape(2, 5)
+    np.testing.assert_array_equal(positions_to_array(positions), expected)
+    np.testing.assert_array_equal(positions_to_array(expected.tolist()), expected)
+    assert positions_to_array(None).shape == (0, 5)
+    assert positions_to_array([]).shape == (0, 5)
+
+    with pytest.raises(ValueError):
+        positions_to_array([{"x": 1}])
+    with pytest.raises(ValueError):
+        positions_to_array([{"x": "a", "y": 2, "z": 3, "theta": 4, "f": 5}])
+
+
+def test_positions_to_array_from_proxy():
+    with Manager() as manager:
+        positions = manager.list()
+        positions.append({"x": 1, "y": 2, "z": 3, "theta": 4, "f": 5})
+        positions.append(manager.dict({"x": 6, "y": 7, "z": 8, "theta": 9, "f": 10}))
+        np.testing.assert_array_equal(
+            positions_to_array(positions), np.arange(1, 11).reshape(2, 5)
+        )
+
+        proxy = PositionTable(positions).to_list_proxy(manager)
+        assert len(proxy) == 2
+        assert proxy[1] == {"x": 6, "y": 7, "z": 8, "theta": 9, "f": 10}
+
+
+def test_position_table():
+    events = []
+    table = PositionTable(np.arange(15).reshape(3, 5))
+    table.subscribe(lambda event, data: events.append(event))
+
+    assert len(table) == 3
+    assert table[1] == dict(zip(TABLE_AXES, [5, 6, 7, 8, 9]))
+    assert table[-1]["f"] == 14
+    with pytest.raises(IndexError):
+        table[3]
+    assert [position["x"] for position in table] == [0, 5, 10]
+
+    for i in range(100):
+        table.append({"x": i, "y": 0, "z": 0, "theta": 0, "f": 0})
+    assert len(table) == 103
+    assert table[-1]["x"] == 99
+    assert table.array.shape == (103, 5)
+
+    table.remove([False, True, False])
+    assert len(table) == 101
+    assert table[0]["x"] == 5
+
+    table.reorder(np.arange(len(table))[::-1])
+    assert table[0]["x"] == 99
+    assert table[-1]["x"] == 5
+
+    table.set([])
+    assert len(table) == 0
+    assert events == ["append"] * 100 + ["remove", "reorder", "reset"]
+
+    table.set([[1, 2, 3, 4, 5]], notify=False)
+    assert events[-1] == "reset" and len(events) == 103
+    assert table.to_list() == [dict(zip(TABLE_AXES, [1, 2, 3, 4, 5]))]
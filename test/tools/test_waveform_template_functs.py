@@ -34,9 +34,15 @@
 import unittest
 
 # Third-party imports
+import numpy as np
 
 # Local application imports
-from navigate.tools.waveform_template_funcs import get_waveform_template_parameters
+from navigate.tools.waveform_template_funcs import (
+    get_waveform_template_parameters,
+    decimate_waveform,
+    repeat_decimated_waveform,
+    decimate_waveform_dict,
+)
 
 
 class TestGetWaveformTemplateParameters(unittest.TestCase):
@@ -122,5 +128,57 @@ class TestGetWaveformTemplateParametersExceptions(unittest.TestCase):
         )
 
 
+class TestDecimateWaveform(unittest.TestCase):
+    def setUp(self):
+        self.waveform = np.sin(np.linspace(0, 20 * np.pi, 100000))
+        self.waveform[12345] = 3
+
+    def test_short_waveform_is_not_decimated(self):
+        positions, values = decimate_waveform(self.waveform[:100], 2000)
+        np.testing.assert_array_equal(positions, np.arange(100))
+        np.testing.assert_array_equal(values, self.waveform[:100])
+
+    def test_envelope_keeps_peaks(self):
+        positions, values = decimate_waveform(self.waveform, 2000)
+        self.assertLessEqual(len(values), 2000)
+        self.assertEqual(values.max(), 3)
+        self.assertIn(12345, positions)
+        self.assertEqual(values.min(), self.waveform.min())
+        self.assertTrue(np.all(np.diff(positions) >= 0))
+        np.testing.assert_array_equal(values, self.waveform[positions])
+
+    def test_repeat(self):
+        positions, values = decimate_waveform(self.waveform, 2000)
+        for repeat in [1, 2, 100, 100000]:
+            x, y = repeat_decimated_waveform(positions, values, 100000, repeat, 2000)
+            self.assertLessEqual(len(y), 2000)
+            self.assertEqual(y.max(), 3)
+            self.assertEqual(y.min(), self.waveform.min())
+            self.assertLess(x.max(), 100000 * repeat)
+            self.assertTrue(np.all(np.diff(x) >= 0))
+
+    def test_decimate_waveform_dict(self):
+        waveform_dict = {
+            "camera_waveform": {"channel_1": self.waveform, "channel_2": None},
+            "remote_focus_waveform": {"channel_1": self.waveform, "channel_2": None},
+            "galvo_waveform": [{"channel_1": self.waveform}, None],
+        }
+        plot_dict = decimate_waveform_dict(waveform_dict, 2000)
+        positions, values, n_samples = plot_dict["camera_waveform"]["channel_1"]
+        self.assertEqual(n_samples, 100000)
+        self.assertLessEqual(len(values), 2000)
+        self.assertIsNone(plot_dict["remote_focus_waveform"]["channel_2"])
+        self.assertEqual(plot_dict["galvo_waveform"][1], {})
+
+        # the hash only changes with the waveforms
+        self.assertEqual(
+            plot_dict["hash"], decimate_waveform_dict(waveform_dict, 2000)["hash"]
+        )
+        waveform_dict["galvo_waveform"][0] = {"channel_1": -self.waveform}
+        self.assertNotEqual(
+            plot_dict["hash"], decimate_waveform_dict(waveform_dict, 2000)["hash"]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()